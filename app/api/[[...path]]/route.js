@@ -1,19 +1,12 @@
 import { NextResponse } from 'next/server'
-import { MongoClient } from 'mongodb'
+import { checkMongoHealth, getDb } from '../../../lib/mongodb.js'
+import { buildCacheKey, getResponseCache } from '../../../lib/responseCache.js'
+import { getRpcMetrics } from '../../../lib/rpcGateway.js'
 import { v4 as uuidv4 } from 'uuid'
 
-// MongoDB connection
-let client
-let db
-
-async function connectToDatabase() {
-  if (!client) {
-    client = new MongoClient(process.env.MONGO_URL)
-    await client.connect()
-    db = client.db()
-    console.log('🔗 Connected to MongoDB for room management')
-  }
-  return db
+// MongoDB connection (shared pool, database named in the connection string)
+function connectToDatabase() {
+  return getDb(null)
 }
 
 // CORS headers
@@ -30,16 +23,98 @@ const corsHeaders = {
   'X-External-Access': 'Enhanced'
 }
 
+const responseCache = getResponseCache()
+
 const ROOM_TIERS = {
   1: { entryFee: 100, bounty: 90, platformFee: 10 },
   5: { entryFee: 500, bounty: 450, platformFee: 50 },
   20: { entryFee: 2000, bounty: 1800, platformFee: 200 }
 }
 
+// Display fields for each tier never change, so build them once
+const ROOM_TIER_CATALOGUE = Object.entries(ROOM_TIERS).map(([tier, config]) => ({
+  tier: Number(tier),
+  entryFee: config.entryFee,
+  entryFeeDisplay: `$${(config.entryFee / 100).toFixed(2)}`,
+  bounty: config.bounty,
+  bountyDisplay: `$${(config.bounty / 100).toFixed(2)}`,
+  platformFee: config.platformFee,
+  platformFeeDisplay: `$${(config.platformFee / 100).toFixed(2)}`,
+  description: `$${tier} → $${(config.bounty / 100).toFixed(2)} bounty, $${(config.platformFee / 100).toFixed(2)} fee`
+}))
+
 const PLATFORM_WALLET = '0x6657C1E107e9963EBbFc9Dfe510054238f7E8251'
 const DAMAGE_ATTRIBUTION_WINDOW = 10_000
 const CASHOUT_FEE_PERCENT = 10
 
+// Route tables. `cache` opts a route into the server-side response cache;
+// `invalidates` lists cached routes whose responses a successful call makes
+// stale. /api/servers and /api/servers-proxy have their own route handlers.
+// Balance changes made outside this file invalidate 'rooms/tiers' through
+// invalidateCachedRoutes().
+const GET_ROUTES = {
+  '': { handler: () => handleApiRoot() },
+  // Shared Mongo pool health and utilization
+  'health/database': { handler: () => handleDatabaseHealth() },
+  'health/cache': { handler: () => NextResponse.json(responseCache.getMetrics(), { headers: corsHeaders }) },
+  // Solana RPC latency per method and endpoint availability
+  'health/rpc': { handler: () => NextResponse.json(getRpcMetrics(), { headers: corsHeaders }) }
+}
+
+const POST_ROUTES = {
+  'hathora/create-room': { handler: ({ body }) => handleCreateHathoraRoom(body) },
+  'rooms/create': { handler: ({ body }) => handleCreateRoom(body) },
+  'rooms/join': {
+    handler: ({ body }) => (body && (body.roomTier !== undefined || body.matchId))
+      ? handlePaidRoomJoin(body)
+      : handleJoinRoom(body),
+    invalidates: ['rooms/tiers']
+  },
+  'rooms/status': { handler: ({ body }) => handleUpdateRoomStatus(body) },
+  'game-sessions': { handler: ({ body }) => handleGameSessions(body) },
+  'users/add-mission-reward': { handler: ({ body }) => handleAddMissionReward(body), invalidates: ['rooms/tiers'] },
+  // Tier catalogue is static; only the caller's balance varies
+  'rooms/tiers': { handler: ({ body }) => handleGetRoomTiers(body), cache: { ttlMs: 5_000, varyBy: ['userId'] } },
+  'rooms/damage': { handler: ({ body }) => handleRecordDamage(body) },
+  'rooms/eliminate': { handler: ({ body }) => handleProcessElimination(body), invalidates: ['rooms/tiers'] },
+  'rooms/cashout': { handler: ({ body }) => handleProcessCashout(body), invalidates: ['rooms/tiers'] },
+  'rooms/match': { handler: ({ body }) => handleGetMatchStatus(body) }
+}
+
+async function dispatch(routes, route, context) {
+  const definition = routes[route]
+
+  // Default route for unknown paths
+  if (!definition) {
+    return NextResponse.json({ error: 'Not found' }, { status: 404, headers: corsHeaders })
+  }
+
+  if (definition.cache) {
+    return respondFromCache(route, definition, context)
+  }
+
+  const response = await definition.handler(context)
+
+  if (definition.invalidates && response.ok) {
+    await Promise.all(definition.invalidates.map((cachedRoute) => responseCache.invalidateRoute(cachedRoute)))
+  }
+
+  return response
+}
+
+async function respondFromCache(route, definition, context) {
+  const key = buildCacheKey(route, definition.cache.varyBy, context.params)
+  const { entry, state } = await responseCache.fetch(route, key, definition.cache, async () => {
+    const response = await definition.handler(context)
+    return { status: response.status, body: await response.json() }
+  })
+
+  return NextResponse.json(entry.body, {
+    status: entry.status,
+    headers: { ...corsHeaders, 'X-Cache': state }
+  })
+}
+
 export async function GET(request, { params }) {
   const { path } = params
   const route = path?.join('/') || ''
@@ -47,28 +122,11 @@ export async function GET(request, { params }) {
   console.log('🚀 GET HANDLER CALLED - PATH:', route)
   
   try {
-    // Root API endpoint
-    if (!path || path.length === 0) {
-      return NextResponse.json(
-        { 
-          message: 'TurfLoot API v2.0',
-          service: 'turfloot-api',
-          status: 'operational',
-          features: ['auth', 'blockchain', 'multiplayer'],
-          timestamp: new Date().toISOString()
-        }, 
-        { headers: corsHeaders }
-      )
-    }
-
-    // Servers API endpoint - get active rooms
-    if (route === 'servers' || route === 'servers-proxy') {
-      return await handleGetServers(request)
-    }
-
-    // Default route for unknown paths
-    return NextResponse.json({ error: 'Not found' }, { status: 404, headers: corsHeaders })
-    
+    const searchParams = new URL(request.url).searchParams
+    return await dispatch(GET_ROUTES, route, {
+      request,
+      params: Object.fromEntries(searchParams)
+    })
   } catch (error) {
     console.error('GET handler error:', error)
     return NextResponse.json({ error: 'Internal Server Error' }, { status: 500, headers: corsHeaders })
@@ -93,116 +151,7 @@ export async function POST(request, { params }) {
   }
 
   try {
-    // Hathora room creation endpoint
-    if (route === 'hathora/create-room') {
-      try {
-        const { gameMode = 'practice', region, maxPlayers = 50, stakeAmount = 0 } = body || {}
-        
-        console.log(`🚀 Creating Hathora room with gameMode: ${gameMode}, region: ${region}, stakeAmount: ${stakeAmount}`)
-        
-        // Call the working /api/hathora/room endpoint directly to avoid circular dependency
-        const roomResponse = await fetch(`${process.env.NEXT_PUBLIC_BASE_URL}/api/hathora/room`, {
-          method: 'POST',
-          headers: {
-            'Content-Type': 'application/json',
-          },
-          body: JSON.stringify({
-            gameMode,
-            region,
-            maxPlayers,
-            stakeAmount
-          })
-        })
-        
-        if (!roomResponse.ok) {
-          const errorData = await roomResponse.json()
-          throw new Error(`Hathora room creation failed: ${errorData.error || roomResponse.statusText}`)
-        }
-        
-        const roomData = await roomResponse.json()
-        
-        if (!roomData.success) {
-          throw new Error(`Hathora room creation failed: ${roomData.error}`)
-        }
-        
-        console.log(`✅ Created Hathora room: ${roomData.roomId}`)
-        
-        return NextResponse.json({
-          success: true,
-          roomId: roomData.roomId,
-          gameMode: roomData.gameMode,
-          region: roomData.region,
-          maxPlayers: roomData.maxPlayers,
-          stakeAmount: roomData.stakeAmount,
-          host: roomData.host,
-          port: roomData.port,
-          playerToken: roomData.playerToken,
-          isHathoraRoom: true,
-          isMockRoom: false,
-          timestamp: new Date().toISOString()
-        }, { headers: corsHeaders })
-        
-      } catch (error) {
-        console.error('❌ Error creating Hathora room:', error)
-        return NextResponse.json({
-          success: false,
-          error: 'Failed to create Hathora room',
-          message: error.message,
-          timestamp: new Date().toISOString()
-        }, { status: 500, headers: corsHeaders })
-      }
-    }
-
-    // Create room endpoint
-    if (route === 'rooms/create') {
-      return await handleCreateRoom(body)
-    }
-
-    // Join room endpoint
-    if (route === 'rooms/join') {
-      if (body && (body.roomTier !== undefined || body.matchId)) {
-        return await handlePaidRoomJoin(body)
-      }
-      return await handleJoinRoom(body)
-    }
-
-    // Update room status endpoint
-    if (route === 'rooms/status') {
-      return await handleUpdateRoomStatus(body)
-    }
-
-    // Game sessions endpoint (existing)
-    if (route === 'game-sessions') {
-      return await handleGameSessions(body)
-    }
-
-    if (route === 'users/add-mission-reward') {
-      return await handleAddMissionReward(body)
-    }
-
-    if (route === 'rooms/tiers') {
-      return await handleGetRoomTiers(body)
-    }
-
-    if (route === 'rooms/damage') {
-      return await handleRecordDamage(body)
-    }
-
-    if (route === 'rooms/eliminate') {
-      return await handleProcessElimination(body)
-    }
-
-    if (route === 'rooms/cashout') {
-      return await handleProcessCashout(body)
-    }
-
-    if (route === 'rooms/match') {
-      return await handleGetMatchStatus(body)
-    }
-
-    // Default route for unknown paths
-    return NextResponse.json({ error: 'Not found' }, { status: 404, headers: corsHeaders })
-    
+    return await dispatch(POST_ROUTES, route, { request, body, params: body || {} })
   } catch (error) {
     console.error('POST handler error:', error)
     return NextResponse.json({ error: 'Internal Server Error' }, { status: 500, headers: corsHeaders })
@@ -213,96 +162,87 @@ export async function OPTIONS(request) {
   return new NextResponse(null, { status: 200, headers: corsHeaders })
 }
 
-// Room Management Handler Functions
+// Root API endpoint
+function handleApiRoot() {
+  return NextResponse.json(
+    { 
+      message: 'TurfLoot API v2.0',
+      service: 'turfloot-api',
+      status: 'operational',
+      features: ['auth', 'blockchain', 'multiplayer'],
+      timestamp: new Date().toISOString()
+    }, 
+    { headers: corsHeaders }
+  )
+}
+
+async function handleDatabaseHealth() {
+  const health = await checkMongoHealth()
+  return NextResponse.json(health, { status: health.healthy ? 200 : 503, headers: corsHeaders })
+}
 
-// Get active servers/rooms
-async function handleGetServers(request) {
+// Hathora room creation endpoint
+async function handleCreateHathoraRoom(body = {}) {
   try {
-    console.log('🌐 Fetching active rooms from database...')
-    const database = await connectToDatabase()
-    const roomsCollection = database.collection('active_rooms')
+    const { gameMode = 'practice', region, maxPlayers = 50, stakeAmount = 0 } = body || {}
+    
+    console.log(`🚀 Creating Hathora room with gameMode: ${gameMode}, region: ${region}, stakeAmount: ${stakeAmount}`)
     
-    // Get active rooms (created in last 24 hours and not ended)
-    const twentyFourHoursAgo = new Date(Date.now() - 24 * 60 * 60 * 1000)
-    const activeRooms = await roomsCollection.find({
-      createdAt: { $gte: twentyFourHoursAgo },
-      status: { $in: ['waiting', 'active'] },
-      endedAt: { $exists: false }
-    }).toArray()
-
-    // Clean up old rooms (older than 24 hours or ended)
-    await roomsCollection.deleteMany({
-      $or: [
-        { createdAt: { $lt: twentyFourHoursAgo } },
-        { status: 'ended' },
-        { endedAt: { $exists: true } }
-      ]
+    // Call the working /api/hathora/room endpoint directly to avoid circular dependency
+    const roomResponse = await fetch(`${process.env.NEXT_PUBLIC_BASE_URL}/api/hathora/room`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({
+        gameMode,
+        region,
+        maxPlayers,
+        stakeAmount
+      })
     })
-
-    // Transform rooms into server browser format
-    const servers = activeRooms.map(room => ({
-      id: room.roomId,
-      name: room.name || `${room.creatorName}'s Game`,
-      players: room.currentPlayers || 0,
-      maxPlayers: room.maxPlayers || 8,
-      gameType: room.gameType || 'Arena Battle',
-      region: room.region || 'Global',
-      entryFee: room.entryFee || 0,
-      status: room.status,
-      ping: room.region === 'US-East' ? 45 : 
-            room.region === 'US-West' ? 78 : 
-            room.region === 'Europe' ? 123 : 
-            room.region === 'Asia-Pacific' ? 67 : 85,
-      creatorWallet: room.creatorWallet,
-      creatorName: room.creatorName,
-      roomId: room.roomId,
-      colyseusEndpoint: room.colyseusEndpoint || 'wss://au-syd-ab3eaf4e.colyseus.cloud',
-      createdAt: room.createdAt,
-      lastActivity: room.lastActivity || room.createdAt
-    }))
-
-    // Calculate stats
-    const totalPlayers = servers.reduce((sum, server) => sum + server.players, 0)
-    const activeServers = servers.filter(s => s.status === 'active').length
-    const practiceServers = 0 // Practice servers are local only
-    const cashServers = servers.filter(s => s.entryFee > 0).length
-
-    const response = {
-      servers: servers,
-      totalPlayers: totalPlayers,
-      totalActiveServers: activeServers,
-      totalServers: servers.length,
-      practiceServers: practiceServers,
-      cashServers: cashServers,
-      regions: ['US-East', 'US-West', 'Europe', 'Asia-Pacific', 'Global'],
-      gameTypes: ['Arena Battle', 'Cash Game', 'Tournament'],
-      timestamp: new Date().toISOString()
+    
+    if (!roomResponse.ok) {
+      const errorData = await roomResponse.json()
+      throw new Error(`Hathora room creation failed: ${errorData.error || roomResponse.statusText}`)
     }
-
-    console.log(`✅ Returning ${servers.length} active rooms, ${totalPlayers} total players`)
-    return NextResponse.json(response, { headers: corsHeaders })
-
-  } catch (error) {
-    console.error('❌ Error fetching servers:', error)
     
-    // Return fallback data on error
-    const fallbackResponse = {
-      servers: [],
-      totalPlayers: 0,
-      totalActiveServers: 0,
-      totalServers: 0,
-      practiceServers: 0,
-      cashServers: 0,
-      regions: ['US-East', 'US-West', 'Europe', 'Asia-Pacific', 'Global'],
-      gameTypes: ['Arena Battle', 'Cash Game', 'Tournament'],
-      timestamp: new Date().toISOString(),
-      error: 'Database connection failed'
+    const roomData = await roomResponse.json()
+    
+    if (!roomData.success) {
+      throw new Error(`Hathora room creation failed: ${roomData.error}`)
     }
     
-    return NextResponse.json(fallbackResponse, { headers: corsHeaders })
+    console.log(`✅ Created Hathora room: ${roomData.roomId}`)
+    
+    return NextResponse.json({
+      success: true,
+      roomId: roomData.roomId,
+      gameMode: roomData.gameMode,
+      region: roomData.region,
+      maxPlayers: roomData.maxPlayers,
+      stakeAmount: roomData.stakeAmount,
+      host: roomData.host,
+      port: roomData.port,
+      playerToken: roomData.playerToken,
+      isHathoraRoom: true,
+      isMockRoom: false,
+      timestamp: new Date().toISOString()
+    }, { headers: corsHeaders })
+    
+  } catch (error) {
+    console.error('❌ Error creating Hathora room:', error)
+    return NextResponse.json({
+      success: false,
+      error: 'Failed to create Hathora room',
+      message: error.message,
+      timestamp: new Date().toISOString()
+    }, { status: 500, headers: corsHeaders })
   }
 }
 
+// Room Management Handler Functions
+
 // Create a new room
 async function handleCreateRoom(body = {}) {
   try {
@@ -1150,16 +1090,9 @@ async function handleGetRoomTiers(body = {}) {
     const user = await usersCollection.findOne({ userId })
     const userBalance = user?.balance || 0
 
-    const tiers = Object.entries(ROOM_TIERS).map(([tier, config]) => ({
-      tier: Number(tier),
-      entryFee: config.entryFee,
-      entryFeeDisplay: `$${(config.entryFee / 100).toFixed(2)}`,
-      bounty: config.bounty,
-      bountyDisplay: `$${(config.bounty / 100).toFixed(2)}`,
-      platformFee: config.platformFee,
-      platformFeeDisplay: `$${(config.platformFee / 100).toFixed(2)}`,
-      affordable: userBalance >= config.entryFee,
-      description: `$${tier} → $${(config.bounty / 100).toFixed(2)} bounty, $${(config.platformFee / 100).toFixed(2)} fee`
+    const tiers = ROOM_TIER_CATALOGUE.map((tier) => ({
+      ...tier,
+      affordable: userBalance >= tier.entryFee
     }))
 
     return NextResponse.json(
@@ -1,4 +1,8 @@
 import { NextResponse } from 'next/server'
+import { invalidateWallet } from '../../../lib/walletCache.js'
+import { invalidateCachedRoutes } from '../../../lib/responseCache.js'
+import { connection } from '../../../lib/solana.js'
+import { PayoutStatus, queuePayout } from '../../../lib/payoutBatcher.js'
 
 /**
  * Cash-out API - Sends SOL from platform wallet to user's wallet
@@ -58,7 +62,7 @@ export async function POST(request) {
     })
 
     // Import Solana libraries
-    const { Connection, PublicKey, Transaction, SystemProgram, Keypair } = await import('@solana/web3.js')
+    const { PublicKey, Transaction, SystemProgram, Keypair } = await import('@solana/web3.js')
     const bs58 = await import('bs58')
 
     // Get platform wallet private key from environment
@@ -67,58 +71,51 @@ export async function POST(request) {
       throw new Error('Platform wallet private key not configured')
     }
 
-    // Create connection to Helius RPC
-    const heliusRpc = process.env.NEXT_PUBLIC_HELIUS_RPC
-    const connection = new Connection(heliusRpc, 'confirmed')
-
     // Load platform wallet keypair
     const platformKeypair = Keypair.fromSecretKey(bs58.default.decode(platformPrivateKey))
     const platformWallet = platformKeypair.publicKey
     
     console.log('🏦 Platform wallet:', platformWallet.toBase58())
 
-    // Check platform wallet balance
-    const platformBalance = await connection.getBalance(platformWallet)
-    const platformBalanceSOL = platformBalance / 1_000_000_000
-
-    console.log('💰 Platform wallet balance:', platformBalanceSOL.toFixed(8), 'SOL')
-
-    // Check if platform wallet has enough balance
-    const RENT_EXEMPT_MINIMUM = 890880 // lamports
-    const TRANSACTION_FEE = 5000 // lamports
-    const requiredBalance = lamportsToSend + RENT_EXEMPT_MINIMUM + TRANSACTION_FEE
-
-    if (platformBalance < requiredBalance) {
-      const shortfall = (requiredBalance - platformBalance) / 1_000_000_000
-      throw new Error(
-        `Insufficient platform wallet balance. Need ${(requiredBalance / 1_000_000_000).toFixed(8)} SOL, ` +
-        `have ${platformBalanceSOL.toFixed(8)} SOL. Shortfall: ${shortfall.toFixed(8)} SOL`
-      )
-    }
-
-    // Create transfer instruction
-    const userPubkey = new PublicKey(userWalletAddress)
-    
-    const transferInstruction = SystemProgram.transfer({
-      fromPubkey: platformWallet,
-      toPubkey: userPubkey,
-      lamports: lamportsToSend
-    })
+    // If prepareOnly flag is set, return the serialized transaction for Privy
+    if (prepareOnly) {
+      // Queued payouts check the balance in the batch; a prepared transaction
+      // is checked here. Same endpoints as the payout batcher (lib/solana.js).
+      const platformBalance = await connection.getBalance(platformWallet)
+      const platformBalanceSOL = platformBalance / 1_000_000_000
+
+      console.log('💰 Platform wallet balance:', platformBalanceSOL.toFixed(8), 'SOL')
+
+      const RENT_EXEMPT_MINIMUM = 890880 // lamports
+      const TRANSACTION_FEE = 5000 // lamports
+      const requiredBalance = lamportsToSend + RENT_EXEMPT_MINIMUM + TRANSACTION_FEE
+
+      if (platformBalance < requiredBalance) {
+        const shortfall = (requiredBalance - platformBalance) / 1_000_000_000
+        throw new Error(
+          `Insufficient platform wallet balance. Need ${(requiredBalance / 1_000_000_000).toFixed(8)} SOL, ` +
+          `have ${platformBalanceSOL.toFixed(8)} SOL. Shortfall: ${shortfall.toFixed(8)} SOL`
+        )
+      }
+
+      const transferInstruction = SystemProgram.transfer({
+        fromPubkey: platformWallet,
+        toPubkey: new PublicKey(userWalletAddress),
+        lamports: lamportsToSend
+      })
 
-    // Get recent blockhash
-    const { blockhash } = await connection.getLatestBlockhash('confirmed')
+      // Get recent blockhash
+      const { blockhash } = await connection.getLatestBlockhash('confirmed')
 
-    // Create and sign transaction
-    const transaction = new Transaction({
-      recentBlockhash: blockhash,
-      feePayer: platformWallet
-    }).add(transferInstruction)
+      // Create and sign transaction
+      const transaction = new Transaction({
+        recentBlockhash: blockhash,
+        feePayer: platformWallet
+      }).add(transferInstruction)
 
-    // Sign transaction with platform wallet
-    transaction.sign(platformKeypair)
+      // Sign transaction with platform wallet
+      transaction.sign(platformKeypair)
 
-    // If prepareOnly flag is set, return the serialized transaction for Privy
-    if (prepareOnly) {
       const serializedTransaction = transaction.serialize().toString('base64')
       console.log('✅ Transaction prepared (not sent), returning for Privy approval')
       
@@ -131,23 +128,39 @@ export async function POST(request) {
       })
     }
 
-    console.log('📤 Sending transaction...')
+    console.log('📤 Queueing payout for the next batch...')
 
-    // Send transaction
-    const signature = await connection.sendRawTransaction(transaction.serialize(), {
-      skipPreflight: false,
-      preflightCommitment: 'confirmed'
+    // Sent together with other cash-outs from this window and confirmed as a batch
+    const payout = await queuePayout({
+      recipient: userWalletAddress,
+      lamports: lamportsToSend,
+      reference: privyUserId
     })
+    const { signature } = payout
 
-    console.log('✅ Transaction sent! Signature:', signature)
-
-    // Wait for confirmation
-    const confirmation = await connection.confirmTransaction(signature, 'confirmed')
+    if (payout.status === PayoutStatus.SENT) {
+      // Sent but not yet confirmed; the payouts record is reconciled later
+      invalidateWallet(userWalletAddress, platformWallet.toBase58())
+      await invalidateCachedRoutes('rooms/tiers')
+      return NextResponse.json({
+        success: true,
+        pending: true,
+        signature,
+        payoutUSD: payoutUSD.toFixed(2),
+        payoutSOL: payoutSOL.toFixed(8),
+        platformFeeUSD: platformFeeUSD.toFixed(2),
+        message: `Sent ${payoutSOL.toFixed(6)} SOL to ${userWalletAddress}, awaiting confirmation`
+      }, { status: 202 })
+    }
 
-    if (confirmation.value.err) {
-      throw new Error(`Transaction failed: ${JSON.stringify(confirmation.value.err)}`)
+    if (payout.status !== PayoutStatus.CONFIRMED) {
+      throw new Error(`Transaction failed: ${payout.error || payout.status}`)
     }
 
+    // Balances and history changed for both wallets
+    invalidateWallet(userWalletAddress, platformWallet.toBase58())
+    await invalidateCachedRoutes('rooms/tiers')
+
     console.log('✅ Cash-out successful!', {
       signature,
       user: playerName || privyUserId,
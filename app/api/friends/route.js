@@ -1,120 +1,38 @@
 import { NextResponse } from 'next/server'
-import { MongoClient } from 'mongodb'
+import { connectToDatabase as connectToSharedDatabase } from '../../../lib/mongodb.js'
+import { classifyUserAccount, discoverUsers } from '../../../lib/userDiscovery.js'
+import { getPresence, heartbeat, markOffline } from '../../../lib/presence.js'
+import { publishSocialChange } from '../../../lib/socialEvents.js'
 
-// MongoDB connection
-let cachedClient = null
-let cachedDb = null
-
-async function connectToDatabase() {
-  if (cachedClient && cachedDb) {
-    return { client: cachedClient, db: cachedDb }
-  }
-
-  const client = new MongoClient(process.env.MONGO_URL)
-  await client.connect()
-  const db = client.db(process.env.DB_NAME || 'turfloot_db')
-
-  cachedClient = client
-  cachedDb = db
-
-  return { client, db }
+// MongoDB connection (shared pool)
+function connectToDatabase() {
+  return connectToSharedDatabase(process.env.DB_NAME || 'turfloot_db')
 }
 
 // All friend data now stored in MongoDB - no mock data structures
 
-async function cleanupTestUsers(db) {
-  try {
-    // Remove test users created during development/testing
-    const result = await db.collection('users').deleteMany({
-      $or: [
-        { userIdentifier: { $regex: /(test|debug|mock|demo|cashout\.test|debug\.test)/i } },
-        { username: { $regex: /(test|debug|mock|demo|cashout\.test|debug\.test)/i } },
-        // Remove users without proper Privy identifiers
-        { 
-          $and: [
-            { email: { $in: [null, ''] } },
-            { walletAddress: { $in: [null, ''] } },
-            { userIdentifier: { $regex: /^(test_|mock_|debug_|cashout_)/i } }
-          ]
-        }
-      ]
-    })
-    
-    if (result.deletedCount > 0) {
-      console.log(`🧹 Cleaned up ${result.deletedCount} test users from database`)
-    }
-  } catch (error) {
-    console.error('❌ Error cleaning up test users:', error)
-  }
-}
-
-async function getPrivyUsers(currentUserIdentifier) {
+// Test-account cleanup runs offline (scripts/backfill-user-discovery.js);
+// discovery relies on the isDiscoverable flag computed in storePrivyUser.
+async function getPrivyUsers(currentUserIdentifier, { cursor, limit } = {}) {
   try {
     const { db } = await connectToDatabase()
     
-    // Clean up test/mock users first
-    await cleanupTestUsers(db)
-    
-    // Get only real Privy users who have signed up (exclude test users)
-    const users = await db.collection('users').find({
-      userIdentifier: { 
-        $ne: currentUserIdentifier,
-        // Exclude test users with these patterns
-        $not: {
-          $regex: /(test|debug|mock|demo|cashout\.test|debug\.test)/i
-        }
-      },
-      // Only include users with valid email or wallet address (real Privy accounts)
-      $or: [
-        { email: { $exists: true, $ne: null, $ne: '' } },
-        { walletAddress: { $exists: true, $ne: null, $ne: '' } }
-      ]
-    }).toArray()
-    
-    // Get current user's friends from database
-    const userFriends = await db.collection('friends').find({
-      userIdentifier: currentUserIdentifier
-    }).toArray()
-    
-    // Get pending friend requests from database
-    const sentRequests = await db.collection('friend_requests').find({
-      $or: [
-        { fromUserIdentifier: currentUserIdentifier },
-        { fromUserId: currentUserIdentifier }
-      ],
-      status: 'pending'
-    }).toArray()
-    
-    const receivedRequests = await db.collection('friend_requests').find({
-      $or: [
-        { toUserIdentifier: currentUserIdentifier },
-        { toUserId: currentUserIdentifier }
-      ],
-      status: 'pending'
-    }).toArray()
-    
-    // Create sets of userIdentifiers to exclude
-    const friendUserIdentifiers = new Set(userFriends.map(f => f.friendUserIdentifier))
-    const sentRequestUserIdentifiers = new Set(sentRequests.map(r => r.toUserIdentifier))
-    const receivedRequestUserIdentifiers = new Set(receivedRequests.map(r => r.fromUserIdentifier))
-    
-    // Filter out users who are already friends or have pending requests
-    const availableUsers = users.filter(user => {
-      const userIdentifier = user.userIdentifier
-      return !friendUserIdentifiers.has(userIdentifier) && 
-             !sentRequestUserIdentifiers.has(userIdentifier) && 
-             !receivedRequestUserIdentifiers.has(userIdentifier)
-    }).map(user => ({
-      username: user.username || user.displayName || `User_${user.userIdentifier.slice(-4)}`,
-      status: user.isOnline ? 'online' : 'offline',
-      joinedAt: user.createdAt || user.joinedAt || new Date().toISOString(),
-      gamesPlayed: user.gamesPlayed || 0
-    }))
-    
-    return availableUsers
+    const page = await discoverUsers(db, currentUserIdentifier, { cursor, limit })
+    const presence = await getPresence(page.users.map(user => user.userIdentifier))
+    
+    return {
+      ...page,
+      users: page.users.map(user => ({
+        userIdentifier: user.userIdentifier,
+        username: user.username || user.displayName || `User_${user.userIdentifier.slice(-4)}`,
+        status: presence.get(user.userIdentifier)?.online ? 'online' : 'offline',
+        joinedAt: user.createdAt || user.joinedAt || new Date().toISOString(),
+        gamesPlayed: user.gamesPlayed || 0
+      }))
+    }
   } catch (error) {
     console.error('❌ Error fetching Privy users:', error)
-    return []
+    return { users: [], hasMore: false, nextCursor: null }
   }
 }
 
@@ -122,9 +40,15 @@ async function storePrivyUser(userIdentifier, userData) {
   try {
     const { db } = await connectToDatabase()
     
+    const { isTestAccount, isDiscoverable } = classifyUserAccount({
+      userIdentifier,
+      username: userData.username || userData.displayName,
+      email: userData.email,
+      walletAddress: userData.walletAddress
+    })
+    
     // Validate that this is a real Privy user, not a test user
-    if (!userIdentifier || 
-        userIdentifier.match(/(test|debug|mock|demo|cashout\.test|debug\.test)/i) ||
+    if (!userIdentifier || isTestAccount ||
         (!userData.email && !userData.walletAddress)) {
       console.log('⚠️ Skipping test/invalid user storage:', userIdentifier)
       return false
@@ -143,8 +67,8 @@ async function storePrivyUser(userIdentifier, userData) {
       email: userData.email,
       walletAddress: userData.walletAddress,
       createdAt: new Date().toISOString(),
-      lastSeenAt: new Date().toISOString(),
-      isOnline: true,
+      isTestAccount,
+      isDiscoverable,
       gamesPlayed: 0,
       equippedSkin: userData.equippedSkin || {
         type: 'circle',
@@ -159,6 +83,9 @@ async function storePrivyUser(userIdentifier, userData) {
       { upsert: true }
     )
     
+    // Online status is tracked by the presence service, not the user document
+    await heartbeat(userIdentifier)
+    
     console.log('✅ Real Privy user stored/updated:', userIdentifier)
     return true
   } catch (error) {
@@ -186,15 +113,20 @@ export async function GET(request) {
     }
     
     if (requestType === 'users') {
-      // Get list of all available Privy users to add as friends
-      const availableUsers = await getPrivyUsers(userIdentifier)
+      // Get one page of available Privy users to add as friends
+      const { users: availableUsers, hasMore, nextCursor } = await getPrivyUsers(userIdentifier, {
+        cursor: searchParams.get('cursor'),
+        limit: searchParams.get('limit')
+      })
       
       console.log('✅ Available Privy users retrieved:', availableUsers.length, 'users')
       
       return NextResponse.json({
         success: true,
         users: availableUsers,
-        count: availableUsers.length
+        count: availableUsers.length,
+        hasMore,
+        nextCursor
       })
     } else if (requestType === 'requests') {
       // Get friend requests for this user from database
@@ -237,15 +169,20 @@ export async function GET(request) {
         userIdentifier: userIdentifier
       }).toArray()
       
+      const presence = await getPresence(userFriends.map(friend => friend.friendUserIdentifier))
+      
       // Transform the data to match frontend expectations
-      const transformedFriends = userFriends.map(friend => ({
-        id: friend.friendUserIdentifier,
-        username: friend.friendUsername,
-        status: friend.status,
-        addedAt: friend.addedAt,
-        lastSeen: friend.lastSeen,
-        isOnline: friend.isOnline || false
-      }))
+      const transformedFriends = userFriends.map(friend => {
+        const friendPresence = presence.get(friend.friendUserIdentifier)
+        return {
+          id: friend.friendUserIdentifier,
+          username: friend.friendUsername,
+          status: friend.status,
+          addedAt: friend.addedAt,
+          lastSeen: friendPresence?.lastSeen || friend.lastSeen,
+          isOnline: friendPresence?.online || false
+        }
+      })
       
       console.log('✅ Friends list retrieved from database:', transformedFriends.length, 'friends')
       console.log('🔍 Friend data sample:', transformedFriends[0] || 'No friends')
@@ -290,6 +227,14 @@ export async function POST(request) {
       case 'register_user':
         return await handleRegisterPrivyUser(userIdentifier, userData)
       
+      case 'heartbeat':
+        await heartbeat(userIdentifier)
+        return NextResponse.json({ success: true })
+      
+      case 'go_offline':
+        await markOffline(userIdentifier)
+        return NextResponse.json({ success: true })
+      
       case 'send_request':
         return await handleSendFriendRequest(userIdentifier, friendUsername)
       
@@ -446,6 +391,7 @@ async function handleSendFriendRequest(fromUserIdentifier, toUsername) {
     
     // Store in database
     await db.collection('friend_requests').insertOne(friendRequest)
+    publishSocialChange('friend_requests', 'insert', friendRequest)
     
     console.log('✅ Friend request stored in database successfully')
     
@@ -521,8 +467,7 @@ async function handleAcceptFriendRequest(userIdentifier, requestId) {
       friendUsername: fromUsername,
       status: 'accepted',
       addedAt: timestamp,
-      lastSeen: senderUser.lastSeenAt || timestamp,
-      isOnline: senderUser.isOnline || false
+      lastSeen: senderUser.lastSeenAt || timestamp
     }
     
     const friendshipForSender = {
@@ -531,8 +476,7 @@ async function handleAcceptFriendRequest(userIdentifier, requestId) {
       friendUsername: currentUsername,
       status: 'accepted',
       addedAt: timestamp,
-      lastSeen: currentUser.lastSeenAt || timestamp,
-      isOnline: currentUser.isOnline || true
+      lastSeen: currentUser.lastSeenAt || timestamp
     }
     
     // Insert both friendship records
@@ -541,8 +485,13 @@ async function handleAcceptFriendRequest(userIdentifier, requestId) {
       friendshipForSender
     ])
     
+    publishSocialChange('friend_requests', 'delete', request)
+    publishSocialChange('friends', 'insert', friendshipForCurrentUser)
+    
     console.log('✅ Friend request accepted, friendship stored in database')
     
+    const senderPresence = await getPresence([fromUserIdentifier])
+    
     return NextResponse.json({
       success: true,
       message: `You and ${fromUsername} are now friends!`,
@@ -551,7 +500,7 @@ async function handleAcceptFriendRequest(userIdentifier, requestId) {
         username: fromUsername,
         status: 'accepted',
         addedAt: timestamp,
-        isOnline: senderUser.isOnline || false
+        isOnline: senderPresence.get(fromUserIdentifier)?.online || false
       }
     })
     
@@ -571,7 +520,7 @@ async function handleDeclineFriendRequest(userIdentifier, requestId) {
     const { db } = await connectToDatabase()
     
     // Find and remove the friend request from database
-    const result = await db.collection('friend_requests').deleteOne({
+    const declined = await db.collection('friend_requests').findOneAndDelete({
       id: requestId,
       $or: [
         { toUserIdentifier: userIdentifier },
@@ -580,13 +529,14 @@ async function handleDeclineFriendRequest(userIdentifier, requestId) {
       status: 'pending'
     })
     
-    if (result.deletedCount === 0) {
+    if (!declined) {
       return NextResponse.json(
         { error: 'Friend request not found' },
         { status: 404 }
       )
     }
     
+    publishSocialChange('friend_requests', 'delete', declined)
     console.log('✅ Friend request declined and removed from database')
     
     return NextResponse.json({
@@ -610,7 +560,7 @@ async function handleCancelFriendRequest(userIdentifier, requestId) {
     const { db } = await connectToDatabase()
     
     // Find and remove the friend request from database
-    const result = await db.collection('friend_requests').deleteOne({
+    const canceled = await db.collection('friend_requests').findOneAndDelete({
       id: requestId,
       $or: [
         { fromUserIdentifier: userIdentifier },
@@ -619,13 +569,14 @@ async function handleCancelFriendRequest(userIdentifier, requestId) {
       status: 'pending'
     })
     
-    if (result.deletedCount === 0) {
+    if (!canceled) {
       return NextResponse.json(
         { error: 'Friend request not found' },
         { status: 404 }
       )
     }
     
+    publishSocialChange('friend_requests', 'delete', canceled)
     console.log('✅ Friend request canceled and removed from database')
     
     return NextResponse.json({
@@ -666,6 +617,7 @@ async function handleRemoveFriend(userIdentifier, friendIdentifier) {
       )
     }
     
+    publishSocialChange('friends', 'delete', { userIdentifier, friendUserIdentifier: friendIdentifier })
     console.log('✅ Friendship removed from database')
     
     return NextResponse.json({
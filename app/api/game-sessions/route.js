@@ -1,13 +1,13 @@
 import { NextResponse } from 'next/server'
-import { MongoClient } from 'mongodb'
 import { randomUUID } from 'crypto'
-
-// MongoDB connection helper
-async function getDb() {
-  const client = new MongoClient(process.env.MONGO_URL)
-  await client.connect()
-  return { client, db: client.db('turfloot') }
-}
+import {
+  findActiveSessionId,
+  getRoomPlayerCount,
+  getRoomPlayerCounts,
+  leaveSession,
+  listActiveSessions,
+  touchSession
+} from '../../../lib/gameSessions.js'
 
 export async function POST(request) {
   try {
@@ -23,9 +23,6 @@ export async function POST(request) {
 
     console.log(`🎮 Game session tracking: ${action}`, { roomId, session, bodySessionId, bodyUserId })
     
-    const { client, db } = await getDb()
-    const gameSessions = db.collection('game_sessions')
-    
     let resolvedSessionId = null
     let resolvedUserId = null
 
@@ -45,25 +42,13 @@ export async function POST(request) {
         ? session.userId.trim()
         : (typeof bodyUserId === 'string' && bodyUserId.trim() ? bodyUserId.trim() : resolvedSessionId)
 
-      const now = new Date()
-      const joinedAt = session.joinedAt ? new Date(session.joinedAt) : now
-      const lastActivityAt = session.lastActivity ? new Date(session.lastActivity) : now
-
-      const sessionDoc = {
-        ...session,
-        roomId: normalizedRoomId,
+      await touchSession({
         sessionId: resolvedSessionId,
         userId: resolvedUserId,
-        joinedAt,
-        lastActivity: lastActivityAt,
-        status: 'active'
-      }
-
-      await gameSessions.updateOne(
-        { sessionId: resolvedSessionId },
-        { $set: sessionDoc },
-        { upsert: true }
-      )
+        roomId: normalizedRoomId,
+        session,
+        joinedAt: session.joinedAt ? new Date(session.joinedAt) : null
+      })
 
       console.log(`✅ Player session recorded for room ${normalizedRoomId} (sessionId=${resolvedSessionId})`)
 
@@ -82,20 +67,15 @@ export async function POST(request) {
       }
 
       if (!resolvedSessionId && resolvedUserId) {
-        const existing = await gameSessions.findOne({ roomId, userId: resolvedUserId, status: 'active' })
-        if (existing) {
-          resolvedSessionId = existing.sessionId
-        }
+        resolvedSessionId = await findActiveSessionId(roomId, resolvedUserId)
       }
 
       if (!resolvedSessionId || !resolvedUserId) {
         return NextResponse.json({ error: 'Missing roomId, sessionId, userId, or lastActivity' }, { status: 400 })
       }
 
-      await gameSessions.updateOne(
-        { sessionId: resolvedSessionId, userId: resolvedUserId },
-        { $set: { lastActivity: new Date(lastActivity), status: 'active', roomId } }
-      )
+      // Activity is stamped with server time so the TTL index can rely on it
+      await touchSession({ sessionId: resolvedSessionId, userId: resolvedUserId, roomId })
 
       console.log(`🔄 Updated activity for room ${roomId} (sessionId=${resolvedSessionId})`)
 
@@ -114,20 +94,14 @@ export async function POST(request) {
       }
 
       if (!resolvedSessionId && resolvedUserId) {
-        const existing = await gameSessions.findOne({ roomId, userId: resolvedUserId, status: 'active' })
-        if (existing) {
-          resolvedSessionId = existing.sessionId
-        }
+        resolvedSessionId = await findActiveSessionId(roomId, resolvedUserId)
       }
 
       if (!resolvedSessionId || !resolvedUserId) {
         return NextResponse.json({ error: 'Missing roomId, sessionId, or userId' }, { status: 400 })
       }
 
-      await gameSessions.updateOne(
-        { sessionId: resolvedSessionId, userId: resolvedUserId, status: 'active' },
-        { $set: { status: 'left', leftAt: new Date(), roomId } }
-      )
+      await leaveSession({ sessionId: resolvedSessionId, userId: resolvedUserId })
 
       console.log(`👋 Player left room ${roomId} (sessionId=${resolvedSessionId})`)
 
@@ -135,8 +109,6 @@ export async function POST(request) {
       return NextResponse.json({ error: 'Invalid action' }, { status: 400 })
     }
 
-    await client.close()
-
     return NextResponse.json({
       success: true,
       action,
@@ -156,17 +128,23 @@ export async function POST(request) {
 
 export async function GET(request) {
   try {
+    const { searchParams } = new URL(request.url)
+    const roomId = searchParams.get('roomId')
+
+    // Player count for one room, read from the bucketed room counters
+    if (roomId) {
+      return NextResponse.json({
+        roomId,
+        activePlayers: await getRoomPlayerCount(roomId),
+        timestamp: new Date().toISOString()
+      })
+    }
+
     // Get active sessions for debugging/monitoring
-    const { client, db } = await getDb()
-    const gameSessions = db.collection('game_sessions')
-    
-    // Get sessions active within last 5 minutes
-    const fiveMinutesAgo = new Date(Date.now() - 5 * 60 * 1000)
-    
-    const activeSessions = await gameSessions.find({
-      status: 'active',
-      lastActivity: { $gte: fiveMinutesAgo }
-    }).toArray()
+    const [activeSessions, playersByRoom] = await Promise.all([
+      listActiveSessions(),
+      getRoomPlayerCounts()
+    ])
     
     // Group sessions by room for easier viewing
     const sessionsByRoom = {}
@@ -185,10 +163,9 @@ export async function GET(request) {
       })
     })
     
-    await client.close()
-    
     return NextResponse.json({
       totalActiveSessions: activeSessions.length,
+      playersByRoom: Object.fromEntries(playersByRoom),
       sessionsByRoom,
       timestamp: new Date().toISOString()
     })
@@ -1,28 +1,32 @@
 import { NextResponse } from 'next/server'
-import { connectToDatabase } from '../../../lib/mongodb.js'
+import { LEADERBOARD_SIZE, getLeaderboard, recordEarnings } from '../../../lib/leaderboard.js'
 
 // GET /api/leaderboard - Get top earners from paid arenas
+// Served from the materialized board; supports ?window=all|daily|weekly and
+// conditional requests via ETag / If-None-Match.
 export async function GET(request) {
   try {
     const { searchParams } = new URL(request.url)
-    const limit = parseInt(searchParams.get('limit')) || 10
-    
-    console.log(`🏆 Fetching top ${limit} earners from paid arenas...`)
-    
-    const { db } = await connectToDatabase()
-    const eliminationEarningsCollection = db.collection('elimination_earnings')
-    
-    // Get top earners sorted by total winnings from eliminations
-    const topEarners = await eliminationEarningsCollection
-      .find({})
-      .sort({ totalEarnings: -1 })
-      .limit(limit)
-      .toArray()
-    
-    console.log(`✅ Found ${topEarners.length} top earners`)
-    
+    const limit = Math.min(parseInt(searchParams.get('limit')) || 10, LEADERBOARD_SIZE)
+    const window = searchParams.get('window') || 'all'
+
+    const board = await getLeaderboard(window)
+    const etag = `${board.etag.slice(0, -1)}-${limit}"`
+    const headers = {
+      ETag: etag,
+      'Cache-Control': 'public, max-age=5, stale-while-revalidate=30'
+    }
+
+    if (request.headers.get('if-none-match') === etag) {
+      return new NextResponse(null, { status: 304, headers })
+    }
+
+    const topEarners = board.entries.slice(0, limit)
+
     return NextResponse.json({
       success: true,
+      window: board.window,
+      bucket: board.bucket,
       leaderboard: topEarners.map((user, index) => ({
         rank: index + 1,
         name: user.playerName || 'Anonymous',
@@ -32,7 +36,7 @@ export async function GET(request) {
         gamesPlayed: user.gamesPlayed || 0,
         lastActive: user.lastActive
       }))
-    })
+    }, { headers })
     
   } catch (error) {
     console.error('❌ Error fetching leaderboard:', error)
@@ -55,28 +59,8 @@ export async function POST(request) {
     
     console.log(`💰 Updating elimination earnings for ${playerName}: +$${earningsAdded}`)
     
-    const { db } = await connectToDatabase()
-    const eliminationEarningsCollection = db.collection('elimination_earnings')
-    
-    // Update or create user earnings record
-    const result = await eliminationEarningsCollection.updateOne(
-      { userIdentifier },
-      {
-        $set: {
-          playerName: playerName || 'Anonymous',
-          lastActive: new Date()
-        },
-        $inc: {
-          totalEarnings: earningsAdded || 0,
-          totalEliminations: eliminationsAdded || 0,
-          gamesPlayed: 1
-        }
-      },
-      { upsert: true }
-    )
-    
-    // Get updated record
-    const updatedUser = await eliminationEarningsCollection.findOne({ userIdentifier })
+    // Single upsert returning the new totals; boards are updated incrementally
+    const updatedUser = await recordEarnings({ userIdentifier, playerName, earningsAdded, eliminationsAdded })
     
     console.log(`✅ Earnings updated: ${updatedUser.playerName} now has $${updatedUser.totalEarnings.toFixed(2)}`)
     
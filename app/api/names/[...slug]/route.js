@@ -1,9 +1,17 @@
 import { NextResponse } from 'next/server'
-
-// Simplified in-memory name storage for production reliability
-// This bypasses MongoDB entirely to avoid infrastructure issues
-const userNames = new Map()
-const nameHistory = new Map()
+import { searchNames } from '../../../../lib/nameSearch.js'
+import {
+  MAX_BATCH_IDS,
+  getName,
+  getNameHistory,
+  getNames,
+  listRecentNames,
+  setName,
+  setNames
+} from '../../../../lib/nameRegistry.js'
+
+// Names live in the shared registry (Mongo `names` collection behind a
+// per-instance LRU), so every worker sees the same names across restarts.
 
 // CORS headers for cross-origin requests
 const corsHeaders = {
@@ -42,37 +50,22 @@ export async function POST(request, { params }) {
         )
       }
 
-      // Store name in memory (survives until server restart)
-      const nameData = {
+      const nameData = await setName({
         userId,
         customName: customName.trim(),
-        privyId: privyId || userId,
-        email: email || null,
-        updatedAt: new Date().toISOString(),
-        source: 'names_api'
-      }
-
-      userNames.set(userId, nameData)
-      
-      // Keep history for debugging
-      if (!nameHistory.has(userId)) {
-        nameHistory.set(userId, [])
-      }
-      nameHistory.get(userId).push({
-        name: customName.trim(),
-        timestamp: new Date().toISOString()
+        privyId,
+        email
       })
 
-      console.log(`✅ Name stored for ${userId}: "${customName.trim()}"`)
-      console.log(`📊 Total names stored: ${userNames.size}`)
+      console.log(`✅ Name stored for ${userId}: "${nameData.customName}"`)
 
       return NextResponse.json({
         success: true,
         message: 'Name stored successfully',
-        customName: customName.trim(),
+        customName: nameData.customName,
         userId,
-        timestamp: new Date().toISOString(),
-        storage: 'in_memory_reliable'
+        timestamp: nameData.updatedAt,
+        storage: 'name_registry'
       }, { headers: corsHeaders })
 
     } else if (action === 'batch-sync') {
@@ -86,24 +79,16 @@ export async function POST(request, { params }) {
         )
       }
 
-      let syncedCount = 0
-      for (const nameData of names) {
-        if (nameData.userId && nameData.customName) {
-          userNames.set(nameData.userId, {
-            ...nameData,
-            updatedAt: new Date().toISOString(),
-            source: 'batch_sync'
-          })
-          syncedCount++
-        }
-      }
+      const validNames = names
+        .filter((nameData) => nameData.userId && nameData.customName)
+        .map(({ userId, customName, privyId, email }) => ({ userId, customName, privyId, email }))
+      const synced = await setNames(validNames)
 
-      console.log(`✅ Batch synced ${syncedCount} names`)
+      console.log(`✅ Batch synced ${synced.length} names`)
       
       return NextResponse.json({
         success: true,
-        syncedCount,
-        totalStored: userNames.size
+        syncedCount: synced.length
       }, { headers: corsHeaders })
 
     } else {
@@ -138,7 +123,7 @@ export async function GET(request, { params }) {
         )
       }
 
-      const nameData = userNames.get(userId)
+      const nameData = await getName(userId)
       
       if (nameData) {
         console.log(`📖 Retrieved name for ${userId}: "${nameData.customName}"`)
@@ -153,6 +138,39 @@ export async function GET(request, { params }) {
         )
       }
 
+    } else if (action === 'batch') {
+      // Resolve many display names in one call (leaderboards, party lists)
+      const ids = (url.searchParams.get('ids') || '')
+        .split(',')
+        .map((id) => id.trim())
+        .filter(Boolean)
+
+      if (ids.length === 0) {
+        return NextResponse.json(
+          { error: 'ids parameter is required' },
+          { status: 400, headers: corsHeaders }
+        )
+      }
+
+      if (ids.length > MAX_BATCH_IDS) {
+        return NextResponse.json(
+          { error: `At most ${MAX_BATCH_IDS} ids per request` },
+          { status: 400, headers: corsHeaders }
+        )
+      }
+
+      const resolved = await getNames(ids)
+      const names = {}
+      for (const [userId, nameData] of resolved) {
+        names[userId] = nameData ? nameData.customName : null
+      }
+
+      return NextResponse.json({
+        success: true,
+        names,
+        found: Object.values(names).filter(Boolean).length
+      }, { headers: corsHeaders })
+
     } else if (action === 'search') {
       const query = url.searchParams.get('q')
       const currentUserId = url.searchParams.get('userId')
@@ -164,51 +182,42 @@ export async function GET(request, { params }) {
         }, { headers: corsHeaders })
       }
 
-      const matchingUsers = []
-      for (const [userId, nameData] of userNames.entries()) {
-        if (userId !== currentUserId && 
-            nameData.customName.toLowerCase().includes(query.toLowerCase())) {
-          matchingUsers.push({
-            id: userId,
-            username: nameData.customName,
-            updatedAt: nameData.updatedAt,
-            source: 'names_api'
-          })
-        }
-      }
+      const { results, hasMore } = await searchNames(query, { excludeUserId: currentUserId })
+      const matchingUsers = results.map((entry) => ({
+        id: entry.userId,
+        username: entry.name,
+        updatedAt: entry.updatedAt,
+        source: 'names_api'
+      }))
 
       console.log(`🔍 Search "${query}" found ${matchingUsers.length} users`)
       
       return NextResponse.json({
-        users: matchingUsers.slice(0, 10), // Limit to 10 results
-        total: matchingUsers.length
+        users: matchingUsers,
+        total: matchingUsers.length,
+        hasMore
       }, { headers: corsHeaders })
 
     } else if (action === 'all') {
-      // Debug endpoint to see all stored names
-      const allNames = Array.from(userNames.entries()).map(([userId, data]) => ({
-        userId: userId.substring(0, 20) + '...',
+      // Debug endpoint to see the most recently stored names
+      const { total, names } = await listRecentNames()
+      const allNames = names.map((data) => ({
+        userId: data.userId.substring(0, 20) + '...',
         customName: data.customName,
         updatedAt: data.updatedAt
       }))
 
       return NextResponse.json({
-        totalNames: userNames.size,
+        totalNames: total,
         names: allNames
       }, { headers: corsHeaders })
 
     } else if (action === 'history') {
       const userId = url.searchParams.get('userId')
       
-      if (userId && nameHistory.has(userId)) {
-        return NextResponse.json({
-          history: nameHistory.get(userId)
-        }, { headers: corsHeaders })
-      } else {
-        return NextResponse.json({
-          history: []
-        }, { headers: corsHeaders })
-      }
+      return NextResponse.json({
+        history: userId ? await getNameHistory(userId) : []
+      }, { headers: corsHeaders })
 
     } else {
       return NextResponse.json(
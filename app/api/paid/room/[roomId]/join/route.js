@@ -0,0 +1,43 @@
+import { NextResponse } from 'next/server';
+import { consumeJoinTicket, verifyJoinTicket } from '../../../../../../lib/paid/intentService.js';
+import { ensurePaidRoomWatchers } from '../../../../../../lib/paid/watchers.js';
+
+ensurePaidRoomWatchers();
+
+// Admits a player to a paid room. The join ticket is used up here, so each
+// confirmed payment buys exactly one join.
+export async function POST(request, { params }) {
+  try {
+    const { roomId } = params;
+    const body = await request.json().catch(() => null);
+    const token = body?.joinTicket;
+    if (!token) {
+      return NextResponse.json({ error: 'Missing join ticket' }, { status: 400 });
+    }
+
+    let ticket;
+    try {
+      ticket = await verifyJoinTicket(token);
+      if (ticket.roomId !== roomId) {
+        return NextResponse.json({ error: 'Join ticket is for another room' }, { status: 403 });
+      }
+      ticket = await consumeJoinTicket(token);
+    } catch (error) {
+      if (error.message === 'Join ticket secret not configured') {
+        throw error;
+      }
+      return NextResponse.json({ error: error.message || 'Invalid join ticket' }, { status: 401 });
+    }
+
+    return NextResponse.json({
+      roomId: ticket.roomId,
+      gameId: ticket.gameId,
+      intentId: ticket.intentId,
+      userId: ticket.userId,
+      player: ticket.player
+    });
+  } catch (error) {
+    console.error('❌ Failed to join paid room:', error);
+    return NextResponse.json({ error: error.message || 'Failed to join paid room' }, { status: 500 });
+  }
+}
@@ -0,0 +1,38 @@
+import { NextResponse } from 'next/server';
+import { confirmIntentsFromWebhook } from '../../../../lib/paid/intentService.js';
+import { ensurePaidRoomWatchers } from '../../../../lib/paid/watchers.js';
+
+ensurePaidRoomWatchers();
+
+// Helius enhanced-transaction webhook for the paid room vaults. Helius sends
+// the configured auth header verbatim in `Authorization`.
+export async function POST(request) {
+  const secret = process.env.HELIUS_WEBHOOK_SECRET;
+  if (!secret) {
+    console.warn('⚠️ HELIUS_WEBHOOK_SECRET not configured');
+    return NextResponse.json({ error: 'Webhook not configured' }, { status: 503 });
+  }
+  if (request.headers.get('authorization') !== secret) {
+    return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+  }
+
+  try {
+    const body = await request.json();
+    const transactions = Array.isArray(body) ? body : [body];
+    const results = await confirmIntentsFromWebhook(transactions);
+    const confirmed = results.filter((result) => result.joinTicket).length;
+    if (confirmed > 0) {
+      console.log(`⚡ Confirmed ${confirmed} payment intents from webhook`);
+    }
+
+    return NextResponse.json({
+      received: transactions.length,
+      matched: results.length,
+      confirmed,
+      results: results.map(({ signature, intentId, status, reason }) => ({ signature, intentId, status, reason }))
+    });
+  } catch (error) {
+    console.error('❌ Failed to process paid room webhook:', error);
+    return NextResponse.json({ error: error.message || 'Failed to process webhook' }, { status: 500 });
+  }
+}
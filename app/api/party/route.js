@@ -1,23 +1,26 @@
 import { NextResponse } from 'next/server'
-import { MongoClient } from 'mongodb'
+import { connectToDatabase as connectToSharedDatabase } from '../../../lib/mongodb.js'
+import { createMemberCache, hydratePartyMembers } from '../../../lib/partyMembers.js'
+import { publishSocialChange } from '../../../lib/socialEvents.js'
 
-// MongoDB connection
-let cachedClient = null
-let cachedDb = null
+// MongoDB connection (shared pool)
+function connectToDatabase() {
+  return connectToSharedDatabase(process.env.DB_NAME || 'turfloot_db')
+}
 
-async function connectToDatabase() {
-  if (cachedClient && cachedDb) {
-    return { client: cachedClient, db: cachedDb }
+// Listing shape shared by the public and friends party lists
+function toPartyListing(party, members) {
+  return {
+    id: party.id,
+    name: party.name,
+    privacy: party.privacy,
+    maxPlayers: party.maxPlayers,
+    currentPlayerCount: party.currentPlayers.length,
+    createdBy: party.createdBy,
+    createdByUsername: party.createdByUsername,
+    createdAt: party.createdAt,
+    members
   }
-
-  const client = new MongoClient(process.env.MONGO_URL)
-  await client.connect()
-  const db = client.db(process.env.DB_NAME || 'turfloot_db')
-
-  cachedClient = client
-  cachedDb = db
-
-  return { client, db }
 }
 
 export async function GET(request) {
@@ -28,6 +31,9 @@ export async function GET(request) {
     
     console.log('🎯 Party GET request:', { userIdentifier, requestType })
     
+    // Member profiles fetched during this request
+    const memberCache = createMemberCache()
+    
     if (requestType === 'public') {
       // Get all public parties that are waiting for players - no auth required
       const { db } = await connectToDatabase()
@@ -43,36 +49,9 @@ export async function GET(request) {
         party.currentPlayers.length < (party.maxPlayers || 2)
       )
       
-      // Get party details with member information
-      const partiesWithDetails = await Promise.all(
-        availableParties.map(async (party) => {
-          // Get member details
-          const memberUsers = await db.collection('users').find({
-            userIdentifier: { $in: party.currentPlayers }
-          }).toArray()
-          
-          return {
-            id: party.id,
-            name: party.name,
-            privacy: party.privacy,
-            maxPlayers: party.maxPlayers,
-            currentPlayerCount: party.currentPlayers.length,
-            createdBy: party.createdBy,
-            createdByUsername: party.createdByUsername,
-            createdAt: party.createdAt,
-            members: memberUsers.map(member => ({
-              userIdentifier: member.userIdentifier,
-              username: member.username || member.displayName || 'Unknown User',
-              isOnline: member.isOnline || false,
-              equippedSkin: member.equippedSkin || {
-                type: 'circle',
-                color: '#3b82f6',
-                pattern: 'solid'
-              }
-            }))
-          }
-        })
-      )
+      // Get party details with member information (one users query for all parties)
+      const memberLists = await hydratePartyMembers(db, availableParties, { cache: memberCache })
+      const partiesWithDetails = availableParties.map((party, index) => toPartyListing(party, memberLists[index]))
       
       console.log('✅ Public parties retrieved:', partiesWithDetails.length, 'parties')
       
@@ -120,22 +99,11 @@ export async function GET(request) {
       
       if (currentParty) {
         // Get party member details
-        const memberUsers = await db.collection('users').find({
-          userIdentifier: { $in: currentParty.currentPlayers }
-        }).toArray()
+        const [members] = await hydratePartyMembers(db, [currentParty], { cache: memberCache })
         
         const partyWithMembers = {
           ...currentParty,
-          members: memberUsers.map(member => ({
-            userIdentifier: member.userIdentifier,
-            username: member.username || member.displayName || 'Unknown User',
-            isOnline: member.isOnline || false,
-            equippedSkin: member.equippedSkin || {
-              type: 'circle',
-              color: '#3b82f6',
-              pattern: 'solid'
-            }
-          }))
+          members
         }
         
         console.log('✅ Current party retrieved:', {
@@ -185,36 +153,9 @@ export async function GET(request) {
         $expr: { $lt: [{ $size: "$currentPlayers" }, "$maxPlayers"] } // Party not full
       }).toArray()
       
-      // Get party details with member information
-      const partiesWithDetails = await Promise.all(
-        friendsParties.map(async (party) => {
-          // Get member details
-          const memberUsers = await db.collection('users').find({
-            userIdentifier: { $in: party.currentPlayers }
-          }).toArray()
-          
-          return {
-            id: party.id,
-            name: party.name,
-            privacy: party.privacy,
-            maxPlayers: party.maxPlayers,
-            currentPlayerCount: party.currentPlayers.length,
-            createdBy: party.createdBy,
-            createdByUsername: party.createdByUsername,
-            createdAt: party.createdAt,
-            members: memberUsers.map(member => ({
-              userIdentifier: member.userIdentifier,
-              username: member.username || member.displayName || 'Unknown User',
-              isOnline: member.isOnline || false,
-              equippedSkin: member.equippedSkin || {
-                type: 'circle',
-                color: '#3b82f6',
-                pattern: 'solid'
-              }
-            }))
-          }
-        })
-      )
+      // Get party details with member information (one users query for all parties)
+      const memberLists = await hydratePartyMembers(db, friendsParties, { cache: memberCache })
+      const partiesWithDetails = friendsParties.map((party, index) => toPartyListing(party, memberLists[index]))
       
       console.log('✅ Friends parties retrieved:', partiesWithDetails.length, 'parties')
       
@@ -361,6 +302,7 @@ async function handleCreatePartyAndInvite(userIdentifier, partyData, invitedFrie
     
     // Store party in database
     await db.collection('parties').insertOne(party)
+    publishSocialChange('parties', 'insert', party)
     
     // Send party invites to friends
     const invitePromises = invitedFriends.map(async (friend) => {
@@ -404,6 +346,7 @@ async function handleCreatePartyAndInvite(userIdentifier, partyData, invitedFrie
       
       // Store in party_invites collection
       await db.collection('party_invites').insertOne(partyInvite)
+      publishSocialChange('party_invites', 'insert', partyInvite)
       
       console.log(`📤 Party invite sent to ${friend.username} (${friend.id})`)
     })
@@ -468,11 +411,17 @@ async function handleAcceptPartyInvite(userIdentifier, inviteId, partyId) {
     await db.collection('party_invites').deleteOne({ id: inviteId })
     
     // Add user to the party
-    await db.collection('parties').updateOne(
+    const joinedParty = await db.collection('parties').findOneAndUpdate(
       { id: partyId },
-      { $addToSet: { currentPlayers: userIdentifier } }
+      { $addToSet: { currentPlayers: userIdentifier } },
+      { returnDocument: 'after' }
     )
     
+    publishSocialChange('party_invites', 'delete', invite)
+    if (joinedParty) {
+      publishSocialChange('parties', 'update', joinedParty)
+    }
+    
     console.log('✅ Party invite accepted:', {
       userIdentifier,
       partyId,
@@ -552,6 +501,8 @@ export async function DELETE(request) {
         partyId: partyId
       })
       
+      publishSocialChange('parties', 'delete', party)
+      
       console.log('🗑️ Party and related data deleted:', {
         partyId,
         partyName: party.name,
@@ -576,10 +527,14 @@ export async function DELETE(request) {
       // Check if party is now empty after member leaves
       const updatedParty = await db.collection('parties').findOne({ id: partyId })
       
+      // The leaving member is still notified through the previous state
+      publishSocialChange('parties', 'update', updatedParty, party)
+      
       if (updatedParty.currentPlayers.length === 0) {
         // If party is empty after member leaves, delete it too
         await db.collection('parties').deleteOne({ id: partyId })
         await db.collection('party_invites').deleteMany({ partyId: partyId })
+        publishSocialChange('parties', 'delete', updatedParty)
         console.log('🏁 Party deleted - no remaining members after member left')
         
         return NextResponse.json({
@@ -723,11 +678,10 @@ async function handleJoinParty(userIdentifier, partyId) {
     
     // Get updated party with member details
     const updatedParty = await db.collection('parties').findOne({ id: partyId })
+    publishSocialChange('parties', 'update', updatedParty, party)
     
-    // Get member details for the response
-    const memberUsers = await db.collection('users').find({
-      userIdentifier: { $in: updatedParty.currentPlayers }
-    }).toArray()
+    // Get member details for the response (assume online when joining)
+    const [members] = await hydratePartyMembers(db, [updatedParty], { assumeOnline: true })
     
     const partyWithMembers = {
       id: updatedParty.id,
@@ -735,16 +689,7 @@ async function handleJoinParty(userIdentifier, partyId) {
       privacy: updatedParty.privacy,
       maxPlayers: updatedParty.maxPlayers,
       currentPlayerCount: updatedParty.currentPlayers.length,
-      members: memberUsers.map(member => ({
-        userIdentifier: member.userIdentifier,
-        username: member.username || member.displayName || 'Unknown User',
-        isOnline: member.isOnline || true, // Assume online when joining
-        equippedSkin: member.equippedSkin || {
-          type: 'circle',
-          color: '#3b82f6',
-          pattern: 'solid'
-        }
-      }))
+      members
     }
     
     console.log('✅ User successfully joined party:', {
@@ -1,4 +1,5 @@
 import { NextResponse } from 'next/server'
+import { expandTierTemplates, getRoomInstances } from '../../../lib/roomDirectory.js'
 
 export async function GET() {
   try {
@@ -10,92 +11,98 @@ export async function GET() {
     // This room uses the original working room name for compatibility
     const now = new Date().toISOString()
 
+    const tierTemplates = [
+      {
+        id: 'global-turfloot-arena', // Use original working room identifier
+        roomType: 'arena',
+        name: 'Turfloot $1 Room - Australia',
+        region: 'Australia',
+        regionId: 'au-syd',
+        endpoint: colyseusEndpoint,
+        maxPlayers: 50,
+        currentPlayers: 0, // Will be updated dynamically by Colyseus
+        entryFee: 0,
+        gameType: 'Arena Battle',
+        serverType: 'colyseus',
+        isActive: true, // Always active
+        canSpectate: true,
+        ping: 0,
+        status: 'active', // Always active and ready
+        canJoin: true, // Always joinable
+        creatorName: 'TurfLoot', // Official room
+        creatorWallet: 'Official',
+        description: 'Open 24/7 multiplayer arena - join anytime!',
+        isPersistent: true, // Mark as persistent room
+        lastUpdated: now,
+        timestamp: now
+      },
+      {
+        id: 'turfloot-au-5',
+        roomType: 'arena',
+        name: 'Turfloot $5 Room - Australia',
+        region: 'Australia',
+        regionId: 'au-syd',
+        endpoint: colyseusEndpoint,
+        maxPlayers: 50,
+        currentPlayers: 0,
+        entryFee: 0.05,
+        chargeAmount: 0.05,
+        minBalance: 0.05,
+        feePercentage: 10,
+        gameType: 'Arena Battle',
+        serverType: 'colyseus',
+        isActive: true,
+        canSpectate: true,
+        ping: 0,
+        status: 'active',
+        canJoin: true,
+        creatorName: 'TurfLoot',
+        creatorWallet: 'Official',
+        description: 'Competitive arena with a $0.05 entry charge (10% fee applied).',
+        isPersistent: true,
+        lastUpdated: now,
+        timestamp: now
+      },
+      {
+        id: 'turfloot-au-20',
+        roomType: 'arena',
+        name: 'Turfloot $20 Room - Australia',
+        region: 'Australia',
+        regionId: 'au-syd',
+        endpoint: colyseusEndpoint,
+        maxPlayers: 50,
+        currentPlayers: 0,
+        entryFee: 0.10,
+        chargeAmount: 0.10,
+        minBalance: 0.10,
+        feePercentage: 10,
+        gameType: 'Arena Battle',
+        serverType: 'colyseus',
+        isActive: true,
+        canSpectate: true,
+        ping: 0,
+        status: 'active',
+        canJoin: true,
+        creatorName: 'TurfLoot',
+        creatorWallet: 'Official',
+        description: 'High-stakes arena with a $0.10 entry charge (10% fee applied).',
+        isPersistent: true,
+        lastUpdated: now,
+        timestamp: now
+      }
+    ]
+
+    // Each persistent tier may be running several autoscaled instances
+    const instances = await getRoomInstances(colyseusEndpoint)
+    const servers = instances ? expandTierTemplates(tierTemplates, instances) : tierTemplates
+
     const serverData = {
-      servers: [
-        {
-          id: 'global-turfloot-arena', // Use original working room identifier
-          roomType: 'arena',
-          name: 'Turfloot $1 Room - Australia',
-          region: 'Australia',
-          regionId: 'au-syd',
-          endpoint: colyseusEndpoint,
-          maxPlayers: 50,
-          currentPlayers: 0, // Will be updated dynamically by Colyseus
-          entryFee: 0,
-          gameType: 'Arena Battle',
-          serverType: 'colyseus',
-          isActive: true, // Always active
-          canSpectate: true,
-          ping: 0,
-          status: 'active', // Always active and ready
-          canJoin: true, // Always joinable
-          creatorName: 'TurfLoot', // Official room
-          creatorWallet: 'Official',
-          description: 'Open 24/7 multiplayer arena - join anytime!',
-          isPersistent: true, // Mark as persistent room
-          lastUpdated: now,
-          timestamp: now
-        },
-        {
-          id: 'turfloot-au-5',
-          roomType: 'arena',
-          name: 'Turfloot $5 Room - Australia',
-          region: 'Australia',
-          regionId: 'au-syd',
-          endpoint: colyseusEndpoint,
-          maxPlayers: 50,
-          currentPlayers: 0,
-          entryFee: 0.05,
-          chargeAmount: 0.05,
-          minBalance: 0.05,
-          feePercentage: 10,
-          gameType: 'Arena Battle',
-          serverType: 'colyseus',
-          isActive: true,
-          canSpectate: true,
-          ping: 0,
-          status: 'active',
-          canJoin: true,
-          creatorName: 'TurfLoot',
-          creatorWallet: 'Official',
-          description: 'Competitive arena with a $0.05 entry charge (10% fee applied).',
-          isPersistent: true,
-          lastUpdated: now,
-          timestamp: now
-        },
-        {
-          id: 'turfloot-au-20',
-          roomType: 'arena',
-          name: 'Turfloot $20 Room - Australia',
-          region: 'Australia',
-          regionId: 'au-syd',
-          endpoint: colyseusEndpoint,
-          maxPlayers: 50,
-          currentPlayers: 0,
-          entryFee: 0.10,
-          chargeAmount: 0.10,
-          minBalance: 0.10,
-          feePercentage: 10,
-          gameType: 'Arena Battle',
-          serverType: 'colyseus',
-          isActive: true,
-          canSpectate: true,
-          ping: 0,
-          status: 'active',
-          canJoin: true,
-          creatorName: 'TurfLoot',
-          creatorWallet: 'Official',
-          description: 'High-stakes arena with a $0.10 entry charge (10% fee applied).',
-          isPersistent: true,
-          lastUpdated: now,
-          timestamp: now
-        }
-      ],
-      totalPlayers: 0, // Will be updated by real connections
-      totalActiveServers: 3, // Always 3 active rooms
-      totalServers: 3,
-      practiceServers: 1,
-      cashServers: 2,
+      servers,
+      totalPlayers: servers.reduce((sum, server) => sum + (server.currentPlayers || 0), 0),
+      totalActiveServers: servers.length,
+      totalServers: servers.length,
+      practiceServers: servers.filter(server => (server.entryFee || 0) === 0).length,
+      cashServers: servers.filter(server => (server.entryFee || 0) > 0).length,
       regions: ['Australia'],
       gameTypes: ['Arena Battle'],
       colyseusEnabled: true,
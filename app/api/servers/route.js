@@ -1,4 +1,5 @@
 import { NextResponse } from 'next/server'
+import { expandTierTemplates, getRoomInstances } from '../../../lib/roomDirectory.js'
 
 export async function GET(request) {
   try {
@@ -59,30 +60,18 @@ export async function GET(request) {
       }
     ]
 
-    // Try to get real player count from game sessions database
+    // Live room instances published by the Colyseus server (one or more per
+    // tier), served from a short-lived in-process cache
+    const instances = await getRoomInstances(colyseusEndpoint)
+
     let realPlayers = 0
-    try {
-      const { MongoClient } = await import('mongodb')
-      const client = new MongoClient(process.env.MONGO_URL)
-      
-      await client.connect()
-      const db = client.db('turfloot')
-      const gameSessions = db.collection('game_sessions')
-      
-      // Count active players in Colyseus arena (active within last 2 minutes)
-      const activeSessionsCount = await gameSessions.countDocuments({
-        roomId: 'colyseus-arena-global',
-        status: 'active',
-        lastActivity: { $gte: new Date(Date.now() - 2 * 60 * 1000) }
-      })
-      
-      realPlayers = activeSessionsCount
-      console.log(`📊 Colyseus Arena: ${realPlayers} real players from database`)
-      
-      await client.close()
-    } catch (error) {
-      console.warn(`⚠️ Could not query database for Colyseus arena:`, error.message)
-      realPlayers = 0
+    if (instances) {
+      realPlayers = instances
+        .filter(instance => instance.tier === arenaServer.id)
+        .reduce((sum, instance) => sum + (instance.players ?? instance.clients ?? 0), 0)
+      console.log(`📊 Colyseus Arena: ${realPlayers} live players across ${instances.length} room instances`)
+    } else {
+      console.warn('⚠️ Live room metrics unavailable - reporting empty rooms')
     }
 
     // No simulation - use real player counts only
@@ -141,8 +130,10 @@ export async function GET(request) {
       canSpectate: false
     }))
 
-    // Return all available server templates (arena + cash rooms)
-    const servers = [arenaServer, ...cashRooms]
+    // Expand each tier into its live instances when the room directory is available
+    const servers = instances
+      ? expandTierTemplates([arenaServer, ...cashRooms], instances)
+      : [arenaServer, ...cashRooms]
 
     const totalPlayers = servers.reduce((sum, server) => sum + (server.currentPlayers || 0), 0)
     const totalActiveServers = servers.filter(server => (server.currentPlayers || 0) > 0).length
@@ -1,33 +1,17 @@
 import { NextResponse } from 'next/server'
-import { MongoClient } from 'mongodb'
+import { getDb as getSharedDb } from '../../../../lib/mongodb.js'
+import { getCachedBalance } from '../../../../lib/walletCache.js'
 import jwt from 'jsonwebtoken'
 
 const JWT_SECRET = process.env.JWT_SECRET || 'turfloot-secret-key-change-in-production'
-const MONGO_URL = process.env.MONGO_URL || 'mongodb://localhost:27017/turfloot'
 const HELIUS_API_KEY = process.env.HELIUS_API_KEY
+const HELIUS_RPC_BASE = process.env.HELIUS_RPC_BASE || 'https://mainnet.helius-rpc.com'
 
-let client = null
-
-async function getDb() {
-  if (!client) {
-    try {
-      console.log('🔗 Connecting to MongoDB for wallet balance')
-      client = new MongoClient(MONGO_URL, {
-        serverSelectionTimeoutMS: 5000,
-        connectTimeoutMS: 10000,
-        maxPoolSize: 10,
-      })
-      await client.connect()
-      console.log('✅ MongoDB connected successfully')
-    } catch (error) {
-      console.error('❌ MongoDB connection failed:', error)
-      throw error
-    }
-  }
-  return client.db('turfloot_db')
+function getDb() {
+  return getSharedDb('turfloot_db')
 }
 
-// Fetch SOL balance using Helius API
+// Fetch SOL balance using Helius API; null when the lookup failed
 async function getSolanaBalance(walletAddress) {
   if (!HELIUS_API_KEY || !walletAddress) {
     console.log('⚠️ No Helius API key or wallet address provided')
@@ -37,7 +21,7 @@ async function getSolanaBalance(walletAddress) {
   try {
     console.log(`🔗 Fetching SOL balance for wallet: ${walletAddress}`)
     
-    const heliusUrl = `https://mainnet.helius-rpc.com/?api-key=${HELIUS_API_KEY}`
+    const heliusUrl = `${HELIUS_RPC_BASE}/?api-key=${HELIUS_API_KEY}`
     
     const response = await fetch(heliusUrl, {
       method: 'POST',
@@ -65,7 +49,7 @@ async function getSolanaBalance(walletAddress) {
     console.log('⚠️ Error fetching SOL balance from Helius:', error.message)
   }
   
-  return 0
+  return null
 }
 
 // Find wallet address from various sources
@@ -225,7 +209,8 @@ export async function GET(request) {
       let totalUsdBalance = user.balance || 25.00 // Default testing balance
 
       if (walletAddress) {
-        realSolBalance = await getSolanaBalance(walletAddress)
+        // Cached per wallet for a few seconds; concurrent tabs share one lookup
+        realSolBalance = (await getCachedBalance(walletAddress, () => getSolanaBalance(walletAddress))) ?? 0
         
         // Update USD balance based on SOL (approximate conversion)
         const solToUsd = realSolBalance * 160 // Rough SOL price
@@ -1,9 +1,9 @@
 import { NextResponse } from 'next/server'
-import { MongoClient } from 'mongodb'
+import { getDb as getSharedDb } from '../../../../lib/mongodb.js'
+import { getCachedTransactions } from '../../../../lib/walletCache.js'
 import jwt from 'jsonwebtoken'
 
 const JWT_SECRET = process.env.JWT_SECRET || 'turfloot-secret-key-change-in-production'
-const MONGO_URL = process.env.MONGO_URL || 'mongodb://localhost:27017/turfloot'
 const HELIUS_API_KEY =
   process.env.HELIUS_API_KEY ||
   process.env.NEXT_PUBLIC_HELIUS_API_KEY ||
@@ -11,25 +11,8 @@ const HELIUS_API_KEY =
   '9ce7937c-f2a5-4759-8d79-dd8f9ca63fa5'
 const HELIUS_REST_BASE = process.env.HELIUS_REST_BASE || 'https://api.helius.xyz/v0'
 
-let client = null
-
-async function getDb() {
-  if (!client) {
-    try {
-      console.log('🔗 Connecting to MongoDB for wallet transactions')
-      client = new MongoClient(MONGO_URL, {
-        serverSelectionTimeoutMS: 5000,
-        connectTimeoutMS: 10000,
-        maxPoolSize: 10,
-      })
-      await client.connect()
-      console.log('✅ MongoDB connected successfully for transactions')
-    } catch (error) {
-      console.error('❌ MongoDB connection failed for transactions:', error)
-      throw error
-    }
-  }
-  return client.db('turfloot_db')
+function getDb() {
+  return getSharedDb('turfloot_db')
 }
 
 function decodeTestingToken(token) {
@@ -192,6 +175,7 @@ function normaliseHeliusTransactions(rawTransactions, walletAddress) {
   })
 }
 
+// Returns null when the lookup failed, so the failure is not cached
 async function fetchHeliusTransactions(walletAddress) {
   if (!HELIUS_API_KEY || !walletAddress) {
     console.log('⚠️ Missing Helius API key or wallet address for transactions')
@@ -205,7 +189,7 @@ async function fetchHeliusTransactions(walletAddress) {
     const response = await fetch(heliusUrl, { method: 'GET' })
     if (!response.ok) {
       console.warn('⚠️ Helius transactions response not OK:', response.status, response.statusText)
-      return []
+      return null
     }
 
     const data = await response.json()
@@ -214,7 +198,7 @@ async function fetchHeliusTransactions(walletAddress) {
     return normalised
   } catch (error) {
     console.error('❌ Error fetching transactions from Helius:', error)
-    return []
+    return null
   }
 }
 
@@ -288,7 +272,8 @@ export async function GET(request) {
       }, { headers: corsHeaders })
     }
 
-    const transactions = await fetchHeliusTransactions(walletAddress)
+    const transactions =
+      (await getCachedTransactions(walletAddress, () => fetchHeliusTransactions(walletAddress))) || []
 
     const responsePayload = {
       transactions,
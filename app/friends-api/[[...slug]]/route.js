@@ -222,7 +222,7 @@ export async function POST(request, { params }) {
       }
       
       if (subAction === 'online') {
-        FriendsSystem.setUserOnline(userId)
+        await FriendsSystem.setUserOnline(userId)
         return NextResponse.json({
           success: true,
           message: 'User set as online',
@@ -231,7 +231,7 @@ export async function POST(request, { params }) {
       }
       
       if (subAction === 'offline') {
-        FriendsSystem.setUserOffline(userId)
+        await FriendsSystem.setUserOffline(userId)
         return NextResponse.json({
           success: true,
           message: 'User set as offline',
@@ -1,20 +1,10 @@
 import { NextResponse } from 'next/server'
 import { PartySystem } from '../../../lib/partySystem.js'
-import { MongoClient } from 'mongodb'
+import { getDb as getSharedDb } from '../../../lib/mongodb.js'
 
-// MongoDB connection
-async function getDb() {
-  try {
-    const client = new MongoClient(process.env.MONGO_URL, {
-      serverSelectionTimeoutMS: 5000,
-      connectTimeoutMS: 10000,
-    })
-    await client.connect()
-    return client.db(process.env.DB_NAME || 'turfloot_db')
-  } catch (error) {
-    console.error('❌ Database connection error:', error)
-    throw error
-  }
+// MongoDB connection (shared pool)
+function getDb() {
+  return getSharedDb(process.env.DB_NAME || 'turfloot_db')
 }
 
 // CORS headers
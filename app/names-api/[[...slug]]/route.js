@@ -1,30 +1,5 @@
 import { NextResponse } from 'next/server'
-import { MongoClient } from 'mongodb'
-
-// MongoDB connection with optimized settings for API calls
-let client = null
-let db = null
-
-async function getDb() {
-  if (db) return db
-  
-  try {
-    if (!client) {
-      client = new MongoClient(process.env.MONGO_URL, {
-        serverSelectionTimeoutMS: 5000,
-        connectTimeoutMS: 10000,
-        maxPoolSize: 10
-      })
-      await client.connect()
-    }
-    
-    db = client.db(process.env.DB_NAME || 'turfloot_db')
-    return db
-  } catch (error) {
-    console.error('❌ Database connection error:', error)
-    throw error
-  }
-}
+import { getName, setName } from '../../../lib/nameRegistry.js'
 
 // CORS headers
 const corsHeaders = {
@@ -77,10 +52,7 @@ export async function GET(request, { params }) {
         return NextResponse.json({ error: 'userId required' }, { status: 400, headers: corsHeaders })
       }
       
-      const db = await getDb()
-      const names = db.collection('names')
-      
-      const result = await names.findOne({ userId })
+      const result = await getName(userId)
       
       return NextResponse.json({
         success: true,
@@ -116,19 +88,7 @@ export async function POST(request, { params }) {
         return NextResponse.json({ error: 'userId and customName required' }, { status: 400, headers: corsHeaders })
       }
       
-      const db = await getDb()
-      const names = db.collection('names')
-      
-      const result = await names.replaceOne(
-        { userId },
-        {
-          userId,
-          customName,
-          updatedAt: new Date(),
-          createdAt: new Date()
-        },
-        { upsert: true }
-      )
+      await setName({ userId, customName })
       
       console.log('✅ Names API bypass - name saved successfully')
       
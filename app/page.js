@@ -127,7 +127,8 @@ export default function TurfLootTactical() {
     authenticated,
     user: privyUser,
     login,
-    logout
+    logout,
+    getAccessToken
   } = usePrivy()
   const { createWallet } = useCreateWallet()
   const { wallets, ready: walletsReady } = useSolanaWallets()
@@ -1360,6 +1361,34 @@ export default function TurfLootTactical() {
     }
   }, [isAuthenticated, user])
 
+  // Keep the user online in the presence service (entries expire after 60s
+  // without a heartbeat) and go offline when the page is closed
+  useEffect(() => {
+    const userIdentifier = user?.wallet?.address || user?.email?.address || user?.id
+    if (!isAuthenticated || !userIdentifier) return
+
+    const sendPresence = (action) => fetch('/api/friends', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ action, userIdentifier }),
+      keepalive: true
+    }).catch((error) => console.warn('⚠️ Presence update failed:', error))
+
+    const intervalId = setInterval(() => sendPresence('heartbeat'), 25000)
+    const goOffline = () => {
+      const payload = new Blob([JSON.stringify({ action: 'go_offline', userIdentifier })], { type: 'application/json' })
+      if (!navigator.sendBeacon?.('/api/friends', payload)) {
+        sendPresence('go_offline')
+      }
+    }
+    window.addEventListener('pagehide', goOffline)
+
+    return () => {
+      clearInterval(intervalId)
+      window.removeEventListener('pagehide', goOffline)
+    }
+  }, [isAuthenticated, user])
+
   const registerPrivyUser = async () => {
     try {
       if (!user) {
@@ -1453,6 +1482,9 @@ export default function TurfLootTactical() {
   const [loadingParty, setLoadingParty] = useState(false)
   const [availableUsers, setAvailableUsers] = useState([])
   const [loadingUsers, setLoadingUsers] = useState(false)
+  // Cursor for the next page of available users, null once all are loaded
+  const [usersCursor, setUsersCursor] = useState(null)
+  const [loadingMoreUsers, setLoadingMoreUsers] = useState(false)
 
   // Load friends when modal opens
   useEffect(() => {
@@ -1482,38 +1514,120 @@ export default function TurfLootTactical() {
     }
   }, [isAuthenticated, user])
   
-  // Auto-refresh friend requests every 30 seconds to catch new invites
+  // Friend requests, party invites and party changes are pushed over the
+  // game server socket. The 30 second poll only runs while the socket is
+  // not subscribed.
   useEffect(() => {
-    if (!isAuthenticated || !user) return
-    
-    const interval = setInterval(() => {
-      console.log('🔄 Auto-refreshing friend requests and party invites...')
-      loadFriendRequests()
-    }, 30000) // Refresh every 30 seconds
-    
-    return () => clearInterval(interval)
+    const userIdentifier = user?.wallet?.address || user?.email?.address || user?.id
+    if (!isAuthenticated || !userIdentifier) return
+
+    let socket = null
+    let pollInterval = null
+    let cancelled = false
+
+    const startPolling = () => {
+      if (pollInterval) return
+      pollInterval = setInterval(() => {
+        console.log('🔄 Auto-refreshing friend requests and party invites...')
+        loadFriendRequests()
+        loadCurrentParty()
+      }, 30000)
+    }
+    const stopPolling = () => {
+      clearInterval(pollInterval)
+      pollInterval = null
+    }
+
+    // Requests and invites are stored as sent by the API, so deltas apply
+    // directly; friends and the current party are hydrated by the API and
+    // are reloaded instead
+    const applyRequestChange = (change) => {
+      setFriendRequests((current) => {
+        const next = {
+          sent: current.sent.filter((request) => request.id !== change.id),
+          received: current.received.filter((request) => request.id !== change.id)
+        }
+        const doc = change.document
+        if (!doc || doc.status !== 'pending') return next
+
+        if ((doc.toUserIdentifier || doc.toUserId) === userIdentifier) {
+          next.received.push(doc)
+        } else if (change.collection === 'friend_requests' && (doc.fromUserIdentifier || doc.fromUserId) === userIdentifier) {
+          next.sent.push(doc)
+        }
+        return next
+      })
+    }
+
+    const applyChange = (change) => {
+      console.log('📨 Social update:', change.collection, change.operation)
+      if (change.collection === 'friend_requests' || change.collection === 'party_invites') {
+        applyRequestChange(change)
+      } else if (change.collection === 'friends') {
+        loadFriendsList()
+      } else if (change.collection === 'parties') {
+        loadCurrentParty()
+      }
+    }
+
+    startPolling()
+    import('socket.io-client')
+      .then(({ io }) => {
+        if (cancelled) return
+        socket = io()
+        socket.on('connect', async () => {
+          socket.emit('subscribe_social', { token: await getAccessToken(), userIdentifier })
+        })
+        socket.on('social_subscribed', () => {
+          stopPolling()
+          // Catch up on anything missed while not subscribed
+          loadFriendRequests()
+          loadCurrentParty()
+        })
+        socket.on('disconnect', startPolling)
+        socket.on('friends_update', applyChange)
+        socket.on('party_update', applyChange)
+      })
+      .catch((error) => console.warn('⚠️ Social updates unavailable, polling instead:', error))
+
+    return () => {
+      cancelled = true
+      stopPolling()
+      socket?.disconnect()
+    }
   }, [isAuthenticated, user])
 
-  const loadAvailableUsers = async () => {
-    setLoadingUsers(true)
+  // Loads the first page of available users, or with `cursor` appends the
+  // next one
+  const loadAvailableUsers = async (cursor = null) => {
+    const setLoading = cursor ? setLoadingMoreUsers : setLoadingUsers
+    setLoading(true)
     try {
       const userIdentifier = isAuthenticated ? 
         (user?.wallet?.address || user?.email?.address || user?.id) : 
         'guest'
       
-      const response = await fetch(`/api/friends?userIdentifier=${encodeURIComponent(userIdentifier)}&type=users`)
+      const cursorParam = cursor ? `&cursor=${encodeURIComponent(cursor)}` : ''
+      const response = await fetch(`/api/friends?userIdentifier=${encodeURIComponent(userIdentifier)}&type=users${cursorParam}`)
       const result = await response.json()
       
       if (result.success) {
-        setAvailableUsers(result.users)
-        console.log('✅ Available users loaded:', result.users.length, 'users')
+        setAvailableUsers((current) => cursor ? [...current, ...result.users] : result.users)
+        setUsersCursor(result.hasMore ? result.nextCursor : null)
+        console.log('✅ Available users loaded:', result.users.length, 'users', result.hasMore ? '(more available)' : '')
       } else {
         console.error('❌ Failed to load users:', result.error)
       }
     } catch (error) {
       console.error('❌ Error loading users:', error)
     }
-    setLoadingUsers(false)
+    setLoading(false)
+  }
+
+  const loadMoreAvailableUsers = () => {
+    if (usersCursor && !loadingUsers && !loadingMoreUsers) {
+      loadAvailableUsers(usersCursor)
+    }
   }
 
   const loadFriendsList = async () => {
@@ -10551,16 +10665,25 @@ export default function TurfLootTactical() {
                     marginBottom: '12px',
                     letterSpacing: '0.05em'
                   }}>
-                    Authenticated Users ({availableUsers.length} Available)
+                    Authenticated Users ({availableUsers.length}{usersCursor ? '+' : ''} Available)
                   </label>
                   
-                  <div style={{
-                    maxHeight: '300px',
-                    overflowY: 'auto',
-                    border: '2px solid rgba(104, 211, 145, 0.3)',
-                    borderRadius: '8px',
-                    background: 'rgba(26, 32, 44, 0.8)'
-                  }}>
+                  <div
+                    onScroll={(e) => {
+                      // Fetch the next page when scrolled near the bottom
+                      const list = e.currentTarget
+                      if (list.scrollHeight - list.scrollTop - list.clientHeight < 60) {
+                        loadMoreAvailableUsers()
+                      }
+                    }}
+                    style={{
+                      maxHeight: '300px',
+                      overflowY: 'auto',
+                      border: '2px solid rgba(104, 211, 145, 0.3)',
+                      borderRadius: '8px',
+                      background: 'rgba(26, 32, 44, 0.8)'
+                    }}
+                  >
                     {loadingUsers ? (
                       <div style={{
                         padding: '20px',
@@ -10737,6 +10860,26 @@ export default function TurfLootTactical() {
                             </button>
                           </div>
                         ))}
+                        {usersCursor && (
+                          <button
+                            onClick={loadMoreAvailableUsers}
+                            disabled={loadingMoreUsers}
+                            style={{
+                              width: '100%',
+                              background: 'transparent',
+                              border: 'none',
+                              color: '#a0aec0',
+                              padding: '10px',
+                              fontSize: '12px',
+                              fontWeight: '600',
+                              cursor: loadingMoreUsers ? 'default' : 'pointer',
+                              textTransform: 'uppercase',
+                              letterSpacing: '0.05em'
+                            }}
+                          >
+                            {loadingMoreUsers ? '⏳ Loading more users...' : 'Load more users'}
+                          </button>
+                        )}
                       </div>
                     ) : (
                       <div style={{
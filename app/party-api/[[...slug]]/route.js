@@ -19,7 +19,12 @@ export async function OPTIONS() {
 let initialized = false
 async function ensureInitialized() {
   if (!initialized) {
-    await PartySystem.initializeCollections()
+    // Index problems must not take the party API down; queries still work
+    try {
+      await PartySystem.initializeCollections()
+    } catch (error) {
+      console.error('❌ Failed to initialize party collections:', error)
+    }
     initialized = true
   }
 }
@@ -1,11 +1,10 @@
 // User authentication and session management
 import jwt from 'jsonwebtoken'
 import bcrypt from 'bcryptjs'
-import { MongoClient } from 'mongodb'
+import { getDb as getSharedDb } from './mongodb.js'
 import crypto from 'crypto'
 
 const JWT_SECRET = process.env.JWT_SECRET || 'turfloot-secret-key-change-in-production'
-const MONGO_URL = process.env.MONGO_URL || 'mongodb://localhost:27017'
 const DB_NAME = process.env.DB_NAME || 'turfloot_db'
 
 // CORS headers for the middleware
@@ -15,14 +14,8 @@ const corsHeaders = {
   'Access-Control-Allow-Headers': 'Content-Type, Authorization',
 }
 
-let client = null
-
-async function getDb() {
-  if (!client) {
-    client = new MongoClient(MONGO_URL)
-    await client.connect()
-  }
-  return client.db(DB_NAME)
+function getDb() {
+  return getSharedDb(DB_NAME)
 }
 
 // Helper: dynamically get NextResponse when available (Next.js runtime)
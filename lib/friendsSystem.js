@@ -1,66 +1,22 @@
 // Advanced Friends System with Redis, Rate Limiting, and Socket Events
-import { MongoClient } from 'mongodb'
-
-// MongoDB connection
-let client = null
-let db = null
-
-async function getDb() {
-  if (db) return db
-  
-  try {
-    if (!client) {
-      client = new MongoClient(process.env.MONGO_URL, {
-        serverSelectionTimeoutMS: 5000,
-        connectTimeoutMS: 10000,
-        maxPoolSize: 20
-      })
-      await client.connect()
-    }
-    
-    db = client.db(process.env.DB_NAME || 'turfloot_db')
-    return db
-  } catch (error) {
-    console.error('❌ Database connection error:', error)
-    throw error
-  }
+import { getDb as getSharedDb } from './mongodb.js'
+import { getOnlineUserIds, heartbeat, isOnline, markOffline } from './presence.js'
+import { deliverToUser } from './socialEvents.js'
+import { ensureManifestIndexes } from './indexManifest.js'
+
+// MongoDB connection (shared pool)
+function getDb() {
+  return getSharedDb(process.env.DB_NAME || 'turfloot_db')
 }
 
 // Redis connection (mock implementation for now - can be replaced with real Redis)
+// Presence lives in the shared presence service (./presence.js).
 class RedisManager {
   constructor() {
-    this.presenceSet = new Map() // userId -> { online: boolean, lastSeen: timestamp }
     this.suggestionsCache = new Map() // userId -> [suggested userIds]
     this.rateLimitCache = new Map() // userId -> { count: number, resetTime: timestamp }
   }
 
-  // Presence management
-  setUserOnline(userId) {
-    this.presenceSet.set(userId, { online: true, lastSeen: Date.now() })
-    console.log(`🟢 User ${userId} is now online`)
-  }
-
-  setUserOffline(userId) {
-    const existing = this.presenceSet.get(userId) || {}
-    this.presenceSet.set(userId, { ...existing, online: false, lastSeen: Date.now() })
-    console.log(`🔴 User ${userId} is now offline`)
-  }
-
-  isUserOnline(userId) {
-    const presence = this.presenceSet.get(userId)
-    return presence?.online || false
-  }
-
-  getOnlineUsers() {
-    const online = []
-    for (const [userId, presence] of this.presenceSet.entries()) {
-      if (presence.online) {
-        online.push(userId)
-      }
-    }
-    return online
-  }
-
   // Suggestions caching
   setSuggestions(userId, suggestions) {
     this.suggestionsCache.set(userId, suggestions)
@@ -103,11 +59,11 @@ class RedisManager {
 // Global Redis instance
 const redis = new RedisManager()
 
-// Socket events manager (mock implementation)
+// Socket events manager
 class SocketManager {
   static emit(userId, event, data) {
     console.log(`🔌 Socket emit to ${userId}: ${event}`, data)
-    // In real implementation, this would emit to actual WebSocket connections
+    deliverToUser(userId, event, data)
   }
 
   static emitToMultiple(userIds, event, data) {
@@ -121,13 +77,8 @@ export class FriendsSystem {
   static async initializeCollections() {
     const db = await getDb()
     
-    // Create indexes for performance  
-    await db.collection('friendships').createIndex({ fromUserId: 1, toUserId: 1 }, { unique: true })
-    await db.collection('friendships').createIndex({ toUserId: 1, status: 1 })
-    await db.collection('friend_requests').createIndex({ fromUserId: 1, toUserId: 1 }, { unique: true })
-    await db.collection('friend_requests').createIndex({ toUserId: 1, status: 1 })
-    await db.collection('blocked_users').createIndex({ blockerId: 1, blockedId: 1 }, { unique: true })
-    await db.collection('users').createIndex({ username: 1 })
+    // Create indexes for performance (declared in lib/indexManifest.js)
+    await ensureManifestIndexes(db, 'social', ['friendships', 'friend_requests', 'blocked_users', 'users'])
     
     console.log('✅ Friends system collections initialized')
   }
@@ -394,14 +345,19 @@ export class FriendsSystem {
       status: 'active'
     }).toArray()
 
-    const friends = friendships.map(friendship => {
-      const friendId = friendship.fromUserId === userId ? friendship.toUserId : friendship.fromUserId
+    const friendIds = friendships.map(friendship =>
+      friendship.fromUserId === userId ? friendship.toUserId : friendship.fromUserId
+    )
+    const online = await isOnline(friendIds)
+
+    const friends = friendships.map((friendship, index) => {
+      const friendId = friendIds[index]
       const friendUsername = friendship.fromUserId === userId ? friendship.toUsername : friendship.fromUsername
       
       return {
         id: friendId,
         username: friendUsername,
-        online: redis.isUserOnline(friendId),
+        online: online.get(friendId) || false,
         lastSeen: friendship.updatedAt,
         friendshipId: friendship.id
       }
@@ -470,16 +426,17 @@ export class FriendsSystem {
     }
 
     let users = await db.collection('users').find(searchQuery).limit(20).toArray()
+    const online = await isOnline(users.map(user => user.id))
 
     // Filter by online status if requested
     if (onlineOnly) {
-      users = users.filter(user => redis.isUserOnline(user.id))
+      users = users.filter(user => online.get(user.id))
     }
 
     return users.map(user => ({
       id: user.id,
       username: user.username,
-      online: redis.isUserOnline(user.id),
+      online: online.get(user.id) || false,
       canSendRequest: true
     }))
   }
@@ -534,18 +491,19 @@ export class FriendsSystem {
   }
 
   // 9. Presence Management
-  static setUserOnline(userId) {
-    redis.setUserOnline(userId)
+  // Also serves as the heartbeat that keeps a user online
+  static async setUserOnline(userId) {
+    await heartbeat(userId)
     SocketManager.emit(userId, 'presence_updated', { online: true })
   }
 
-  static setUserOffline(userId) {
-    redis.setUserOffline(userId)
+  static async setUserOffline(userId) {
+    await markOffline(userId)
     SocketManager.emit(userId, 'presence_updated', { online: false })
   }
 
-  static getOnlineUsers() {
-    return redis.getOnlineUsers()
+  static async getOnlineUsers() {
+    return getOnlineUserIds()
   }
 }
 
@@ -1,20 +1,16 @@
 import { Server } from 'socket.io'
 import jwt from 'jsonwebtoken'
-import { MongoClient } from 'mongodb'
+import { getDb as getSharedDb } from './mongodb.js'
 import crypto from 'crypto'
 import { antiCheat } from './antiCheat.js'
+import { PRESENCE_TTL_MS, heartbeat, markOffline } from './presence.js'
+import { onSocialChange, setSocketTransport, startSocialChangeStream } from './socialEvents.js'
+import { PartySocketManager } from './partySystem.js'
+import { SocketManager } from './friendsSystem.js'
+import { invalidateCachedRoutes } from './responseCache.js'
 
-// Database connection
-let dbCache = null
-
-const getDb = async () => {
-  if (dbCache) return dbCache
-
-  const client = new MongoClient(process.env.MONGO_URL)
-  await client.connect()
-  dbCache = client.db('turfloot')
-  return dbCache
-}
+// Database connection (shared pool)
+const getDb = () => getSharedDb('turfloot')
 
 // Game Configuration
 const config = {
@@ -207,6 +203,7 @@ class TurfLootGameRoom {
         $set: { updated_at: new Date() }
       }
     )
+    await invalidateCachedRoutes('rooms/tiers')
 
     return true
   }
@@ -826,6 +823,7 @@ export class TurfLootGameServer {
     this.io = null
     this.rooms = new Map()
     this.gameLoop = null
+    this.presenceLoop = null
     this.persistentServers = new Map() // Track persistent servers
     this.onlineUsers = new Map() // Track online users for real-time social features
     this.userSessions = new Map() // Map userId to socketId for direct messaging
@@ -944,6 +942,8 @@ export class TurfLootGameServer {
 
     this.setupSocketHandlers()
     this.startGameLoop()
+    this.startPresenceHeartbeat()
+    this.startSocialPush()
     
     // NEW: Initialize persistent practice room AFTER Socket.IO is ready
     this.initializePersistentPracticeRoom()
@@ -1201,6 +1201,24 @@ export class TurfLootGameServer {
         }
       })
 
+      // Lobby clients subscribe here to receive party_update/friends_update
+      // pushes instead of polling /api/party and /api/friends. Social events
+      // are addressed by the identifier the social routes use (wallet, email
+      // or Privy id), which the client sends along with its token.
+      socket.on('subscribe_social', (data) => {
+        const userInfo = this.verifyToken(data?.token)
+        if (!userInfo) {
+          socket.emit('auth_error', { message: 'Invalid authentication token' })
+          return
+        }
+
+        const userId = typeof data?.userIdentifier === 'string' && data.userIdentifier
+          ? data.userIdentifier
+          : userInfo.userId
+        this.registerUserOnline(userId, socket.id, userInfo.nickname)
+        socket.emit('social_subscribed', { userId })
+      })
+
       socket.on('disconnect', () => {
         console.log(`🔌 Player disconnected: ${socket.id}`)
         
@@ -1379,6 +1397,9 @@ export class TurfLootGameServer {
       currentRoom: null
     })
     this.userSessions.set(userId, socketId)
+    heartbeat(userId).catch((error) => {
+      console.error('❌ Presence heartbeat failed:', error)
+    })
     
     console.log(`🟢 User ${nickname} (${userId}) is now online`)
   }
@@ -1389,6 +1410,9 @@ export class TurfLootGameServer {
       console.log(`🔴 User ${user.nickname} (${userId}) is now offline`)
       this.onlineUsers.delete(userId)
       this.userSessions.delete(userId)
+      markOffline(userId).catch((error) => {
+        console.error('❌ Presence update failed:', error)
+      })
     }
   }
 
@@ -1600,6 +1624,41 @@ export class TurfLootGameServer {
     }, 1000 / config.tickRate)
   }
 
+  // Connected sockets count as heartbeats for the shared presence service
+  startPresenceHeartbeat() {
+    this.presenceLoop = setInterval(() => {
+      const now = Date.now()
+      for (const userId of this.onlineUsers.keys()) {
+        heartbeat(userId, now).catch((error) => {
+          console.error('❌ Presence heartbeat failed:', error)
+        })
+      }
+    }, PRESENCE_TTL_MS / 2)
+  }
+
+  // Forwards party/friend change events to the sockets of the users involved
+  startSocialPush() {
+    setSocketTransport((userId, event, data) => {
+      const socketId = this.userSessions.get(userId)
+      if (!socketId) {
+        return false
+      }
+      this.io.to(socketId).emit(event, data)
+      return true
+    })
+
+    onSocialChange((change) => {
+      const isPartyChange = change.collection === 'parties' || change.collection === 'party_invites'
+      const manager = isPartyChange ? PartySocketManager : SocketManager
+      const onlineRecipients = change.recipients.filter((userId) => this.userSessions.has(userId))
+      manager.emitToMultiple(onlineRecipients, isPartyChange ? 'party_update' : 'friends_update', change)
+    })
+
+    if (process.env.SOCIAL_CHANGE_STREAMS === 'true') {
+      startSocialChangeStream()
+    }
+  }
+
   getRoomStats() {
     const stats = []
     for (const [roomId, room] of this.rooms) {
@@ -0,0 +1,237 @@
+// Game session store.
+// Each player session is one compact document in `game_sessions`, upserted
+// on join and on every heartbeat. A TTL index on `lastActivity` deletes
+// sessions that stop heartbeating, so the collection only ever holds live
+// and recently-left players.
+//
+// Player counts per room are kept as time-bucketed counters in
+// `game_room_activity`: a session is counted once in each BUCKET_MS bucket in
+// which it heartbeats, and leaving uncounts it. A room's player count is the
+// larger of the current and previous bucket, which is a two-document read
+// instead of a range scan over sessions. Players that vanish without leaving
+// drop out of the count within two buckets.
+import { getDb } from './mongodb.js'
+import { ensureManifestIndexes, GAME_SESSION_TTL_SECONDS } from './indexManifest.js'
+
+const SESSIONS_COLLECTION = 'game_sessions'
+const ACTIVITY_COLLECTION = 'game_room_activity'
+
+export const BUCKET_MS = Number(process.env.GAME_SESSION_BUCKET_MS || 60_000)
+export const ACTIVE_SESSION_WINDOW_MS = GAME_SESSION_TTL_SECONDS * 1000
+
+// Session fields clients may send on join; anything else is dropped.
+const SESSION_FIELDS = ['playerName', 'walletAddress', 'entryFee', 'mode', 'region']
+
+let indexesReady = null
+
+function ensureIndexes(db) {
+  if (!indexesReady) {
+    indexesReady = ensureManifestIndexes(db, 'game', [SESSIONS_COLLECTION, ACTIVITY_COLLECTION]).catch((error) => {
+      indexesReady = null
+      throw error
+    })
+  }
+  return indexesReady
+}
+
+async function getCollections() {
+  const db = await getDb('turfloot')
+  await ensureIndexes(db)
+  return {
+    sessions: db.collection(SESSIONS_COLLECTION),
+    activity: db.collection(ACTIVITY_COLLECTION)
+  }
+}
+
+export function getBucket(at = Date.now()) {
+  return Math.floor(at / BUCKET_MS)
+}
+
+function activityId(roomId, bucket) {
+  return `${roomId}:${bucket}`
+}
+
+function adjustRoomCount(activity, roomId, bucket, delta) {
+  return activity.updateOne(
+    { _id: activityId(roomId, bucket) },
+    {
+      $inc: { players: delta },
+      $setOnInsert: {
+        roomId,
+        bucket,
+        // Buckets are only read while current or previous
+        expiresAt: new Date((bucket + 3) * BUCKET_MS)
+      }
+    },
+    { upsert: true }
+  )
+}
+
+// Buckets in which a session document is currently counted.
+function countedBuckets(session) {
+  if (!session || session.status !== 'active') {
+    return []
+  }
+  return [session.countedBucket, session.previousBucket].filter((bucket) => Number.isInteger(bucket))
+}
+
+// Client-supplied values go into an update pipeline, where a string starting
+// with `$` would otherwise be read as a field path.
+function literal(value) {
+  return { $literal: value }
+}
+
+function pickSessionFields(session = {}) {
+  const fields = {}
+  for (const field of SESSION_FIELDS) {
+    if (session?.[field] !== undefined) {
+      fields[field] = literal(session[field])
+    }
+  }
+  return fields
+}
+
+// Two concurrent upserts for a new session can both insert; the unique
+// sessionId index rejects the second, which is retried as an update of the
+// document the first one created.
+async function upsertSession(sessions, filter, update) {
+  const options = { upsert: true, returnDocument: 'before', includeResultMetadata: false }
+  try {
+    return await sessions.findOneAndUpdate(filter, update, options)
+  } catch (error) {
+    if (error.code !== 11000) {
+      throw error
+    }
+    return sessions.findOneAndUpdate(filter, update, options)
+  }
+}
+
+// Upserts the session and counts it in the current bucket of its room.
+// Used for both join and heartbeat; a heartbeat for an expired session
+// simply recreates it.
+export async function touchSession({ sessionId, userId, roomId, session = null, joinedAt = null }, now = new Date()) {
+  const { sessions, activity } = await getCollections()
+  const bucket = getBucket(now.getTime())
+
+  const previous = await upsertSession(sessions, { sessionId }, [
+    {
+      $set: {
+        sessionId: literal(sessionId),
+        userId: literal(userId),
+        roomId: literal(roomId),
+        status: 'active',
+        lastActivity: now,
+        joinedAt: { $ifNull: ['$joinedAt', joinedAt || now] },
+        ...pickSessionFields(session),
+        // The bucket this session was counted in before the current one,
+        // while it stays active in the same room
+        previousBucket: {
+          $cond: [
+            { $and: [{ $eq: ['$status', 'active'] }, { $eq: ['$roomId', literal(roomId)] }] },
+            { $cond: [{ $eq: ['$countedBucket', bucket] }, '$previousBucket', '$countedBucket'] },
+            null
+          ]
+        },
+        countedBucket: bucket
+      }
+    },
+    { $unset: 'leftAt' }
+  ])
+
+  const counted = countedBuckets(previous).filter((countedBucket) => countedBucket >= bucket - 1)
+  const movedRoom = previous && previous.status === 'active' && previous.roomId !== roomId
+  const updates = []
+
+  if (movedRoom) {
+    for (const countedBucket of counted) {
+      updates.push(adjustRoomCount(activity, previous.roomId, countedBucket, -1))
+    }
+  }
+  if (movedRoom || !counted.includes(bucket)) {
+    updates.push(adjustRoomCount(activity, roomId, bucket, 1))
+  }
+
+  await Promise.all(updates)
+}
+
+// Looks up an active session's id from its room and user, for clients that
+// heartbeat without a session id.
+export async function findActiveSessionId(roomId, userId) {
+  const { sessions } = await getCollections()
+  const existing = await sessions.findOne(
+    { roomId, userId, status: 'active' },
+    { projection: { _id: 0, sessionId: 1 } }
+  )
+  return existing?.sessionId || null
+}
+
+// Marks the session as left and uncounts it. Returns false when there was no
+// active session to leave.
+export async function leaveSession({ sessionId, userId }, now = new Date()) {
+  const { sessions, activity } = await getCollections()
+
+  const previous = await sessions.findOneAndUpdate(
+    { sessionId, userId, status: 'active' },
+    { $set: { status: 'left', leftAt: now, lastActivity: now } },
+    { returnDocument: 'before', includeResultMetadata: false }
+  )
+
+  if (!previous) {
+    return false
+  }
+
+  const current = getBucket(now.getTime())
+  await Promise.all(
+    countedBuckets(previous)
+      .filter((bucket) => bucket >= current - 1)
+      .map((bucket) => adjustRoomCount(activity, previous.roomId, bucket, -1))
+  )
+  return true
+}
+
+function readCounts(docs, bucket) {
+  const counts = new Map()
+  for (const doc of docs) {
+    const entry = counts.get(doc.roomId) || { current: 0, previous: 0 }
+    if (doc.bucket === bucket) {
+      entry.current = doc.players
+    } else {
+      entry.previous = doc.players
+    }
+    counts.set(doc.roomId, entry)
+  }
+
+  const players = new Map()
+  for (const [roomId, { current, previous }] of counts) {
+    const count = Math.max(current, previous, 0)
+    if (count > 0) {
+      players.set(roomId, count)
+    }
+  }
+  return players
+}
+
+export async function getRoomPlayerCount(roomId, now = Date.now()) {
+  const { activity } = await getCollections()
+  const bucket = getBucket(now)
+  const docs = await activity
+    .find({ _id: { $in: [activityId(roomId, bucket), activityId(roomId, bucket - 1)] } })
+    .toArray()
+  return readCounts(docs, bucket).get(roomId) || 0
+}
+
+// roomId -> player count for every room with players.
+export async function getRoomPlayerCounts(now = Date.now()) {
+  const { activity } = await getCollections()
+  const bucket = getBucket(now)
+  const docs = await activity.find({ bucket: { $in: [bucket, bucket - 1] } }).toArray()
+  return readCounts(docs, bucket)
+}
+
+export async function listActiveSessions(now = Date.now()) {
+  const { sessions } = await getCollections()
+  return sessions.find(
+    { status: 'active', lastActivity: { $gte: new Date(now - ACTIVE_SESSION_WINDOW_MS) } },
+    { projection: { _id: 0 } }
+  ).toArray()
+}
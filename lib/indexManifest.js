@@ -0,0 +1,231 @@
+// Central MongoDB index manifest.
+// Every index the app relies on is declared here, grouped by the database it
+// lives in. Modules that used to create their own indexes call
+// ensureManifestIndexes() for the collections they touch, and the whole
+// manifest is applied once at server startup (server.js) or with
+// `node scripts/apply-indexes.js`. mongo_query_audit.py checks the query
+// shapes the routes run against these indexes.
+import { getDb } from './mongodb.js'
+
+// Logical database -> actual database name. `null` means the database named
+// in the connection string.
+export const MANIFEST_DATABASES = {
+  social: () => process.env.DB_NAME || 'turfloot_db',
+  game: () => 'turfloot',
+  default: () => null
+}
+
+// Sessions that stop heartbeating for this long are deleted (lib/gameSessions.js)
+export const GAME_SESSION_TTL_SECONDS = Number(process.env.GAME_SESSION_TTL_SECONDS || 600)
+
+// Processed webhook deliveries are kept this long for de-duplication
+export const HELIUS_QUEUE_RETENTION_SECONDS = Number(process.env.HELIUS_QUEUE_RETENTION_SECONDS || 7 * 24 * 60 * 60)
+
+export const INDEX_MANIFEST = {
+  social: {
+    users: [
+      { key: { userIdentifier: 1 }, name: 'userIdentifier_1' },
+      { key: { isDiscoverable: 1, userIdentifier: 1 }, name: 'discoverable_userIdentifier' },
+      // email_1, username_1, id_1 and privy_id_1 are also created by
+      // scripts/init-production-database.js; the options match it except
+      // that id_1 is not unique, because the friends route stores users
+      // without an id. An existing unique id_1 is kept.
+      { key: { email: 1 }, name: 'email_1' },
+      { key: { walletAddress: 1 }, name: 'walletAddress_1', sparse: true },
+      { key: { username: 1 }, name: 'username_1' },
+      { key: { id: 1 }, name: 'id_1' },
+      { key: { privy_id: 1 }, name: 'privy_id_1' }
+    ],
+    friends: [
+      { key: { userIdentifier: 1, friendUserIdentifier: 1 }, name: 'userIdentifier_friendUserIdentifier' },
+      { key: { friendIdentifier: 1, status: 1 }, name: 'friendIdentifier_1_status_1', sparse: true }
+    ],
+    friend_requests: [
+      { key: { id: 1 }, name: 'id_1' },
+      { key: { fromUserId: 1, toUserId: 1 }, name: 'fromUserId_1_toUserId_1', unique: true },
+      { key: { toUserId: 1, status: 1 }, name: 'toUserId_1_status_1' },
+      { key: { fromUserIdentifier: 1, status: 1 }, name: 'fromUserIdentifier_1_status_1' },
+      { key: { toUserIdentifier: 1, status: 1 }, name: 'toUserIdentifier_1_status_1' }
+    ],
+    parties: [
+      { key: { id: 1 }, name: 'id_1', unique: true },
+      { key: { privacy: 1, status: 1, createdBy: 1 }, name: 'privacy_status_createdBy' },
+      { key: { currentPlayers: 1, status: 1 }, name: 'currentPlayers_1_status_1' },
+      // Same options as the index PartySystem created before the manifest
+      { key: { ownerId: 1 }, name: 'ownerId_1' },
+      { key: { status: 1 }, name: 'status_1' }
+    ],
+    party_invites: [
+      { key: { id: 1 }, name: 'id_1' },
+      { key: { toUserIdentifier: 1, status: 1 }, name: 'toUserIdentifier_1_status_1' },
+      { key: { partyId: 1 }, name: 'partyId_1' }
+    ],
+    names: [
+      { key: { userId: 1 }, name: 'userId_1' },
+      { key: { updatedAt: -1 }, name: 'updatedAt_-1' }
+    ],
+    // lib/friendsSystem.js and lib/partySystem.js collections
+    friendships: [
+      { key: { fromUserId: 1, toUserId: 1 }, name: 'fromUserId_1_toUserId_1', unique: true },
+      { key: { toUserId: 1, status: 1 }, name: 'toUserId_1_status_1' }
+    ],
+    blocked_users: [
+      { key: { blockerId: 1, blockedId: 1 }, name: 'blockerId_1_blockedId_1', unique: true }
+    ],
+    party_invitations: [
+      { key: { partyId: 1, toUserId: 1 }, name: 'partyId_1_toUserId_1', unique: true },
+      { key: { toUserId: 1, status: 1 }, name: 'toUserId_1_status_1' }
+    ],
+    party_members: [
+      { key: { partyId: 1, userId: 1 }, name: 'partyId_1_userId_1', unique: true }
+    ]
+  },
+  game: {
+    game_sessions: [
+      { key: { sessionId: 1 }, name: 'sessionId_1', unique: true },
+      { key: { roomId: 1, userId: 1, status: 1 }, name: 'roomId_userId_status' },
+      { key: { status: 1, lastActivity: -1 }, name: 'status_1_lastActivity_-1' },
+      { key: { lastActivity: 1 }, name: 'lastActivity_ttl', expireAfterSeconds: GAME_SESSION_TTL_SECONDS }
+    ],
+    game_room_activity: [
+      { key: { bucket: 1 }, name: 'bucket_1' },
+      { key: { expiresAt: 1 }, name: 'expiresAt_ttl', expireAfterSeconds: 0 }
+    ],
+    elimination_earnings: [
+      { key: { userIdentifier: 1 }, name: 'userIdentifier_1' },
+      { key: { totalEarnings: -1 }, name: 'totalEarnings_-1' }
+    ],
+    elimination_earnings_windows: [
+      { key: { window: 1, bucket: 1, userIdentifier: 1 }, name: 'window_bucket_user', unique: true },
+      { key: { window: 1, bucket: 1, totalEarnings: -1 }, name: 'window_bucket_earnings' },
+      { key: { expiresAt: 1 }, name: 'expiresAt_ttl', expireAfterSeconds: 0 }
+    ],
+    paymentIntents: [
+      { key: { intentId: 1 }, name: 'intentId_1', unique: true },
+      { key: { status: 1, expiresAt: 1 }, name: 'status_1_expiresAt_1' },
+      { key: { signature: 1 }, name: 'signature_1', unique: true, sparse: true },
+      { key: { referenceId: 1 }, name: 'referenceId_1', unique: true, sparse: true },
+      { key: { userId: 1, roomId: 1, status: 1, createdAt: -1 }, name: 'userId_roomId_status_createdAt' }
+    ],
+    paidRoomTxAudits: [
+      { key: { signature: 1 }, name: 'signature_1', unique: true },
+      { key: { intentId: 1 }, name: 'intentId_1' },
+      { key: { timestamp: -1 }, name: 'timestamp_-1' }
+    ]
+  },
+  default: {
+    users: [
+      { key: { userId: 1 }, name: 'userId_1', sparse: true }
+    ],
+    active_rooms: [
+      { key: { roomId: 1 }, name: 'roomId_1' },
+      { key: { status: 1, createdAt: -1 }, name: 'status_1_createdAt_-1' }
+    ],
+    paid_matches: [
+      { key: { matchId: 1 }, name: 'matchId_1', unique: true },
+      { key: { status: 1, createdAt: -1 }, name: 'status_1_createdAt_-1' }
+    ],
+    // Queued Helius deliveries, _id = signature (lib/transactions/webhookQueue.js)
+    helius_webhook_queue: [
+      { key: { status: 1, available_at: 1 }, name: 'status_1_available_at_1' },
+      { key: { claim_id: 1 }, name: 'claim_id_1', sparse: true },
+      { key: { completed_at: 1 }, name: 'completed_at_ttl', expireAfterSeconds: HELIUS_QUEUE_RETENTION_SECONDS }
+    ],
+    // One document per credited transfer, _id = signature:kind:index
+    deposit_credits: [
+      { key: { claim_id: 1 }, name: 'claim_id_1', sparse: true },
+      { key: { signature: 1 }, name: 'signature_1' }
+    ],
+    pending_deposits: [
+      { key: { user_id: 1, status: 1, expires_at: 1 }, name: 'user_id_status_expires_at' }
+    ],
+    // Batched cash-outs (lib/payoutBatcher.js)
+    payouts: [
+      { key: { payoutId: 1 }, name: 'payoutId_1', unique: true },
+      { key: { signature: 1 }, name: 'signature_1', sparse: true },
+      { key: { status: 1, updatedAt: -1 }, name: 'status_1_updatedAt_-1' }
+    ]
+  }
+}
+
+const applied = new Map()
+
+// IndexOptionsConflict / IndexKeySpecsConflict: an index with the same name
+// or key already exists with other options
+const INDEX_CONFLICT_CODES = new Set([85, 86])
+// Existing documents violate a unique index being built
+const DUPLICATE_KEY_CODE = 11000
+
+function specsFor(logicalDb, collection) {
+  const specs = INDEX_MANIFEST[logicalDb]?.[collection]
+  if (!specs) {
+    throw new Error(`No index manifest entry for ${logicalDb}.${collection}`)
+  }
+  return specs
+}
+
+// createIndexes builds nothing when one spec fails, so on a failure the specs
+// are retried one at a time. A conflicting spec keeps the existing index (it
+// covers the same key, so the queries are still served), and a unique index
+// that existing documents violate is built without the constraint until the
+// data is cleaned up (e.g. scripts/dedupe-game-sessions.js).
+async function createManifestIndexes(collection, specs) {
+  try {
+    await collection.createIndexes(specs)
+  } catch (error) {
+    if (!INDEX_CONFLICT_CODES.has(error.code) && error.code !== DUPLICATE_KEY_CODE) {
+      throw error
+    }
+
+    for (const spec of specs) {
+      try {
+        await collection.createIndexes([spec])
+      } catch (specError) {
+        if (spec.unique && specError.code === DUPLICATE_KEY_CODE) {
+          console.warn(`⚠️ Duplicate keys in ${collection.collectionName}, creating ${spec.name} without unique: ${specError.message}`)
+          await collection.createIndexes([{ ...spec, unique: false }])
+        } else if (INDEX_CONFLICT_CODES.has(specError.code)) {
+          console.warn(`⚠️ Keeping existing index ${collection.collectionName}.${spec.name}: ${specError.message}`)
+        } else {
+          throw specError
+        }
+      }
+    }
+  }
+}
+
+// Creates the manifest indexes for the given collections once per process.
+export function ensureManifestIndexes(db, logicalDb, collections) {
+  return Promise.all(collections.map((collection) => {
+    const cacheKey = `${db.databaseName}.${collection}`
+    if (!applied.has(cacheKey)) {
+      const pending = createManifestIndexes(db.collection(collection), specsFor(logicalDb, collection)).catch((error) => {
+        applied.delete(cacheKey)
+        throw error
+      })
+      applied.set(cacheKey, pending)
+    }
+    return applied.get(cacheKey)
+  }))
+}
+
+// Applies the whole manifest. Failures are collected per collection so one
+// conflicting index does not block the rest.
+export async function applyIndexManifest() {
+  const results = []
+
+  for (const [logicalDb, collections] of Object.entries(INDEX_MANIFEST)) {
+    const db = await getDb(MANIFEST_DATABASES[logicalDb]())
+
+    for (const collection of Object.keys(collections)) {
+      try {
+        await ensureManifestIndexes(db, logicalDb, [collection])
+        results.push({ database: db.databaseName, collection, ok: true })
+      } catch (error) {
+        results.push({ database: db.databaseName, collection, ok: false, error: error.message })
+      }
+    }
+  }
+
+  return results
+}
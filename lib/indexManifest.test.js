@@ -0,0 +1,71 @@
+import assert from 'assert'
+import { ensureManifestIndexes, INDEX_MANIFEST } from './indexManifest.js'
+
+// Minimal stand-in for a collection's index catalogue. Like the server,
+// createIndexes builds nothing when any spec fails.
+function indexOptions(spec) {
+  return JSON.stringify({ key: spec.key, unique: Boolean(spec.unique), sparse: Boolean(spec.sparse) })
+}
+
+// `duplicated` names the indexes whose keys existing documents repeat
+function fakeCollection(name, existing, duplicated = []) {
+  const indexes = new Map(existing.map((spec) => [spec.name, spec]))
+  return {
+    collectionName: name,
+    indexes,
+    async createIndexes(specs) {
+      for (const spec of specs) {
+        const current = indexes.get(spec.name)
+        if (current && indexOptions(current) !== indexOptions(spec)) {
+          throw Object.assign(new Error(`Index already exists with different options: ${spec.name}`), {
+            code: 85,
+            codeName: 'IndexOptionsConflict'
+          })
+        }
+        if (!current && spec.unique && duplicated.includes(spec.name)) {
+          throw Object.assign(new Error(`E11000 duplicate key error index: ${spec.name}`), {
+            code: 11000,
+            codeName: 'DuplicateKey'
+          })
+        }
+      }
+      specs.forEach((spec) => indexes.set(spec.name, spec))
+      return specs.map((spec) => spec.name)
+    }
+  }
+}
+
+// The users indexes scripts/init-production-database.js creates
+const users = fakeCollection('users', [
+  { key: { id: 1 }, name: 'id_1', unique: true },
+  { key: { privy_id: 1 }, name: 'privy_id_1' },
+  { key: { email: 1 }, name: 'email_1' },
+  { key: { username: 1 }, name: 'username_1' },
+  { key: { customName: 1 }, name: 'customName_1' }
+])
+// Sessions written before sessionId_1 was unique may repeat a sessionId
+const sessions = fakeCollection('game_sessions', [], ['sessionId_1'])
+const collections = { users, game_sessions: sessions }
+const db = { databaseName: 'turfloot_test', collection: (name) => collections[name] }
+
+const originalWarn = console.warn
+console.warn = () => {}
+try {
+  await ensureManifestIndexes(db, 'social', ['users'])
+  await ensureManifestIndexes(db, 'game', ['game_sessions'])
+} finally {
+  console.warn = originalWarn
+}
+
+for (const spec of INDEX_MANIFEST.social.users) {
+  assert.ok(users.indexes.has(spec.name), `Manifest index ${spec.name} should exist`)
+}
+assert.strictEqual(users.indexes.get('id_1').unique, true, 'Existing unique id_1 should be kept')
+assert.ok(users.indexes.has('customName_1'), 'Indexes outside the manifest should be left alone')
+
+for (const spec of INDEX_MANIFEST.game.game_sessions) {
+  assert.ok(sessions.indexes.has(spec.name), `Manifest index ${spec.name} should exist despite duplicate sessions`)
+}
+assert.strictEqual(sessions.indexes.get('sessionId_1').unique, false, 'sessionId_1 should fall back to non-unique')
+
+console.log('✅ Index manifest conflict regression test passed')
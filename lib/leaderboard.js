@@ -0,0 +1,254 @@
+// Materialized elimination-earnings leaderboard.
+// Top-N boards (all-time, daily, weekly) are kept in memory and updated
+// incrementally on every earnings write. Boards are snapshotted into a capped
+// collection so a cold instance can serve immediately. Windowed totals live
+// in per-bucket documents indexed by earnings, so no board is ever built from
+// a full scan of `elimination_earnings`.
+import crypto from 'crypto'
+import { getDb } from './mongodb.js'
+import { ensureManifestIndexes } from './indexManifest.js'
+
+const EARNINGS_COLLECTION = 'elimination_earnings'
+const WINDOW_COLLECTION = 'elimination_earnings_windows'
+const SNAPSHOT_COLLECTION = 'leaderboard_snapshots'
+
+export const LEADERBOARD_WINDOWS = ['all', 'daily', 'weekly']
+export const LEADERBOARD_SIZE = 100
+
+const BOARD_REFRESH_MS = Number(process.env.LEADERBOARD_REFRESH_MS || 30_000)
+const SNAPSHOT_DEBOUNCE_MS = 5_000
+const SNAPSHOT_CAP_BYTES = 4 * 1024 * 1024
+const SNAPSHOT_CAP_DOCS = 500
+const WINDOW_RETENTION_MS = {
+  daily: 3 * 24 * 60 * 60 * 1000,
+  weekly: 15 * 24 * 60 * 60 * 1000
+}
+
+// boardKey -> { entries, etag, loadedAt, dirty }
+const boards = new Map()
+const pendingSnapshots = new Map()
+let indexesReady = null
+
+function startOfUtcDay(date) {
+  return new Date(Date.UTC(date.getUTCFullYear(), date.getUTCMonth(), date.getUTCDate()))
+}
+
+export function getWindowBucket(window, now = new Date()) {
+  if (window === 'daily') {
+    return startOfUtcDay(now).toISOString().slice(0, 10)
+  }
+
+  if (window === 'weekly') {
+    // Weeks start on Monday (UTC)
+    const day = startOfUtcDay(now)
+    const offset = (day.getUTCDay() + 6) % 7
+    day.setUTCDate(day.getUTCDate() - offset)
+    return day.toISOString().slice(0, 10)
+  }
+
+  return 'all'
+}
+
+function boardKey(window, bucket) {
+  return window === 'all' ? 'all' : `${window}:${bucket}`
+}
+
+function toEntry(doc) {
+  return {
+    userIdentifier: doc.userIdentifier,
+    playerName: doc.playerName || 'Anonymous',
+    totalEarnings: doc.totalEarnings || 0,
+    totalEliminations: doc.totalEliminations || 0,
+    gamesPlayed: doc.gamesPlayed || 0,
+    lastActive: doc.lastActive || null
+  }
+}
+
+function computeEtag(key, entries) {
+  const hash = crypto.createHash('sha1').update(key).update(JSON.stringify(entries)).digest('base64url')
+  return `W/"${hash}"`
+}
+
+function setBoard(key, entries, loadedAt = Date.now()) {
+  const board = { entries, etag: computeEtag(key, entries), loadedAt, dirty: false }
+  boards.set(key, board)
+  return board
+}
+
+async function ensureIndexes(db) {
+  if (!indexesReady) {
+    indexesReady = (async () => {
+      await ensureManifestIndexes(db, 'game', [EARNINGS_COLLECTION, WINDOW_COLLECTION])
+
+      const existing = await db.listCollections({ name: SNAPSHOT_COLLECTION }).toArray()
+      if (existing.length === 0) {
+        await db.createCollection(SNAPSHOT_COLLECTION, {
+          capped: true,
+          size: SNAPSHOT_CAP_BYTES,
+          max: SNAPSHOT_CAP_DOCS
+        })
+      }
+    })().catch((error) => {
+      indexesReady = null
+      throw error
+    })
+  }
+
+  return indexesReady
+}
+
+async function loadSnapshot(db, key) {
+  const snapshot = await db.collection(SNAPSHOT_COLLECTION)
+    .find({ board: key })
+    .sort({ $natural: -1 })
+    .limit(1)
+    .next()
+
+  if (!snapshot || Date.now() - new Date(snapshot.createdAt).getTime() > BOARD_REFRESH_MS) {
+    return null
+  }
+
+  return setBoard(key, snapshot.entries, new Date(snapshot.createdAt).getTime())
+}
+
+async function rebuildBoard(db, window, bucket) {
+  const key = boardKey(window, bucket)
+  const docs = window === 'all'
+    ? await db.collection(EARNINGS_COLLECTION)
+      .find({})
+      .sort({ totalEarnings: -1 })
+      .limit(LEADERBOARD_SIZE)
+      .toArray()
+    : await db.collection(WINDOW_COLLECTION)
+      .find({ window, bucket })
+      .sort({ totalEarnings: -1 })
+      .limit(LEADERBOARD_SIZE)
+      .toArray()
+
+  const board = setBoard(key, docs.map(toEntry))
+  scheduleSnapshot(key)
+  return board
+}
+
+function scheduleSnapshot(key) {
+  if (pendingSnapshots.has(key)) {
+    return
+  }
+
+  const timer = setTimeout(async () => {
+    pendingSnapshots.delete(key)
+    const board = boards.get(key)
+    if (!board) {
+      return
+    }
+
+    try {
+      const db = await getDb()
+      await db.collection(SNAPSHOT_COLLECTION).insertOne({
+        board: key,
+        entries: board.entries,
+        createdAt: new Date()
+      })
+    } catch (error) {
+      console.warn('⚠️ Failed to snapshot leaderboard:', error.message)
+    }
+  }, SNAPSHOT_DEBOUNCE_MS)
+
+  if (typeof timer.unref === 'function') {
+    timer.unref()
+  }
+  pendingSnapshots.set(key, timer)
+}
+
+// Applies one user's new totals to an in-memory board. Boards only ever see
+// totals grow, so a user leaving the top-N is handled by marking the board
+// dirty and letting the next read rebuild it from the earnings index.
+function applyToBoard(key, entry) {
+  const board = boards.get(key)
+  if (!board) {
+    return
+  }
+
+  const entries = board.entries.filter((existing) => existing.userIdentifier !== entry.userIdentifier)
+  const wasPresent = entries.length !== board.entries.length
+  const isFull = entries.length >= LEADERBOARD_SIZE
+  const lowest = entries.length ? entries[entries.length - 1].totalEarnings : -Infinity
+
+  if (!wasPresent && isFull && entry.totalEarnings <= lowest) {
+    return
+  }
+
+  if (wasPresent && isFull && entry.totalEarnings < lowest) {
+    board.dirty = true
+    return
+  }
+
+  let index = entries.findIndex((existing) => existing.totalEarnings < entry.totalEarnings)
+  if (index === -1) {
+    index = entries.length
+  }
+  entries.splice(index, 0, entry)
+
+  setBoard(key, entries.slice(0, LEADERBOARD_SIZE), board.loadedAt)
+  scheduleSnapshot(key)
+}
+
+export async function getLeaderboard(window = 'all', now = new Date()) {
+  const normalizedWindow = LEADERBOARD_WINDOWS.includes(window) ? window : 'all'
+  const bucket = getWindowBucket(normalizedWindow, now)
+  const key = boardKey(normalizedWindow, bucket)
+
+  const cached = boards.get(key)
+  if (cached && !cached.dirty && Date.now() - cached.loadedAt < BOARD_REFRESH_MS) {
+    return { window: normalizedWindow, bucket, ...cached }
+  }
+
+  const db = await getDb()
+  await ensureIndexes(db)
+
+  const board = (!cached && await loadSnapshot(db, key)) || await rebuildBoard(db, normalizedWindow, bucket)
+  return { window: normalizedWindow, bucket, ...board }
+}
+
+export async function recordEarnings({ userIdentifier, playerName, earningsAdded = 0, eliminationsAdded = 0 }, now = new Date()) {
+  const db = await getDb()
+  await ensureIndexes(db)
+
+  const increments = {
+    totalEarnings: earningsAdded || 0,
+    totalEliminations: eliminationsAdded || 0,
+    gamesPlayed: 1
+  }
+  const name = playerName || 'Anonymous'
+
+  const updated = await db.collection(EARNINGS_COLLECTION).findOneAndUpdate(
+    { userIdentifier },
+    {
+      $set: { playerName: name, lastActive: now },
+      $inc: increments
+    },
+    { upsert: true, returnDocument: 'after', includeResultMetadata: false }
+  )
+
+  applyToBoard('all', toEntry(updated))
+
+  await Promise.all(['daily', 'weekly'].map(async (window) => {
+    const bucket = getWindowBucket(window, now)
+    const windowDoc = await db.collection(WINDOW_COLLECTION).findOneAndUpdate(
+      { window, bucket, userIdentifier },
+      {
+        $set: {
+          playerName: name,
+          lastActive: now,
+          expiresAt: new Date(now.getTime() + WINDOW_RETENTION_MS[window])
+        },
+        $inc: increments
+      },
+      { upsert: true, returnDocument: 'after', includeResultMetadata: false }
+    )
+
+    applyToBoard(boardKey(window, bucket), toEntry(windowDoc))
+  }))
+
+  return updated
+}
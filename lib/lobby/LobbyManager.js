@@ -3,7 +3,7 @@
  * Handles lobby creation, joining, and match allocation
  */
 
-import { MongoClient } from 'mongodb'
+import { getDb } from '../mongodb.js'
 import crypto from 'crypto'
 
 class LobbyManager {
@@ -14,11 +14,9 @@ class LobbyManager {
   }
 
   // Initialize lobby manager
-  async initialize(io, mongoUrl) {
+  async initialize(io) {
     this.io = io
-    this.client = new MongoClient(mongoUrl)
-    await this.client.connect()
-    this.db = this.client.db('turfloot_db')
+    this.db = await getDb('turfloot_db')
     
     console.log('🎮 Lobby Manager initialized')
     
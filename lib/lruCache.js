@@ -0,0 +1,61 @@
+// Small in-process LRU with per-entry TTL.
+// Map iteration order is insertion order, so re-inserting on read keeps the
+// least recently used entry at the front where eviction can find it.
+
+export class LruCache {
+  constructor({ maxEntries = 1000, ttlMs = 60_000 } = {}) {
+    this.maxEntries = maxEntries
+    this.ttlMs = ttlMs
+    this.entries = new Map()
+  }
+
+  get size() {
+    return this.entries.size
+  }
+
+  has(key) {
+    return this.peek(key) !== undefined
+  }
+
+  // Returns the cached value without touching recency, or undefined.
+  peek(key) {
+    const entry = this.entries.get(key)
+    if (!entry) {
+      return undefined
+    }
+
+    if (entry.expiresAt <= Date.now()) {
+      this.entries.delete(key)
+      return undefined
+    }
+
+    return entry.value
+  }
+
+  get(key) {
+    const value = this.peek(key)
+    if (value !== undefined) {
+      const entry = this.entries.get(key)
+      this.entries.delete(key)
+      this.entries.set(key, entry)
+    }
+    return value
+  }
+
+  set(key, value, ttlMs = this.ttlMs) {
+    this.entries.delete(key)
+    this.entries.set(key, { value, expiresAt: Date.now() + ttlMs })
+
+    while (this.entries.size > this.maxEntries) {
+      this.entries.delete(this.entries.keys().next().value)
+    }
+  }
+
+  delete(key) {
+    return this.entries.delete(key)
+  }
+
+  clear() {
+    this.entries.clear()
+  }
+}
@@ -1,38 +1,80 @@
 import { MongoClient } from 'mongodb'
 
-const uri = process.env.MONGO_URL
-const options = {}
+// Shared MongoDB connection manager.
+// Every API route and lib module borrows connections from this single pool
+// instead of constructing its own MongoClient, so one Next.js process holds
+// at most MONGO_MAX_POOL_SIZE connections against the cluster.
 
-let client
-let clientPromise
+const DEFAULT_DB_NAME = 'turfloot'
 
-if (!process.env.MONGO_URL) {
-  throw new Error('Please add your Mongo URI to .env.local')
+const poolOptions = {
+  maxPoolSize: Number(process.env.MONGO_MAX_POOL_SIZE || 20),
+  minPoolSize: Number(process.env.MONGO_MIN_POOL_SIZE || 0),
+  maxIdleTimeMS: Number(process.env.MONGO_MAX_IDLE_TIME_MS || 60_000),
+  waitQueueTimeoutMS: Number(process.env.MONGO_WAIT_QUEUE_TIMEOUT_MS || 10_000),
+  serverSelectionTimeoutMS: 5000,
+  connectTimeoutMS: 10000
 }
 
-if (process.env.NODE_ENV === 'development') {
-  // In development mode, use a global variable so that the value
-  // is preserved across module reloads caused by HMR (Hot Module Replacement).
-  if (!global._mongoClientPromise) {
-    client = new MongoClient(uri, options)
-    global._mongoClientPromise = client.connect()
+// The pool lives on globalThis so that HMR in development and warm
+// serverless invocations in production reuse it instead of opening a new one.
+const state = globalThis._turflootMongo || (globalThis._turflootMongo = {
+  client: null,
+  clientPromise: null,
+  metrics: {
+    connectionsCreated: 0,
+    connectionsClosed: 0,
+    checkoutsStarted: 0,
+    checkedOut: 0,
+    checkoutFailures: 0
   }
-  clientPromise = global._mongoClientPromise
-} else {
-  // In production mode, it's best to not use a global variable.
-  client = new MongoClient(uri, options)
-  clientPromise = client.connect()
+})
+
+function trackPoolEvents(client) {
+  const { metrics } = state
+
+  client.on('connectionCreated', () => { metrics.connectionsCreated++ })
+  client.on('connectionClosed', () => { metrics.connectionsClosed++ })
+  client.on('connectionCheckOutStarted', () => { metrics.checkoutsStarted++ })
+  client.on('connectionCheckedOut', () => { metrics.checkedOut++ })
+  client.on('connectionCheckedIn', () => { metrics.checkedOut = Math.max(0, metrics.checkedOut - 1) })
+  client.on('connectionCheckOutFailed', () => { metrics.checkoutFailures++ })
+}
+
+export function getMongoClient() {
+  if (state.clientPromise) {
+    return state.clientPromise
+  }
+
+  if (!process.env.MONGO_URL) {
+    return Promise.reject(new Error('Please add your Mongo URI to .env.local'))
+  }
+
+  const client = new MongoClient(process.env.MONGO_URL, poolOptions)
+  trackPoolEvents(client)
+
+  state.client = client
+  state.clientPromise = client.connect().catch((error) => {
+    // Let the next caller retry instead of caching a rejected promise
+    state.client = null
+    state.clientPromise = null
+    throw error
+  })
+
+  return state.clientPromise
 }
 
-// Export a module-scoped MongoClient promise. By doing this in a
-// separate module, the client can be shared across functions.
-export default clientPromise
+// Pass `null` to use the database named in the connection string.
+export async function getDb(dbName = DEFAULT_DB_NAME) {
+  const client = await getMongoClient()
+  return client.db(dbName || undefined)
+}
 
-export async function connectToDatabase() {
+export async function connectToDatabase(dbName = DEFAULT_DB_NAME) {
   try {
-    const client = await clientPromise
-    const db = client.db('turfloot')
-    
+    const client = await getMongoClient()
+    const db = client.db(dbName || undefined)
+
     return {
       client,
       db
@@ -41,4 +83,41 @@ export async function connectToDatabase() {
     console.error('MongoDB connection error:', error)
     throw error
   }
-}
\ No newline at end of file
+}
+
+export function getPoolMetrics() {
+  const { metrics } = state
+  const open = metrics.connectionsCreated - metrics.connectionsClosed
+
+  return {
+    connected: Boolean(state.client),
+    maxPoolSize: poolOptions.maxPoolSize,
+    open,
+    inUse: metrics.checkedOut,
+    available: Math.max(0, open - metrics.checkedOut),
+    utilization: poolOptions.maxPoolSize > 0 ? metrics.checkedOut / poolOptions.maxPoolSize : 0,
+    checkoutFailures: metrics.checkoutFailures,
+    totalCheckouts: metrics.checkoutsStarted
+  }
+}
+
+export async function checkMongoHealth() {
+  const startedAt = Date.now()
+
+  try {
+    const client = await getMongoClient()
+    await client.db('admin').command({ ping: 1 })
+    return {
+      healthy: true,
+      latencyMs: Date.now() - startedAt,
+      pool: getPoolMetrics()
+    }
+  } catch (error) {
+    return {
+      healthy: false,
+      latencyMs: Date.now() - startedAt,
+      error: error.message,
+      pool: getPoolMetrics()
+    }
+  }
+}
@@ -0,0 +1,301 @@
+// Shared custom-name registry.
+// Names are persisted in the Mongo `names` collection (the same documents
+// names-api reads and writes) with an in-process LRU in front of it. Every
+// write is published on a small capped collection that all instances tail,
+// so other workers drop their cached copy and update their search index
+// instead of serving a stale name until the TTL runs out.
+import crypto from 'crypto'
+import { getDb } from './mongodb.js'
+import { LruCache } from './lruCache.js'
+import { indexName } from './nameSearch.js'
+import { ensureManifestIndexes } from './indexManifest.js'
+
+const NAMES_COLLECTION = 'names'
+const INVALIDATION_COLLECTION = 'name_invalidations'
+const INVALIDATION_CAP_BYTES = 1024 * 1024
+const INVALIDATION_CAP_DOCS = 5000
+const INVALIDATION_RETRY_MS = 5000
+// Publishers stamp messages and names with their own clocks
+const CLOCK_SKEW_MARGIN_MS = 60_000
+const HISTORY_LIMIT = 20
+
+export const MAX_BATCH_IDS = 100
+
+const RECORD_PROJECTION = {
+  _id: 0,
+  userId: 1,
+  customName: 1,
+  privyId: 1,
+  email: 1,
+  updatedAt: 1,
+  source: 1
+}
+
+// userId -> record, or null for users known to have no custom name
+const cache = new LruCache({
+  maxEntries: Number(process.env.NAME_CACHE_MAX_ENTRIES || 10_000),
+  ttlMs: Number(process.env.NAME_CACHE_TTL_MS || 60_000)
+})
+const instanceId = crypto.randomUUID()
+let setupReady = null
+let listening = false
+
+function getNamesDb() {
+  return getDb(process.env.DB_NAME || 'turfloot_db')
+}
+
+function toIsoString(value) {
+  return value instanceof Date ? value.toISOString() : value || null
+}
+
+function toRecord(doc) {
+  return {
+    userId: doc.userId,
+    customName: doc.customName,
+    privyId: doc.privyId || doc.userId,
+    email: doc.email || null,
+    updatedAt: toIsoString(doc.updatedAt),
+    source: doc.source || 'names_api'
+  }
+}
+
+function ensureSetup(db) {
+  if (!setupReady) {
+    setupReady = (async () => {
+      await ensureManifestIndexes(db, 'social', [NAMES_COLLECTION])
+
+      const existing = await db.listCollections({ name: INVALIDATION_COLLECTION }).toArray()
+      if (existing.length === 0) {
+        await db.createCollection(INVALIDATION_COLLECTION, {
+          capped: true,
+          size: INVALIDATION_CAP_BYTES,
+          max: INVALIDATION_CAP_DOCS
+        })
+        // A tailable cursor on an empty capped collection closes immediately
+        await db.collection(INVALIDATION_COLLECTION).insertOne({ names: [], origin: instanceId, createdAt: new Date() })
+      }
+    })().catch((error) => {
+      setupReady = null
+      throw error
+    })
+  }
+
+  return setupReady
+}
+
+async function getReadyDb() {
+  const db = await getNamesDb()
+  await ensureSetup(db)
+  startInvalidationListener()
+  return db
+}
+
+function applyLocally(record) {
+  cache.set(record.userId, record)
+  indexName(record.userId, record.customName, record.updatedAt)
+}
+
+// Re-indexes names written after `since` for search. Used when the tail is
+// re-established, since their invalidation messages may have been missed.
+async function reindexNamesSince(db, since) {
+  const cursor = db.collection(NAMES_COLLECTION).find(
+    { updatedAt: { $gt: since } },
+    { projection: { _id: 0, userId: 1, customName: 1, updatedAt: 1 } }
+  )
+
+  let reindexed = 0
+  for await (const doc of cursor) {
+    if (doc.customName) {
+      indexName(doc.userId, doc.customName, toIsoString(doc.updatedAt))
+      reindexed++
+    }
+  }
+  console.log(`🔤 Re-indexed ${reindexed} names changed while the invalidation tail was down`)
+}
+
+function startInvalidationListener() {
+  if (listening) {
+    return
+  }
+  listening = true
+
+  ;(async () => {
+    let established = false
+    // createdAt of the newest message this tail has seen
+    let lastAppliedAt = null
+
+    while (true) {
+      try {
+        const db = await getNamesDb()
+        const invalidations = db.collection(INVALIDATION_COLLECTION)
+
+        // ObjectIds from different instances are not ordered by insertion, so
+        // the tail reads the capped collection in natural order and skips up
+        // to the newest message present when it starts. Messages published
+        // while the tail was down are lost, so the cache is dropped and names
+        // changed since the last message seen are re-indexed instead.
+        const latest = await invalidations.find({}).sort({ $natural: -1 }).limit(1).next()
+        let resumeAfter = latest?._id || null
+        if (established) {
+          cache.clear()
+          const since = lastAppliedAt ? lastAppliedAt.getTime() - CLOCK_SKEW_MARGIN_MS : 0
+          await reindexNamesSince(db, new Date(since))
+        }
+        established = true
+        lastAppliedAt = latest?.createdAt || new Date()
+
+        const cursor = invalidations.find({}, { tailable: true, awaitData: true })
+
+        for await (const message of cursor) {
+          if (resumeAfter) {
+            if (message._id.equals(resumeAfter)) {
+              resumeAfter = null
+            }
+            continue
+          }
+          if (message.createdAt > lastAppliedAt) {
+            lastAppliedAt = message.createdAt
+          }
+          if (message.origin === instanceId) {
+            continue
+          }
+
+          for (const { userId, customName, updatedAt } of message.names || []) {
+            cache.delete(userId)
+            if (customName) {
+              indexName(userId, customName, toIsoString(updatedAt))
+            }
+          }
+        }
+      } catch (error) {
+        console.warn('⚠️ Name invalidation listener error:', error.message)
+      }
+
+      await new Promise((resolve) => setTimeout(resolve, INVALIDATION_RETRY_MS))
+    }
+  })()
+}
+
+async function publishInvalidation(db, records) {
+  try {
+    await db.collection(INVALIDATION_COLLECTION).insertOne({
+      names: records.map(({ userId, customName, updatedAt }) => ({ userId, customName, updatedAt })),
+      origin: instanceId,
+      createdAt: new Date()
+    })
+  } catch (error) {
+    // Other instances fall back to their cache TTL
+    console.warn('⚠️ Failed to publish name invalidation:', error.message)
+  }
+}
+
+function buildUpsert({ userId, customName, privyId, email, source }, now) {
+  return {
+    updateOne: {
+      filter: { userId },
+      update: {
+        $set: {
+          customName,
+          privyId: privyId || userId,
+          email: email || null,
+          source,
+          updatedAt: now
+        },
+        $setOnInsert: { createdAt: now },
+        $push: { history: { $each: [{ name: customName, timestamp: now }], $slice: -HISTORY_LIMIT } }
+      },
+      upsert: true
+    }
+  }
+}
+
+export async function getName(userId) {
+  const cached = cache.get(userId)
+  if (cached !== undefined) {
+    return cached
+  }
+
+  const db = await getReadyDb()
+  const doc = await db.collection(NAMES_COLLECTION).findOne({ userId }, { projection: RECORD_PROJECTION })
+  const record = doc?.customName ? toRecord(doc) : null
+  cache.set(userId, record)
+  return record
+}
+
+// Resolves many ids with at most one Mongo query. Returns userId -> record|null.
+export async function getNames(userIds) {
+  const ids = [...new Set(userIds.filter(Boolean))].slice(0, MAX_BATCH_IDS)
+  const result = new Map()
+  const missing = []
+
+  for (const id of ids) {
+    const cached = cache.get(id)
+    if (cached === undefined) {
+      missing.push(id)
+    } else {
+      result.set(id, cached)
+    }
+  }
+
+  if (missing.length > 0) {
+    const db = await getReadyDb()
+    const docs = await db.collection(NAMES_COLLECTION)
+      .find({ userId: { $in: missing } }, { projection: RECORD_PROJECTION })
+      .toArray()
+    const found = new Map(docs.filter((doc) => doc.customName).map((doc) => [doc.userId, toRecord(doc)]))
+
+    for (const id of missing) {
+      const record = found.get(id) || null
+      cache.set(id, record)
+      result.set(id, record)
+    }
+  }
+
+  return result
+}
+
+export async function setName({ userId, customName, privyId, email, source = 'names_api' }) {
+  const records = await setNames([{ userId, customName, privyId, email }], source)
+  return records[0]
+}
+
+export async function setNames(entries, source = 'batch_sync') {
+  if (entries.length === 0) {
+    return []
+  }
+
+  const db = await getReadyDb()
+  const now = new Date()
+  const records = entries.map((entry) => ({ ...entry, source }))
+
+  await db.collection(NAMES_COLLECTION).bulkWrite(
+    records.map((record) => buildUpsert(record, now)),
+    { ordered: false }
+  )
+
+  const saved = records.map((record) => toRecord({ ...record, updatedAt: now }))
+  saved.forEach(applyLocally)
+  await publishInvalidation(db, saved)
+  return saved
+}
+
+export async function getNameHistory(userId) {
+  const db = await getReadyDb()
+  const doc = await db.collection(NAMES_COLLECTION).findOne({ userId }, { projection: { _id: 0, history: 1 } })
+
+  return (doc?.history || []).map((entry) => ({
+    name: entry.name,
+    timestamp: toIsoString(entry.timestamp)
+  }))
+}
+
+export async function listRecentNames(limit = 100) {
+  const db = await getReadyDb()
+  const collection = db.collection(NAMES_COLLECTION)
+  const [total, docs] = await Promise.all([
+    collection.estimatedDocumentCount(),
+    collection.find({}, { projection: RECORD_PROJECTION }).sort({ updatedAt: -1 }).limit(limit).toArray()
+  ])
+
+  return { total, names: docs.map(toRecord) }
+}
@@ -0,0 +1,193 @@
+// Substring search over custom display names.
+// Every name is broken into lowercase bigrams and trigrams; each gram maps to
+// the set of user ids whose name contains it. A query only walks the smallest
+// posting list among its grams, confirms candidates against the others and
+// stops as soon as it has enough results, so search cost tracks how selective
+// the query is rather than how many names exist.
+// The index is kept in sync by the name registry on every local or remote
+// write and is warmed from the Mongo `names` collection the first time a
+// process searches.
+import { getDb } from './mongodb.js'
+
+export const DEFAULT_SEARCH_LIMIT = 10
+const MIN_GRAM = 2
+const MAX_GRAM = 3
+const LOAD_BATCH_SIZE = 1000
+const WARM_RETRY_MS = 30_000
+
+function gramsOf(text, size) {
+  const grams = new Set()
+  for (let i = 0; i + size <= text.length; i++) {
+    grams.add(text.slice(i, i + size))
+  }
+  return grams
+}
+
+function allGramsOf(text) {
+  const grams = new Set()
+  for (let size = MIN_GRAM; size <= MAX_GRAM; size++) {
+    for (const gram of gramsOf(text, size)) {
+      grams.add(gram)
+    }
+  }
+  return grams
+}
+
+export class NameSearchIndex {
+  constructor() {
+    // userId -> { userId, name, lower, updatedAt }
+    this.entries = new Map()
+    // gram -> Set<userId>
+    this.postings = new Map()
+  }
+
+  get size() {
+    return this.entries.size
+  }
+
+  has(userId) {
+    return this.entries.has(userId)
+  }
+
+  set(userId, name, updatedAt = null) {
+    if (!userId || typeof name !== 'string') {
+      return
+    }
+
+    const lower = name.toLowerCase()
+    const existing = this.entries.get(userId)
+
+    if (existing && existing.lower === lower) {
+      existing.name = name
+      existing.updatedAt = updatedAt
+      return
+    }
+
+    if (existing) {
+      this.unindex(userId, existing.lower)
+    }
+
+    this.entries.set(userId, { userId, name, lower, updatedAt })
+    for (const gram of allGramsOf(lower)) {
+      let ids = this.postings.get(gram)
+      if (!ids) {
+        ids = new Set()
+        this.postings.set(gram, ids)
+      }
+      ids.add(userId)
+    }
+  }
+
+  delete(userId) {
+    const existing = this.entries.get(userId)
+    if (!existing) {
+      return false
+    }
+
+    this.unindex(userId, existing.lower)
+    this.entries.delete(userId)
+    return true
+  }
+
+  unindex(userId, lower) {
+    for (const gram of allGramsOf(lower)) {
+      const ids = this.postings.get(gram)
+      if (!ids) {
+        continue
+      }
+      ids.delete(userId)
+      if (ids.size === 0) {
+        this.postings.delete(gram)
+      }
+    }
+  }
+
+  // Returns up to `limit` entries whose name contains `query`, plus whether
+  // more matches exist. Queries shorter than MIN_GRAM return nothing.
+  search(query, { limit = DEFAULT_SEARCH_LIMIT, excludeUserId = null } = {}) {
+    const needle = (query || '').toLowerCase()
+    if (needle.length < MIN_GRAM) {
+      return { results: [], hasMore: false }
+    }
+
+    const gramSize = Math.min(needle.length, MAX_GRAM)
+    const lists = []
+    for (const gram of gramsOf(needle, gramSize)) {
+      const ids = this.postings.get(gram)
+      if (!ids) {
+        return { results: [], hasMore: false }
+      }
+      lists.push(ids)
+    }
+    lists.sort((a, b) => a.size - b.size)
+
+    const [smallest, ...rest] = lists
+    const results = []
+
+    for (const userId of smallest) {
+      if (userId === excludeUserId || !rest.every((ids) => ids.has(userId))) {
+        continue
+      }
+
+      // Gram overlap is necessary but not sufficient for a substring match
+      const entry = this.entries.get(userId)
+      if (!entry.lower.includes(needle)) {
+        continue
+      }
+
+      if (results.length === limit) {
+        return { results, hasMore: true }
+      }
+      results.push(entry)
+    }
+
+    return { results, hasMore: false }
+  }
+}
+
+const nameIndex = new NameSearchIndex()
+let warmPromise = null
+let warmRetryAt = 0
+
+// Loads persisted names once per process. Names written locally while the
+// load is in flight are newer than what Mongo returned and are kept.
+export function warmNameIndex() {
+  if (!warmPromise && Date.now() >= warmRetryAt) {
+    warmPromise = (async () => {
+      const db = await getDb(process.env.DB_NAME || 'turfloot_db')
+      const cursor = db.collection('names')
+        .find({}, { projection: { _id: 0, userId: 1, customName: 1, updatedAt: 1 } })
+        .batchSize(LOAD_BATCH_SIZE)
+
+      let loaded = 0
+      for await (const doc of cursor) {
+        if (doc.userId && doc.customName && !nameIndex.has(doc.userId)) {
+          nameIndex.set(doc.userId, doc.customName, doc.updatedAt || null)
+          loaded++
+        }
+      }
+
+      console.log(`🔤 Name search index warmed with ${loaded} names`)
+    })().catch((error) => {
+      // Serve from whatever is indexed locally and retry after a back-off
+      warmPromise = null
+      warmRetryAt = Date.now() + WARM_RETRY_MS
+      console.warn('⚠️ Failed to warm name search index:', error.message)
+    })
+  }
+
+  return warmPromise
+}
+
+export function indexName(userId, customName, updatedAt = null) {
+  nameIndex.set(userId, customName, updatedAt)
+}
+
+export function removeIndexedName(userId) {
+  return nameIndex.delete(userId)
+}
+
+export async function searchNames(query, options) {
+  await warmNameIndex()
+  return nameIndex.search(query, options)
+}
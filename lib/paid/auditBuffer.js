@@ -0,0 +1,111 @@
+// Write-behind buffer for paid room transaction audits.
+// Confirming an intent only appends its audit record here; records are
+// flushed in one bulkWrite every PAID_ROOMS_AUDIT_FLUSH_MS, when the buffer
+// fills, and on shutdown. The raw transaction is serialized and gzipped at
+// flush time, off the join path. Records are upserted by signature and carry
+// the intent's ids, so a confirmed intent without an audit record can be
+// found and re-audited.
+import { promisify } from 'util';
+import { gzip } from 'zlib';
+
+const gzipAsync = promisify(gzip);
+
+const FLUSH_INTERVAL_MS = Number(process.env.PAID_ROOMS_AUDIT_FLUSH_MS || 2_000);
+const MAX_BUFFERED = Number(process.env.PAID_ROOMS_AUDIT_BATCH_SIZE || 100);
+// Records kept for retry while the database is unavailable
+const MAX_RETAINED = 10_000;
+
+async function compressRecord({ rawTransaction, ...record }) {
+  let raw = null;
+  try {
+    raw = typeof rawTransaction === 'function' ? rawTransaction() : rawTransaction;
+  } catch (error) {
+    console.warn(`⚠️ Unable to serialize audited transaction ${record.signature}:`, error.message);
+  }
+  if (!raw) {
+    return record;
+  }
+  return {
+    ...record,
+    rawTransactionGzip: await gzipAsync(Buffer.from(raw, 'base64')),
+    rawTransactionEncoding: 'gzip+wire'
+  };
+}
+
+// `getCollection` resolves to the audit collection. `rawTransaction` on a
+// record may be a base64 string or a function producing one.
+export function createAuditBuffer(getCollection) {
+  const state = { records: [], timer: null, flushing: null, hooked: false };
+
+  async function writeRecords(records) {
+    const audits = await getCollection();
+    const documents = await Promise.all(records.map(compressRecord));
+    await audits.bulkWrite(
+      documents.map((document) => ({
+        updateOne: {
+          filter: { signature: document.signature },
+          update: { $set: document },
+          upsert: true
+        }
+      })),
+      { ordered: false }
+    );
+  }
+
+  // Flushes everything buffered so far, after any flush already running
+  function flush() {
+    if (state.flushing) {
+      return state.flushing.then(() => flush());
+    }
+    if (state.records.length === 0) {
+      return Promise.resolve(0);
+    }
+
+    const records = state.records.splice(0, state.records.length);
+    state.flushing = writeRecords(records)
+      .then(() => records.length)
+      .catch((error) => {
+        console.error(`❌ Failed to flush ${records.length} transaction audits:`, error);
+        state.records.unshift(...records);
+        const dropped = state.records.length - MAX_RETAINED;
+        if (dropped > 0) {
+          state.records.splice(0, dropped);
+          console.error(`❌ Dropped ${dropped} transaction audits while the database is unavailable`);
+        }
+        return 0;
+      })
+      .finally(() => {
+        state.flushing = null;
+      });
+    return state.flushing;
+  }
+
+  function installShutdownFlush() {
+    if (state.hooked || typeof process?.once !== 'function') return;
+    state.hooked = true;
+    process.once('beforeExit', () => flush());
+    for (const signal of ['SIGTERM', 'SIGINT']) {
+      process.once(signal, async () => {
+        await flush();
+        // Without other listeners, restore the default exit on the signal
+        if (process.listenerCount(signal) === 0) {
+          process.kill(process.pid, signal);
+        }
+      });
+    }
+  }
+
+  function append(record) {
+    state.records.push({ ...record, bufferedAt: new Date() });
+    installShutdownFlush();
+    if (!state.timer) {
+      state.timer = setInterval(flush, FLUSH_INTERVAL_MS);
+      state.timer.unref?.();
+    }
+    if (state.records.length >= MAX_BUFFERED) {
+      flush();
+    }
+  }
+
+  return { append, flush, size: () => state.records.length };
+}
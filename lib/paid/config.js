@@ -1,3 +1,4 @@
+import { readFileSync, watchFile } from 'fs';
 import { LAMPORTS_PER_SOL, PublicKey } from '@solana/web3.js';
 import { DEFAULT_JOIN_TICKET_TTL_SECONDS, MIN_JOIN_TICKET_TTL_SECONDS, MAX_JOIN_TICKET_TTL_SECONDS } from './constants.js';
 
@@ -34,33 +35,52 @@ const FALLBACK_ROOMS = [
   }
 ];
 
-function parseRoomConfigFromEnv() {
-  const raw = process.env.PAID_ROOMS_CONFIG;
+// Throws when the configuration is not a JSON array of rooms
+function parseRoomList(raw) {
+  const parsed = JSON.parse(raw);
+  if (!Array.isArray(parsed)) {
+    throw new Error('PAID_ROOMS_CONFIG must be an array of room configs');
+  }
+
+  return parsed.map((room) => ({
+    ...room,
+    entryLamports: Number(room.entryLamports ?? 0),
+    feeBps: Number(room.feeBps ?? 0),
+    currencyDisplay: room.currencyDisplay || 'SOL',
+    priorityFeeMicroLamports: Number(room.priorityFeeMicroLamports || DEFAULT_PRIORITY_FEE_MICRO_LAMPORTS)
+  }));
+}
+
+function parseRoomConfig(raw) {
   if (!raw) {
     return FALLBACK_ROOMS;
   }
 
   try {
-    const parsed = JSON.parse(raw);
-    if (!Array.isArray(parsed)) {
-      console.warn('⚠️ PAID_ROOMS_CONFIG must be an array of room configs');
-      return FALLBACK_ROOMS;
-    }
-
-    return parsed.map((room) => ({
-      ...room,
-      entryLamports: Number(room.entryLamports ?? 0),
-      feeBps: Number(room.feeBps ?? 0),
-      currencyDisplay: room.currencyDisplay || 'SOL',
-      priorityFeeMicroLamports: Number(room.priorityFeeMicroLamports || DEFAULT_PRIORITY_FEE_MICRO_LAMPORTS)
-    }));
+    return parseRoomList(raw);
   } catch (error) {
     console.error('❌ Failed to parse PAID_ROOMS_CONFIG:', error);
     return FALLBACK_ROOMS;
   }
 }
 
-const ROOM_CONFIGS = parseRoomConfigFromEnv();
+// PAID_ROOMS_CONFIG_FILE takes precedence over PAID_ROOMS_CONFIG and is
+// watched for changes. With `strict`, an unreadable file throws instead of
+// falling back to the environment.
+function readRoomConfigSource({ strict = false } = {}) {
+  const file = process.env.PAID_ROOMS_CONFIG_FILE;
+  if (file) {
+    try {
+      return readFileSync(file, 'utf8');
+    } catch (error) {
+      if (strict) {
+        throw error;
+      }
+      console.error(`❌ Failed to read PAID_ROOMS_CONFIG_FILE ${file}:`, error);
+    }
+  }
+  return process.env.PAID_ROOMS_CONFIG;
+}
 
 const FEE_WALLET =
   process.env.PAID_ROOMS_FEE_WALLET ||
@@ -89,39 +109,97 @@ function normalizeRoomConfig(room) {
   };
 }
 
+// The quote for a room, or the error a quote request for it should raise.
+// Vault keys are decoded once here and reused for every intent.
+function compileQuote(config) {
+  if (!config.prizeVault || !config.feeVault) {
+    return { error: 'Paid room vault wallets not configured' };
+  }
+
+  try {
+    const prizeVaultKey = new PublicKey(config.prizeVault);
+    const feeVaultKey = new PublicKey(config.feeVault);
+    const feeLamports = Math.ceil((config.entryLamports * (config.feeBps || DEFAULT_FEE_BPS)) / 10_000);
+
+    return {
+      quote: Object.freeze({
+        roomId: config.id,
+        entryLamports: config.entryLamports,
+        feeLamports,
+        totalLamports: config.entryLamports + feeLamports,
+        feeBps: config.feeBps,
+        prizeVault: prizeVaultKey.toBase58(),
+        feeVault: feeVaultKey.toBase58(),
+        prizeVaultKey,
+        feeVaultKey,
+        currencyDisplay: config.currencyDisplay,
+        priorityFeeMicroLamports: config.priorityFeeMicroLamports
+      })
+    };
+  } catch (error) {
+    return { error: `Invalid vault wallet for room ${config.id}: ${error.message}` };
+  }
+}
+
+// Compiles the room configuration into an immutable snapshot: normalized
+// configs and quotes keyed by room id.
+export function compileRoomSnapshot(rooms) {
+  const configs = new Map();
+  const quotes = new Map();
+  for (const room of rooms) {
+    const config = Object.freeze(normalizeRoomConfig(room));
+    configs.set(config.id, config);
+    quotes.set(config.id, compileQuote(config));
+  }
+  return Object.freeze({ configs, quotes, loadedAt: new Date() });
+}
+
+// Kept on globalThis so a reload is seen by every route bundle
+const roomState = globalThis._turflootPaidRoomSnapshot || (globalThis._turflootPaidRoomSnapshot = {
+  snapshot: compileRoomSnapshot(parseRoomConfig(readRoomConfigSource())),
+  watching: false
+});
+
+// Recompiles the room configuration and swaps the snapshot in one step;
+// quotes already handed out keep the values they were issued with. A
+// configuration that cannot be read or parsed (e.g. a file caught mid-write)
+// leaves the current snapshot in place.
+export function reloadRoomConfig(raw) {
+  let rooms;
+  try {
+    rooms = parseRoomList(raw ?? readRoomConfigSource({ strict: true }));
+  } catch (error) {
+    console.error('❌ Failed to reload paid room config, keeping the current rooms:', error);
+    return roomState.snapshot;
+  }
+
+  roomState.snapshot = compileRoomSnapshot(rooms);
+  console.log(`🔄 Reloaded paid room config (${roomState.snapshot.configs.size} rooms)`);
+  return roomState.snapshot;
+}
+
+if (process.env.PAID_ROOMS_CONFIG_FILE && !roomState.watching) {
+  roomState.watching = true;
+  watchFile(process.env.PAID_ROOMS_CONFIG_FILE, { interval: 5_000, persistent: false }, () => reloadRoomConfig());
+}
+
 export function getRoomConfig(roomId) {
-  const room = ROOM_CONFIGS.find((cfg) => cfg.id === roomId);
-  return normalizeRoomConfig(room);
+  return roomState.snapshot.configs.get(roomId) || null;
 }
 
 export function getAllRoomConfigs() {
-  return ROOM_CONFIGS.map((cfg) => normalizeRoomConfig(cfg)).filter(Boolean);
+  return [...roomState.snapshot.configs.values()];
 }
 
 export function getRoomQuote(roomId) {
-  const config = getRoomConfig(roomId);
-  if (!config) {
+  const entry = roomState.snapshot.quotes.get(roomId);
+  if (!entry) {
     return null;
   }
-
-  if (!config.prizeVault || !config.feeVault) {
-    throw new Error('Paid room vault wallets not configured');
+  if (entry.error) {
+    throw new Error(entry.error);
   }
-
-  const feeLamports = Math.ceil((config.entryLamports * (config.feeBps || DEFAULT_FEE_BPS)) / 10_000);
-  const totalLamports = config.entryLamports + feeLamports;
-
-  return {
-    roomId: config.id,
-    entryLamports: config.entryLamports,
-    feeLamports,
-    totalLamports,
-    feeBps: config.feeBps,
-    prizeVault: new PublicKey(config.prizeVault).toBase58(),
-    feeVault: new PublicKey(config.feeVault).toBase58(),
-    currencyDisplay: config.currencyDisplay,
-    priorityFeeMicroLamports: config.priorityFeeMicroLamports
-  };
+  return entry.quote;
 }
 
 export function getSeatHoldMilliseconds() {
@@ -136,6 +214,12 @@ export function getJoinTicketTtlSeconds() {
   return Math.min(Math.max(configured, MIN_JOIN_TICKET_TTL_SECONDS), MAX_JOIN_TICKET_TTL_SECONDS);
 }
 
+// When a Helius webhook delivers transfers to the vaults, intents are
+// confirmed from the notification and polling only acts as a fallback.
+export function isWebhookConfirmationEnabled() {
+  return process.env.PAID_ROOMS_WEBHOOK_CONFIRMATION === 'true';
+}
+
 export function getPriorityFeeMicroLamports(roomId) {
   const config = getRoomConfig(roomId);
   return config?.priorityFeeMicroLamports ?? DEFAULT_PRIORITY_FEE_MICRO_LAMPORTS;
@@ -7,6 +7,16 @@ export const PaymentIntentStatus = Object.freeze({
   MISMATCH: 'MISMATCH'
 });
 
+// Intent state machine: target status -> statuses it may be entered from.
+// Status updates only match intents in one of the source statuses, so
+// concurrent writers cannot move an intent backwards or skip a state.
+export const PaymentIntentTransitions = Object.freeze({
+  [PaymentIntentStatus.SENT]: [PaymentIntentStatus.CREATED, PaymentIntentStatus.SENT, PaymentIntentStatus.MISMATCH],
+  [PaymentIntentStatus.CONFIRMED]: [PaymentIntentStatus.CREATED, PaymentIntentStatus.SENT, PaymentIntentStatus.MISMATCH],
+  [PaymentIntentStatus.CONSUMED]: [PaymentIntentStatus.CONFIRMED],
+  [PaymentIntentStatus.EXPIRED]: [PaymentIntentStatus.CREATED, PaymentIntentStatus.SENT, PaymentIntentStatus.MISMATCH]
+});
+
 export const DEFAULT_JOIN_TICKET_TTL_SECONDS = 90;
 export const MIN_JOIN_TICKET_TTL_SECONDS = 60;
 export const MAX_JOIN_TICKET_TTL_SECONDS = 120;
@@ -1,15 +1,17 @@
 import { randomUUID } from 'crypto';
 import jwt from 'jsonwebtoken';
 import { keccak256 } from 'js-sha3';
+import bs58 from 'bs58';
 import { TransactionInstruction, TransactionMessage } from '@solana/web3.js';
 import { connectToDatabase } from '../mongodb.js';
+import { ensureManifestIndexes } from '../indexManifest.js';
 import {
   getJoinTicketTtlSeconds,
   getRoomQuote,
   getSeatHoldMilliseconds,
   memoIssuer
 } from './config.js';
-import { PaymentIntentStatus } from './constants.js';
+import { MAX_JOIN_TICKET_TTL_SECONDS, PaymentIntentStatus, PaymentIntentTransitions } from './constants.js';
 import {
   PublicKey,
   SystemProgram,
@@ -17,14 +19,20 @@ import {
   buildPriorityFeeInstruction,
   clearBlockhashCache,
   getLatestBlockhashWithCache,
-  getParsedTransactionWithRetries,
-  getRawTransactionWithRetries
+  getSignatureStatusesBatched,
+  getTransactionsWithRetries,
+  serializeTransactionResponse
 } from '../solana.js';
+import { mapWithConcurrency, verifyIntentBatch } from './verificationPipeline.js';
+import { createAuditBuffer } from './auditBuffer.js';
 
 const COLLECTION_PAYMENT_INTENTS = 'paymentIntents';
 const COLLECTION_TX_AUDIT = 'paidRoomTxAudits';
 const JOIN_TICKET_SECRET = process.env.PAID_ROOMS_JWT_SECRET || process.env.JWT_SECRET;
 const JWT_ISSUER = memoIssuer;
+const VERIFY_BATCH_SIZE = Number(process.env.PAID_ROOMS_VERIFY_BATCH_SIZE || 50);
+const DEFAULT_WEBHOOK_CONCURRENCY = 8;
+const SYSTEM_TRANSFER_INSTRUCTION = 2;
 
 if (!JOIN_TICKET_SECRET) {
   console.warn('⚠️ Paid room JWT secret not configured - using development fallback. Set PAID_ROOMS_JWT_SECRET.');
@@ -40,20 +48,112 @@ async function getCollections() {
 
 let indexesEnsured = false;
 
+const PENDING_STATUSES = [PaymentIntentStatus.CREATED, PaymentIntentStatus.SENT, PaymentIntentStatus.MISMATCH];
+
+// Audit records are written behind the confirmation (see auditBuffer.js)
+const txAuditBuffer = globalThis._turflootTxAuditBuffer || (globalThis._turflootTxAuditBuffer = createAuditBuffer(
+  async () => (await getCollections()).audits
+));
+
+export function flushTxAudits() {
+  return txAuditBuffer.flush();
+}
+
+// Join tickets issued by this process (intentId -> { token, expiresAt }) and
+// intents whose ticket has been used (intentId -> { expiresAt, persisted }),
+// so ticket polls and joins are served without Mongo. Entries are dropped
+// once they expire, except consumed intents not yet marked CONSUMED in Mongo;
+// both maps are kept in roughly expiry order.
+const joinTickets = globalThis._turflootJoinTickets || (globalThis._turflootJoinTickets = {
+  issued: new Map(),
+  consumed: new Map()
+});
+
+const CONSUME_RETRY_BASE_MS = 1_000;
+const CONSUME_RETRY_MAX_MS = 30_000;
+
+function pruneExpired(entries, now = Date.now()) {
+  for (const [key, entry] of entries) {
+    if (entry.expiresAt.getTime() > now) break;
+    if (entry.persisted === false) continue;
+    entries.delete(key);
+  }
+}
+
+// Applies a state machine transition to the intent matching `filter`.
+// Returns the updated intent, or null when no intent in an allowed source
+// status matched.
+async function transitionIntent(filter, to, fields = {}) {
+  const { intents } = await getCollections();
+  return intents.findOneAndUpdate(
+    { ...filter, status: { $in: PaymentIntentTransitions[to] } },
+    { $set: { ...fields, status: to, updatedAt: new Date() } },
+    { returnDocument: 'after', includeResultMetadata: false }
+  );
+}
+
+// Pending intents keyed by memo referenceId and by signature, so webhook
+// notifications are matched without a query. Kept on globalThis because
+// Next.js bundles each route separately; misses (e.g. intents created by
+// another instance) fall back to Mongo.
+const pendingIndex = globalThis._turflootPendingIntents || (globalThis._turflootPendingIntents = {
+  byReference: new Map(),
+  bySignature: new Map(),
+  warmed: null
+});
+
+function indexPendingIntent(intent) {
+  const entry = { intentId: intent.intentId, expiresAt: new Date(intent.expiresAt).getTime() };
+  if (intent.referenceId) {
+    pendingIndex.byReference.set(intent.referenceId, entry);
+  }
+  if (intent.signature) {
+    pendingIndex.bySignature.set(intent.signature, entry);
+  }
+}
+
+function unindexIntent(intent) {
+  if (intent?.referenceId) {
+    pendingIndex.byReference.delete(intent.referenceId);
+  }
+  if (intent?.signature) {
+    pendingIndex.bySignature.delete(intent.signature);
+  }
+}
+
+function lookupPendingIntent(map, key, now = Date.now()) {
+  const entry = key ? map.get(key) : null;
+  if (!entry) return null;
+  if (entry.expiresAt <= now) {
+    map.delete(key);
+    return null;
+  }
+  return entry.intentId;
+}
+
+async function warmPendingIndex() {
+  if (!pendingIndex.warmed) {
+    pendingIndex.warmed = (async () => {
+      const { intents } = await getCollections();
+      const pending = await intents
+        .find(
+          { status: { $in: PENDING_STATUSES }, expiresAt: { $gt: new Date() } },
+          { projection: { _id: 0, intentId: 1, referenceId: 1, signature: 1, expiresAt: 1 } }
+        )
+        .toArray();
+      pending.forEach(indexPendingIntent);
+    })().catch((error) => {
+      pendingIndex.warmed = null;
+      throw error;
+    });
+  }
+  return pendingIndex.warmed;
+}
+
 async function ensureIndexes() {
   if (indexesEnsured) return;
-  const { intents, audits } = await getCollections();
-  await intents.createIndexes([
-    { key: { intentId: 1 }, unique: true },
-    { key: { status: 1, expiresAt: 1 } },
-    { key: { signature: 1 }, unique: true, sparse: true },
-    { key: { referenceId: 1 }, unique: true, sparse: true }
-  ]);
-  await audits.createIndexes([
-    { key: { signature: 1 }, unique: true },
-    { key: { intentId: 1 } },
-    { key: { timestamp: -1 } }
-  ]);
+  const { db } = await connectToDatabase();
+  await ensureManifestIndexes(db, 'game', [COLLECTION_PAYMENT_INTENTS, COLLECTION_TX_AUDIT]);
   indexesEnsured = true;
 }
 
@@ -131,14 +231,14 @@ async function buildServerMessage({
   playerPubkey,
   prizeVault,
   feeVault,
+  prizeVaultKey = new PublicKey(prizeVault),
+  feeVaultKey = new PublicKey(feeVault),
   entryLamports,
   feeLamports,
   memoJson,
   priorityFeeMicroLamports
 }) {
   const payer = new PublicKey(playerPubkey);
-  const prizeVaultPubkey = new PublicKey(prizeVault);
-  const feeVaultPubkey = new PublicKey(feeVault);
   const { blockhash, lastValidBlockHeight } = await getLatestBlockhashWithCache();
 
   const instructions = [buildPriorityFeeInstruction(priorityFeeMicroLamports)];
@@ -147,7 +247,7 @@ async function buildServerMessage({
     instructions.push(
       SystemProgram.transfer({
         fromPubkey: payer,
-        toPubkey: prizeVaultPubkey,
+        toPubkey: prizeVaultKey,
         lamports: entryLamports
       })
     );
@@ -157,7 +257,7 @@ async function buildServerMessage({
     instructions.push(
       SystemProgram.transfer({
         fromPubkey: payer,
-        toPubkey: feeVaultPubkey,
+        toPubkey: feeVaultKey,
         lamports: feeLamports
       })
     );
@@ -240,6 +340,8 @@ export async function createPaymentIntent(payload) {
     playerPubkey,
     prizeVault: quote.prizeVault,
     feeVault: quote.feeVault,
+    prizeVaultKey: quote.prizeVaultKey,
+    feeVaultKey: quote.feeVaultKey,
     entryLamports,
     feeLamports,
     memoJson,
@@ -286,6 +388,7 @@ export async function createPaymentIntent(payload) {
       createdAt: now
     });
   }
+  indexPendingIntent(baseDoc);
 
   return {
     intentId,
@@ -317,29 +420,24 @@ export async function submitIntentSignature(intentId, signature) {
     throw new Error('Signature is required');
   }
 
-  const { intents } = await getCollections();
-
-  const update = await intents.findOneAndUpdate(
-    {
-      intentId,
-      status: { $in: [PaymentIntentStatus.CREATED, PaymentIntentStatus.SENT, PaymentIntentStatus.MISMATCH] },
-      $or: [{ signature: { $exists: false } }, { signature: null }]
-    },
-    {
-      $set: {
-        signature,
-        status: PaymentIntentStatus.SENT,
-        updatedAt: new Date()
-      }
-    },
-    { returnDocument: 'after' }
+  const updated = await transitionIntent(
+    { intentId, $or: [{ signature: { $exists: false } }, { signature: null }] },
+    PaymentIntentStatus.SENT,
+    { signature }
   );
 
-  if (!update.value) {
+  if (!updated) {
+    // The webhook may already have attached this signature
+    const { intents } = await getCollections();
+    const existing = await intents.findOne({ intentId, signature });
+    if (existing) {
+      return existing;
+    }
     throw new Error('Intent not found or already has a signature');
   }
 
-  return update.value;
+  indexPendingIntent(updated);
+  return updated;
 }
 
 function validateMemoAgainstIntent(intent, memoJson) {
@@ -372,8 +470,7 @@ function validateMemoAgainstIntent(intent, memoJson) {
   );
 }
 
-async function recordTxAudit({ intent, signature, parsedTx, rawTxBase64, entryTransfer, feeTransfer }) {
-  const { audits } = await getCollections();
+function buildTxAuditRecord({ intent, signature, parsedTx, rawTransaction, entryTransfer, feeTransfer }) {
   const transfers = [];
 
   const normaliseTransfer = (ix, kind) => {
@@ -392,27 +489,23 @@ async function recordTxAudit({ intent, signature, parsedTx, rawTxBase64, entryTr
   if (entryInfo) transfers.push(entryInfo);
   if (feeInfo) transfers.push(feeInfo);
 
-  if (transfers.length === 0) return;
+  if (transfers.length === 0) return null;
 
   const timestamp = parsedTx.blockTime ? new Date(parsedTx.blockTime * 1000) : new Date();
 
-  await audits.updateOne(
-    { signature },
-    {
-      $set: {
-        signature,
-        intentId: intent.intentId,
-        referenceId: intent.referenceId,
-        transfers,
-        lamports: transfers.reduce((sum, transfer) => sum + Number(transfer.lamports || 0), 0),
-        slot: parsedTx.slot,
-        timestamp,
-        memoJson: intent.memoJson,
-        rawTransaction: rawTxBase64
-      }
-    },
-    { upsert: true }
-  );
+  return {
+    signature,
+    intentId: intent.intentId,
+    referenceId: intent.referenceId,
+    userId: intent.userId,
+    roomId: intent.roomId,
+    transfers,
+    lamports: transfers.reduce((sum, transfer) => sum + Number(transfer.lamports || 0), 0),
+    slot: parsedTx.slot,
+    timestamp,
+    memoJson: intent.memoJson,
+    rawTransaction
+  };
 }
 
 function buildJoinTicketPayload(intent) {
@@ -422,6 +515,7 @@ function buildJoinTicketPayload(intent) {
     gameId: intent.gameId,
     roomId: intent.roomId,
     intentId: intent.intentId,
+    player: intent.playerPubkey,
     type: 'join-ticket',
     iat: Math.floor(Date.now() / 1000)
   };
@@ -439,23 +533,17 @@ function signJoinTicket(payload, ttlSeconds) {
   });
 }
 
-async function generateJoinTicket(intent) {
+// Tickets are self-contained signed tokens, so they are not stored with the
+// intent; a confirmed intent can always be issued a fresh one.
+function generateJoinTicket(intent) {
   const ttlSeconds = getJoinTicketTtlSeconds();
   const payload = buildJoinTicketPayload(intent);
   const token = signJoinTicket(payload, ttlSeconds);
   const expiresAt = new Date(Date.now() + ttlSeconds * 1000);
 
-  const { intents } = await getCollections();
-  await intents.updateOne(
-    { intentId: intent.intentId },
-    {
-      $set: {
-        joinTicket: token,
-        joinTicketExpiresAt: expiresAt,
-        updatedAt: new Date()
-      }
-    }
-  );
+  pruneExpired(joinTickets.issued);
+  joinTickets.issued.delete(intent.intentId);
+  joinTickets.issued.set(intent.intentId, { token, expiresAt });
 
   return { token, expiresAt };
 }
@@ -469,6 +557,43 @@ function parseMemoFromInstruction(instructions) {
   return memoText ? safeJsonParse(memoText) : null;
 }
 
+// Decodes the system transfers and memo of a getTransaction response into
+// the jsonParsed instruction shape, so one raw fetch serves both the checks
+// below and the audit record.
+function decodeInstructions(txResponse) {
+  const { message } = txResponse.transaction;
+  const accountKeys = message.getAccountKeys({
+    accountKeysFromLookups: txResponse.meta?.loadedAddresses
+  });
+  const systemProgramId = SystemProgram.programId.toBase58();
+
+  return message.compiledInstructions.map((ix) => {
+    const programId = accountKeys.get(ix.programIdIndex)?.toBase58();
+    const data = Buffer.from(ix.data);
+
+    if (programId === systemProgramId && data.length >= 12 && data.readUInt32LE(0) === SYSTEM_TRANSFER_INSTRUCTION) {
+      return {
+        program: 'system',
+        programId: accountKeys.get(ix.programIdIndex),
+        parsed: {
+          type: 'transfer',
+          info: {
+            source: accountKeys.get(ix.accountKeyIndexes[0])?.toBase58(),
+            destination: accountKeys.get(ix.accountKeyIndexes[1])?.toBase58(),
+            lamports: Number(data.readBigUInt64LE(4))
+          }
+        }
+      };
+    }
+
+    if (programId === MEMO_PROGRAM_ID) {
+      return { program: 'spl-memo', programId: accountKeys.get(ix.programIdIndex), parsed: data.toString('utf8') };
+    }
+
+    return { programId: accountKeys.get(ix.programIdIndex) };
+  });
+}
+
 function instructionsContainTransfer(instructions, intent) {
   const transfers = instructions.filter((ix) => ix.program === 'system' && ix.parsed?.type === 'transfer');
   if (!transfers.length) {
@@ -534,13 +659,62 @@ function instructionsContainTransfer(instructions, intent) {
   return { ok: true, entryTransfer, feeTransfer };
 }
 
-export async function verifyIntent(intent) {
+// Checks a landed transaction's memo and transfers against the intent and,
+// if they match, confirms the intent and issues its join ticket. Shared by
+// RPC verification and webhook notifications.
+async function confirmIntentTransaction(intent, { instructions, parsedTx, rawTransaction = null }) {
+  const memoJson = parseMemoFromInstruction(instructions);
+  if (!validateMemoAgainstIntent(intent, memoJson)) {
+    return { status: PaymentIntentStatus.MISMATCH, reason: 'MEMO_MISMATCH' };
+  }
+
+  const transferCheck = instructionsContainTransfer(instructions, intent);
+  if (!transferCheck.ok) {
+    return { status: PaymentIntentStatus.MISMATCH, reason: transferCheck.reason };
+  }
+
+  // Only pending intents transition, so a concurrent verification of the
+  // same intent does not issue a second ticket
+  const confirmedAt = new Date();
+  const confirmedIntent = await transitionIntent(
+    { intentId: intent.intentId, signature: intent.signature },
+    PaymentIntentStatus.CONFIRMED,
+    { confirmedAt, memoJson }
+  );
+
+  unindexIntent(intent);
+  if (!confirmedIntent) {
+    return getJoinTicketForIntent(intent.intentId);
+  }
+
+  const auditRecord = buildTxAuditRecord({
+    intent: confirmedIntent,
+    signature: intent.signature,
+    parsedTx,
+    rawTransaction,
+    entryTransfer: transferCheck.entryTransfer,
+    feeTransfer: transferCheck.feeTransfer
+  });
+  if (auditRecord) {
+    txAuditBuffer.append(auditRecord);
+  }
+
+  const joinTicket = generateJoinTicket(confirmedIntent);
+
+  return { status: PaymentIntentStatus.CONFIRMED, joinTicket };
+}
+
+// `transaction` is the getTransaction response when the caller already
+// fetched it (batched sweeps); otherwise it is fetched here.
+export async function verifyIntent(intent, { transaction } = {}) {
   if (!intent.signature) {
     return { status: intent.status, reason: 'NO_SIGNATURE' };
   }
 
   try {
-    const parsedTx = await getParsedTransactionWithRetries(intent.signature, { retries: 3 });
+    const parsedTx = transaction !== undefined
+      ? transaction
+      : (await getTransactionsWithRetries([intent.signature], { retries: 3 })).get(intent.signature);
     if (!parsedTx) {
       return { status: intent.status, reason: 'PENDING' };
     }
@@ -549,55 +723,138 @@ export async function verifyIntent(intent) {
       return { status: PaymentIntentStatus.MISMATCH, reason: 'TRANSACTION_ERROR', details: parsedTx.meta.err };
     }
 
-    const memoJson = parseMemoFromInstruction(parsedTx.transaction.message.instructions);
-    if (!validateMemoAgainstIntent(intent, memoJson)) {
-      return { status: PaymentIntentStatus.MISMATCH, reason: 'MEMO_MISMATCH' };
+    return await confirmIntentTransaction(intent, {
+      instructions: decodeInstructions(parsedTx),
+      parsedTx,
+      // Serialized when the audit buffer flushes
+      rawTransaction: () => serializeTransactionResponse(parsedTx)
+    });
+  } catch (error) {
+    if (error?.message?.includes('BlockhashNotFound')) {
+      clearBlockhashCache();
     }
+    console.error(`❌ Failed to verify intent ${intent.intentId}:`, error);
+    return { status: PaymentIntentStatus.MISMATCH, reason: error.message };
+  }
+}
 
-    const transferCheck = instructionsContainTransfer(parsedTx.transaction.message.instructions, intent);
-    if (!transferCheck.ok) {
-      return { status: PaymentIntentStatus.MISMATCH, reason: transferCheck.reason };
+// Builds jsonParsed-style instructions from a Helius enhanced transaction:
+// its native transfers plus the memo of any memo-program instruction.
+function webhookInstructions(tx) {
+  const instructions = (tx.nativeTransfers || []).map((transfer) => ({
+    program: 'system',
+    parsed: {
+      type: 'transfer',
+      info: {
+        source: transfer.fromUserAccount,
+        destination: transfer.toUserAccount,
+        lamports: Number(transfer.amount)
+      }
+    }
+  }));
+
+  for (const ix of tx.instructions || []) {
+    if (ix.programId === MEMO_PROGRAM_ID && ix.data) {
+      try {
+        instructions.push({ program: 'spl-memo', parsed: Buffer.from(bs58.decode(ix.data)).toString('utf8') });
+      } catch (error) {
+        console.warn('⚠️ Unable to decode webhook memo data:', error.message);
+      }
     }
+  }
 
-    const rawTx = await getRawTransactionWithRetries(intent.signature, { retries: 3 });
-    const rawTxBase64 = rawTx ? Buffer.from(rawTx.transaction.serialize()).toString('base64') : null;
+  return instructions;
+}
 
-    await recordTxAudit({
-      intent,
-      signature: intent.signature,
-      parsedTx,
-      rawTxBase64,
-      entryTransfer: transferCheck.entryTransfer,
-      feeTransfer: transferCheck.feeTransfer
+// Confirms pending intents straight from Helius webhook notifications.
+// Transactions are matched to intents by signature or by the memo's
+// referenceId (the webhook can arrive before the client submits its
+// signature). Returns one result per matched transaction; unmatched
+// transactions are left to the deposit handling.
+export async function confirmIntentsFromWebhook(transactions) {
+  await ensureIndexes();
+  await warmPendingIndex();
+
+  const candidates = [];
+  for (const tx of transactions) {
+    if (!tx?.signature) continue;
+    const instructions = webhookInstructions(tx);
+    const referenceId = parseMemoFromInstruction(instructions)?.referenceId || null;
+    if (!referenceId && !pendingIndex.bySignature.has(tx.signature)) continue;
+    candidates.push({
+      tx,
+      instructions,
+      referenceId,
+      intentId:
+        lookupPendingIntent(pendingIndex.bySignature, tx.signature) ||
+        lookupPendingIntent(pendingIndex.byReference, referenceId)
     });
+  }
 
-    const { intents } = await getCollections();
-    const confirmedAt = new Date();
+  if (candidates.length === 0) {
+    return [];
+  }
 
-    const updateResult = await intents.findOneAndUpdate(
-      { intentId: intent.intentId },
-      {
-        $set: {
-          status: PaymentIntentStatus.CONFIRMED,
-          confirmedAt,
-          updatedAt: confirmedAt,
-          memoJson
-        }
-      },
-      { returnDocument: 'after' }
-    );
+  const { intents } = await getCollections();
+  const unresolved = candidates.filter((candidate) => !candidate.intentId);
+  const knownIds = candidates.filter((candidate) => candidate.intentId).map((candidate) => candidate.intentId);
+  const or = [];
+  if (knownIds.length) or.push({ intentId: { $in: knownIds } });
+  if (unresolved.length) {
+    or.push({ referenceId: { $in: unresolved.map((candidate) => candidate.referenceId).filter(Boolean) } });
+    or.push({ signature: { $in: unresolved.map((candidate) => candidate.tx.signature) } });
+  }
+
+  const found = await intents.find({ $or: or, status: { $in: PENDING_STATUSES } }).toArray();
+  const byId = new Map(found.map((intent) => [intent.intentId, intent]));
+  const byReference = new Map(found.map((intent) => [intent.referenceId, intent]));
+  const bySignature = new Map(found.filter((intent) => intent.signature).map((intent) => [intent.signature, intent]));
+
+  const matched = candidates
+    .map((candidate) => ({
+      ...candidate,
+      intent:
+        byId.get(candidate.intentId) ||
+        bySignature.get(candidate.tx.signature) ||
+        byReference.get(candidate.referenceId)
+    }))
+    .filter((candidate) => candidate.intent);
+
+  return mapWithConcurrency(matched, DEFAULT_WEBHOOK_CONCURRENCY, async ({ tx, instructions, intent }) => {
+    const signature = tx.signature;
+    try {
+      if (tx.transactionError) {
+        return { signature, intentId: intent.intentId, status: PaymentIntentStatus.MISMATCH, reason: 'TRANSACTION_ERROR' };
+      }
 
-    const confirmedIntent = updateResult.value;
-    const joinTicket = await generateJoinTicket(confirmedIntent);
+      if (intent.signature && intent.signature !== signature) {
+        return { signature, intentId: intent.intentId, status: intent.status, reason: 'SIGNATURE_MISMATCH' };
+      }
 
-    return { status: PaymentIntentStatus.CONFIRMED, joinTicket };
-  } catch (error) {
-    if (error?.message?.includes('BlockhashNotFound')) {
-      clearBlockhashCache();
+      if (!intent.signature) {
+        const attached = await transitionIntent(
+          { intentId: intent.intentId, $or: [{ signature: { $exists: false } }, { signature: null }] },
+          PaymentIntentStatus.SENT,
+          { signature }
+        );
+        if (!attached) {
+          return { signature, intentId: intent.intentId, status: intent.status, reason: 'SIGNATURE_MISMATCH' };
+        }
+      }
+
+      const result = await confirmIntentTransaction(
+        { ...intent, signature },
+        {
+          instructions,
+          parsedTx: { slot: tx.slot, blockTime: tx.timestamp }
+        }
+      );
+      return { signature, intentId: intent.intentId, ...result };
+    } catch (error) {
+      console.error(`❌ Failed to confirm intent ${intent.intentId} from webhook:`, error);
+      return { signature, intentId: intent.intentId, status: intent.status, reason: error.message };
     }
-    console.error(`❌ Failed to verify intent ${intent.intentId}:`, error);
-    return { status: PaymentIntentStatus.MISMATCH, reason: error.message };
-  }
+  });
 }
 
 export async function verifyIntentById(intentId) {
@@ -611,24 +868,25 @@ export async function verifyIntentById(intentId) {
   return verifyIntent(intent);
 }
 
-export async function verifyPendingIntents(limit = 10) {
+export async function verifyPendingIntents(limit = VERIFY_BATCH_SIZE) {
   await ensureIndexes();
   const { intents } = await getCollections();
   const now = new Date();
   const pending = await intents
     .find({
       status: { $in: [PaymentIntentStatus.SENT, PaymentIntentStatus.MISMATCH] },
-      expiresAt: { $gt: now }
+      expiresAt: { $gt: now },
+      signature: { $type: 'string' }
     })
+    .sort({ createdAt: 1 })
     .limit(limit)
     .toArray();
 
-  const results = [];
-  for (const intent of pending) {
-    // eslint-disable-next-line no-await-in-loop
-    results.push(await verifyIntent(intent));
-  }
-  return results;
+  return verifyIntentBatch(pending, {
+    fetchStatuses: (signatures) => getSignatureStatusesBatched(signatures, { retries: 3 }),
+    fetchTransactions: (signatures) => getTransactionsWithRetries(signatures, { retries: 3 }),
+    verifyFetched: (intent, transaction) => verifyIntent(intent, { transaction })
+  });
 }
 
 export async function expireStaleIntents() {
@@ -637,7 +895,7 @@ export async function expireStaleIntents() {
   const now = new Date();
   const result = await intents.updateMany(
     {
-      status: { $in: [PaymentIntentStatus.CREATED, PaymentIntentStatus.SENT, PaymentIntentStatus.MISMATCH] },
+      status: { $in: PaymentIntentTransitions[PaymentIntentStatus.EXPIRED] },
       expiresAt: { $lt: now }
     },
     {
@@ -652,59 +910,104 @@ export async function expireStaleIntents() {
 }
 
 export async function getJoinTicketForIntent(intentId) {
+  const issued = joinTickets.issued.get(intentId);
+  if (issued && issued.expiresAt > new Date()) {
+    return {
+      status: PaymentIntentStatus.CONFIRMED,
+      joinTicket: issued
+    };
+  }
+
   const intent = await getIntentById(intentId);
   if (!intent) {
     return null;
   }
 
-  if (intent.status !== PaymentIntentStatus.CONFIRMED) {
+  if (joinTickets.consumed.has(intentId)) {
     return {
-      status: intent.status,
+      status: PaymentIntentStatus.CONSUMED,
       intent
     };
   }
 
-  const now = new Date();
-  if (!intent.joinTicket || !intent.joinTicketExpiresAt || intent.joinTicketExpiresAt < now) {
-    const joinTicket = await generateJoinTicket(intent);
+  if (intent.status !== PaymentIntentStatus.CONFIRMED) {
     return {
-      status: PaymentIntentStatus.CONFIRMED,
-      joinTicket
+      status: intent.status,
+      intent
     };
   }
 
   return {
     status: PaymentIntentStatus.CONFIRMED,
-    joinTicket: {
-      token: intent.joinTicket,
-      expiresAt: intent.joinTicketExpiresAt
-    }
+    joinTicket: generateJoinTicket(intent)
   };
 }
 
 export async function markIntentConsumed(intentId) {
-  const { intents } = await getCollections();
-  const now = new Date();
-  const result = await intents.updateOne(
-    { intentId },
-    {
-      $set: {
-        status: PaymentIntentStatus.CONSUMED,
-        consumedAt: now,
-        updatedAt: now
-      }
-    }
-  );
-  return result.modifiedCount > 0;
+  const consumed = await transitionIntent({ intentId }, PaymentIntentStatus.CONSUMED, { consumedAt: new Date() });
+  return Boolean(consumed);
 }
 
-export async function verifyJoinTicket(token) {
+function decodeJoinTicket(token) {
   if (!JOIN_TICKET_SECRET) {
     throw new Error('Join ticket secret not configured');
   }
   const decoded = jwt.verify(token, JOIN_TICKET_SECRET, {
     issuer: JWT_ISSUER
   });
+  if (decoded.type !== 'join-ticket' || !decoded.intentId) {
+    throw new Error('Invalid join ticket');
+  }
+  if (joinTickets.consumed.has(decoded.intentId)) {
+    throw new Error('Join ticket already used');
+  }
+  return decoded;
+}
+
+// Checks a join ticket's signature and expiry without touching Mongo.
+export async function verifyJoinTicket(token) {
+  return decodeJoinTicket(token);
+}
+
+// Marks the intent consumed in Mongo, retrying with backoff until the write
+// is acknowledged. Until then the consumed entry is kept past its expiry so
+// this process cannot issue or accept a new ticket for the intent.
+function persistConsumed(intentId, attempt = 0) {
+  markIntentConsumed(intentId)
+    .then((consumed) => {
+      if (!consumed) {
+        console.warn(`⚠️ Intent ${intentId} was not CONFIRMED when its join ticket was used`);
+      }
+      const entry = joinTickets.consumed.get(intentId);
+      if (entry) {
+        entry.persisted = true;
+      }
+    })
+    .catch((error) => {
+      const delay = Math.min(CONSUME_RETRY_BASE_MS * 2 ** attempt, CONSUME_RETRY_MAX_MS);
+      console.error(`❌ Failed to mark intent ${intentId} consumed, retrying in ${delay}ms:`, error);
+      setTimeout(() => persistConsumed(intentId, attempt + 1), delay).unref?.();
+    });
+}
+
+// Verifies a join ticket and uses it up: later tickets for the same intent
+// are rejected by this process, and the intent is marked consumed in the
+// background. Other processes rely on the short ticket lifetime and on the
+// CONFIRMED -> CONSUMED transition, which only succeeds once.
+export async function consumeJoinTicket(token) {
+  const decoded = decodeJoinTicket(token);
+  const { intentId } = decoded;
+
+  // Any ticket issued for the intent so far expires within the maximum TTL
+  pruneExpired(joinTickets.consumed);
+  joinTickets.consumed.set(intentId, {
+    expiresAt: new Date(Date.now() + MAX_JOIN_TICKET_TTL_SECONDS * 1000),
+    persisted: false
+  });
+  joinTickets.issued.delete(intentId);
+
+  persistConsumed(intentId);
+
   return decoded;
 }
 
@@ -0,0 +1,82 @@
+// Batched payment-intent verification.
+// A sweep takes the oldest pending intents first, asks the cluster for all of
+// their signature statuses in one call, and only fetches the transactions
+// that have actually landed - one batched fetch, one transaction per
+// signature. Verification of the fetched transactions (memo/transfer checks
+// and the Mongo writes) then runs with bounded concurrency.
+//
+// The pipeline is storage- and RPC-agnostic: callers pass the fetchers and
+// the per-intent verifier, which keeps it benchmarkable against a local RPC
+// stand-in (scripts/bench-intent-verification.js).
+import { PaymentIntentStatus } from './constants.js';
+
+export const DEFAULT_VERIFY_CONCURRENCY = Number(process.env.PAID_ROOMS_VERIFY_CONCURRENCY || 8);
+
+const LANDED_COMMITMENTS = new Set(['confirmed', 'finalized']);
+
+export async function mapWithConcurrency(items, limit, fn) {
+  const results = new Array(items.length);
+  let next = 0;
+
+  const worker = async () => {
+    while (next < items.length) {
+      const index = next++;
+      // eslint-disable-next-line no-await-in-loop
+      results[index] = await fn(items[index], index);
+    }
+  };
+
+  await Promise.all(Array.from({ length: Math.min(Math.max(1, limit), items.length) }, worker));
+  return results;
+}
+
+function intentAge(intent) {
+  const submitted = intent.createdAt ? new Date(intent.createdAt).getTime() : Date.now();
+  return Number.isFinite(submitted) ? submitted : Date.now();
+}
+
+// Oldest first: players who have waited longest are verified first.
+export function prioritiseByAge(intents) {
+  return [...intents].sort((a, b) => intentAge(a) - intentAge(b));
+}
+
+export async function verifyIntentBatch(intents, {
+  fetchStatuses,
+  fetchTransactions,
+  verifyFetched,
+  concurrency = DEFAULT_VERIFY_CONCURRENCY
+}) {
+  const ordered = prioritiseByAge(intents.filter((intent) => intent.signature));
+  if (ordered.length === 0) {
+    return [];
+  }
+
+  const statuses = await fetchStatuses(ordered.map((intent) => intent.signature));
+
+  const results = new Map();
+  const landed = [];
+  for (const intent of ordered) {
+    const status = statuses.get(intent.signature);
+    if (status?.err) {
+      results.set(intent.intentId, {
+        status: PaymentIntentStatus.MISMATCH,
+        reason: 'TRANSACTION_ERROR',
+        details: status.err
+      });
+    } else if (status && LANDED_COMMITMENTS.has(status.confirmationStatus)) {
+      landed.push(intent);
+    } else {
+      results.set(intent.intentId, { status: intent.status, reason: 'PENDING' });
+    }
+  }
+
+  if (landed.length > 0) {
+    const transactions = await fetchTransactions(landed.map((intent) => intent.signature));
+    const verified = await mapWithConcurrency(landed, concurrency, (intent) =>
+      verifyFetched(intent, transactions.get(intent.signature) || null)
+    );
+    landed.forEach((intent, index) => results.set(intent.intentId, verified[index]));
+  }
+
+  return ordered.map((intent) => ({ intentId: intent.intentId, ...results.get(intent.intentId) }));
+}
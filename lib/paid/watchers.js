@@ -4,8 +4,15 @@ import {
   verifyPendingIntents
 } from './intentService.js';
 import { PaymentIntentStatus } from './constants.js';
+import { isWebhookConfirmationEnabled } from './config.js';
+
+// With webhook confirmation most intents are confirmed by the notification,
+// so polling backs off to a fallback for missed or delayed deliveries.
+const WEBHOOK_GRACE_MS = Number(process.env.PAID_ROOMS_WEBHOOK_GRACE_MS || 10_000);
+const FALLBACK_SWEEP_INTERVAL_MS = 15_000;
 
 let watchersStarted = false;
+let sweepInFlight = null;
 const activeVerifications = new Set();
 
 function schedule(fn, delay = 0) {
@@ -16,12 +23,18 @@ function schedule(fn, delay = 0) {
   return timer;
 }
 
-async function runPendingVerifications() {
-  try {
-    await verifyPendingIntents();
-  } catch (error) {
-    console.error('❌ Paid room verification sweep failed:', error);
+// A slow sweep is not overlapped by the next interval tick.
+function runPendingVerifications() {
+  if (!sweepInFlight) {
+    sweepInFlight = verifyPendingIntents()
+      .catch((error) => {
+        console.error('❌ Paid room verification sweep failed:', error);
+      })
+      .finally(() => {
+        sweepInFlight = null;
+      });
   }
+  return sweepInFlight;
 }
 
 async function runExpirySweep() {
@@ -38,8 +51,12 @@ async function runExpirySweep() {
 export function ensurePaidRoomWatchers() {
   if (watchersStarted) return;
   watchersStarted = true;
+  const webhookEnabled = isWebhookConfirmationEnabled();
   schedule(runPendingVerifications, 3_000);
-  const verificationInterval = setInterval(runPendingVerifications, 5_000);
+  const verificationInterval = setInterval(
+    runPendingVerifications,
+    webhookEnabled ? FALLBACK_SWEEP_INTERVAL_MS : 5_000
+  );
   verificationInterval.unref?.();
   const expiryInterval = setInterval(runExpirySweep, 10_000);
   expiryInterval.unref?.();
@@ -47,6 +64,10 @@ export function ensurePaidRoomWatchers() {
 
 export function scheduleIntentVerification(intentId, delay = 500) {
   ensurePaidRoomWatchers();
+  if (isWebhookConfirmationEnabled()) {
+    // Give the webhook a chance to confirm before polling the RPC
+    delay = Math.max(delay, WEBHOOK_GRACE_MS);
+  }
   if (activeVerifications.has(intentId)) {
     return;
   }
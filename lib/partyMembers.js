@@ -0,0 +1,77 @@
+// Party member hydration.
+// Party listings render a few profile fields for every member of every party.
+// Instead of one users query per party, all member identifiers in a listing
+// are collected and fetched with a single projected `$in` query. Results are
+// kept in a per-request cache so later lookups in the same request (e.g. the
+// current party plus a listing) don't hit Mongo again. Online status comes
+// from the presence service, not the user documents.
+import { isOnline } from './presence.js'
+
+export const PARTY_MEMBER_PROJECTION = {
+  _id: 0,
+  userIdentifier: 1,
+  username: 1,
+  displayName: 1,
+  equippedSkin: 1
+}
+
+const DEFAULT_SKIN = {
+  type: 'circle',
+  color: '#3b82f6',
+  pattern: 'solid'
+}
+
+// One cache per request; never share it across requests.
+export function createMemberCache() {
+  return new Map()
+}
+
+function toPartyMember(user, online) {
+  return {
+    userIdentifier: user.userIdentifier,
+    username: user.username || user.displayName || 'Unknown User',
+    isOnline: online,
+    equippedSkin: user.equippedSkin || { ...DEFAULT_SKIN }
+  }
+}
+
+// Fetches every identifier not already in the cache with one query.
+// Identifiers with no user document are cached as null so they are not
+// looked up again within the same request.
+export async function loadPartyMembers(db, identifiers, cache = createMemberCache()) {
+  const missing = [...new Set(identifiers)].filter((id) => id && !cache.has(id))
+
+  if (missing.length > 0) {
+    const users = await db.collection('users')
+      .find({ userIdentifier: { $in: missing } }, { projection: PARTY_MEMBER_PROJECTION })
+      .toArray()
+
+    for (const id of missing) {
+      cache.set(id, null)
+    }
+    for (const user of users) {
+      cache.set(user.userIdentifier, user)
+    }
+  }
+
+  return cache
+}
+
+// Returns one members array per party, in the same order as `parties`.
+export async function hydratePartyMembers(db, parties, { cache = createMemberCache(), assumeOnline = false } = {}) {
+  const identifiers = parties.flatMap((party) =>
+    Array.isArray(party.currentPlayers) ? party.currentPlayers : []
+  )
+
+  const [, online] = await Promise.all([
+    loadPartyMembers(db, identifiers, cache),
+    isOnline(identifiers)
+  ])
+
+  return parties.map((party) =>
+    (Array.isArray(party.currentPlayers) ? party.currentPlayers : [])
+      .map((id) => cache.get(id))
+      .filter(Boolean)
+      .map((user) => toPartyMember(user, assumeOnline || online.get(user.userIdentifier) || false))
+  )
+}
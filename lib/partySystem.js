@@ -1,36 +1,24 @@
 // Advanced Party/Lobby System with Real-time Notifications
-import { MongoClient } from 'mongodb'
-
-// MongoDB connection
-let client = null
-let db = null
-
-async function getDb() {
-  if (db) return db
-  
-  try {
-    if (!client) {
-      client = new MongoClient(process.env.MONGO_URL, {
-        serverSelectionTimeoutMS: 5000,
-        connectTimeoutMS: 10000,
-        maxPoolSize: 20
-      })
-      await client.connect()
-    }
-    
-    db = client.db(process.env.DB_NAME || 'turfloot_db')
-    return db
-  } catch (error) {
-    console.error('❌ Database connection error:', error)
-    throw error
-  }
+import { getDb as getSharedDb } from './mongodb.js'
+import { deliverToUser } from './socialEvents.js'
+import { ensureManifestIndexes } from './indexManifest.js'
+
+// MongoDB connection (shared pool)
+function getDb() {
+  return getSharedDb(process.env.DB_NAME || 'turfloot_db')
 }
 
 // Socket events manager for real-time party updates
 class PartySocketManager {
   static emit(userId, event, data) {
     console.log(`🎉 Party socket emit to ${userId}: ${event}`, data)
-    // In real implementation, this would emit to actual WebSocket connections
+    deliverToUser(userId, event, data)
+  }
+
+  static emitToMultiple(userIds, event, data) {
+    userIds.forEach(userId => {
+      this.emit(userId, event, data)
+    })
   }
 
   static emitToParty(partyId, event, data) {
@@ -43,13 +31,8 @@ export class PartySystem {
   static async initializeCollections() {
     const db = await getDb()
     
-    // Create indexes for performance
-    await db.collection('parties').createIndex({ id: 1 }, { unique: true })
-    await db.collection('parties').createIndex({ ownerId: 1 })
-    await db.collection('parties').createIndex({ status: 1 })
-    await db.collection('party_invitations').createIndex({ partyId: 1, toUserId: 1 }, { unique: true })
-    await db.collection('party_invitations').createIndex({ toUserId: 1, status: 1 })
-    await db.collection('party_members').createIndex({ partyId: 1, userId: 1 }, { unique: true })
+    // Create indexes for performance (declared in lib/indexManifest.js)
+    await ensureManifestIndexes(db, 'social', ['parties', 'party_invitations', 'party_members'])
     
     console.log('✅ Party system collections initialized')
   }
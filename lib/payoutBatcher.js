@@ -0,0 +1,337 @@
+// Batched SOL payouts from the platform wallet.
+// Cash-outs queued within PAYOUT_BATCH_WINDOW_MS are packed into as few
+// transactions as the packet size allows (one transfer instruction per
+// payout, plus a priority fee), signed with the cached blockhash, sent
+// together and confirmed with one status poll for the whole batch. Each
+// payout is then reconciled on its own: a transaction is atomic, so every
+// payout in it shares its outcome, while payouts in other transactions are
+// unaffected. Outcomes are recorded in the `payouts` collection.
+import { randomUUID } from 'crypto';
+import bs58 from 'bs58';
+import {
+  ComputeBudgetProgram,
+  Keypair,
+  PublicKey,
+  SendTransactionError,
+  SystemProgram,
+  TransactionMessage,
+  VersionedTransaction
+} from '@solana/web3.js';
+import {
+  buildPriorityFeeInstruction,
+  clearBlockhashCache,
+  connection,
+  getLatestBlockhashWithCache,
+  getSignatureStatusesBatched
+} from './solana.js';
+import { getDb } from './mongodb.js';
+import { ensureManifestIndexes } from './indexManifest.js';
+
+// PACKET_DATA_SIZE: the largest serialized transaction the cluster accepts
+const MAX_TRANSACTION_BYTES = 1232;
+const BATCH_WINDOW_MS = Number(process.env.PAYOUT_BATCH_WINDOW_MS || 1_500);
+const MAX_BATCH_PAYOUTS = Number(process.env.PAYOUT_BATCH_MAX || 60);
+const PRIORITY_FEE_MICRO_LAMPORTS = Number(process.env.PAYOUT_PRIORITY_FEE_MICRO_LAMPORTS || 5_000);
+const SIGNATURE_FEE_LAMPORTS = 5_000;
+// A system transfer uses 150 compute units; the limit keeps the priority fee
+// proportional to the batch instead of the default 200k units per instruction
+const COMPUTE_UNITS_PER_TRANSFER = 450;
+const BASE_COMPUTE_UNITS = 1_000;
+// Kept in the platform wallet so it stays rent exempt
+const RENT_EXEMPT_MINIMUM = 890_880;
+const CONFIRM_POLL_MS = 1_000;
+const LANDED_COMMITMENTS = new Set(['confirmed', 'finalized']);
+
+export const PayoutStatus = Object.freeze({
+  SENT: 'sent',
+  CONFIRMED: 'confirmed',
+  FAILED: 'failed',
+  // The blockhash expired before the transaction landed; safe to retry
+  EXPIRED: 'expired'
+});
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+function getPayoutKeypair() {
+  const secret = process.env.PLATFORM_WALLET_PRIVATE_KEY;
+  if (!secret) {
+    throw new Error('Platform wallet private key not configured');
+  }
+  return Keypair.fromSecretKey(bs58.decode(secret));
+}
+
+function computeUnitLimit(payoutCount) {
+  return BASE_COMPUTE_UNITS + COMPUTE_UNITS_PER_TRANSFER * payoutCount;
+}
+
+function transactionFee(payoutCount) {
+  return SIGNATURE_FEE_LAMPORTS +
+    Math.ceil((computeUnitLimit(payoutCount) * PRIORITY_FEE_MICRO_LAMPORTS) / 1_000_000);
+}
+
+function buildTransaction(payouts, { payer, recentBlockhash, priorityFeeMicroLamports }) {
+  const message = new TransactionMessage({
+    payerKey: payer,
+    recentBlockhash,
+    instructions: [
+      ComputeBudgetProgram.setComputeUnitLimit({ units: computeUnitLimit(payouts.length) }),
+      buildPriorityFeeInstruction(priorityFeeMicroLamports),
+      ...payouts.map((payout) =>
+        SystemProgram.transfer({
+          fromPubkey: payer,
+          toPubkey: new PublicKey(payout.recipient),
+          lamports: payout.lamports
+        })
+      )
+    ]
+  }).compileToV0Message();
+  return new VersionedTransaction(message);
+}
+
+// Greedily packs payouts into transactions that fit in one packet.
+// Returns [{ payouts, transaction }] with unsigned transactions.
+export function packPayoutTransactions(payouts, options) {
+  const packed = [];
+  let current = [];
+  let currentTx = null;
+
+  for (const payout of payouts) {
+    const candidate = buildTransaction([...current, payout], options);
+    if (current.length > 0 && candidate.serialize().length > MAX_TRANSACTION_BYTES) {
+      packed.push({ payouts: current, transaction: currentTx });
+      current = [payout];
+      currentTx = buildTransaction(current, options);
+    } else {
+      current.push(payout);
+      currentTx = candidate;
+    }
+  }
+  if (current.length > 0) {
+    packed.push({ payouts: current, transaction: currentTx });
+  }
+  return packed;
+}
+
+const defaultConfirmRpc = {
+  getSignatureStatuses: (signatures) => getSignatureStatusesBatched(signatures),
+  getBlockHeight: () => connection.getBlockHeight('confirmed')
+};
+
+// Polls the batch's signatures until each has landed or failed, or the
+// blockhash has expired. Returns signature -> { status, error }.
+export async function confirmSignatures(signatures, lastValidBlockHeight, rpc = defaultConfirmRpc) {
+  const outcomes = new Map();
+  let pending = [...signatures];
+
+  // With `expired`, signatures the cluster still does not know are expired
+  const settle = (statuses, expired) => {
+    for (const signature of pending) {
+      const status = statuses.get(signature);
+      if (status?.err) {
+        outcomes.set(signature, { status: PayoutStatus.FAILED, error: JSON.stringify(status.err) });
+      } else if (status && LANDED_COMMITMENTS.has(status.confirmationStatus)) {
+        outcomes.set(signature, { status: PayoutStatus.CONFIRMED });
+      } else if (!status && expired) {
+        outcomes.set(signature, { status: PayoutStatus.EXPIRED, error: 'Blockhash expired before confirmation' });
+      }
+    }
+    pending = pending.filter((signature) => !outcomes.has(signature));
+  };
+
+  while (pending.length > 0) {
+    // eslint-disable-next-line no-await-in-loop
+    settle(await rpc.getSignatureStatuses(pending), false);
+    if (pending.length === 0) break;
+
+    // eslint-disable-next-line no-await-in-loop
+    const blockHeight = await rpc.getBlockHeight();
+    if (blockHeight > lastValidBlockHeight) {
+      // A transaction may have landed after the poll above, so the statuses
+      // (searched in the transaction history) are read once more before
+      // anything is reported as expired and so safe to retry. Signatures
+      // seen but not yet confirmed keep being polled.
+      // eslint-disable-next-line no-await-in-loop
+      settle(await rpc.getSignatureStatuses(pending), true);
+      if (pending.length === 0) break;
+    }
+    // eslint-disable-next-line no-await-in-loop
+    await sleep(CONFIRM_POLL_MS);
+  }
+
+  return outcomes;
+}
+
+async function getPayoutsCollection() {
+  const db = await getDb(null);
+  await ensureManifestIndexes(db, 'default', ['payouts']);
+  return db.collection('payouts');
+}
+
+async function recordPayouts(results, batchId) {
+  try {
+    const payouts = await getPayoutsCollection();
+    const now = new Date();
+    await payouts.bulkWrite(
+      results.map((result) => ({
+        updateOne: {
+          filter: { payoutId: result.payoutId },
+          update: {
+            $set: {
+              status: result.status,
+              signature: result.signature || null,
+              error: result.error || null,
+              batchId,
+              updatedAt: now
+            },
+            $setOnInsert: {
+              recipient: result.recipient,
+              lamports: result.lamports,
+              reference: result.reference || null,
+              createdAt: now
+            }
+          },
+          upsert: true
+        }
+      })),
+      { ordered: false }
+    );
+  } catch (error) {
+    console.error('❌ Failed to record payout outcomes:', error);
+  }
+}
+
+// Sends the payouts in as few transactions as possible and reconciles each.
+// Payouts are { payoutId, recipient, lamports, reference }.
+export async function executePayouts(payouts) {
+  const batchId = randomUUID();
+  const payer = getPayoutKeypair();
+  const { blockhash, lastValidBlockHeight } = await getLatestBlockhashWithCache();
+  const transactionOptions = {
+    payer: payer.publicKey,
+    recentBlockhash: blockhash,
+    priorityFeeMicroLamports: PRIORITY_FEE_MICRO_LAMPORTS
+  };
+  const packed = packPayoutTransactions(payouts, transactionOptions);
+
+  const results = new Map();
+  const settle = (batchPayouts, outcome) =>
+    batchPayouts.forEach((payout) => results.set(payout.payoutId, { ...payout, ...outcome }));
+
+  let available = (await connection.getBalance(payer.publicKey)) - RENT_EXEMPT_MINIMUM;
+  // Reserves the entry's lamports and fee and signs it, or fails its payouts
+  const reserve = (entry) => {
+    const required = entry.payouts.reduce((total, payout) => total + payout.lamports, transactionFee(entry.payouts.length));
+    if (required > available) {
+      settle(entry.payouts, { status: PayoutStatus.FAILED, error: 'Insufficient platform wallet balance' });
+      return false;
+    }
+    available -= required;
+    entry.required = required;
+    entry.transaction.sign([payer]);
+    entry.signature = bs58.encode(entry.transaction.signatures[0]);
+    settle(entry.payouts, { status: PayoutStatus.SENT, signature: entry.signature });
+    return true;
+  };
+
+  // Sends the entries and returns those that may land. A rejected preflight
+  // fails the whole transaction, so one bad transfer (e.g. an amount below
+  // rent exemption for a new account) would fail every payout packed with
+  // it; those payouts are retried one per transaction instead.
+  const send = async (entries) => {
+    const signed = entries.filter(reserve);
+    // Signatures are recorded before sending, so a crash mid-batch leaves
+    // something to reconcile against
+    await recordPayouts(signed.flatMap((entry) => entry.payouts.map((payout) => results.get(payout.payoutId))), batchId);
+
+    const sent = [];
+    const retry = [];
+    await Promise.all(signed.map(async (entry) => {
+      try {
+        await connection.sendRawTransaction(entry.transaction.serialize(), {
+          skipPreflight: false,
+          preflightCommitment: 'confirmed'
+        });
+        sent.push(entry);
+      } catch (error) {
+        const blockhashExpired = error?.message?.includes('Blockhash not found');
+        if (blockhashExpired) {
+          clearBlockhashCache();
+        }
+        if (!(error instanceof SendTransactionError)) {
+          // After other errors (e.g. a timeout) the transaction may still
+          // land, so it is confirmed below
+          sent.push(entry);
+        } else if (entry.payouts.length > 1 && !blockhashExpired) {
+          // The rejected transaction never lands, so its reservation is freed
+          available += entry.required;
+          retry.push(...entry.payouts.map((payout) => ({
+            payouts: [payout],
+            transaction: buildTransaction([payout], transactionOptions)
+          })));
+        } else {
+          settle(entry.payouts, { status: PayoutStatus.FAILED, signature: entry.signature, error: error.message });
+        }
+      }
+    }));
+
+    return retry.length > 0 ? [...sent, ...(await send(retry))] : sent;
+  };
+
+  const sent = await send(packed);
+  try {
+    const outcomes = await confirmSignatures(sent.map((entry) => entry.signature), lastValidBlockHeight);
+    sent.forEach((entry) => settle(entry.payouts, { signature: entry.signature, ...outcomes.get(entry.signature) }));
+  } catch (error) {
+    // The transactions may still land; they stay `sent` for reconciliation
+    console.error(`❌ Failed to confirm payout batch ${batchId}:`, error);
+  }
+
+  const reconciled = payouts.map((payout) => results.get(payout.payoutId));
+  await recordPayouts(reconciled, batchId);
+
+  const confirmed = reconciled.filter((result) => result.status === PayoutStatus.CONFIRMED).length;
+  console.log(`💸 Payout batch ${batchId}: ${confirmed}/${payouts.length} confirmed in ${packed.length} transactions`);
+  return reconciled;
+}
+
+// Queued payouts are flushed one batch at a time, so balance checks of
+// consecutive batches cannot overlap.
+const queue = globalThis._turflootPayoutQueue || (globalThis._turflootPayoutQueue = {
+  pending: [],
+  timer: null,
+  chain: Promise.resolve()
+});
+
+function flushQueue() {
+  clearTimeout(queue.timer);
+  queue.timer = null;
+  const batch = queue.pending.splice(0, queue.pending.length);
+  if (batch.length === 0) return;
+
+  queue.chain = queue.chain.then(async () => {
+    try {
+      const results = await executePayouts(batch.map(({ payout }) => payout));
+      batch.forEach(({ resolve }, index) => resolve(results[index]));
+    } catch (error) {
+      console.error('❌ Payout batch failed:', error);
+      batch.forEach(({ payout, resolve }) =>
+        resolve({ ...payout, status: PayoutStatus.FAILED, error: error.message })
+      );
+    }
+  });
+}
+
+// Queues a payout for the next batch and resolves with its reconciled
+// result: { payoutId, status, signature, error }.
+export function queuePayout({ recipient, lamports, reference = null }) {
+  const payout = { payoutId: randomUUID(), recipient: new PublicKey(recipient).toBase58(), lamports, reference };
+
+  return new Promise((resolve) => {
+    queue.pending.push({ payout, resolve });
+    if (queue.pending.length >= MAX_BATCH_PAYOUTS) {
+      flushQueue();
+    } else if (!queue.timer) {
+      queue.timer = setTimeout(flushQueue, BATCH_WINDOW_MS);
+    }
+  });
+}
@@ -0,0 +1,29 @@
+import assert from 'assert'
+import { confirmSignatures, PayoutStatus } from './payoutBatcher.js'
+
+const LAST_VALID_BLOCK_HEIGHT = 100
+
+// The transaction lands between the regular status poll and the block
+// height read that finds the blockhash expired
+const polls = []
+const rpc = {
+  async getSignatureStatuses(signatures) {
+    polls.push([...signatures])
+    const landed = polls.length > 1
+    return new Map(signatures.map((signature) => [
+      signature,
+      landed && signature === 'landed' ? { err: null, confirmationStatus: 'confirmed' } : null
+    ]))
+  },
+  async getBlockHeight() {
+    return LAST_VALID_BLOCK_HEIGHT + 1
+  }
+}
+
+const outcomes = await confirmSignatures(['landed', 'dropped'], LAST_VALID_BLOCK_HEIGHT, rpc)
+
+assert.strictEqual(polls.length, 2, 'Statuses should be read once more after the blockhash expires')
+assert.strictEqual(outcomes.get('landed').status, PayoutStatus.CONFIRMED, 'A transaction that landed late should be confirmed, not expired')
+assert.strictEqual(outcomes.get('dropped').status, PayoutStatus.EXPIRED, 'An unknown signature after expiry should be expired')
+
+console.log('✅ Payout confirmation expiry regression test passed')
@@ -0,0 +1,155 @@
+// Presence service.
+// A user is online while their heartbeats keep arriving: every heartbeat
+// records a last-seen timestamp and the user counts as online until
+// PRESENCE_TTL_MS passes without another. Clients that disappear without a
+// logout simply expire. State is kept in memory, or in a Redis sorted set
+// when REDIS_URL is configured, so that every process sees the same users
+// online. Nothing here writes to Mongo.
+
+export const PRESENCE_TTL_MS = Number(process.env.PRESENCE_TTL_MS || 60_000)
+
+const REDIS_PRESENCE_KEY = 'presence:last_seen'
+const MEMORY_SWEEP_INTERVAL = 1000
+
+class MemoryPresenceStore {
+  constructor() {
+    this.lastSeen = new Map()
+    this.touches = 0
+  }
+
+  async touch(userId, at) {
+    this.lastSeen.set(userId, at)
+    if (++this.touches % MEMORY_SWEEP_INTERVAL === 0) {
+      this.sweep(at - PRESENCE_TTL_MS)
+    }
+  }
+
+  async remove(userId) {
+    this.lastSeen.delete(userId)
+  }
+
+  async getMany(userIds) {
+    return userIds.map((userId) => this.lastSeen.get(userId) ?? null)
+  }
+
+  async listSince(cutoff) {
+    this.sweep(cutoff)
+    return [...this.lastSeen.keys()]
+  }
+
+  sweep(cutoff) {
+    for (const [userId, at] of this.lastSeen) {
+      if (at < cutoff) {
+        this.lastSeen.delete(userId)
+      }
+    }
+  }
+}
+
+class RedisPresenceStore {
+  constructor(client) {
+    this.client = client
+  }
+
+  async touch(userId, at) {
+    await this.client.zAdd(REDIS_PRESENCE_KEY, { score: at, value: userId })
+  }
+
+  async remove(userId) {
+    await this.client.zRem(REDIS_PRESENCE_KEY, userId)
+  }
+
+  async getMany(userIds) {
+    return this.client.zmScore(REDIS_PRESENCE_KEY, userIds)
+  }
+
+  async listSince(cutoff) {
+    await this.client.zRemRangeByScore(REDIS_PRESENCE_KEY, '-inf', `(${cutoff}`)
+    return this.client.zRangeByScore(REDIS_PRESENCE_KEY, cutoff, '+inf')
+  }
+}
+
+// Kept on globalThis so the custom server (lib/gameServer.js) and the
+// webpack-bundled API routes share one store within the process
+const presenceState = globalThis._turflootPresence || (globalThis._turflootPresence = { storePromise: null })
+
+// Redis is optional: without REDIS_URL, or without the `redis` package,
+// presence is tracked per process. The package is not a dependency, so the
+// import is left to Node at runtime instead of being resolved by webpack.
+async function createStore() {
+  if (process.env.REDIS_URL) {
+    try {
+      const { createClient } = await import(/* webpackIgnore: true */ 'redis')
+      const client = createClient({ url: process.env.REDIS_URL })
+      client.on('error', (error) => console.warn('⚠️ Presence Redis error:', error.message))
+      await client.connect()
+      console.log('🟢 Presence service using Redis')
+      return new RedisPresenceStore(client)
+    } catch (error) {
+      console.warn('⚠️ Presence Redis unavailable, falling back to memory:', error.message)
+    }
+  }
+
+  return new MemoryPresenceStore()
+}
+
+function getStore() {
+  if (!presenceState.storePromise) {
+    presenceState.storePromise = createStore()
+  }
+  return presenceState.storePromise
+}
+
+export async function heartbeat(userId, at = Date.now()) {
+  if (!userId) {
+    return
+  }
+  const store = await getStore()
+  await store.touch(userId, at)
+}
+
+export async function markOffline(userId) {
+  if (!userId) {
+    return
+  }
+  const store = await getStore()
+  await store.remove(userId)
+}
+
+// Returns userId -> { online, lastSeen } for every requested id.
+export async function getPresence(userIds) {
+  const ids = [...new Set(userIds.filter(Boolean))]
+  const presence = new Map()
+  if (ids.length === 0) {
+    return presence
+  }
+
+  const store = await getStore()
+  const lastSeen = await store.getMany(ids)
+  const cutoff = Date.now() - PRESENCE_TTL_MS
+
+  ids.forEach((userId, index) => {
+    const at = lastSeen[index] === null || lastSeen[index] === undefined ? null : Number(lastSeen[index])
+    presence.set(userId, {
+      online: at !== null && at >= cutoff,
+      lastSeen: at !== null ? new Date(at).toISOString() : null
+    })
+  })
+
+  return presence
+}
+
+// Returns userId -> boolean for every requested id.
+export async function isOnline(userIds) {
+  const presence = await getPresence(userIds)
+  const online = new Map()
+  for (const [userId, { online: isUserOnline }] of presence) {
+    online.set(userId, isUserOnline)
+  }
+  return online
+}
+
+export async function getOnlineUserIds() {
+  const store = await getStore()
+  return store.listSince(Date.now() - PRESENCE_TTL_MS)
+}
@@ -0,0 +1,212 @@
+// Server-side response cache for API routes.
+// Each cached route declares a policy: how long a response is fresh
+// (`ttlMs`), how long a stale copy may still be served while it is refreshed
+// in the background (`staleWhileRevalidateMs`), and which request parameters
+// the response varies by (`varyBy`). Responses live in an in-process LRU and,
+// optionally, in a shared store so that other instances can reuse them.
+import { getDb } from './mongodb.js'
+import { LruCache } from './lruCache.js'
+
+const SHARED_COLLECTION = 'api_response_cache'
+
+function emptyRouteMetrics() {
+  return { hits: 0, staleHits: 0, sharedHits: 0, misses: 0, revalidations: 0, errors: 0 }
+}
+
+// Only successful responses are cached; handlers that degrade to a
+// fallback payload mark it with an `error` field.
+function defaultIsCacheable({ status, body }) {
+  return status === 200 && !(body && body.error)
+}
+
+export function buildCacheKey(route, varyBy = [], params = {}) {
+  const parts = [...varyBy].sort().map((name) => {
+    const value = params?.[name]
+    return `${name}=${value === undefined || value === null ? '' : encodeURIComponent(String(value))}`
+  })
+  return parts.length ? `${route}?${parts.join('&')}` : route
+}
+
+// Shared store backed by a Mongo collection with a TTL index on `expiresAt`.
+export class MongoResponseStore {
+  constructor(dbName = null) {
+    this.dbName = dbName
+    this.indexesReady = null
+  }
+
+  async collection() {
+    const db = await getDb(this.dbName)
+    if (!this.indexesReady) {
+      this.indexesReady = Promise.all([
+        db.collection(SHARED_COLLECTION).createIndex({ expiresAt: 1 }, { name: 'expiresAt_ttl', expireAfterSeconds: 0 }),
+        db.collection(SHARED_COLLECTION).createIndex({ route: 1 }, { name: 'route_1' })
+      ]).catch((error) => {
+        this.indexesReady = null
+        throw error
+      })
+    }
+    await this.indexesReady
+    return db.collection(SHARED_COLLECTION)
+  }
+
+  async get(key) {
+    const doc = await (await this.collection()).findOne({ _id: key })
+    return doc ? { status: doc.status, body: doc.body, storedAt: doc.storedAt } : null
+  }
+
+  async set(key, route, entry, lifetimeMs) {
+    await (await this.collection()).replaceOne(
+      { _id: key },
+      { route, ...entry, expiresAt: new Date(entry.storedAt + lifetimeMs) },
+      { upsert: true }
+    )
+  }
+
+  async deleteRoute(route) {
+    await (await this.collection()).deleteMany({ route })
+  }
+}
+
+export class ResponseCache {
+  constructor({ maxEntries = 1000, sharedStore = null } = {}) {
+    this.local = new LruCache({ maxEntries })
+    this.sharedStore = sharedStore
+    this.inflight = new Map()
+    this.metrics = new Map()
+  }
+
+  routeMetrics(route) {
+    let metrics = this.metrics.get(route)
+    if (!metrics) {
+      metrics = emptyRouteMetrics()
+      this.metrics.set(route, metrics)
+    }
+    return metrics
+  }
+
+  // Returns { entry: { status, body, storedAt }, state } where state is
+  // HIT, STALE (served while a refresh runs) or MISS.
+  async fetch(route, key, policy, compute) {
+    const metrics = this.routeMetrics(route)
+    let entry = this.local.get(key)
+
+    if (!entry && this.sharedStore) {
+      try {
+        entry = await this.sharedStore.get(key)
+        if (entry) {
+          metrics.sharedHits++
+          this.local.set(key, entry, this.lifetime(policy))
+        }
+      } catch (error) {
+        console.warn('⚠️ Shared response cache read failed:', error.message)
+      }
+    }
+
+    if (entry) {
+      const age = Date.now() - entry.storedAt
+      if (age < policy.ttlMs) {
+        metrics.hits++
+        return { entry, state: 'HIT' }
+      }
+      if (age < this.lifetime(policy)) {
+        metrics.staleHits++
+        this.refresh(route, key, policy, compute).catch(() => {})
+        return { entry, state: 'STALE' }
+      }
+    }
+
+    metrics.misses++
+    return { entry: await this.refresh(route, key, policy, compute), state: 'MISS' }
+  }
+
+  lifetime(policy) {
+    return policy.ttlMs + (policy.staleWhileRevalidateMs || 0)
+  }
+
+  // Concurrent refreshes of the same key share one handler call.
+  refresh(route, key, policy, compute) {
+    const pending = this.inflight.get(key)
+    if (pending) {
+      return pending
+    }
+
+    const metrics = this.routeMetrics(route)
+    metrics.revalidations++
+
+    const promise = (async () => {
+      const result = await compute()
+      const entry = { status: result.status, body: result.body, storedAt: Date.now() }
+      const isCacheable = policy.isCacheable || defaultIsCacheable
+
+      if (isCacheable(entry)) {
+        this.local.set(key, entry, this.lifetime(policy))
+        if (this.sharedStore) {
+          this.sharedStore.set(key, route, entry, this.lifetime(policy)).catch((error) => {
+            console.warn('⚠️ Shared response cache write failed:', error.message)
+          })
+        }
+      }
+
+      return entry
+    })().catch((error) => {
+      metrics.errors++
+      throw error
+    }).finally(() => {
+      this.inflight.delete(key)
+    })
+
+    this.inflight.set(key, promise)
+    return promise
+  }
+
+  async invalidateRoute(route) {
+    for (const key of [...this.local.entries.keys()]) {
+      if (key === route || key.startsWith(`${route}?`)) {
+        this.local.delete(key)
+      }
+    }
+
+    if (this.sharedStore) {
+      try {
+        await this.sharedStore.deleteRoute(route)
+      } catch (error) {
+        console.warn('⚠️ Shared response cache invalidation failed:', error.message)
+      }
+    }
+  }
+
+  getMetrics() {
+    const routes = {}
+    for (const [route, metrics] of this.metrics) {
+      const served = metrics.hits + metrics.staleHits + metrics.misses
+      routes[route] = { ...metrics, hitRatio: served > 0 ? (metrics.hits + metrics.staleHits) / served : 0 }
+    }
+
+    return {
+      entries: this.local.size,
+      sharedStore: Boolean(this.sharedStore),
+      routes
+    }
+  }
+}
+
+// The process-wide cache the catch-all API serves from. It lives on
+// globalThis so that routes in other bundles can invalidate it;
+// API_CACHE_SHARED_STORE=mongo also shares cached responses between
+// instances.
+export function getResponseCache() {
+  return globalThis._turflootResponseCache || (globalThis._turflootResponseCache = new ResponseCache({
+    maxEntries: Number(process.env.API_CACHE_MAX_ENTRIES || 1000),
+    sharedStore: process.env.API_CACHE_SHARED_STORE === 'mongo' ? new MongoResponseStore(null) : null
+  }))
+}
+
+// Drops cached responses for the routes, e.g. 'rooms/tiers' after a balance
+// change. Never throws, so callers can run it after a write has succeeded.
+export async function invalidateCachedRoutes(...routes) {
+  try {
+    await Promise.all(routes.map((route) => getResponseCache().invalidateRoute(route)))
+  } catch (error) {
+    console.warn('⚠️ Response cache invalidation failed:', error.message)
+  }
+}
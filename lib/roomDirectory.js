@@ -0,0 +1,145 @@
+// Live arena instance directory for the server browser.
+// The Colyseus server autoscales each stake tier (roomName) into as many room
+// instances as load requires. Every room publishes its counts (players,
+// spectators, tick p99, memory) to Colyseus presence and the `/rooms` endpoint
+// serves that snapshot. These helpers keep a short-lived in-process copy of it
+// and expand the static tier templates into one browser entry per instance.
+
+const ROOM_DIRECTORY_TIMEOUT_MS = 1500
+const ROOM_DIRECTORY_TTL_MS = Number(process.env.ROOM_DIRECTORY_TTL_MS || 2000)
+const ROOM_DIRECTORY_STALE_MS = 30_000
+
+// endpoint -> { rooms, fetchedAt, pending }
+const directoryCache = new Map()
+
+export function getColyseusHttpEndpoint(endpoint) {
+  if (!endpoint) {
+    return null
+  }
+
+  return endpoint
+    .replace(/^wss:\/\//, 'https://')
+    .replace(/^ws:\/\//, 'http://')
+    .replace(/\/+$/, '')
+}
+
+export async function fetchRoomInstances(endpoint) {
+  const baseUrl = getColyseusHttpEndpoint(endpoint)
+  if (!baseUrl) {
+    return null
+  }
+
+  const controller = new AbortController()
+  const timeout = setTimeout(() => controller.abort(), ROOM_DIRECTORY_TIMEOUT_MS)
+
+  try {
+    const response = await fetch(`${baseUrl}/rooms`, {
+      signal: controller.signal,
+      cache: 'no-store'
+    })
+
+    if (!response.ok) {
+      console.warn(`⚠️ Room directory responded with ${response.status}`)
+      return null
+    }
+
+    const data = await response.json()
+    return Array.isArray(data?.rooms) ? data.rooms : null
+  } catch (error) {
+    console.warn('⚠️ Could not load live room instances:', error.message)
+    return null
+  } finally {
+    clearTimeout(timeout)
+  }
+}
+
+// Returns the cached room listing for `endpoint`, refreshing it at most once
+// per TTL no matter how many requests arrive. Concurrent callers share the
+// in-flight fetch. If a refresh fails the last good listing is served until it
+// is ROOM_DIRECTORY_STALE_MS old, after which callers get null.
+export async function getRoomInstances(endpoint) {
+  const now = Date.now()
+  const entry = directoryCache.get(endpoint) || { rooms: null, fetchedAt: 0, pending: null }
+  directoryCache.set(endpoint, entry)
+
+  if (entry.rooms && now - entry.fetchedAt < ROOM_DIRECTORY_TTL_MS) {
+    return entry.rooms
+  }
+
+  if (!entry.pending) {
+    entry.pending = fetchRoomInstances(endpoint)
+      .then((rooms) => {
+        if (rooms) {
+          entry.rooms = rooms
+          entry.fetchedAt = Date.now()
+        }
+        return rooms
+      })
+      .finally(() => {
+        entry.pending = null
+      })
+  }
+
+  const rooms = await entry.pending
+  if (rooms) {
+    return rooms
+  }
+
+  return entry.rooms && Date.now() - entry.fetchedAt < ROOM_DIRECTORY_STALE_MS
+    ? entry.rooms
+    : null
+}
+
+export function groupInstancesByTier(instances) {
+  const byTier = new Map()
+
+  for (const instance of instances || []) {
+    const tier = instance?.tier || 'default'
+    if (!byTier.has(tier)) {
+      byTier.set(tier, [])
+    }
+    byTier.get(tier).push(instance)
+  }
+
+  for (const list of byTier.values()) {
+    list.sort((a, b) => (a.clients || 0) - (b.clients || 0))
+  }
+
+  return byTier
+}
+
+// Expands one tier template into an entry per live instance, least loaded
+// first. `id` stays the tier name so joins keep going through matchmaking,
+// which routes to the least-loaded unlocked instance. A tier with no running
+// instance keeps its template entry so players can still start one.
+export function expandTierTemplate(template, instancesForTier = []) {
+  if (!instancesForTier.length) {
+    return [{ ...template, instanceCount: 0 }]
+  }
+
+  return instancesForTier.map((instance, index) => {
+    const currentPlayers = instance.players ?? instance.clients ?? 0
+    const maxPlayers = instance.maxClients || template.maxPlayers
+    const isFull = (instance.clients ?? currentPlayers) >= maxPlayers
+
+    return {
+      ...template,
+      roomInstanceId: instance.roomId,
+      instanceIndex: index + 1,
+      instanceCount: instancesForTier.length,
+      name: instancesForTier.length > 1 ? `${template.name} #${index + 1}` : template.name,
+      currentPlayers,
+      maxPlayers,
+      spectators: instance.spectators || 0,
+      tickP99Ms: instance.tickP99Ms ?? null,
+      overloaded: Boolean(instance.overloaded),
+      status: isFull ? 'full' : currentPlayers > 0 ? 'active' : 'waiting',
+      canJoin: !isFull
+    }
+  })
+}
+
+export function expandTierTemplates(templates, instances) {
+  const byTier = groupInstancesByTier(instances)
+  return templates.flatMap((template) => expandTierTemplate(template, byTier.get(template.id)))
+}
@@ -0,0 +1,323 @@
+// Shared Solana JSON-RPC gateway.
+// Every server-side Connection sends its requests through gatewayFetch, which
+// - multiplexes single calls made within SOLANA_RPC_BATCH_WINDOW_MS into one
+//   JSON-RPC batch request,
+// - rate limits each endpoint with a token bucket that halves its rate on a
+//   429 and creeps back up on success,
+// - retries 429s, 5xx responses and network errors with exponential backoff
+//   and full jitter, limited by a retry budget shared by all callers, so a
+//   rate-limited burst does not retry in lockstep,
+// - fails over to the next configured endpoint when one keeps failing, and
+// - records per-method latency (see getRpcMetrics()).
+// Connections are reused through Node's global fetch, which keeps sockets
+// alive per origin. State lives on globalThis because Next.js bundles each
+// route separately.
+import { Connection } from '@solana/web3.js';
+
+const DEFAULT_RPS = Number(process.env.SOLANA_RPC_RPS || 40);
+const DEFAULT_BURST = Number(process.env.SOLANA_RPC_BURST || DEFAULT_RPS);
+const MIN_RPS = 1;
+const BATCH_WINDOW_MS = Number(process.env.SOLANA_RPC_BATCH_WINDOW_MS ?? 2);
+const MAX_BATCH_SIZE = Number(process.env.SOLANA_RPC_MAX_BATCH || 50);
+const MAX_ATTEMPTS = Number(process.env.SOLANA_RPC_MAX_ATTEMPTS || 5);
+const BASE_BACKOFF_MS = 250;
+const MAX_BACKOFF_MS = 8_000;
+// Consecutive failures before an endpoint is skipped, and for how long
+const FAILURES_TO_TRIP = 3;
+const ENDPOINT_COOLDOWN_MS = 10_000;
+// Every success earns a tenth of a retry, up to RETRY_BUDGET_MAX
+const RETRY_BUDGET_MAX = 20;
+const RETRY_BUDGET_EARN = 0.1;
+const LATENCY_SAMPLES = 256;
+
+const gateway = globalThis._turflootRpcGateway || (globalThis._turflootRpcGateway = {
+  endpoints: new Map(),
+  batchers: new Map(),
+  connections: new Map(),
+  methods: new Map(),
+  retryBudget: RETRY_BUDGET_MAX
+});
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// Full jitter: a random delay up to the exponential backoff for the attempt
+export function backoffDelay(attempt, baseMs = BASE_BACKOFF_MS, maxMs = MAX_BACKOFF_MS) {
+  return Math.random() * Math.min(maxMs, baseMs * 2 ** attempt);
+}
+
+class TokenBucket {
+  constructor(ratePerSecond, burst) {
+    this.maxRate = ratePerSecond;
+    this.rate = ratePerSecond;
+    this.burst = burst;
+    this.tokens = burst;
+    this.updatedAt = Date.now();
+  }
+
+  refill(now) {
+    this.tokens = Math.min(this.burst, this.tokens + ((now - this.updatedAt) / 1000) * this.rate);
+    this.updatedAt = now;
+  }
+
+  // Reserves a token and returns how long to wait before using it
+  take() {
+    const now = Date.now();
+    this.refill(now);
+    this.tokens -= 1;
+    return this.tokens >= 0 ? 0 : (-this.tokens / this.rate) * 1000;
+  }
+
+  throttled(retryAfterMs = 0) {
+    this.refill(Date.now());
+    this.rate = Math.max(MIN_RPS, this.rate / 2);
+    this.tokens = Math.min(this.tokens, -(retryAfterMs / 1000) * this.rate);
+  }
+
+  succeeded() {
+    this.rate = Math.min(this.maxRate, this.rate + this.maxRate * 0.01);
+  }
+}
+
+function endpointState(url) {
+  if (!gateway.endpoints.has(url)) {
+    gateway.endpoints.set(url, {
+      url,
+      bucket: new TokenBucket(DEFAULT_RPS, DEFAULT_BURST),
+      consecutiveFailures: 0,
+      unavailableUntil: 0,
+      requests: 0,
+      failures: 0
+    });
+  }
+  return gateway.endpoints.get(url);
+}
+
+// Prefers the first available endpoint, moving down the list on retries.
+// If every endpoint is cooling down, the one that recovers first is used.
+function pickEndpoint(urls, attempt) {
+  const now = Date.now();
+  const states = urls.map(endpointState);
+  const available = states.filter((state) => state.unavailableUntil <= now);
+  if (available.length > 0) {
+    return available[attempt % available.length];
+  }
+  return states.reduce((best, state) => (state.unavailableUntil < best.unavailableUntil ? state : best));
+}
+
+function methodMetrics(method) {
+  if (!gateway.methods.has(method)) {
+    gateway.methods.set(method, { count: 0, errors: 0, totalMs: 0, maxMs: 0, samples: [] });
+  }
+  return gateway.methods.get(method);
+}
+
+function recordLatency(methods, elapsedMs, failed) {
+  for (const method of methods) {
+    const metrics = methodMetrics(method);
+    metrics.count += 1;
+    metrics.totalMs += elapsedMs;
+    metrics.maxMs = Math.max(metrics.maxMs, elapsedMs);
+    if (failed) metrics.errors += 1;
+    metrics.samples[metrics.count % LATENCY_SAMPLES] = elapsedMs;
+  }
+}
+
+function retryAfterMs(response) {
+  const header = response.headers.get('retry-after');
+  const seconds = header ? Number(header) : NaN;
+  return Number.isFinite(seconds) ? seconds * 1000 : 0;
+}
+
+class RetryableRpcError extends Error {
+  constructor(message, retryAfter = 0) {
+    super(message);
+    this.retryAfter = retryAfter;
+  }
+}
+
+// Posts a JSON-RPC payload (single call or batch) with rate limiting,
+// retries and failover. Resolves to { status, text }.
+async function postWithRetries(urls, payload) {
+  const body = JSON.stringify(payload);
+  const methods = Array.isArray(payload) ? payload.map((call) => call.method) : [payload.method];
+
+  for (let attempt = 0; ; attempt++) {
+    const endpoint = pickEndpoint(urls, attempt);
+    const wait = endpoint.bucket.take();
+    if (wait > 0) {
+      // eslint-disable-next-line no-await-in-loop
+      await sleep(wait);
+    }
+
+    const started = Date.now();
+    endpoint.requests += 1;
+    try {
+      // eslint-disable-next-line no-await-in-loop
+      const response = await fetch(endpoint.url, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body
+      });
+
+      if (response.status === 429) {
+        endpoint.bucket.throttled(retryAfterMs(response));
+        throw new RetryableRpcError(`429 Too Many Requests from ${new URL(endpoint.url).host}`, retryAfterMs(response));
+      }
+      if (response.status >= 500) {
+        throw new RetryableRpcError(`${response.status} ${response.statusText} from ${new URL(endpoint.url).host}`);
+      }
+
+      // eslint-disable-next-line no-await-in-loop
+      const text = await response.text();
+      endpoint.consecutiveFailures = 0;
+      endpoint.bucket.succeeded();
+      gateway.retryBudget = Math.min(RETRY_BUDGET_MAX, gateway.retryBudget + RETRY_BUDGET_EARN);
+      recordLatency(methods, Date.now() - started, false);
+      return { status: response.status, text };
+    } catch (error) {
+      recordLatency(methods, Date.now() - started, true);
+      endpoint.failures += 1;
+      endpoint.consecutiveFailures += 1;
+      if (endpoint.consecutiveFailures >= FAILURES_TO_TRIP) {
+        endpoint.unavailableUntil = Date.now() + ENDPOINT_COOLDOWN_MS;
+      }
+
+      // Network errors surface as TypeError from fetch
+      const retryable = error instanceof RetryableRpcError || error instanceof TypeError;
+      if (!retryable || attempt + 1 >= MAX_ATTEMPTS || gateway.retryBudget < 1) {
+        throw error;
+      }
+      gateway.retryBudget -= 1;
+      // eslint-disable-next-line no-await-in-loop
+      await sleep(Math.max(backoffDelay(attempt), error.retryAfter || 0));
+    }
+  }
+}
+
+function jsonResponse(text, status = 200) {
+  return new Response(text, { status, headers: { 'Content-Type': 'application/json' } });
+}
+
+// Sends each call on its own; used when an endpoint rejects batch requests
+async function sendIndividually(urls, calls) {
+  await Promise.all(calls.map(async (call) => {
+    try {
+      call.resolve(await postWithRetries(urls, call.payload));
+    } catch (error) {
+      call.reject(error);
+    }
+  }));
+}
+
+async function flushBatch(urls, calls) {
+  if (calls.length === 1) {
+    const [call] = calls;
+    return postWithRetries(urls, call.payload).then(call.resolve, call.reject);
+  }
+
+  // Callers' ids may collide, so the batch uses positional ids
+  const batch = calls.map((call, index) => ({ ...call.payload, id: index }));
+  try {
+    const { status, text } = await postWithRetries(urls, batch);
+    const replies = JSON.parse(text);
+    if (!Array.isArray(replies)) {
+      return sendIndividually(urls, calls);
+    }
+    const byId = new Map(replies.map((reply) => [reply.id, reply]));
+    calls.forEach((call, index) => {
+      const reply = byId.get(index);
+      if (reply) {
+        call.resolve({ status, text: JSON.stringify({ ...reply, id: call.payload.id }) });
+      } else {
+        call.reject(new Error(`No reply for ${call.payload.method} in JSON-RPC batch`));
+      }
+    });
+  } catch (error) {
+    calls.forEach((call) => call.reject(error));
+  }
+}
+
+// Queues a single call for the next batch to these endpoints
+function enqueueCall(urls, payload) {
+  const key = urls.join('|');
+  let batcher = gateway.batchers.get(key);
+  if (!batcher) {
+    batcher = { calls: [], timer: null };
+    gateway.batchers.set(key, batcher);
+  }
+
+  return new Promise((resolve, reject) => {
+    batcher.calls.push({ payload, resolve, reject });
+    const flush = () => {
+      clearTimeout(batcher.timer);
+      batcher.timer = null;
+      const calls = batcher.calls.splice(0, batcher.calls.length);
+      for (let i = 0; i < calls.length; i += MAX_BATCH_SIZE) {
+        flushBatch(urls, calls.slice(i, i + MAX_BATCH_SIZE));
+      }
+    };
+    if (batcher.calls.length >= MAX_BATCH_SIZE) {
+      flush();
+    } else if (!batcher.timer) {
+      batcher.timer = setTimeout(flush, BATCH_WINDOW_MS);
+    }
+  });
+}
+
+// fetch implementation for web3.js Connections bound to `urls`
+function gatewayFetch(urls) {
+  return async (_url, init = {}) => {
+    const payload = JSON.parse(init.body);
+    const { status, text } = Array.isArray(payload) || BATCH_WINDOW_MS <= 0
+      ? await postWithRetries(urls, payload)
+      : await enqueueCall(urls, payload);
+    return jsonResponse(text, status);
+  };
+}
+
+// Shared Connection for a list of endpoints (first = preferred).
+export function getRpcConnection(urls, commitment = 'confirmed') {
+  if (!urls?.length) {
+    throw new Error('At least one Solana RPC endpoint is required');
+  }
+  const key = `${commitment}|${urls.join('|')}`;
+  if (!gateway.connections.has(key)) {
+    gateway.connections.set(key, new Connection(urls[0], {
+      commitment,
+      fetch: gatewayFetch(urls),
+      // Rate limits are retried here, with jitter, instead of in web3.js
+      disableRetryOnRateLimit: true
+    }));
+  }
+  return gateway.connections.get(key);
+}
+
+function percentile(samples, fraction) {
+  const sorted = samples.filter((sample) => sample !== undefined).sort((a, b) => a - b);
+  return sorted.length ? sorted[Math.min(sorted.length - 1, Math.floor(sorted.length * fraction))] : 0;
+}
+
+export function getRpcMetrics() {
+  const methods = {};
+  for (const [method, metrics] of gateway.methods) {
+    methods[method] = {
+      count: metrics.count,
+      errors: metrics.errors,
+      avgMs: Math.round(metrics.totalMs / metrics.count),
+      p50Ms: percentile(metrics.samples, 0.5),
+      p95Ms: percentile(metrics.samples, 0.95),
+      maxMs: metrics.maxMs
+    };
+  }
+
+  const now = Date.now();
+  const endpoints = [...gateway.endpoints.values()].map((endpoint) => ({
+    host: new URL(endpoint.url).host,
+    requests: endpoint.requests,
+    failures: endpoint.failures,
+    available: endpoint.unavailableUntil <= now,
+    ratePerSecond: Number(endpoint.bucket.rate.toFixed(1))
+  }));
+
+  return { methods, endpoints, retryBudget: Number(gateway.retryBudget.toFixed(1)) };
+}
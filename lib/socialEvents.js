@@ -0,0 +1,170 @@
+// Push pipeline for party and friend updates.
+// Writes to the social collections become change events addressed to the
+// users they concern. Events come either from the HTTP routes that perform
+// the writes (in-process) or, when SOCIAL_CHANGE_STREAMS=true, from a Mongo
+// change stream that also sees writes made by other processes. The game
+// server forwards each event to its recipients' sockets through the party and
+// friends socket managers, so subscribed clients receive deltas instead of
+// polling.
+import { EventEmitter } from 'events'
+import { getDb } from './mongodb.js'
+
+export const SOCIAL_COLLECTIONS = ['parties', 'party_invites', 'friend_requests', 'friends']
+
+const CHANGE_STREAM_RETRY_MS = 5000
+
+// Next.js bundles route modules separately from the custom server, so the
+// emitter and transport live on globalThis to be shared within the process.
+const state = globalThis._turflootSocialEvents || (globalThis._turflootSocialEvents = {
+  emitter: new EventEmitter(),
+  changeStream: null,
+  preImages: false,
+  transport: null
+})
+state.emitter.setMaxListeners(0)
+
+function recipientsFor(collection, doc) {
+  if (!doc) {
+    return []
+  }
+
+  const ids = []
+  switch (collection) {
+    case 'parties':
+      ids.push(doc.createdBy, ...(doc.currentPlayers || []), ...(doc.invitedPlayers || []))
+      break
+    case 'party_invites':
+      ids.push(doc.fromUserIdentifier, doc.toUserIdentifier)
+      break
+    case 'friend_requests':
+      ids.push(doc.fromUserIdentifier || doc.fromUserId, doc.toUserIdentifier || doc.toUserId)
+      break
+    case 'friends':
+      ids.push(doc.userIdentifier, doc.friendUserIdentifier)
+      break
+  }
+
+  return [...new Set(ids.filter(Boolean))]
+}
+
+function toEvent(collection, operation, document, previous = null) {
+  const doc = document || previous
+  return {
+    collection,
+    operation,
+    id: doc?.id || null,
+    document: operation === 'delete' ? null : document,
+    recipients: [...new Set([...recipientsFor(collection, document), ...recipientsFor(collection, previous)])],
+    timestamp: new Date().toISOString()
+  }
+}
+
+// Called by routes after a successful write. `document` is the state after
+// the write (or the removed document for deletes). While the change stream
+// is running it already reports these writes, so nothing is emitted here;
+// without pre-images it cannot address deletes or users an update removed,
+// so those are still emitted in-process.
+export function publishSocialChange(collection, operation, document, previous = null) {
+  if (!state.changeStream) {
+    state.emitter.emit('change', toEvent(collection, operation, document, previous))
+    return
+  }
+  if (state.preImages) {
+    return
+  }
+
+  if (operation === 'delete') {
+    state.emitter.emit('change', toEvent(collection, operation, document, previous))
+  } else if (previous) {
+    const event = toEvent(collection, operation, document, previous)
+    const current = new Set(recipientsFor(collection, document))
+    event.recipients = event.recipients.filter((id) => !current.has(id))
+    if (event.recipients.length > 0) {
+      state.emitter.emit('change', event)
+    }
+  }
+}
+
+export function onSocialChange(listener) {
+  state.emitter.on('change', listener)
+  return () => state.emitter.off('change', listener)
+}
+
+// Delivery to connected sockets; registered by whichever process owns them.
+export function setSocketTransport(transport) {
+  state.transport = transport
+}
+
+export function deliverToUser(userId, event, data) {
+  return state.transport ? state.transport(userId, event, data) : false
+}
+
+// Deletes and member removals need the document as it was before the change,
+// which the stream only reports for collections with pre-images enabled
+// (MongoDB 6.0+).
+async function enablePreImages(db) {
+  const options = { changeStreamPreAndPostImages: { enabled: true } }
+  const existing = new Set((await db.listCollections({}, { nameOnly: true }).toArray()).map((collection) => collection.name))
+
+  await Promise.all(SOCIAL_COLLECTIONS.map(async (name) => {
+    if (!existing.has(name)) {
+      try {
+        await db.createCollection(name, options)
+        return
+      } catch (error) {
+        // Created concurrently by another process
+        if (error.codeName !== 'NamespaceExists') {
+          throw error
+        }
+      }
+    }
+    await db.command({ collMod: name, ...options })
+  }))
+}
+
+// Change streams need a replica set; on errors the stream is dropped (so
+// routes emit in-process again) and retried.
+export async function startSocialChangeStream(dbName = process.env.DB_NAME || 'turfloot_db') {
+  if (state.changeStream) {
+    return
+  }
+
+  try {
+    const db = await getDb(dbName)
+
+    if (!state.preImages) {
+      try {
+        await enablePreImages(db)
+        state.preImages = true
+      } catch (error) {
+        console.warn('⚠️ Change stream pre-images unavailable, emitting deletes in-process:', error.message)
+      }
+    }
+
+    const stream = db.watch(
+      [{ $match: { 'ns.coll': { $in: SOCIAL_COLLECTIONS }, operationType: { $in: ['insert', 'update', 'replace', 'delete'] } } }],
+      { fullDocument: 'updateLookup', fullDocumentBeforeChange: 'whenAvailable' }
+    )
+
+    stream.on('change', (change) => {
+      const operation = change.operationType === 'replace' ? 'update' : change.operationType
+      const event = toEvent(change.ns.coll, operation, change.fullDocument, change.fullDocumentBeforeChange)
+      // Without a pre-image a delete has no recipients; the route emitted it
+      if (event.recipients.length > 0) {
+        state.emitter.emit('change', event)
+      }
+    })
+
+    stream.on('error', (error) => {
+      console.warn('⚠️ Social change stream error:', error.message)
+      stream.close().catch(() => {})
+      state.changeStream = null
+      setTimeout(() => startSocialChangeStream(dbName), CHANGE_STREAM_RETRY_MS)
+    })
+
+    state.changeStream = stream
+    console.log('📡 Social change stream started')
+  } catch (error) {
+    console.warn('⚠️ Social change stream unavailable, using in-process events:', error.message)
+  }
+}
@@ -1,13 +1,15 @@
 // Solana blockchain integration utilities
 import {
-  Connection,
   PublicKey,
   LAMPORTS_PER_SOL,
   Transaction,
   SystemProgram,
-  ComputeBudgetProgram
+  ComputeBudgetProgram,
+  VersionedTransaction
 } from '@solana/web3.js';
+import bs58 from 'bs58';
 import { TOKEN_PROGRAM_ID } from '@solana/spl-token';
+import { backoffDelay, getRpcConnection } from './rpcGateway.js';
 
 export const MEMO_PROGRAM_ID = 'MemoSq4gqABAXKb96qnH8TysNcWxMyWCqXgDLGmfcHr';
 
@@ -55,12 +57,13 @@ const deriveDefaultRpc = () => {
     : 'https://api.devnet.solana.com';
 };
 
-const SOLANA_RPC_URL = deriveDefaultRpc();
+// SOLANA_RPC_URLS lists endpoints in order of preference for failover
+const SOLANA_RPC_URLS = (process.env.SOLANA_RPC_URLS || '')
+  .split(',')
+  .map((url) => url.trim())
+  .filter(Boolean);
 
-const connection = new Connection(SOLANA_RPC_URL, {
-  commitment: 'confirmed',
-  disableRetryOnRateLimit: false
-});
+const connection = getRpcConnection(SOLANA_RPC_URLS.length ? SOLANA_RPC_URLS : [deriveDefaultRpc()]);
 
 let cachedBlockhash = null;
 let cachedBlockhashFetchedAt = 0;
@@ -189,6 +192,8 @@ export async function getTransactionStatus(signature) {
   }
 }
 
+// HTTP-level failures are already retried by the RPC gateway; this covers
+// errors surfaced by web3.js itself (e.g. JSON-RPC errors).
 async function withRetries(fn, { retries = 5, delayMs = 1_000 } = {}) {
   let attempt = 0;
   while (attempt <= retries) {
@@ -199,7 +204,7 @@ async function withRetries(fn, { retries = 5, delayMs = 1_000 } = {}) {
       if (attempt > retries) {
         throw error;
       }
-      await new Promise((resolve) => setTimeout(resolve, delayMs * attempt));
+      await new Promise((resolve) => setTimeout(resolve, backoffDelay(attempt, delayMs)));
     }
   }
 }
@@ -226,4 +231,62 @@ export async function getRawTransactionWithRetries(signature, options = {}) {
   );
 }
 
+// getSignatureStatuses accepts at most 256 signatures per call
+const SIGNATURE_STATUS_CHUNK = 256;
+const TRANSACTION_BATCH_CHUNK = Number(process.env.SOLANA_TX_BATCH_SIZE || 50);
+
+function chunk(items, size) {
+  const chunks = [];
+  for (let i = 0; i < items.length; i += size) {
+    chunks.push(items.slice(i, i + size));
+  }
+  return chunks;
+}
+
+// Returns signature -> status (or null when the cluster has not seen it).
+export async function getSignatureStatusesBatched(signatures, options = {}) {
+  const statuses = new Map();
+  for (const signatureChunk of chunk(signatures, SIGNATURE_STATUS_CHUNK)) {
+    // eslint-disable-next-line no-await-in-loop
+    const response = await withRetries(
+      () => connection.getSignatureStatuses(signatureChunk, { searchTransactionHistory: true }),
+      options
+    );
+    signatureChunk.forEach((signature, index) => {
+      statuses.set(signature, response?.value?.[index] || null);
+    });
+  }
+  return statuses;
+}
+
+// Fetches many transactions as JSON-RPC batch requests; returns
+// signature -> transaction response (or null when not yet available).
+export async function getTransactionsWithRetries(signatures, options = {}) {
+  const transactions = new Map();
+  await Promise.all(chunk(signatures, TRANSACTION_BATCH_CHUNK).map(async (signatureChunk) => {
+    const responses = await withRetries(
+      () =>
+        connection.getTransactions(signatureChunk, {
+          commitment: 'confirmed',
+          maxSupportedTransactionVersion: 0
+        }),
+      options
+    );
+    signatureChunk.forEach((signature, index) => {
+      transactions.set(signature, responses?.[index] || null);
+    });
+  }));
+  return transactions;
+}
+
+// Rebuilds the wire-format transaction from a getTransaction response.
+export function serializeTransactionResponse(response) {
+  const { message, signatures } = response.transaction;
+  const transaction = new VersionedTransaction(
+    message,
+    signatures.map((signature) => bs58.decode(signature))
+  );
+  return Buffer.from(transaction.serialize()).toString('base64');
+}
+
 export { connection, PublicKey, SystemProgram };
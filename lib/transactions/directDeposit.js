@@ -5,46 +5,45 @@
 
 import { v4 as uuidv4 } from 'uuid'
 import { adjustBalance } from './transactionManager.js'
+import { getDb as getSharedDb } from '../mongodb.js'
+import { ensureManifestIndexes } from '../indexManifest.js'
+import { mapWithConcurrency } from '../paid/verificationPipeline.js'
+import { invalidateWallet } from '../walletCache.js'
+import { invalidateCachedRoutes } from '../responseCache.js'
+
+// Balance adjustments run with bounded concurrency when a batch is applied
+const CREDIT_CONCURRENCY = 8
 
 /**
- * Get MongoDB connection
+ * Get MongoDB connection from the shared pool
+ * (database named in the connection string)
  */
-const getDb = async () => {
-  const { MongoClient } = await import('mongodb')
-  const client = new MongoClient(process.env.MONGO_URL)
-  await client.connect()
-  return { client, db: client.db() }
-}
+const getDb = () => getSharedDb(null)
 
 /**
  * Create pending deposit record
  * Used to track which user initiated a deposit
  */
 export async function createPendingDeposit(userId, amountUsd) {
-  const { client, db } = await getDb()
+  const db = await getDb()
+
+  const pendingDeposits = db.collection('pending_deposits')
   
-  try {
-    const pendingDeposits = db.collection('pending_deposits')
-    
-    const deposit = {
-      _id: uuidv4(),
-      user_id: userId,
-      user_wallet: userId, // Store wallet address
-      amount_usd: amountUsd,
-      status: 'pending',
-      created_at: new Date(),
-      expires_at: new Date(Date.now() + 30 * 60 * 1000) // 30 minutes
-    }
-    
-    await pendingDeposits.insertOne(deposit)
-    
-    console.log('📝 Created pending deposit:', deposit._id)
-    
-    return deposit
-    
-  } finally {
-    await client.close()
+  const deposit = {
+    _id: uuidv4(),
+    user_id: userId,
+    user_wallet: userId, // Store wallet address
+    amount_usd: amountUsd,
+    status: 'pending',
+    created_at: new Date(),
+    expires_at: new Date(Date.now() + 30 * 60 * 1000) // 30 minutes
   }
+  
+  await pendingDeposits.insertOne(deposit)
+  
+  console.log('📝 Created pending deposit:', deposit._id)
+  
+  return deposit
 }
 
 /**
@@ -52,56 +51,28 @@ export async function createPendingDeposit(userId, amountUsd) {
  * Matches deposit by user and amount within time window
  */
 export async function completePendingDeposit(userId, amountUsd, signature) {
-  const { client, db } = await getDb()
+  const db = await getDb()
+
+  const pendingDeposits = db.collection('pending_deposits')
   
-  try {
-    const pendingDeposits = db.collection('pending_deposits')
-    
-    // Find pending deposit for this user with similar amount
-    // Allow 5% variance for exchange rate fluctuations
-    const minAmount = amountUsd * 0.95
-    const maxAmount = amountUsd * 1.05
-    
-    const deposit = await pendingDeposits.findOne({
-      user_id: userId,
-      status: 'pending',
-      amount_usd: { $gte: minAmount, $lte: maxAmount },
-      expires_at: { $gt: new Date() }
-    })
-    
-    if (!deposit) {
-      console.warn('⚠️ No matching pending deposit found')
-      // Still credit the user even without pending record
-      // This handles cases where deposit came from external wallet
-      console.log('💰 Crediting user directly without pending record')
-      
-      await adjustBalance(
-        userId,
-        amountUsd,
-        'deposit',
-        'completed',
-        signature,
-        `Direct deposit: $${amountUsd.toFixed(2)}`,
-        { direct_deposit: true, no_pending_record: true }
-      )
-      
-      return { credited: true, amount: amountUsd }
-    }
-    
-    // Mark deposit as completed
-    await pendingDeposits.updateOne(
-      { _id: deposit._id },
-      { 
-        $set: { 
-          status: 'completed',
-          signature,
-          completed_at: new Date(),
-          actual_amount: amountUsd
-        } 
-      }
-    )
+  // Find pending deposit for this user with similar amount
+  // Allow 5% variance for exchange rate fluctuations
+  const minAmount = amountUsd * 0.95
+  const maxAmount = amountUsd * 1.05
+  
+  const deposit = await pendingDeposits.findOne({
+    user_id: userId,
+    status: 'pending',
+    amount_usd: { $gte: minAmount, $lte: maxAmount },
+    expires_at: { $gt: new Date() }
+  })
+  
+  if (!deposit) {
+    console.warn('⚠️ No matching pending deposit found')
+    // Still credit the user even without pending record
+    // This handles cases where deposit came from external wallet
+    console.log('💰 Crediting user directly without pending record')
     
-    // Credit user's mock balance
     await adjustBalance(
       userId,
       amountUsd,
@@ -109,71 +80,258 @@ export async function completePendingDeposit(userId, amountUsd, signature) {
       'completed',
       signature,
       `Direct deposit: $${amountUsd.toFixed(2)}`,
-      { 
-        direct_deposit: true,
-        pending_deposit_id: deposit._id,
-        expected_amount: deposit.amount_usd,
-        actual_amount: amountUsd
-      }
+      { direct_deposit: true, no_pending_record: true }
     )
+    invalidateWallet(userId)
+    await invalidateCachedRoutes('rooms/tiers')
     
-    console.log('✅ Completed pending deposit and credited balance')
-    
-    return { credited: true, amount: amountUsd, deposit }
-    
-  } finally {
-    await client.close()
+    return { credited: true, amount: amountUsd }
   }
+  
+  // Mark deposit as completed
+  await pendingDeposits.updateOne(
+    { _id: deposit._id },
+    { 
+      $set: { 
+        status: 'completed',
+        signature,
+        completed_at: new Date(),
+        actual_amount: amountUsd
+      } 
+    }
+  )
+  
+  // Credit user's mock balance
+  await adjustBalance(
+    userId,
+    amountUsd,
+    'deposit',
+    'completed',
+    signature,
+    `Direct deposit: $${amountUsd.toFixed(2)}`,
+    { 
+      direct_deposit: true,
+      pending_deposit_id: deposit._id,
+      expected_amount: deposit.amount_usd,
+      actual_amount: amountUsd
+    }
+  )
+  
+  invalidateWallet(userId)
+  await invalidateCachedRoutes('rooms/tiers')
+  console.log('✅ Completed pending deposit and credited balance')
+  
+  return { credited: true, amount: amountUsd, deposit }
+}
+
+function amountMatches(deposit, amountUsd) {
+  return deposit.amount_usd >= amountUsd * 0.95 && deposit.amount_usd <= amountUsd * 1.05
+}
+
+function isDuplicateKeyError(writeError) {
+  return writeError?.code === 11000
 }
 
 /**
- * Clean up expired pending deposits
+ * Complete a batch of deposits from webhook transfers
+ * Each deposit is { creditId, userId, amountUsd, signature, metadata }, where
+ * creditId identifies the transfer (signature + transfer index). Credits are
+ * recorded in `deposit_credits` under that id, so a redelivered transfer is
+ * never credited twice. Pending deposits for all depositors are matched with
+ * one query and completed with one bulkWrite.
  */
-export async function cleanupExpiredDeposits() {
-  const { client, db } = await getDb()
-  
+export async function completePendingDeposits(deposits) {
+  if (deposits.length === 0) {
+    return []
+  }
+
+  const db = await getDb()
+  await ensureManifestIndexes(db, 'default', ['deposit_credits', 'pending_deposits'])
+
+  const credits = db.collection('deposit_credits')
+  const pendingDeposits = db.collection('pending_deposits')
+  const now = new Date()
+
+  // Record every credit; the unique _id turns redeliveries into no-ops
   try {
-    const pendingDeposits = db.collection('pending_deposits')
-    
-    const result = await pendingDeposits.updateMany(
-      {
-        status: 'pending',
-        expires_at: { $lt: new Date() }
-      },
-      {
-        $set: { status: 'expired' }
-      }
+    await credits.bulkWrite(
+      deposits.map((deposit) => ({
+        insertOne: {
+          document: {
+            _id: deposit.creditId,
+            user_id: deposit.userId,
+            amount_usd: deposit.amountUsd,
+            signature: deposit.signature,
+            metadata: deposit.metadata || {},
+            status: 'pending',
+            created_at: now
+          }
+        }
+      })),
+      { ordered: false }
     )
-    
-    console.log(`🧹 Marked ${result.modifiedCount} deposits as expired`)
-    
-    return result.modifiedCount
-    
-  } finally {
-    await client.close()
+  } catch (error) {
+    if (!error.writeErrors || !error.writeErrors.every(isDuplicateKeyError)) {
+      throw error
+    }
   }
+
+  // Claim the credits that have not been applied yet. A credit left in
+  // `applying` by a crash is never retried automatically, so a balance is
+  // credited at most once
+  const claimId = uuidv4()
+  await credits.updateMany(
+    { _id: { $in: deposits.map((deposit) => deposit.creditId) }, status: 'pending' },
+    { $set: { status: 'applying', claim_id: claimId, claimed_at: now } }
+  )
+  const claimed = new Set(
+    (await credits.find({ claim_id: claimId }, { projection: { _id: 1 } }).toArray()).map((credit) => credit._id)
+  )
+
+  const toApply = deposits.filter((deposit) => claimed.has(deposit.creditId))
+
+  // Match pending deposits in memory: oldest first, each used once
+  const open = toApply.length === 0 ? [] : await pendingDeposits
+    .find({
+      user_id: { $in: [...new Set(toApply.map((deposit) => deposit.userId))] },
+      status: 'pending',
+      expires_at: { $gt: now }
+    })
+    .sort({ created_at: 1 })
+    .toArray()
+
+  const matches = new Map()
+  for (const deposit of toApply) {
+    const index = open.findIndex((pending) => pending.user_id === deposit.userId && amountMatches(pending, deposit.amountUsd))
+    if (index !== -1) {
+      matches.set(deposit.creditId, open.splice(index, 1)[0])
+    }
+  }
+
+  if (matches.size > 0) {
+    await pendingDeposits.bulkWrite(
+      toApply.filter((deposit) => matches.has(deposit.creditId)).map((deposit) => ({
+        updateOne: {
+          filter: { _id: matches.get(deposit.creditId)._id, status: 'pending' },
+          update: {
+            $set: {
+              status: 'completed',
+              signature: deposit.signature,
+              completed_at: now,
+              actual_amount: deposit.amountUsd
+            }
+          }
+        }
+      })),
+      { ordered: false }
+    )
+  }
+
+  const applied = await mapWithConcurrency(toApply, CREDIT_CONCURRENCY, async (deposit) => {
+    const pending = matches.get(deposit.creditId)
+    try {
+      await adjustBalance(
+        deposit.userId,
+        deposit.amountUsd,
+        'deposit',
+        'completed',
+        deposit.signature,
+        `Direct deposit: $${deposit.amountUsd.toFixed(2)}`,
+        pending
+          ? {
+            direct_deposit: true,
+            pending_deposit_id: pending._id,
+            expected_amount: pending.amount_usd,
+            actual_amount: deposit.amountUsd,
+            ...deposit.metadata
+          }
+          : { direct_deposit: true, no_pending_record: true, ...deposit.metadata }
+      )
+      return { creditId: deposit.creditId, ok: true }
+    } catch (error) {
+      console.error(`❌ Failed to credit deposit ${deposit.creditId}:`, error)
+      return { creditId: deposit.creditId, ok: false, error: error.message }
+    }
+  })
+
+  // Depositors are identified by their wallet address
+  invalidateWallet(...new Set(toApply.map((deposit) => deposit.userId)))
+  await invalidateCachedRoutes('rooms/tiers')
+
+  // Credits that could not be applied go back to pending, so the queue's
+  // retry of the delivery applies them
+  const outcomes = new Map(applied.map((result) => [result.creditId, result]))
+  await credits.bulkWrite(
+    applied.map((result) => ({
+      updateOne: {
+        filter: { _id: result.creditId, claim_id: claimId },
+        update: result.ok
+          ? { $set: { status: 'applied', applied_at: new Date() } }
+          : { $set: { status: 'pending', error: result.error }, $unset: { claim_id: '' }, $inc: { attempts: 1 } }
+      }
+    })),
+    { ordered: false }
+  ).catch((error) => {
+    console.error('❌ Failed to record applied deposit credits:', error)
+  })
+
+  console.log(`✅ Applied ${applied.filter((result) => result.ok).length}/${deposits.length} deposit credits`)
+
+  return deposits.map((deposit) => {
+    const outcome = outcomes.get(deposit.creditId)
+    if (!outcome) {
+      return { signature: deposit.signature, status: 'duplicate', user: deposit.userId }
+    }
+    return outcome.ok
+      ? {
+        signature: deposit.signature,
+        status: 'success',
+        user: deposit.userId,
+        amount_usd: deposit.amountUsd,
+        matched_pending: matches.has(deposit.creditId)
+      }
+      : { signature: deposit.signature, status: 'error', user: deposit.userId, error: outcome.error }
+  })
+}
+
+/**
+ * Clean up expired pending deposits
+ */
+export async function cleanupExpiredDeposits() {
+  const db = await getDb()
+
+  const pendingDeposits = db.collection('pending_deposits')
+  
+  const result = await pendingDeposits.updateMany(
+    {
+      status: 'pending',
+      expires_at: { $lt: new Date() }
+    },
+    {
+      $set: { status: 'expired' }
+    }
+  )
+  
+  console.log(`🧹 Marked ${result.modifiedCount} deposits as expired`)
+  
+  return result.modifiedCount
 }
 
 /**
  * Get pending deposits for user
  */
 export async function getUserPendingDeposits(userId) {
-  const { client, db } = await getDb()
+  const db = await getDb()
+
+  const pendingDeposits = db.collection('pending_deposits')
   
-  try {
-    const pendingDeposits = db.collection('pending_deposits')
-    
-    const deposits = await pendingDeposits
-      .find({
-        user_id: userId,
-        status: 'pending'
-      })
-      .sort({ created_at: -1 })
-      .toArray()
-    
-    return deposits
-    
-  } finally {
-    await client.close()
-  }
+  const deposits = await pendingDeposits
+    .find({
+      user_id: userId,
+      status: 'pending'
+    })
+    .sort({ created_at: -1 })
+    .toArray()
+  
+  return deposits
 }
\ No newline at end of file
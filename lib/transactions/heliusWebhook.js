@@ -3,8 +3,7 @@
  * Processes deposits TO platform wallet and credits users
  */
 
-import { completePendingDeposit } from './directDeposit.js'
-import { markSignatureProcessed, isSignatureProcessed } from './transactionManager.js'
+import { drainWebhookQueue, enqueueWebhookTransactions, ensureWebhookQueueWorker } from './webhookQueue.js'
 
 /**
  * Verify Helius webhook signature
@@ -21,188 +20,29 @@ export function verifyWebhookSignature(payload, signature) {
 }
 
 /**
- * Convert lamports to SOL
- */
-function lamportsToSol(lamports) {
-  return lamports / 1_000_000_000
-}
-
-/**
- * Convert SOL to USD (mock rate for now)
- */
-function solToUsd(sol) {
-  const USD_PER_SOL = parseFloat(process.env.USD_PER_SOL || '150')
-  return sol * USD_PER_SOL
-}
-
-/**
- * Process Helius webhook transaction
- * Credits users who deposit to platform wallet
+ * Process Helius webhook transactions
+ * Deliveries are queued (de-duplicated by signature) and acknowledged
+ * immediately; deposits TO the platform wallet are credited by the queue
+ * worker, so a large batch no longer times out and gets re-delivered.
  */
 export async function processHeliusWebhook(webhookData) {
   try {
-    console.log('📥 Processing Helius webhook for direct deposits...')
-    
     const transactions = Array.isArray(webhookData) ? webhookData : [webhookData]
-    const results = []
-    const platformWallet = process.env.PLATFORM_WALLET_ADDRESS
-    
-    if (!platformWallet) {
+
+    if (!process.env.PLATFORM_WALLET_ADDRESS) {
       throw new Error('PLATFORM_WALLET_ADDRESS not configured')
     }
-    
-    for (const tx of transactions) {
-      try {
-        const signature = tx.signature
-        
-        if (!signature) {
-          console.warn('⚠️ No signature in webhook data')
-          continue
-        }
-        
-        // Check if already processed
-        if (await isSignatureProcessed(signature)) {
-          console.log(`✅ Signature ${signature} already processed`)
-          results.push({ signature, status: 'duplicate' })
-          continue
-        }
-        
-        const nativeTransfers = tx.nativeTransfers || []
-        const tokenTransfers = tx.tokenTransfers || []
-        
-        console.log(`📝 Transaction ${signature}`)
-        console.log(`📝 Native transfers: ${nativeTransfers.length}`)
-        
-        // Process native SOL transfers TO platform wallet
-        for (const transfer of nativeTransfers) {
-          const toAddress = transfer.toUserAccount
-          const fromAddress = transfer.fromUserAccount
-          const amountLamports = transfer.amount
-          
-          if (!toAddress || !amountLamports || !fromAddress) {
-            continue
-          }
-          
-          // Only process deposits TO platform wallet
-          if (toAddress.toLowerCase() !== platformWallet.toLowerCase()) {
-            console.log(`⏩ Skipping - not to platform wallet (to: ${toAddress})`)
-            continue
-          }
-          
-          const solAmount = lamportsToSol(amountLamports)
-          const usdAmount = solToUsd(solAmount)
-          
-          console.log(`💰 Direct Deposit Detected!`)
-          console.log(`   From: ${fromAddress}`)
-          console.log(`   To: ${toAddress} (Platform Wallet)`)
-          console.log(`   Amount: ${solAmount.toFixed(4)} SOL (≈$${usdAmount.toFixed(2)})`)
-          
-          try {
-            // Credit the user who sent the funds
-            const result = await completePendingDeposit(
-              fromAddress,
-              usdAmount,
-              signature
-            )
-            
-            console.log(`✅ Credited $${result.amount.toFixed(2)} to ${fromAddress}`)
-            
-            results.push({
-              signature,
-              status: 'success',
-              user: fromAddress,
-              amount_usd: result.amount,
-              amount_sol: solAmount,
-              matched_pending: !!result.deposit
-            })
-            
-          } catch (balanceError) {
-            console.error(`❌ Failed to credit balance:`, balanceError)
-            results.push({
-              signature,
-              status: 'error',
-              user: fromAddress,
-              error: balanceError.message
-            })
-          }
-        }
-        
-        // Process token transfers (USDC, etc.) TO platform wallet
-        for (const transfer of tokenTransfers) {
-          const toAddress = transfer.toUserAccount
-          const fromAddress = transfer.fromUserAccount
-          const tokenAmount = transfer.tokenAmount
-          const mint = transfer.mint
-          
-          if (!toAddress || !tokenAmount || !fromAddress) {
-            continue
-          }
-          
-          // Only process to platform wallet
-          if (toAddress.toLowerCase() !== platformWallet.toLowerCase()) {
-            console.log(`⏩ Skipping token transfer - not to platform wallet`)
-            continue
-          }
-          
-          const usdAmount = tokenAmount // Assume 1:1 for USDC
-          
-          console.log(`💰 Token Deposit to Platform!`)
-          console.log(`   From: ${fromAddress}`)
-          console.log(`   Amount: ${tokenAmount} tokens`)
-          console.log(`   Mint: ${mint}`)
-          
-          try {
-            const result = await completePendingDeposit(
-              fromAddress,
-              usdAmount,
-              signature
-            )
-            
-            console.log(`✅ Credited $${result.amount.toFixed(2)} to ${fromAddress}`)
-            
-            results.push({
-              signature,
-              status: 'success',
-              user: fromAddress,
-              amount_usd: result.amount,
-              token: mint,
-              matched_pending: !!result.deposit
-            })
-            
-          } catch (balanceError) {
-            console.error(`❌ Failed to credit token balance:`, balanceError)
-            results.push({
-              signature,
-              status: 'error',
-              user: fromAddress,
-              error: balanceError.message
-            })
-          }
-        }
-        
-        // Mark signature as processed
-        await markSignatureProcessed(signature, {
-          type: tx.type,
-          processed_at: new Date(),
-          transfers_to_platform: nativeTransfers.length + tokenTransfers.length
-        })
-        
-      } catch (txError) {
-        console.error(`❌ Error processing transaction:`, txError)
-        results.push({
-          signature: tx.signature,
-          status: 'error',
-          error: txError.message
-        })
-      }
-    }
-    
+
+    const result = await enqueueWebhookTransactions(transactions)
+    console.log(`📥 Queued ${result.queued}/${result.received} Helius webhook transactions (${result.duplicates} duplicates)`)
+
+    ensureWebhookQueueWorker()
+    drainWebhookQueue()
+
     return {
       success: true,
-      processed: results.length,
-      results
+      ...result
     }
-    
   } catch (error) {
     console.error('❌ Helius webhook processing error:', error)
     throw error
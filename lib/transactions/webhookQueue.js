@@ -0,0 +1,272 @@
+/**
+ * Helius Webhook Queue
+ * Webhook deliveries are stored in `helius_webhook_queue` (one document per
+ * transaction signature) and acknowledged straight away; a worker drains the
+ * queue in batches. The signature is the document _id, so a re-delivered
+ * webhook is de-duplicated by the queue itself.
+ */
+
+import { v4 as uuidv4 } from 'uuid'
+import { getDb as getSharedDb } from '../mongodb.js'
+import { ensureManifestIndexes } from '../indexManifest.js'
+import { completePendingDeposits } from './directDeposit.js'
+
+const QUEUE_COLLECTION = 'helius_webhook_queue'
+const BATCH_SIZE = Number(process.env.HELIUS_QUEUE_BATCH_SIZE || 100)
+const POLL_INTERVAL_MS = Number(process.env.HELIUS_QUEUE_POLL_MS || 2_000)
+// A claimed batch that is not finished within this window is picked up again
+const CLAIM_TIMEOUT_MS = 60_000
+const MAX_ATTEMPTS = 5
+
+const getDb = () => getSharedDb(null)
+
+async function getQueue() {
+  const db = await getDb()
+  await ensureManifestIndexes(db, 'default', [QUEUE_COLLECTION])
+  return db.collection(QUEUE_COLLECTION)
+}
+
+/**
+ * Convert lamports to SOL
+ */
+function lamportsToSol(lamports) {
+  return lamports / 1_000_000_000
+}
+
+/**
+ * Convert SOL to USD (mock rate for now)
+ */
+function solToUsd(sol) {
+  const USD_PER_SOL = parseFloat(process.env.USD_PER_SOL || '150')
+  return sol * USD_PER_SOL
+}
+
+/**
+ * Extract deposits TO the platform wallet from a Helius transaction
+ */
+export function extractDeposits(tx, platformWallet) {
+  const deposits = []
+  const wallet = platformWallet.toLowerCase()
+
+  ;(tx.nativeTransfers || []).forEach((transfer, index) => {
+    const { toUserAccount, fromUserAccount, amount } = transfer
+    if (!toUserAccount || !fromUserAccount || !amount || toUserAccount.toLowerCase() !== wallet) {
+      return
+    }
+    const solAmount = lamportsToSol(amount)
+    deposits.push({
+      creditId: `${tx.signature}:native:${index}`,
+      userId: fromUserAccount,
+      amountUsd: solToUsd(solAmount),
+      signature: tx.signature,
+      metadata: { amount_sol: solAmount }
+    })
+  })
+
+  ;(tx.tokenTransfers || []).forEach((transfer, index) => {
+    const { toUserAccount, fromUserAccount, tokenAmount, mint } = transfer
+    if (!toUserAccount || !fromUserAccount || !tokenAmount || toUserAccount.toLowerCase() !== wallet) {
+      return
+    }
+    deposits.push({
+      creditId: `${tx.signature}:token:${index}`,
+      userId: fromUserAccount,
+      amountUsd: tokenAmount, // Assume 1:1 for USDC
+      signature: tx.signature,
+      metadata: { token: mint }
+    })
+  })
+
+  return deposits
+}
+
+/**
+ * Store webhook transactions for processing
+ * Already-known signatures are found with one $in query; the rest are
+ * upserted in one bulkWrite.
+ */
+export async function enqueueWebhookTransactions(transactions) {
+  const queue = await getQueue()
+  const bySignature = new Map()
+  for (const tx of transactions) {
+    if (tx?.signature) {
+      bySignature.set(tx.signature, tx)
+    } else {
+      console.warn('⚠️ No signature in webhook data')
+    }
+  }
+
+  const known = await queue
+    .find({ _id: { $in: [...bySignature.keys()] } }, { projection: { _id: 1 } })
+    .toArray()
+  known.forEach(({ _id }) => bySignature.delete(_id))
+
+  let queued = 0
+  if (bySignature.size > 0) {
+    const now = new Date()
+    const result = await queue.bulkWrite(
+      [...bySignature.values()].map((tx) => ({
+        updateOne: {
+          filter: { _id: tx.signature },
+          update: {
+            $setOnInsert: {
+              payload: tx,
+              status: 'queued',
+              attempts: 0,
+              received_at: now,
+              available_at: now
+            }
+          },
+          upsert: true
+        }
+      })),
+      { ordered: false }
+    )
+    queued = result.upsertedCount
+  }
+
+  return {
+    received: transactions.length,
+    queued,
+    duplicates: transactions.length - queued
+  }
+}
+
+async function claimBatch(queue, now) {
+  const candidates = await queue
+    .find(
+      { status: { $in: ['queued', 'processing'] }, available_at: { $lte: now } },
+      { projection: { _id: 1 } }
+    )
+    .sort({ available_at: 1 })
+    .limit(BATCH_SIZE)
+    .toArray()
+
+  if (candidates.length === 0) {
+    return []
+  }
+
+  const claimId = uuidv4()
+  await queue.updateMany(
+    {
+      _id: { $in: candidates.map(({ _id }) => _id) },
+      status: { $in: ['queued', 'processing'] },
+      available_at: { $lte: now }
+    },
+    {
+      $set: { status: 'processing', claim_id: claimId, available_at: new Date(now.getTime() + CLAIM_TIMEOUT_MS) },
+      $inc: { attempts: 1 }
+    }
+  )
+
+  return queue.find({ claim_id: claimId }).toArray()
+}
+
+// Requeues a claimed item with exponential backoff, or fails it for good
+// after MAX_ATTEMPTS
+function retryUpdate(item, errorMessage) {
+  const exhausted = item.attempts >= MAX_ATTEMPTS
+  return {
+    updateOne: {
+      filter: { _id: item._id, claim_id: item.claim_id },
+      update: {
+        $set: {
+          status: exhausted ? 'failed' : 'queued',
+          available_at: new Date(Date.now() + 2 ** item.attempts * 1_000),
+          last_error: errorMessage,
+          ...(exhausted ? { completed_at: new Date() } : {})
+        },
+        $unset: { claim_id: '' }
+      }
+    }
+  }
+}
+
+/**
+ * Process one batch of queued webhook transactions
+ * Returns the number of transactions processed.
+ */
+export async function processWebhookQueueBatch() {
+  const platformWallet = process.env.PLATFORM_WALLET_ADDRESS
+  if (!platformWallet) {
+    throw new Error('PLATFORM_WALLET_ADDRESS not configured')
+  }
+
+  const queue = await getQueue()
+  const now = new Date()
+  const items = await claimBatch(queue, now)
+  if (items.length === 0) {
+    return 0
+  }
+
+  const deposits = items.flatMap((item) => extractDeposits(item.payload, platformWallet))
+  console.log(`📥 Processing ${items.length} queued webhook transactions (${deposits.length} deposits)`)
+
+  try {
+    const results = await completePendingDeposits(deposits)
+    const failed = new Map(
+      results.filter((result) => result.status === 'error').map((result) => [result.signature, result.error])
+    )
+
+    // Items with a credit that failed to apply are retried; their applied
+    // credits are skipped on the next attempt
+    await queue.bulkWrite(
+      items.map((item) => (failed.has(item._id)
+        ? retryUpdate(item, failed.get(item._id))
+        : {
+          updateOne: {
+            filter: { _id: item._id, claim_id: item.claim_id },
+            update: {
+              $set: {
+                status: 'done',
+                completed_at: new Date(),
+                deposits: results.filter((result) => result.signature === item._id).length
+              },
+              $unset: { claim_id: '' }
+            }
+          }
+        })),
+      { ordered: false }
+    )
+  } catch (error) {
+    console.error('❌ Webhook queue batch failed:', error)
+    // Retry with exponential backoff; credits already recorded are skipped
+    await queue.bulkWrite(items.map((item) => retryUpdate(item, error.message)), { ordered: false })
+  }
+
+  return items.length
+}
+
+const worker = globalThis._heliusWebhookQueueWorker || (globalThis._heliusWebhookQueueWorker = {
+  draining: null,
+  interval: null
+})
+
+/**
+ * Drain the queue until it is empty; concurrent calls share one run
+ */
+export function drainWebhookQueue() {
+  if (!worker.draining) {
+    worker.draining = (async () => {
+      while (await processWebhookQueueBatch() > 0) {
+        // keep draining
+      }
+    })()
+      .catch((error) => {
+        console.error('❌ Webhook queue drain failed:', error)
+      })
+      .finally(() => {
+        worker.draining = null
+      })
+  }
+  return worker.draining
+}
+
+/**
+ * Poll the queue so deliveries left by a restart or a failed batch are picked up
+ */
+export function ensureWebhookQueueWorker() {
+  if (worker.interval) return
+  worker.interval = setInterval(drainWebhookQueue, POLL_INTERVAL_MS)
+  worker.interval.unref?.()
+}
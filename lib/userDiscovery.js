@@ -0,0 +1,142 @@
+// Friend discovery over the users collection.
+// Whether an account is a test account, and whether it can be discovered at
+// all, is decided once when the user document is written. Discovery then
+// walks the { isDiscoverable, userIdentifier } index a page at a time, so
+// its cost depends on the page size and the caller's own friend/request
+// count, not on how many users exist.
+
+import { ensureManifestIndexes } from './indexManifest.js'
+
+export const TEST_ACCOUNT_PATTERN = /(test|debug|mock|demo|cashout\.test|debug\.test)/i
+const TEST_ACCOUNT_PREFIX = /^(test_|mock_|debug_|cashout_)/i
+
+export const DEFAULT_DISCOVERY_PAGE_SIZE = 50
+export const MAX_DISCOVERY_PAGE_SIZE = 100
+
+let indexesReady = null
+
+export function classifyUserAccount({ userIdentifier, username, email, walletAddress } = {}) {
+  const hasContact = Boolean(email) || Boolean(walletAddress)
+  const isTestAccount = TEST_ACCOUNT_PATTERN.test(userIdentifier || '') ||
+    TEST_ACCOUNT_PATTERN.test(username || '') ||
+    (!hasContact && TEST_ACCOUNT_PREFIX.test(userIdentifier || ''))
+
+  return {
+    isTestAccount,
+    isDiscoverable: !isTestAccount && hasContact && Boolean(userIdentifier)
+  }
+}
+
+export function encodeDiscoveryCursor(userIdentifier) {
+  return Buffer.from(userIdentifier, 'utf8').toString('base64url')
+}
+
+export function decodeDiscoveryCursor(cursor) {
+  if (!cursor) {
+    return null
+  }
+
+  try {
+    return Buffer.from(cursor, 'base64url').toString('utf8') || null
+  } catch (error) {
+    return null
+  }
+}
+
+export function ensureDiscoveryIndexes(db) {
+  if (!indexesReady) {
+    indexesReady = ensureManifestIndexes(db, 'social', ['users', 'friends']).catch((error) => {
+      indexesReady = null
+      throw error
+    })
+  }
+
+  return indexesReady
+}
+
+// One aggregation over the caller's friends plus pending requests in either
+// direction, so the users page can exclude them in the query itself.
+async function getExcludedIdentifiers(db, currentUserIdentifier) {
+  const [result] = await db.collection('friends').aggregate([
+    { $match: { userIdentifier: currentUserIdentifier } },
+    { $project: { _id: 0, id: '$friendUserIdentifier' } },
+    {
+      $unionWith: {
+        coll: 'friend_requests',
+        pipeline: [
+          {
+            $match: {
+              status: 'pending',
+              $or: [
+                { fromUserIdentifier: currentUserIdentifier },
+                { fromUserId: currentUserIdentifier },
+                { toUserIdentifier: currentUserIdentifier },
+                { toUserId: currentUserIdentifier }
+              ]
+            }
+          },
+          {
+            $project: {
+              _id: 0,
+              id: {
+                $cond: [
+                  {
+                    $or: [
+                      { $eq: ['$fromUserIdentifier', currentUserIdentifier] },
+                      { $eq: ['$fromUserId', currentUserIdentifier] }
+                    ]
+                  },
+                  { $ifNull: ['$toUserIdentifier', '$toUserId'] },
+                  { $ifNull: ['$fromUserIdentifier', '$fromUserId'] }
+                ]
+              }
+            }
+          }
+        ]
+      }
+    },
+    { $match: { id: { $ne: null } } },
+    { $group: { _id: null, ids: { $addToSet: '$id' } } }
+  ]).toArray()
+
+  return result?.ids || []
+}
+
+export async function discoverUsers(db, currentUserIdentifier, { cursor = null, limit = DEFAULT_DISCOVERY_PAGE_SIZE } = {}) {
+  await ensureDiscoveryIndexes(db)
+
+  const pageSize = Math.min(Math.max(1, Number(limit) || DEFAULT_DISCOVERY_PAGE_SIZE), MAX_DISCOVERY_PAGE_SIZE)
+  const after = decodeDiscoveryCursor(cursor)
+  const excluded = await getExcludedIdentifiers(db, currentUserIdentifier)
+
+  const identifierFilter = { $nin: [currentUserIdentifier, ...excluded] }
+  if (after) {
+    identifierFilter.$gt = after
+  }
+
+  const page = await db.collection('users').aggregate([
+    { $match: { isDiscoverable: true, userIdentifier: identifierFilter } },
+    { $sort: { userIdentifier: 1 } },
+    { $limit: pageSize + 1 },
+    {
+      $project: {
+        _id: 0,
+        userIdentifier: 1,
+        username: 1,
+        displayName: 1,
+        createdAt: 1,
+        joinedAt: 1,
+        gamesPlayed: 1
+      }
+    }
+  ]).toArray()
+
+  const hasMore = page.length > pageSize
+  const users = hasMore ? page.slice(0, pageSize) : page
+
+  return {
+    users,
+    hasMore,
+    nextCursor: hasMore ? encodeDiscoveryCursor(users[users.length - 1].userIdentifier) : null
+  }
+}
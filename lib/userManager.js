@@ -1,29 +1,9 @@
 // User Management System - Ensures Privy users are registered in database
-import { MongoClient } from 'mongodb'
+import { getDb as getSharedDb } from './mongodb.js'
 
-// MongoDB connection
-let client = null
-let db = null
-
-async function getDb() {
-  if (db) return db
-  
-  try {
-    if (!client) {
-      client = new MongoClient(process.env.MONGO_URL, {
-        serverSelectionTimeoutMS: 5000,
-        connectTimeoutMS: 10000,
-        maxPoolSize: 20
-      })
-      await client.connect()
-    }
-    
-    db = client.db(process.env.DB_NAME || 'turfloot_db')
-    return db
-  } catch (error) {
-    console.error('❌ Database connection error:', error)
-    throw error
-  }
+// MongoDB connection (shared pool)
+function getDb() {
+  return getSharedDb(process.env.DB_NAME || 'turfloot_db')
 }
 
 export class UserManager {
@@ -0,0 +1,98 @@
+// Per-wallet cache for Helius lookups (SOL balance, recent transactions).
+// Entries live for a short TTL; concurrent misses for the same wallet share
+// one in-flight request, so many tabs polling the same wallet cost one
+// Helius call per TTL. Deposits and cash-outs call invalidateWallet() so the
+// next read sees the new balance.
+//
+// The cache is per process and kept on globalThis because Next.js bundles
+// each route separately (the cash-out route must be able to invalidate what
+// the balance route cached).
+
+export const BALANCE_TTL_MS = Number(process.env.WALLET_BALANCE_TTL_MS || 10_000)
+export const TRANSACTIONS_TTL_MS = Number(process.env.WALLET_TRANSACTIONS_TTL_MS || 30_000)
+const MAX_ENTRIES = Number(process.env.WALLET_CACHE_MAX_ENTRIES || 10_000)
+
+const cache = globalThis._turflootWalletCache || (globalThis._turflootWalletCache = {
+  entries: new Map(),
+  inflight: new Map(),
+  // wallet -> { generation, pending } while any lookup for the wallet is in
+  // flight. Invalidation bumps the generation so a request already in flight
+  // cannot store a pre-invalidation value; the state is dropped with the
+  // wallet's last pending request, so this holds only in-flight wallets.
+  flights: new Map(),
+  stats: { hits: 0, misses: 0, coalesced: 0 }
+})
+
+function store(key, value, ttlMs) {
+  cache.entries.delete(key)
+  cache.entries.set(key, { value, expiresAt: Date.now() + ttlMs })
+  if (cache.entries.size > MAX_ENTRIES) {
+    // Maps iterate in insertion order, so the first key is the oldest
+    cache.entries.delete(cache.entries.keys().next().value)
+  }
+}
+
+// Returns the cached value for (kind, wallet) or loads it with `fetcher`.
+// A fetcher that resolves to null/undefined (a failed lookup) is not cached.
+// Wallets are keyed by their exact address: base58 is case-sensitive, so two
+// addresses differing only in case are different wallets.
+export async function getCachedWalletValue(kind, wallet, ttlMs, fetcher) {
+  const key = `${kind}:${wallet}`
+
+  const entry = cache.entries.get(key)
+  if (entry && entry.expiresAt > Date.now()) {
+    cache.stats.hits++
+    return entry.value
+  }
+
+  const flight = cache.flights.get(wallet) || { generation: 0, pending: 0 }
+  const { generation } = flight
+  const flightKey = `${key}:${generation}`
+  const pending = cache.inflight.get(flightKey)
+  if (pending) {
+    cache.stats.coalesced++
+    return pending
+  }
+
+  cache.stats.misses++
+  flight.pending++
+  cache.flights.set(wallet, flight)
+  const request = (async () => {
+    try {
+      const value = await fetcher()
+      if (value !== null && value !== undefined && flight.generation === generation) {
+        store(key, value, ttlMs)
+      }
+      return value
+    } finally {
+      cache.inflight.delete(flightKey)
+      if (--flight.pending === 0) cache.flights.delete(wallet)
+    }
+  })()
+
+  cache.inflight.set(flightKey, request)
+  return request
+}
+
+export function getCachedBalance(wallet, fetcher) {
+  return getCachedWalletValue('balance', wallet, BALANCE_TTL_MS, fetcher)
+}
+
+export function getCachedTransactions(wallet, fetcher) {
+  return getCachedWalletValue('transactions', wallet, TRANSACTIONS_TTL_MS, fetcher)
+}
+
+// Drops everything cached for the wallets, e.g. after a deposit or cash-out.
+export function invalidateWallet(...wallets) {
+  for (const wallet of wallets) {
+    if (!wallet) continue
+    const flight = cache.flights.get(wallet)
+    if (flight) flight.generation++
+    cache.entries.delete(`balance:${wallet}`)
+    cache.entries.delete(`transactions:${wallet}`)
+  }
+}
+
+export function getWalletCacheStats() {
+  return { ...cache.stats, entries: cache.entries.size, inflight: cache.inflight.size }
+}
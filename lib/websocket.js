@@ -1,26 +1,20 @@
 // WebSocket server for real-time multiplayer functionality
 import { Server } from 'socket.io'
 import { verifyToken } from './auth.js'
-import { MongoClient } from 'mongodb'
+import { getDb as getSharedDb } from './mongodb.js'
 import { lobbyManager } from './lobby/LobbyManager.js'
 import { initializeLobbyHandlers } from './lobby/socketHandlers.js'
 
-const MONGO_URL = process.env.MONGO_URL || 'mongodb://localhost:27017'
 const DB_NAME = process.env.DB_NAME || 'turfloot_db'
 
 let io = null
-let client = null
 
 // Game rooms storage
 const gameRooms = new Map()
 const playerRooms = new Map()
 
-async function getDb() {
-  if (!client) {
-    client = new MongoClient(MONGO_URL)
-    await client.connect()
-  }
-  return client.db(DB_NAME)
+function getDb() {
+  return getSharedDb(DB_NAME)
 }
 
 // Initialize WebSocket server
@@ -35,8 +29,7 @@ export function initializeWebSocket(server) {
   console.log('🔌 Socket.IO server initialized')
 
   // Initialize lobby manager
-  const mongoUrl = process.env.MONGO_URL || 'mongodb://localhost:27017'
-  lobbyManager.initialize(io, mongoUrl)
+  lobbyManager.initialize(io)
     .then(() => {
       console.log('✅ Lobby manager connected to database')
     })
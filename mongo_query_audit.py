@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+MongoDB Query Plan Audit
+Runs explain("executionStats") on every query shape the API routes issue and
+flags the ones that fall back to a collection scan.
+
+Indexes come from lib/indexManifest.js (applied with `node
+scripts/apply-indexes.js` unless --skip-indexes is given). Point it at a local
+mongod; with --seed it first loads synthetic documents so plans and costs are
+meaningful. Exits non-zero when any shape uses a COLLSCAN.
+"""
+
+import argparse
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pymongo
+
+MONGO_URL = os.getenv('MONGO_URL', 'mongodb://localhost:27017')
+DB_NAME = os.getenv('DB_NAME', 'turfloot_db')
+GAME_DB_NAME = 'turfloot'
+
+# Logical databases, matching MANIFEST_DATABASES in lib/indexManifest.js
+DATABASES = {
+    'social': lambda client: client[DB_NAME],
+    'game': lambda client: client[GAME_DB_NAME],
+    'default': lambda client: client.get_default_database('test'),
+}
+
+# Sample values referenced by the query shapes; --seed guarantees they exist.
+SAMPLE_USER = 'did:privy:audit-user-0001'
+SAMPLE_FRIEND = 'did:privy:audit-user-0002'
+SAMPLE_PARTY = 'party_audit_0001'
+SAMPLE_ROOM = 'room_audit_0001'
+SAMPLE_SESSION = 'session_audit_0001'
+SAMPLE_MATCH = 'match_audit_0001'
+
+
+def query_shapes():
+    """Every query shape the routes run, with the file that issues it."""
+    now = datetime.utcnow()
+    return [
+        # users (social)
+        {'db': 'social', 'collection': 'users', 'filter': {'userIdentifier': SAMPLE_USER},
+         'source': 'app/api/party/route.js (resolveUser)'},
+        {'db': 'social', 'collection': 'users', 'filter': {'email': 'audit0001@example.com'},
+         'source': 'app/api/party/route.js (resolveUser)'},
+        {'db': 'social', 'collection': 'users', 'filter': {'walletAddress': 'AuditWallet0001'},
+         'source': 'app/api/party/route.js (resolveUser)'},
+        {'db': 'social', 'collection': 'users', 'filter': {'userIdentifier': {'$in': [SAMPLE_USER, SAMPLE_FRIEND]}},
+         'source': 'lib/partyMembers.js (loadPartyMembers)'},
+        {'db': 'social', 'collection': 'users',
+         'filter': {'isDiscoverable': True, 'userIdentifier': {'$nin': [SAMPLE_USER], '$gt': 'did:privy:audit-user-0100'}},
+         'sort': [('userIdentifier', 1)], 'limit': 51,
+         'source': 'lib/userDiscovery.js (discoverUsers)'},
+        # friends / friend_requests (social)
+        {'db': 'social', 'collection': 'friends', 'filter': {'userIdentifier': SAMPLE_USER},
+         'source': 'app/api/friends/route.js (friends list)'},
+        {'db': 'social', 'collection': 'friends',
+         'filter': {'$or': [{'userIdentifier': SAMPLE_USER, 'status': 'accepted'},
+                            {'friendIdentifier': SAMPLE_USER, 'status': 'accepted'}]},
+         'source': 'app/api/party/route.js (friends parties)'},
+        {'db': 'social', 'collection': 'friend_requests',
+         'filter': {'$or': [{'fromUserIdentifier': SAMPLE_USER}, {'fromUserId': SAMPLE_USER}], 'status': 'pending'},
+         'source': 'app/api/friends/route.js (sent requests)'},
+        {'db': 'social', 'collection': 'friend_requests',
+         'filter': {'$or': [{'toUserIdentifier': SAMPLE_USER}, {'toUserId': SAMPLE_USER}], 'status': 'pending'},
+         'source': 'app/api/friends/route.js (received requests)'},
+        # parties / party_invites (social)
+        {'db': 'social', 'collection': 'parties', 'filter': {'privacy': 'public', 'status': 'waiting'},
+         'source': 'app/api/party/route.js (public parties)'},
+        {'db': 'social', 'collection': 'parties',
+         'filter': {'currentPlayers': SAMPLE_USER, 'status': {'$ne': 'finished'}},
+         'source': 'app/api/party/route.js (current party)'},
+        {'db': 'social', 'collection': 'parties',
+         'filter': {'privacy': 'private', 'status': 'waiting', 'createdBy': {'$in': [SAMPLE_FRIEND]}},
+         'source': 'app/api/party/route.js (friends parties)'},
+        {'db': 'social', 'collection': 'parties', 'filter': {'id': SAMPLE_PARTY},
+         'source': 'app/api/party/route.js (join/leave)'},
+        {'db': 'social', 'collection': 'party_invites',
+         'filter': {'toUserIdentifier': SAMPLE_USER, 'status': 'pending'},
+         'source': 'app/api/party/route.js (invites)'},
+        {'db': 'social', 'collection': 'party_invites', 'filter': {'partyId': SAMPLE_PARTY},
+         'source': 'app/api/party/route.js (leave cleanup)'},
+        # names (social)
+        {'db': 'social', 'collection': 'names', 'filter': {'userId': {'$in': [SAMPLE_USER]}},
+         'source': 'lib/nameRegistry.js (getNames)'},
+        {'db': 'social', 'collection': 'names', 'filter': {}, 'sort': [('updatedAt', -1)], 'limit': 50,
+         'source': 'lib/nameRegistry.js (listRecentNames)'},
+        # game database
+        {'db': 'game', 'collection': 'game_sessions', 'filter': {'sessionId': SAMPLE_SESSION},
+         'source': 'app/api/game-sessions/route.js (join/update)'},
+        {'db': 'game', 'collection': 'game_sessions',
+         'filter': {'roomId': SAMPLE_ROOM, 'userId': SAMPLE_USER, 'status': 'active'},
+         'source': 'app/api/game-sessions/route.js (existing session)'},
+        {'db': 'game', 'collection': 'game_sessions',
+         'filter': {'status': 'active', 'lastActivity': {'$gte': now - timedelta(minutes=5)}},
+         'source': 'app/api/game-sessions/route.js (GET active sessions)'},
+        {'db': 'game', 'collection': 'game_room_activity',
+         'filter': {'bucket': {'$in': [int(now.timestamp() // 60), int(now.timestamp() // 60) - 1]}},
+         'source': 'lib/gameSessions.js (getRoomPlayerCounts)'},
+        {'db': 'game', 'collection': 'elimination_earnings', 'filter': {}, 'sort': [('totalEarnings', -1)], 'limit': 10,
+         'source': 'lib/leaderboard.js (all-time board)'},
+        {'db': 'game', 'collection': 'elimination_earnings_windows',
+         'filter': {'window': 'daily', 'bucket': now.strftime('%Y-%m-%d')}, 'sort': [('totalEarnings', -1)], 'limit': 10,
+         'source': 'lib/leaderboard.js (windowed board)'},
+        {'db': 'game', 'collection': 'paymentIntents', 'filter': {'intentId': 'intent_audit_0001'},
+         'source': 'lib/paid/intentService.js'},
+        {'db': 'game', 'collection': 'paymentIntents',
+         'filter': {'userId': SAMPLE_USER, 'roomId': SAMPLE_ROOM, 'playerPubkey': 'AuditWallet0001',
+                    'lamports': 10000000, 'status': 'CREATED'},
+         'sort': [('createdAt', -1)], 'limit': 1,
+         'source': 'lib/paid/intentService.js (reuse existing intent)'},
+        # default (connection string) database
+        {'db': 'default', 'collection': 'active_rooms',
+         'filter': {'createdAt': {'$gte': now - timedelta(hours=24)}, 'status': {'$in': ['waiting', 'active']},
+                    'endedAt': {'$exists': False}},
+         'source': 'app/api/[[...path]]/route.js (GET servers)'},
+        {'db': 'default', 'collection': 'active_rooms', 'filter': {'roomId': SAMPLE_ROOM},
+         'source': 'app/api/[[...path]]/route.js (join room)'},
+        {'db': 'default', 'collection': 'paid_matches', 'filter': {'matchId': SAMPLE_MATCH},
+         'source': 'app/api/[[...path]]/route.js (paid matches)'},
+        {'db': 'default', 'collection': 'users', 'filter': {'userId': SAMPLE_USER},
+         'source': 'app/api/[[...path]]/route.js (wallet/profile)'},
+        {'db': 'default', 'collection': 'helius_webhook_queue',
+         'filter': {'status': {'$in': ['queued', 'processing']}, 'available_at': {'$lte': now}},
+         'sort': [('available_at', 1)], 'limit': 100,
+         'source': 'lib/transactions/webhookQueue.js (claim batch)'},
+        {'db': 'default', 'collection': 'pending_deposits',
+         'filter': {'user_id': {'$in': ['AuditWallet0001', 'AuditWallet0002']}, 'status': 'pending',
+                    'expires_at': {'$gt': now}},
+         'sort': [('created_at', 1)],
+         'source': 'lib/transactions/directDeposit.js (completePendingDeposits)'},
+    ]
+
+
+def seed(client, users):
+    """Loads a small synthetic dataset shaped like the documents the routes write."""
+    print(f"🌱 Seeding {users} synthetic users and related documents...")
+    social = DATABASES['social'](client)
+    game = DATABASES['game'](client)
+    default = DATABASES['default'](client)
+    now = datetime.utcnow()
+    ids = [f"did:privy:audit-user-{i:04d}" for i in range(1, users + 1)]
+
+    social.users.delete_many({'userIdentifier': {'$regex': '^did:privy:audit-user-'}})
+    social.users.insert_many([{
+        'userIdentifier': uid,
+        'email': f"audit{i:04d}@example.com",
+        'walletAddress': f"AuditWallet{i:04d}",
+        'username': f"auditor{i:04d}",
+        'isDiscoverable': True,
+        'isTestAccount': False,
+        'createdAt': now,
+    } for i, uid in enumerate(ids, start=1)])
+
+    social.friends.delete_many({'userIdentifier': {'$in': ids}})
+    social.friends.insert_many([{
+        'id': f"friend_audit_{i}",
+        'userIdentifier': uid,
+        'friendUserIdentifier': random.choice(ids),
+        'status': 'accepted',
+        'createdAt': now,
+    } for i, uid in enumerate(ids * 3)])
+
+    social.friend_requests.delete_many({'fromUserIdentifier': {'$in': ids}})
+    # The route writes both field spellings; the unique (fromUserId, toUserId)
+    # index needs them present
+    requests = []
+    for i, uid in enumerate(ids):
+        to_id = random.choice(ids)
+        requests.append({
+            'id': f"request_audit_{i}",
+            'fromUserIdentifier': uid,
+            'fromUserId': uid,
+            'toUserIdentifier': to_id,
+            'toUserId': to_id,
+            'status': random.choice(['pending', 'accepted', 'declined']),
+            'createdAt': now,
+        })
+    social.friend_requests.insert_many(requests)
+
+    social.parties.delete_many({'id': {'$regex': '^party_audit_'}})
+    social.parties.insert_many([{
+        'id': f"party_audit_{i:04d}",
+        'name': f"Audit Party {i}",
+        'privacy': random.choice(['public', 'private']),
+        'status': random.choice(['waiting', 'waiting', 'in_game', 'finished']),
+        'createdBy': uid,
+        'currentPlayers': [uid],
+        'maxPlayers': 2,
+        'createdAt': now,
+    } for i, uid in enumerate(ids[: max(1, users // 4)], start=1)])
+
+    social.party_invites.delete_many({'partyId': {'$regex': '^party_audit_'}})
+    social.party_invites.insert_many([{
+        'id': f"invite_audit_{i}",
+        'partyId': f"party_audit_{(i % max(1, users // 4)) + 1:04d}",
+        'fromUserIdentifier': random.choice(ids),
+        'toUserIdentifier': uid,
+        'status': 'pending',
+        'createdAt': now,
+    } for i, uid in enumerate(ids)])
+
+    social.names.delete_many({'userId': {'$in': ids}})
+    social.names.insert_many([{
+        'userId': uid,
+        'customName': f"auditor{i:04d}",
+        'updatedAt': now - timedelta(seconds=i),
+    } for i, uid in enumerate(ids)])
+
+    game.game_sessions.delete_many({'sessionId': {'$regex': '^session_audit_'}})
+    game.game_sessions.insert_many([{
+        'sessionId': f"session_audit_{i:04d}",
+        'roomId': f"room_audit_{(i % 20) + 1:04d}",
+        'userId': uid,
+        'status': random.choice(['active', 'ended']),
+        'joinedAt': now,
+        'lastActivity': now - timedelta(minutes=random.randint(0, 30)),
+    } for i, uid in enumerate(ids, start=1)])
+
+    game.elimination_earnings.delete_many({'userIdentifier': {'$in': ids}})
+    game.elimination_earnings.insert_many([{
+        'userIdentifier': uid,
+        'totalEarnings': round(random.paretovariate(1.5), 2),
+        'eliminations': random.randint(0, 200),
+    } for uid in ids])
+
+    default.active_rooms.delete_many({'roomId': {'$regex': '^room_audit_'}})
+    default.active_rooms.insert_many([{
+        'roomId': f"room_audit_{i:04d}",
+        'status': random.choice(['waiting', 'active', 'ended']),
+        'players': [],
+        'createdAt': now - timedelta(hours=random.randint(0, 48)),
+    } for i in range(1, 21)])
+
+    default.paid_matches.delete_many({'matchId': {'$regex': '^match_audit_'}})
+    default.paid_matches.insert_many([{
+        'matchId': f"match_audit_{i:04d}",
+        'status': random.choice(['waiting', 'active', 'completed']),
+        'createdAt': now,
+    } for i in range(1, 21)])
+
+    default.users.delete_many({'userId': {'$in': ids}})
+    default.users.insert_many([{'userId': uid, 'createdAt': now} for uid in ids])
+
+    print("✅ Synthetic data seeded")
+
+
+def apply_indexes():
+    """Applies lib/indexManifest.js through the Node script."""
+    print("🗂️ Applying index manifest (node scripts/apply-indexes.js)...")
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts', 'apply-indexes.js')
+    result = subprocess.run(['node', script], capture_output=True, text=True)
+    print(result.stdout.strip())
+    if result.returncode != 0:
+        print(result.stderr.strip())
+        print("⚠️ Index manifest could not be fully applied; plans may show COLLSCANs")
+
+
+def plan_stages(plan):
+    """Flattens a winning plan into its stage names, outermost first."""
+    stages = []
+    while plan:
+        stages.append(plan.get('stage'))
+        if plan.get('inputStage'):
+            plan = plan['inputStage']
+        elif plan.get('inputStages'):
+            for child in plan['inputStages']:
+                stages.extend(plan_stages(child))
+            break
+        else:
+            break
+    return stages
+
+
+def explain_shape(client, shape):
+    db = DATABASES[shape['db']](client)
+    cursor = db[shape['collection']].find(shape['filter'])
+    if shape.get('sort'):
+        cursor = cursor.sort(shape['sort'])
+    if shape.get('limit'):
+        cursor = cursor.limit(shape['limit'])
+
+    explain = cursor.explain()
+    query_planner = explain.get('queryPlanner', {})
+    winning = query_planner.get('winningPlan', {})
+    # Slot-based engine nests the classic plan under queryPlan
+    winning = winning.get('queryPlan', winning)
+    stats = explain.get('executionStats', {})
+
+    stages = plan_stages(winning)
+    examined = stats.get('totalDocsExamined', 0)
+    returned = stats.get('nReturned', 0)
+    return {
+        'namespace': f"{db.name}.{shape['collection']}",
+        'source': shape['source'],
+        'stages': stages,
+        'collscan': 'COLLSCAN' in stages,
+        'in_memory_sort': 'SORT' in stages,
+        'docs_examined': examined,
+        'keys_examined': stats.get('totalKeysExamined', 0),
+        'returned': returned,
+        'millis': stats.get('executionTimeMillis', 0),
+        'ratio': examined / returned if returned else float(examined),
+    }
+
+
+def run_audit(client):
+    print("\n🔍 EXPLAINING ROUTE QUERY SHAPES")
+    print("=" * 80)
+
+    results = []
+    for shape in query_shapes():
+        try:
+            result = explain_shape(client, shape)
+        except pymongo.errors.PyMongoError as error:
+            print(f"❌ {shape['collection']} ({shape['source']}): {error}")
+            continue
+        results.append(result)
+
+        status = "🚨 COLLSCAN" if result['collscan'] else ("⚠️ SORT" if result['in_memory_sort'] else "✅")
+        print(f"{status} {result['namespace']}  [{' <- '.join(result['stages'])}]")
+        print(f"    {result['source']}")
+        print(f"    examined {result['docs_examined']} docs / {result['keys_examined']} keys, "
+              f"returned {result['returned']}, {result['millis']}ms, ratio {result['ratio']:.1f}")
+
+    collscans = [result for result in results if result['collscan']]
+    print("\n" + "=" * 80)
+    print(f"📊 {len(results)} query shapes explained, {len(collscans)} COLLSCAN(s)")
+    for result in sorted(collscans, key=lambda r: r['docs_examined'], reverse=True):
+        print(f"   🚨 {result['namespace']} - {result['docs_examined']} docs examined for "
+              f"{result['returned']} returned ({result['millis']}ms) - {result['source']}")
+
+    return collscans
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Explain every route query shape and flag COLLSCANs')
+    parser.add_argument('--seed', type=int, nargs='?', const=2000, default=0,
+                        help='seed N synthetic users (and related documents) first; default 2000')
+    parser.add_argument('--skip-indexes', action='store_true',
+                        help='do not run scripts/apply-indexes.js before explaining')
+    args = parser.parse_args()
+
+    print("🗄️ MONGODB QUERY PLAN AUDIT")
+    print("=" * 80)
+    print(f"📍 MongoDB URL: {MONGO_URL}")
+    print(f"📊 Databases: social={DB_NAME}, game={GAME_DB_NAME}")
+
+    client = pymongo.MongoClient(MONGO_URL, serverSelectionTimeoutMS=5000)
+    client.admin.command('ping')
+
+    if args.seed:
+        seed(client, args.seed)
+    if not args.skip_indexes:
+        apply_indexes()
+
+    started = time.time()
+    collscans = run_audit(client)
+    print(f"⏱️ Audit finished in {time.time() - started:.2f}s")
+
+    client.close()
+    sys.exit(1 if collscans else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -44,7 +44,7 @@ const nextConfig = {
     dangerouslyAllowSVG: true,
   },
   experimental: {
-    serverComponentsExternalPackages: ['mongodb'],
+    serverComponentsExternalPackages: ['mongodb', 'redis'],
     optimizeCss: false,
     outputFileTracingRoot: undefined,
     esmExternals: 'loose',
@@ -0,0 +1,29 @@
+// Applies every index declared in lib/indexManifest.js.
+// The server does this at startup; run this ahead of a deploy, or before
+// mongo_query_audit.py, to build indexes without starting the app.
+import { getMongoClient } from '../lib/mongodb.js'
+import { applyIndexManifest } from '../lib/indexManifest.js'
+
+async function main() {
+  const results = await applyIndexManifest()
+
+  for (const result of results) {
+    if (result.ok) {
+      console.log(`✅ ${result.database}.${result.collection}`)
+    } else {
+      console.error(`❌ ${result.database}.${result.collection}: ${result.error}`)
+    }
+  }
+
+  const client = await getMongoClient()
+  await client.close()
+
+  if (results.some((result) => !result.ok)) {
+    process.exit(1)
+  }
+}
+
+main().catch((error) => {
+  console.error('❌ Applying index manifest failed:', error)
+  process.exit(1)
+})
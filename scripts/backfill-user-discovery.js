@@ -0,0 +1,78 @@
+// Offline job for friend discovery:
+//  1. removes test/mock users (formerly done on every GET /api/friends?type=users)
+//  2. backfills isTestAccount / isDiscoverable on user documents written
+//     before those flags were computed at write time
+import { getDb, getMongoClient } from '../lib/mongodb.js'
+import { TEST_ACCOUNT_PATTERN, classifyUserAccount, ensureDiscoveryIndexes } from '../lib/userDiscovery.js'
+
+const BATCH_SIZE = 1000
+
+async function removeTestUsers(db) {
+  const result = await db.collection('users').deleteMany({
+    $or: [
+      { userIdentifier: { $regex: TEST_ACCOUNT_PATTERN } },
+      { username: { $regex: TEST_ACCOUNT_PATTERN } },
+      // Remove users without proper Privy identifiers
+      {
+        $and: [
+          { email: { $in: [null, ''] } },
+          { walletAddress: { $in: [null, ''] } },
+          { userIdentifier: { $regex: /^(test_|mock_|debug_|cashout_)/i } }
+        ]
+      }
+    ]
+  })
+
+  console.log(`🧹 Removed ${result.deletedCount} test users`)
+}
+
+async function backfillDiscoveryFlags(db) {
+  const users = db.collection('users')
+  const cursor = users.find(
+    { userIdentifier: { $exists: true }, isDiscoverable: { $exists: false } },
+    { projection: { userIdentifier: 1, username: 1, displayName: 1, email: 1, walletAddress: 1 } }
+  )
+
+  let operations = []
+  let updated = 0
+
+  for await (const user of cursor) {
+    const flags = classifyUserAccount({
+      userIdentifier: user.userIdentifier,
+      username: user.username || user.displayName,
+      email: user.email,
+      walletAddress: user.walletAddress
+    })
+
+    operations.push({ updateOne: { filter: { _id: user._id }, update: { $set: flags } } })
+
+    if (operations.length >= BATCH_SIZE) {
+      await users.bulkWrite(operations, { ordered: false })
+      updated += operations.length
+      operations = []
+    }
+  }
+
+  if (operations.length > 0) {
+    await users.bulkWrite(operations, { ordered: false })
+    updated += operations.length
+  }
+
+  console.log(`🏷️ Backfilled discovery flags on ${updated} users`)
+}
+
+async function main() {
+  const db = await getDb(process.env.DB_NAME || 'turfloot_db')
+
+  await ensureDiscoveryIndexes(db)
+  await removeTestUsers(db)
+  await backfillDiscoveryFlags(db)
+
+  const client = await getMongoClient()
+  await client.close()
+}
+
+main().catch((error) => {
+  console.error('❌ User discovery backfill failed:', error)
+  process.exit(1)
+})
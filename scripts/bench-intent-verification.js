@@ -0,0 +1,188 @@
+// Benchmarks payment-intent verification throughput (intents confirmed per
+// second) against a local Solana JSON-RPC stand-in, comparing the old
+// sequential sweep (getParsedTransaction + getTransaction per intent, one at
+// a time) with the batched pipeline in lib/paid/verificationPipeline.js.
+//
+// By default an in-process stand-in with fixed latency is started; pass
+// --rpc-url to point at another one. The Mongo writes of a confirmation are
+// simulated with --db-latency.
+//
+//   node scripts/bench-intent-verification.js --intents 500 --rpc-latency 40
+import http from 'http'
+import { verifyIntentBatch } from '../lib/paid/verificationPipeline.js'
+import { PaymentIntentStatus } from '../lib/paid/constants.js'
+
+function parseArgs(argv) {
+  const args = { intents: 300, rpcLatency: 40, dbLatency: 5, concurrency: 8, sweep: 50, landedRatio: 0.9, rpcUrl: null }
+  for (let i = 0; i < argv.length; i += 2) {
+    const key = argv[i].replace(/^--/, '').replace(/-([a-z])/g, (_, c) => c.toUpperCase())
+    args[key] = key === 'rpcUrl' ? argv[i + 1] : Number(argv[i + 1])
+  }
+  return args
+}
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms))
+
+// Minimal JSON-RPC stand-in: every request (single or batch) costs one
+// round-trip of `latencyMs`. Signatures ending in "-pending" have not landed.
+function startStandIn(latencyMs) {
+  const handle = (call) => {
+    const [first] = call.params || []
+    switch (call.method) {
+      case 'getSignatureStatuses':
+        return {
+          context: { slot: 1 },
+          value: first.map((signature) => signature.endsWith('-pending')
+            ? null
+            : { slot: 1, confirmations: null, err: null, confirmationStatus: 'confirmed' })
+        }
+      case 'getTransaction':
+      case 'getParsedTransaction':
+        return first.endsWith('-pending') ? null : { slot: 1, blockTime: Math.floor(Date.now() / 1000), meta: { err: null } }
+      default:
+        return null
+    }
+  }
+
+  const server = http.createServer((req, res) => {
+    let body = ''
+    req.on('data', (chunk) => { body += chunk })
+    req.on('end', async () => {
+      const payload = JSON.parse(body)
+      await sleep(latencyMs)
+      const reply = Array.isArray(payload)
+        ? payload.map((call) => ({ jsonrpc: '2.0', id: call.id, result: handle(call) }))
+        : { jsonrpc: '2.0', id: payload.id, result: handle(payload) }
+      res.setHeader('Content-Type', 'application/json')
+      res.end(JSON.stringify(reply))
+    })
+  })
+
+  return new Promise((resolve) => {
+    server.listen(0, '127.0.0.1', () => resolve({ server, url: `http://127.0.0.1:${server.address().port}` }))
+  })
+}
+
+function createRpc(url) {
+  const agent = new http.Agent({ keepAlive: true, maxSockets: 64 })
+  let nextId = 1
+  const counters = { requests: 0, calls: 0 }
+
+  const post = (payload) => new Promise((resolve, reject) => {
+    const body = JSON.stringify(payload)
+    const req = http.request(url, { method: 'POST', agent, headers: { 'Content-Type': 'application/json' } }, (res) => {
+      let data = ''
+      res.on('data', (chunk) => { data += chunk })
+      res.on('end', () => resolve(JSON.parse(data)))
+    })
+    req.on('error', reject)
+    req.end(body)
+  })
+
+  return {
+    counters,
+    async call(method, params) {
+      counters.requests++
+      counters.calls++
+      return (await post({ jsonrpc: '2.0', id: nextId++, method, params })).result
+    },
+    async batch(calls) {
+      counters.requests++
+      counters.calls += calls.length
+      const replies = await post(calls.map(([method, params]) => ({ jsonrpc: '2.0', id: nextId++, method, params })))
+      return replies.sort((a, b) => a.id - b.id).map((reply) => reply.result)
+    },
+    close: () => agent.destroy()
+  }
+}
+
+function makeIntents(count, landedRatio) {
+  const now = Date.now()
+  return Array.from({ length: count }, (_, i) => ({
+    intentId: `intent-${i}`,
+    signature: i / count < landedRatio ? `sig-${i}` : `sig-${i}-pending`,
+    status: PaymentIntentStatus.SENT,
+    createdAt: new Date(now - (count - i) * 10)
+  }))
+}
+
+// Stand-in for the memo/transfer checks and the confirmation writes.
+async function confirm(intent, transaction, dbLatency) {
+  if (!transaction) {
+    return { status: intent.status, reason: 'PENDING' }
+  }
+  await sleep(dbLatency)
+  return { status: PaymentIntentStatus.CONFIRMED }
+}
+
+async function runSequential(rpc, intents, { sweep, dbLatency }) {
+  let confirmed = 0
+  for (let offset = 0; offset < intents.length; offset += sweep) {
+    for (const intent of intents.slice(offset, offset + sweep)) {
+      // eslint-disable-next-line no-await-in-loop
+      const parsed = await rpc.call('getParsedTransaction', [intent.signature, { commitment: 'confirmed' }])
+      if (!parsed) continue
+      // eslint-disable-next-line no-await-in-loop
+      await rpc.call('getTransaction', [intent.signature, { commitment: 'confirmed' }])
+      // eslint-disable-next-line no-await-in-loop
+      const result = await confirm(intent, parsed, dbLatency)
+      if (result.status === PaymentIntentStatus.CONFIRMED) confirmed++
+    }
+  }
+  return confirmed
+}
+
+async function runPipeline(rpc, intents, { sweep, dbLatency, concurrency }) {
+  let confirmed = 0
+  for (let offset = 0; offset < intents.length; offset += sweep) {
+    // eslint-disable-next-line no-await-in-loop
+    const results = await verifyIntentBatch(intents.slice(offset, offset + sweep), {
+      concurrency,
+      fetchStatuses: async (signatures) => {
+        const statuses = await rpc.call('getSignatureStatuses', [signatures, { searchTransactionHistory: true }])
+        return new Map(signatures.map((signature, index) => [signature, statuses.value[index]]))
+      },
+      fetchTransactions: async (signatures) => {
+        const transactions = await rpc.batch(signatures.map((signature) => ['getTransaction', [signature, { commitment: 'confirmed' }]]))
+        return new Map(signatures.map((signature, index) => [signature, transactions[index]]))
+      },
+      verifyFetched: (intent, transaction) => confirm(intent, transaction, dbLatency)
+    })
+    confirmed += results.filter((result) => result.status === PaymentIntentStatus.CONFIRMED).length
+  }
+  return confirmed
+}
+
+async function measure(label, url, fn, intents, args) {
+  const rpc = createRpc(url)
+  const started = process.hrtime.bigint()
+  const confirmed = await fn(rpc, intents, args)
+  const seconds = Number(process.hrtime.bigint() - started) / 1e9
+  rpc.close()
+  console.log(
+    `${label.padEnd(10)} ${confirmed} confirmed in ${seconds.toFixed(2)}s  ` +
+    `→ ${(confirmed / seconds).toFixed(1)} joins/s, ${rpc.counters.requests} HTTP requests, ${rpc.counters.calls} RPC calls`
+  )
+  return confirmed / seconds
+}
+
+async function main() {
+  const args = parseArgs(process.argv.slice(2))
+  const standIn = args.rpcUrl ? null : await startStandIn(args.rpcLatency)
+  const url = args.rpcUrl || standIn.url
+  const intents = makeIntents(args.intents, args.landedRatio)
+
+  console.log(`⚡ Intent verification benchmark: ${args.intents} intents, sweep ${args.sweep}, ` +
+    `concurrency ${args.concurrency}, RPC ${args.rpcUrl ? url : `stand-in (${args.rpcLatency}ms)`}, db ${args.dbLatency}ms`)
+
+  const sequential = await measure('sequential', url, runSequential, intents, args)
+  const pipeline = await measure('pipeline', url, runPipeline, intents, args)
+  console.log(`📈 Speed-up: ${(pipeline / sequential).toFixed(1)}x`)
+
+  standIn?.server.close()
+}
+
+main().catch((error) => {
+  console.error('❌ Benchmark failed:', error)
+  process.exit(1)
+})
@@ -0,0 +1,84 @@
+// Microbenchmark for paid room quotes: the compiled snapshot lookup in
+// lib/paid/config.js against the previous per-call path (normalize the room
+// config, compute the fee, decode and re-encode both vault keys), plus the
+// vault key decoding buildServerMessage used to repeat for every intent.
+//
+//   node scripts/bench-room-quotes.js --iterations 200000
+import { PublicKey } from '@solana/web3.js'
+import { getAllRoomConfigs, getRoomQuote } from '../lib/paid/config.js'
+
+function parseArgs(argv) {
+  const args = { iterations: 200_000 }
+  for (let i = 0; i < argv.length; i += 2) {
+    args[argv[i].replace(/^--/, '')] = Number(argv[i + 1])
+  }
+  return args
+}
+
+// The quote path before the snapshot, kept here for comparison
+function legacyQuote(room) {
+  const config = {
+    id: room.id,
+    name: room.name,
+    entryLamports: Number(room.entryLamports || 0),
+    feeBps: Number(room.feeBps || 1_000),
+    currencyDisplay: room.currencyDisplay || 'SOL',
+    prizeVault: room.prizeVault,
+    feeVault: room.feeVault,
+    priorityFeeMicroLamports: Number(room.priorityFeeMicroLamports || 5_000)
+  }
+  const feeLamports = Math.ceil((config.entryLamports * (config.feeBps || 1_000)) / 10_000)
+  const quote = {
+    roomId: config.id,
+    entryLamports: config.entryLamports,
+    feeLamports,
+    totalLamports: config.entryLamports + feeLamports,
+    feeBps: config.feeBps,
+    prizeVault: new PublicKey(config.prizeVault).toBase58(),
+    feeVault: new PublicKey(config.feeVault).toBase58(),
+    currencyDisplay: config.currencyDisplay,
+    priorityFeeMicroLamports: config.priorityFeeMicroLamports
+  }
+  // buildServerMessage decoded the vaults again
+  return [quote, new PublicKey(quote.prizeVault), new PublicKey(quote.feeVault)]
+}
+
+function snapshotQuote(room) {
+  const quote = getRoomQuote(room.id)
+  return [quote, quote.prizeVaultKey, quote.feeVaultKey]
+}
+
+function measure(label, rooms, iterations, fn) {
+  const samples = new Float64Array(iterations)
+  let sink = 0
+  for (let i = 0; i < iterations; i++) {
+    const started = process.hrtime.bigint()
+    sink += fn(rooms[i % rooms.length])[0].totalLamports
+    samples[i] = Number(process.hrtime.bigint() - started) / 1_000
+  }
+  const total = samples.reduce((sum, sample) => sum + sample, 0)
+  samples.sort()
+  console.log(
+    `${label.padEnd(9)} ${(iterations / (total / 1e6)).toFixed(0).padStart(10)} quotes/s  ` +
+    `p50 ${samples[Math.floor(iterations * 0.5)].toFixed(2)}µs  p99 ${samples[Math.floor(iterations * 0.99)].toFixed(2)}µs`
+  )
+  return sink
+}
+
+function main() {
+  const { iterations } = parseArgs(process.argv.slice(2))
+  const rooms = getAllRoomConfigs().filter((room) => room.prizeVault && room.feeVault)
+  if (rooms.length === 0) {
+    console.error('❌ No paid rooms with vault wallets configured (set PAID_ROOMS_PRIZE_VAULT and PAID_ROOMS_FEE_WALLET)')
+    process.exit(1)
+  }
+
+  console.log(`⚡ Room quote benchmark: ${iterations} quotes over ${rooms.length} rooms`)
+  // Warm up both paths before measuring
+  measure('warmup', rooms, Math.min(iterations, 10_000), legacyQuote)
+  measure('warmup', rooms, Math.min(iterations, 10_000), snapshotQuote)
+  measure('legacy', rooms, iterations, legacyQuote)
+  measure('snapshot', rooms, iterations, snapshotQuote)
+}
+
+main()
@@ -0,0 +1,128 @@
+// Benchmarks Helius traffic from wallet balance/transaction polling, in
+// Helius calls per user-minute, with and without lib/walletCache.js.
+//
+// A local HTTP stub stands in for Helius (JSON-RPC getBalance and the REST
+// transactions endpoint) and counts the calls it serves. Each simulated user
+// has several open tabs that poll the balance and the transaction history
+// on the UI's intervals, with jitter; a share of users deposit during the
+// run, which invalidates their cached entries.
+//
+//   node scripts/bench-wallet-cache.js --users 100 --tabs 3 --seconds 20
+import http from 'http'
+import { getCachedBalance, getCachedTransactions, getWalletCacheStats, invalidateWallet } from '../lib/walletCache.js'
+
+function parseArgs(argv) {
+  const args = { users: 100, tabs: 3, seconds: 20, balanceEvery: 5, transactionsEvery: 15, latency: 60, depositRatio: 0.2 }
+  for (let i = 0; i < argv.length; i += 2) {
+    const key = argv[i].replace(/^--/, '').replace(/-([a-z])/g, (_, c) => c.toUpperCase())
+    args[key] = Number(argv[i + 1])
+  }
+  return args
+}
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms))
+
+function startHeliusStub(latencyMs) {
+  const counters = { rpc: 0, rest: 0 }
+
+  const server = http.createServer((req, res) => {
+    let body = ''
+    req.on('data', (chunk) => { body += chunk })
+    req.on('end', async () => {
+      await sleep(latencyMs)
+      res.setHeader('Content-Type', 'application/json')
+      if (req.method === 'POST') {
+        counters.rpc++
+        const call = JSON.parse(body)
+        res.end(JSON.stringify({ jsonrpc: '2.0', id: call.id, result: { context: { slot: 1 }, value: 1_500_000_000 } }))
+      } else {
+        counters.rest++
+        res.end(JSON.stringify([{ signature: `sig-${counters.rest}`, timestamp: Math.floor(Date.now() / 1000), nativeTransfers: [] }]))
+      }
+    })
+  })
+
+  return new Promise((resolve) => {
+    server.listen(0, '127.0.0.1', () => resolve({ server, counters, url: `http://127.0.0.1:${server.address().port}` }))
+  })
+}
+
+// Same requests the wallet routes make
+function heliusClient(url) {
+  const agent = new http.Agent({ keepAlive: true, maxSockets: 256 })
+  const request = (path, method, payload) => new Promise((resolve, reject) => {
+    const req = http.request(`${url}${path}`, { method, agent, headers: { 'Content-Type': 'application/json' } }, (res) => {
+      let data = ''
+      res.on('data', (chunk) => { data += chunk })
+      res.on('end', () => resolve(JSON.parse(data)))
+    })
+    req.on('error', reject)
+    req.end(payload ? JSON.stringify(payload) : undefined)
+  })
+
+  return {
+    balance: async (wallet) => (await request('/?api-key=bench', 'POST', { jsonrpc: '2.0', id: 1, method: 'getBalance', params: [wallet] })).result.value / 1e9,
+    transactions: (wallet) => request(`/v0/addresses/${wallet}/transactions?api-key=bench&limit=20`, 'GET'),
+    close: () => agent.destroy()
+  }
+}
+
+async function poll(everySeconds, deadline, fn) {
+  // Tabs open at different times
+  await sleep(Math.random() * everySeconds * 1000)
+  while (Date.now() < deadline) {
+    // eslint-disable-next-line no-await-in-loop
+    await fn()
+    // eslint-disable-next-line no-await-in-loop
+    await sleep(everySeconds * 1000 * (0.9 + Math.random() * 0.2))
+  }
+}
+
+async function run(label, args, cached) {
+  const stub = await startHeliusStub(args.latency)
+  const helius = heliusClient(stub.url)
+  const deadline = Date.now() + args.seconds * 1000
+  const wallets = Array.from({ length: args.users }, (_, i) => `BenchWallet${label}${i}`)
+
+  const readBalance = (wallet) => cached ? getCachedBalance(wallet, () => helius.balance(wallet)) : helius.balance(wallet)
+  const readTransactions = (wallet) => cached ? getCachedTransactions(wallet, () => helius.transactions(wallet)) : helius.transactions(wallet)
+
+  const loops = []
+  for (const wallet of wallets) {
+    for (let tab = 0; tab < args.tabs; tab++) {
+      loops.push(poll(args.balanceEvery, deadline, () => readBalance(wallet)))
+      loops.push(poll(args.transactionsEvery, deadline, () => readTransactions(wallet)))
+    }
+  }
+  // Deposits land at random times and invalidate the depositor's entries
+  for (const wallet of wallets.filter(() => Math.random() < args.depositRatio)) {
+    loops.push(sleep(Math.random() * args.seconds * 1000).then(() => cached && invalidateWallet(wallet)))
+  }
+
+  await Promise.all(loops)
+  helius.close()
+  stub.server.close()
+
+  const userMinutes = (args.users * args.seconds) / 60
+  const total = stub.counters.rpc + stub.counters.rest
+  console.log(
+    `${label.padEnd(9)} ${total} Helius calls (${stub.counters.rpc} getBalance, ${stub.counters.rest} transactions) ` +
+    `→ ${(total / userMinutes).toFixed(1)} calls per user-minute`
+  )
+  return total / userMinutes
+}
+
+async function main() {
+  const args = parseArgs(process.argv.slice(2))
+  console.log(`⚡ Wallet cache benchmark: ${args.users} users × ${args.tabs} tabs for ${args.seconds}s, ` +
+    `balance every ${args.balanceEvery}s, transactions every ${args.transactionsEvery}s, Helius stub ${args.latency}ms`)
+
+  const uncached = await run('uncached', args, false)
+  const cached = await run('cached', args, true)
+  console.log(`📈 Reduction: ${(uncached / cached).toFixed(1)}x`, getWalletCacheStats())
+}
+
+main().catch((error) => {
+  console.error('❌ Benchmark failed:', error)
+  process.exit(1)
+})
@@ -0,0 +1,73 @@
+// One-off cleanup before the unique game_sessions.sessionId_1 index:
+//  1. deletes sessions without a sessionId
+//  2. keeps only the most recently active document per sessionId
+//  3. replaces a non-unique sessionId_1 (created while duplicates existed)
+//     with the unique manifest index
+// Room counters may have counted a duplicated session twice; they correct
+// themselves within two buckets (lib/gameSessions.js).
+import { getDb, getMongoClient } from '../lib/mongodb.js'
+import { ensureManifestIndexes, MANIFEST_DATABASES } from '../lib/indexManifest.js'
+
+const BATCH_SIZE = 1000
+
+async function removeSessionsWithoutId(sessions) {
+  const result = await sessions.deleteMany({
+    $or: [{ sessionId: { $exists: false } }, { sessionId: null }, { sessionId: '' }]
+  })
+  console.log(`🧹 Removed ${result.deletedCount} sessions without a sessionId`)
+}
+
+async function removeDuplicateSessions(sessions) {
+  const duplicates = sessions.aggregate([
+    { $sort: { lastActivity: -1 } },
+    { $group: { _id: '$sessionId', ids: { $push: '$_id' }, count: { $sum: 1 } } },
+    { $match: { count: { $gt: 1 } } }
+  ], { allowDiskUse: true })
+
+  let stale = []
+  let removed = 0
+
+  for await (const group of duplicates) {
+    // The first id is the most recently active document
+    stale.push(...group.ids.slice(1))
+
+    if (stale.length >= BATCH_SIZE) {
+      removed += (await sessions.deleteMany({ _id: { $in: stale } })).deletedCount
+      stale = []
+    }
+  }
+
+  if (stale.length > 0) {
+    removed += (await sessions.deleteMany({ _id: { $in: stale } })).deletedCount
+  }
+
+  console.log(`🧹 Removed ${removed} duplicate sessions`)
+}
+
+async function rebuildUniqueIndex(db, sessions) {
+  const existing = (await sessions.indexes()).find((index) => index.name === 'sessionId_1')
+  if (existing && !existing.unique) {
+    await sessions.dropIndex('sessionId_1')
+    console.log('🗑️ Dropped non-unique sessionId_1')
+  }
+
+  await ensureManifestIndexes(db, 'game', ['game_sessions'])
+  console.log('✅ game_sessions indexes applied')
+}
+
+async function main() {
+  const db = await getDb(MANIFEST_DATABASES.game())
+  const sessions = db.collection('game_sessions')
+
+  await removeSessionsWithoutId(sessions)
+  await removeDuplicateSessions(sessions)
+  await rebuildUniqueIndex(db, sessions)
+
+  const client = await getMongoClient()
+  await client.close()
+}
+
+main().catch((error) => {
+  console.error('❌ Game session dedupe failed:', error)
+  process.exit(1)
+})
@@ -39,6 +39,21 @@ app.prepare().then(async () => {
     }
   })
 
+  // Apply the central index manifest (lib/indexManifest.js)
+  if (process.env.MONGO_URL) {
+    try {
+      const { applyIndexManifest } = await import('./lib/indexManifest.js')
+      const results = await applyIndexManifest()
+      const failed = results.filter((result) => !result.ok)
+      for (const result of failed) {
+        console.warn(`⚠️ Index manifest failed for ${result.database}.${result.collection}:`, result.error)
+      }
+      console.log(`🗂️ Index manifest applied (${results.length - failed.length}/${results.length} collections)`)
+    } catch (error) {
+      console.log('⚠️ Index manifest not applied:', error.message)
+    }
+  }
+
   // Initialize TurfLoot Game Server with Socket.IO
   try {
     const { gameServer } = await import('./lib/gameServer.js')
@@ -0,0 +1,54 @@
+// Headless benchmark for coin collision work per simulation tick.
+// Run with: npx ts-node loadtest/coinCollisions.bench.ts
+import { ArenaRoom, GameState, Player } from "../src/rooms/ArenaRoom";
+
+const TICKS = 600;
+const PLAYER_COUNTS = [1, 4, 10, 25, 50];
+
+function buildRoom(playerCount: number) {
+  const room = new ArenaRoom();
+  room.setState(new GameState());
+  room.worldSize = 4000;
+  room.playableRadius = 1800;
+
+  for (let i = 0; i < playerCount; i++) {
+    const player = new Player();
+    player.name = `Bench${i}`;
+    player.alive = true;
+    player.mass = 25 + Math.random() * 400;
+    player.radius = room.calculateRadius(player.mass);
+    const angle = Math.random() * Math.PI * 2;
+    const distance = Math.sqrt(Math.random()) * 1600;
+    player.x = 2000 + Math.cos(angle) * distance;
+    player.y = 2000 + Math.sin(angle) * distance;
+    player.vx = (Math.random() - 0.5) * 4;
+    player.vy = (Math.random() - 0.5) * 4;
+    room.state.players.set(`bench_${i}`, player);
+  }
+
+  room.rebuildCoinGrid();
+  room.generateCoins();
+  return room;
+}
+
+console.log("players | coins | checks/tick (grid) | checks/tick (full scan @ maxCoins) | ms/tick");
+
+PLAYER_COUNTS.forEach((playerCount) => {
+  const room = buildRoom(playerCount);
+  room.coinCollisionChecks = 0;
+
+  const start = process.hrtime.bigint();
+  for (let tick = 0; tick < TICKS; tick++) {
+    room["simulateTick"](1 / 60, Date.now());
+  }
+  const elapsedMs = Number(process.hrtime.bigint() - start) / 1e6;
+
+  const checksPerTick = room.coinCollisionChecks / TICKS;
+  const fullScanPerTick = playerCount * room.maxCoins;
+
+  console.log(
+    `${String(playerCount).padStart(7)} | ${String(room.state.coins.size).padStart(5)} | ` +
+    `${checksPerTick.toFixed(1).padStart(18)} | ${String(fullScanPerTick).padStart(34)} | ` +
+    `${(elapsedMs / TICKS).toFixed(3)}`
+  );
+});
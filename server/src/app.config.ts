@@ -1,13 +1,17 @@
 import config from "@colyseus/tools";
-import { ArenaRoom } from "./rooms/ArenaRoom.js";
+import { matchMaker } from "@colyseus/core";
+import { getPoolMetrics } from "./db";
+import { ArenaRoom, ROOM_METRICS_KEY, ROOM_METRICS_STALE_MS } from "./rooms/ArenaRoom.js";
 import { Request, Response } from "express";
 
 export default config({
   initializeGameServer: (gameServer) => {
-    // Define room types with filtering for shared arena
+    // One room type per stake tier (roomName). Rooms lock themselves past their
+    // load threshold, so joins land on the least-loaded unlocked instance and
+    // a new instance is created once every instance of a tier is hot.
     gameServer.define("arena", ArenaRoom)
       .filterBy(['roomName'])
-      .sortBy({ createdAt: -1 });
+      .sortBy({ clients: 1 });
   },
 
   initializeExpress: (app) => {
@@ -19,10 +23,48 @@ export default config({
         server: "colyseus",
         version: "1.0.0",
         region: process.env.REGION || "default",
-        maxPlayers: process.env.MAX_PLAYERS_PER_ROOM || "50"
+        maxPlayers: process.env.MAX_PLAYERS_PER_ROOM || "50",
+        mongoPool: getPoolMetrics()
       });
     });
 
+    // Live arena instances for the server browser. Each room publishes its
+    // counts into the presence hash once a second, so this is a memory read.
+    app.get("/rooms", async (req: Request, res: Response) => {
+      try {
+        const entries = (await matchMaker.presence.hgetall(ROOM_METRICS_KEY)) || {};
+        const now = Date.now();
+        const rooms: any[] = [];
+        const staleRoomIds: string[] = [];
+
+        Object.entries(entries).forEach(([roomId, raw]) => {
+          try {
+            const metrics = JSON.parse(raw as string);
+            if (now - (metrics.updatedAt || 0) > ROOM_METRICS_STALE_MS) {
+              staleRoomIds.push(roomId);
+              return;
+            }
+            rooms.push(metrics);
+          } catch {
+            staleRoomIds.push(roomId);
+          }
+        });
+
+        staleRoomIds.forEach((roomId) => {
+          Promise.resolve(matchMaker.presence.hdel(ROOM_METRICS_KEY, roomId)).catch(() => undefined);
+        });
+
+        res.json({
+          rooms,
+          region: process.env.REGION || "default",
+          timestamp: new Date(now).toISOString()
+        });
+      } catch (error: any) {
+        console.error("❌ Failed to list arena rooms:", error);
+        res.status(500).json({ error: "Failed to list arena rooms", message: error?.message });
+      }
+    });
+
     // Root endpoint
     app.get("/", (req: Request, res: Response) => {
       res.json({
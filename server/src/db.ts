@@ -0,0 +1,63 @@
+import { MongoClient, Db } from "mongodb";
+
+// Single MongoDB pool for the game server process. Rooms borrow connections
+// from here rather than holding their own clients.
+
+const poolOptions = {
+  maxPoolSize: parseInt(process.env.MONGO_MAX_POOL_SIZE || "10"),
+  minPoolSize: parseInt(process.env.MONGO_MIN_POOL_SIZE || "0"),
+  maxIdleTimeMS: parseInt(process.env.MONGO_MAX_IDLE_TIME_MS || "60000"),
+  waitQueueTimeoutMS: parseInt(process.env.MONGO_WAIT_QUEUE_TIMEOUT_MS || "10000"),
+  serverSelectionTimeoutMS: 5000,
+  connectTimeoutMS: 10000
+};
+
+const poolMetrics = {
+  connectionsCreated: 0,
+  connectionsClosed: 0,
+  checkedOut: 0,
+  checkoutFailures: 0
+};
+
+let clientPromise: Promise<MongoClient> | null = null;
+
+function createClient(url: string) {
+  const client = new MongoClient(url, poolOptions);
+
+  client.on("connectionCreated", () => { poolMetrics.connectionsCreated++; });
+  client.on("connectionClosed", () => { poolMetrics.connectionsClosed++; });
+  client.on("connectionCheckedOut", () => { poolMetrics.checkedOut++; });
+  client.on("connectionCheckedIn", () => { poolMetrics.checkedOut = Math.max(0, poolMetrics.checkedOut - 1); });
+  client.on("connectionCheckOutFailed", () => { poolMetrics.checkoutFailures++; });
+
+  return client;
+}
+
+export async function getDatabase(): Promise<Db | null> {
+  if (!process.env.MONGO_URL) {
+    console.warn("⚠️ Arena wallet integration disabled - MONGO_URL not configured");
+    return null;
+  }
+
+  if (!clientPromise) {
+    clientPromise = createClient(process.env.MONGO_URL).connect().catch((error) => {
+      clientPromise = null;
+      throw error;
+    });
+  }
+
+  const client = await clientPromise;
+  return client.db(process.env.MONGO_DB_NAME || "turfloot");
+}
+
+export function getPoolMetrics() {
+  const open = poolMetrics.connectionsCreated - poolMetrics.connectionsClosed;
+  return {
+    connected: clientPromise !== null,
+    maxPoolSize: poolOptions.maxPoolSize,
+    open,
+    inUse: poolMetrics.checkedOut,
+    utilization: poolOptions.maxPoolSize > 0 ? poolMetrics.checkedOut / poolOptions.maxPoolSize : 0,
+    checkoutFailures: poolMetrics.checkoutFailures
+  };
+}
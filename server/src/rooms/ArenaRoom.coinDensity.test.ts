@@ -0,0 +1,97 @@
+import assert from "assert";
+import {
+  ArenaRoom,
+  GameState,
+  Player,
+  Coin,
+  BASE_COIN_COUNT,
+  COINS_PER_PLAYER,
+  COIN_GRID_CELL_SIZE
+} from "./ArenaRoom";
+import { CoinDensityGrid } from "./CoinDensityGrid";
+
+const room = new ArenaRoom();
+room.setState(new GameState());
+room.worldSize = 4000;
+room.playableRadius = 1800;
+
+room.generateCoins();
+assert.strictEqual(
+  room.state.coins.size,
+  BASE_COIN_COUNT,
+  `Empty arena should hold the base coin count (${room.state.coins.size})`
+);
+
+const addPlayer = (id: string, x: number, y: number, mass: number) => {
+  const player = new Player();
+  player.name = id;
+  player.alive = true;
+  player.mass = mass;
+  player.radius = room.calculateRadius(mass);
+  player.x = x;
+  player.y = y;
+  room.state.players.set(id, player);
+  return player;
+};
+
+for (let i = 0; i < 5; i++) {
+  addPlayer(`p${i}`, 2000, 2000, 25);
+}
+room.replenishCoins();
+assert.strictEqual(
+  room.state.coins.size,
+  BASE_COIN_COUNT + 5 * COINS_PER_PLAYER,
+  "Coin total should scale with active player count"
+);
+
+room.maxCoins = 50;
+assert.strictEqual(room.getCoinTarget(), 50, "maxCoins should cap the scaled target");
+room.maxCoins = 300;
+
+// Pile every coin but one into a single far cell and park a player on the
+// remaining coin. The grid should only visit nearby cells, and the respawn
+// should land in an under-filled cell rather than the crowded one.
+const eater = addPlayer("eater", 2000, 2000, 400);
+const target = room.getCoinTarget();
+room.state.coins.clear();
+
+const crowdedX = 3500;
+const crowdedY = 2000;
+for (let i = 0; i < target - 1; i++) {
+  const coin = new Coin();
+  coin.x = crowdedX;
+  coin.y = crowdedY;
+  room.state.coins.set(`crowded_${i}`, coin);
+}
+
+const bait = new Coin();
+bait.x = eater.x;
+bait.y = eater.y;
+room.state.coins.set("bait", bait);
+room.rebuildCoinGrid();
+
+room.coinCollisionChecks = 0;
+room.checkCoinCollisions(eater);
+
+assert.strictEqual(
+  room.coinCollisionChecks,
+  1,
+  `Only coins in nearby cells should be distance-checked (${room.coinCollisionChecks})`
+);
+assert.ok(!room.state.coins.has("bait"), "Overlapping coin should be consumed");
+assert.strictEqual(room.state.coins.size, target, "Eaten coin should be replenished");
+
+const grid = new CoinDensityGrid(2000, 2000, room.playableRadius, COIN_GRID_CELL_SIZE);
+const crowdedCell = grid.cellIndexFor(crowdedX, crowdedY);
+room.state.coins.forEach((coin, coinId) => {
+  if (coinId.startsWith("crowded_")) {
+    return;
+  }
+  assert.notStrictEqual(
+    grid.cellIndexFor(coin.x, coin.y),
+    crowdedCell,
+    "Respawned coin should avoid the over-filled cell"
+  );
+});
+
+console.log("✅ Coin density regression test passed");
@@ -1,7 +1,9 @@
 import { Room, Client } from "@colyseus/core";
 import { Schema, MapSchema, type } from "@colyseus/schema";
-import { MongoClient, Db } from "mongodb";
 import crypto from "crypto";
+import { CoinDensityGrid } from "./CoinDensityGrid";
+import { RoomLoadMonitor } from "./RoomLoadMonitor";
+import { getDatabase } from "../db";
 
 const MIN_SPLIT_MASS = 40;
 const MAX_SPLIT_PIECES = 16;
@@ -14,37 +16,18 @@ export const MERGE_ATTRACTION_RATE = 0.02;
 export const MERGE_ATTRACTION_MAX = 120;
 export const MERGE_ATTRACTION_SPACING = 0.05;
 const FRICTION_PER_TICK_60HZ = 0.9830475724915585;
+export const COIN_GRID_CELL_SIZE = 300;
+export const BASE_COIN_COUNT = 60;
+export const COINS_PER_PLAYER = 12;
+const COIN_RADIUS = 8;
+const COIN_SPAWN_ATTEMPTS = 8;
+const LOAD_CHECK_INTERVAL_MS = 1000;
+export const ROOM_METRICS_KEY = "arena:room-metrics";
+export const ROOM_METRICS_STALE_MS = 5000;
 
 const USERS_COLLECTION = "users";
 const TRANSACTIONS_COLLECTION = "transactions";
 
-let cachedMongoClient: MongoClient | null = null;
-let cachedDb: Db | null = null;
-
-async function getDatabase(): Promise<Db | null> {
-  if (!process.env.MONGO_URL) {
-    console.warn("⚠️ Arena wallet integration disabled - MONGO_URL not configured");
-    return null;
-  }
-
-  if (cachedDb) {
-    return cachedDb;
-  }
-
-  if (!cachedMongoClient) {
-    cachedMongoClient = new MongoClient(process.env.MONGO_URL, {
-      maxPoolSize: 5
-    });
-  }
-
-  if (!cachedDb) {
-    await cachedMongoClient.connect();
-    cachedDb = cachedMongoClient.db(process.env.MONGO_DB_NAME || "turfloot");
-  }
-
-  return cachedDb;
-}
-
 // Player state schema
 export class Player extends Schema {
   @type("string") name: string = "Player";
@@ -101,11 +84,16 @@ export class GameState extends Schema {
 
 export class ArenaRoom extends Room<GameState> {
   maxClients = parseInt(process.env.MAX_PLAYERS_PER_ROOM || '50');
+  // Past either threshold the room locks itself so the matchmaker opens another
+  // instance of the same tier instead of piling more players into this one.
+  softCap = parseInt(process.env.ROOM_SOFT_CAP || String(Math.floor(this.maxClients * 0.8)));
+  tickP99BudgetMs = parseFloat(process.env.ROOM_TICK_P99_BUDGET_MS || '12');
+  tierName = "default";
 
   // Game configuration
   worldSize = parseInt(process.env.WORLD_SIZE || '4000');
   playableRadius = parseInt(process.env.PLAYABLE_RADIUS || '1800');
-  maxCoins = 300; // Triple the original 100-coin cap for higher arena density
+  maxCoins = 300; // Upper bound; the live target scales with player count
   maxViruses = 30; // Double the spike count to intensify arena hazards
   tickRate = parseInt(process.env.TICK_RATE || '20'); // TPS server logic
   private simulationRate = 60;
@@ -114,6 +102,11 @@ export class ArenaRoom extends Room<GameState> {
   private broadcastAccumulator = 0;
   private broadcastInterval = 1 / 20;
   private simulationTimestampMs = Date.now();
+  private coinGrid: CoinDensityGrid | null = null;
+  private nearbyCoinIds: string[] = [];
+  coinCollisionChecks = 0;
+  loadMonitor = new RoomLoadMonitor();
+  private autoscaleLocked = false;
 
   private normalizeStake(raw: unknown): number {
     if (typeof raw === "number" && Number.isFinite(raw)) {
@@ -371,8 +364,12 @@ export class ArenaRoom extends Room<GameState> {
     });
   }
 
-  onCreate() {
-    console.log("🌍 Arena room initialized");
+  onCreate(options: any = {}) {
+    if (typeof options?.roomName === "string" && options.roomName.trim() !== "") {
+      this.tierName = options.roomName.trim();
+    }
+
+    console.log(`🌍 Arena room initialized (${this.tierName})`);
 
     // Initialize game state
     this.setState(new GameState());
@@ -380,6 +377,7 @@ export class ArenaRoom extends Room<GameState> {
     this.state.playableRadius = this.playableRadius;
     
     // Generate initial world objects
+    this.rebuildCoinGrid();
     this.generateCoins();
     this.generateViruses();
     
@@ -411,14 +409,97 @@ export class ArenaRoom extends Room<GameState> {
       const deltaSeconds = typeof deltaTime === "number"
         ? Math.min(deltaTime, 250) / 1000
         : this.simulationDelta;
+      const stepStartedAt = performance.now();
       this.stepSimulation(deltaSeconds);
+      this.loadMonitor.record(performance.now() - stepStartedAt);
     }, 1000 / this.simulationRate);
 
-    console.log(`🪙 Generated ${this.maxCoins} coins`);
+    this.evaluateLoad();
+    this.clock.setInterval(() => this.evaluateLoad(), LOAD_CHECK_INTERVAL_MS);
+
+    console.log(`🪙 Generated ${this.state.coins.size} coins (target scales up to ${this.maxCoins})`);
     console.log(`🦠 Generated ${this.maxViruses} viruses`);
     console.log(`🔄 Game loop started: ${this.simulationRate} Hz sim / ${this.tickRate} TPS broadcast`);
   }
 
+  evaluateLoad() {
+    const players = this.clients.length;
+    const tickP99Ms = this.loadMonitor.tickP99();
+    const overloaded = this.loadMonitor.shouldLock(
+      players,
+      { softCap: this.softCap, tickP99BudgetMs: this.tickP99BudgetMs },
+      this.autoscaleLocked
+    );
+
+    if (overloaded && !this.autoscaleLocked) {
+      this.autoscaleLocked = true;
+      console.log(`📈 Arena ${this.roomId} (${this.tierName}) over load threshold - players ${players}/${this.softCap}, tick p99 ${tickP99Ms.toFixed(2)}ms`);
+      Promise.resolve(this.lock()).catch((error) => {
+        console.error("❌ Failed to lock overloaded arena room:", error);
+      });
+    } else if (!overloaded && this.autoscaleLocked) {
+      this.autoscaleLocked = false;
+      // Always release the explicit lock: Colyseus only reopens a full room
+      // on leave when the room was not locked explicitly
+      console.log(`📉 Arena ${this.roomId} (${this.tierName}) back under load threshold - reopening for joins`);
+      Promise.resolve(this.unlock()).catch((error) => {
+        console.error("❌ Failed to unlock arena room:", error);
+      });
+    }
+
+    Promise.resolve(this.setMetadata({
+      tier: this.tierName,
+      players,
+      softCap: this.softCap,
+      tickP99Ms: Number(tickP99Ms.toFixed(3)),
+      overloaded
+    })).catch((error) => {
+      console.error("❌ Failed to publish arena room metadata:", error);
+    });
+
+    this.publishRoomMetrics(tickP99Ms, overloaded);
+
+    return overloaded;
+  }
+
+  buildRoomMetrics(tickP99Ms: number, overloaded: boolean) {
+    let players = 0;
+    this.clients.forEach((client) => {
+      const player = this.state.players.get(client.sessionId);
+      if (player && player.alive) {
+        players++;
+      }
+    });
+
+    return {
+      roomId: this.roomId,
+      tier: this.tierName,
+      players,
+      spectators: this.clients.length - players,
+      clients: this.clients.length,
+      maxClients: this.maxClients,
+      locked: this.autoscaleLocked || this.clients.length >= this.maxClients,
+      overloaded,
+      tickP99Ms: Number(tickP99Ms.toFixed(3)),
+      heapUsedMb: Number((process.memoryUsage().heapUsed / 1024 / 1024).toFixed(1)),
+      updatedAt: Date.now()
+    };
+  }
+
+  // Writes this room's live counts into the shared presence hash so the
+  // `/rooms` endpoint can serve the server browser without touching Mongo.
+  publishRoomMetrics(tickP99Ms: number, overloaded: boolean) {
+    if (!this.presence) {
+      return;
+    }
+
+    const metrics = this.buildRoomMetrics(tickP99Ms, overloaded);
+    Promise.resolve(this.presence.hset(ROOM_METRICS_KEY, this.roomId, JSON.stringify(metrics)))
+      .catch((error) => {
+        console.error("❌ Failed to publish arena room metrics:", error);
+      });
+  }
+
   private getNextSpawnPosition(padding: number = 0): { x: number, y: number } {
     const spawn = this.samplePositionWithinPlayableRadius(padding);
 
@@ -525,6 +606,7 @@ export class ArenaRoom extends Room<GameState> {
 
     // Add player to game state
     this.state.players.set(client.sessionId, player);
+    this.replenishCoins();
 
     // Store client metadata
     (client as any).userData = {
@@ -788,22 +870,40 @@ export class ArenaRoom extends Room<GameState> {
   }
 
   checkCoinCollisions(player: Player) {
-    this.state.coins.forEach((coin, coinId) => {
+    const grid = this.ensureCoinGrid();
+    const candidates = this.nearbyCoinIds;
+    candidates.length = 0;
+    grid.collectNear(player.x, player.y, player.radius + COIN_RADIUS, candidates);
+
+    let consumed = false;
+
+    for (const coinId of candidates) {
+      const coin = this.state.coins.get(coinId);
+      if (!coin) {
+        grid.remove(coinId);
+        continue;
+      }
+
+      this.coinCollisionChecks++;
+
       const dx = player.x - coin.x;
       const dy = player.y - coin.y;
       const distance = Math.sqrt(dx * dx + dy * dy);
-      
+
       if (distance < player.radius + coin.radius) {
         // Player consumes coin
         player.mass += coin.value;
         player.score += coin.value;
         player.radius = this.calculateRadius(player.mass);
-        
-        // Remove coin and spawn new one
-        this.state.coins.delete(coinId);
-        this.spawnCoin();
+
+        this.removeCoin(coinId);
+        consumed = true;
       }
-    });
+    }
+
+    if (consumed) {
+      this.replenishCoins();
+    }
   }
 
   checkVirusCollisions(player: Player) {
@@ -1098,9 +1198,84 @@ export class ArenaRoom extends Room<GameState> {
   }
 
   generateCoins() {
-    for (let i = 0; i < this.maxCoins; i++) {
-      this.spawnCoin();
+    this.replenishCoins();
+  }
+
+  countActivePlayers() {
+    let count = 0;
+    this.state.players.forEach((player) => {
+      if (player.alive && !player.isSplitPiece) {
+        count++;
+      }
+    });
+    return count;
+  }
+
+  getCoinTarget() {
+    const scaled = BASE_COIN_COUNT + COINS_PER_PLAYER * this.countActivePlayers();
+    return Math.max(0, Math.min(this.maxCoins, scaled));
+  }
+
+  // Tops the coin field back up to the player-scaled target. Surplus coins left
+  // behind when players leave are not culled; they simply aren't replaced.
+  replenishCoins() {
+    const target = this.getCoinTarget();
+    while (this.state.coins.size < target) {
+      this.spawnCoin(target);
+    }
+  }
+
+  rebuildCoinGrid() {
+    const center = this.worldSize / 2;
+    this.coinGrid = new CoinDensityGrid(center, center, this.playableRadius, COIN_GRID_CELL_SIZE);
+    this.state.coins.forEach((coin, coinId) => {
+      this.coinGrid!.add(coinId, coin.x, coin.y);
+    });
+    return this.coinGrid;
+  }
+
+  private ensureCoinGrid() {
+    const grid = this.coinGrid;
+    const center = this.worldSize / 2;
+    if (
+      !grid ||
+      grid.centerX !== center ||
+      grid.radius !== Math.max(0, this.playableRadius) ||
+      grid.size !== this.state.coins.size
+    ) {
+      return this.rebuildCoinGrid();
     }
+    return grid;
+  }
+
+  private removeCoin(coinId: string) {
+    this.coinGrid?.remove(coinId);
+    this.state.coins.delete(coinId);
+  }
+
+  private sampleCoinPosition(grid: CoinDensityGrid, target: number, padding: number) {
+    const cellIndex = grid.pickUnderfilledCell(target);
+    if (cellIndex < 0) {
+      return this.samplePositionWithinPlayableRadius(padding);
+    }
+
+    const bounds = grid.cellBounds(cellIndex);
+    const centerX = this.worldSize / 2;
+    const centerY = this.worldSize / 2;
+    const effectiveRadius = Math.max(0, this.playableRadius - padding);
+    const effectiveRadiusSq = effectiveRadius * effectiveRadius;
+
+    for (let attempt = 0; attempt < COIN_SPAWN_ATTEMPTS; attempt++) {
+      const x = bounds.minX + Math.random() * (bounds.maxX - bounds.minX);
+      const y = bounds.minY + Math.random() * (bounds.maxY - bounds.minY);
+      const dx = x - centerX;
+      const dy = y - centerY;
+      if (dx * dx + dy * dy <= effectiveRadiusSq) {
+        return { x, y };
+      }
+    }
+
+    return this.samplePositionWithinPlayableRadius(padding);
   }
 
   generateViruses() {
@@ -1109,18 +1284,20 @@ export class ArenaRoom extends Room<GameState> {
     }
   }
 
-  spawnCoin() {
+  spawnCoin(target: number = this.getCoinTarget()) {
+    const grid = this.ensureCoinGrid();
     const coinId = `coin_${Date.now()}_${Math.random().toString(36).substring(7)}`;
     const coin = new Coin();
     coin.value = 1;
-    coin.radius = 8;
+    coin.radius = COIN_RADIUS;
     coin.color = "#FFD700";
 
-    const position = this.samplePositionWithinPlayableRadius(coin.radius);
+    const position = this.sampleCoinPosition(grid, target, coin.radius);
     coin.x = position.x;
     coin.y = position.y;
 
     this.state.coins.set(coinId, coin);
+    grid.add(coinId, coin.x, coin.y);
   }
 
   spawnVirus() {
@@ -1145,6 +1322,12 @@ export class ArenaRoom extends Room<GameState> {
   }
 
   onDispose() {
+    if (this.presence) {
+      Promise.resolve(this.presence.hdel(ROOM_METRICS_KEY, this.roomId)).catch((error) => {
+        console.error("❌ Failed to clear arena room metrics:", error);
+      });
+    }
+
     console.log('🛑 Arena room disposed');
   }
 }
\ No newline at end of file
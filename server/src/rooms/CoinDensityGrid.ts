@@ -0,0 +1,189 @@
+// Coarse occupancy grid laid over the playable circle. Each cell tracks the
+// coins inside it so collision checks only visit nearby cells and respawns
+// can be steered towards cells that players have drained.
+
+const AREA_SAMPLES_PER_AXIS = 4;
+
+export interface CellBounds {
+  minX: number;
+  minY: number;
+  maxX: number;
+  maxY: number;
+}
+
+export class CoinDensityGrid {
+  readonly cellSize: number;
+  readonly centerX: number;
+  readonly centerY: number;
+  readonly radius: number;
+  readonly originX: number;
+  readonly originY: number;
+  readonly cols: number;
+  readonly rows: number;
+
+  private readonly weights: Float64Array;
+  private readonly totalWeight: number;
+  private readonly buckets: Array<Set<string>>;
+  private readonly coinCells = new Map<string, number>();
+
+  constructor(centerX: number, centerY: number, radius: number, cellSize: number) {
+    this.centerX = centerX;
+    this.centerY = centerY;
+    this.radius = Math.max(0, radius);
+    this.cellSize = Math.max(1, cellSize);
+    this.originX = centerX - this.radius;
+    this.originY = centerY - this.radius;
+    this.cols = Math.max(1, Math.ceil((this.radius * 2) / this.cellSize));
+    this.rows = this.cols;
+
+    const cellCount = this.cols * this.rows;
+    this.weights = new Float64Array(cellCount);
+    this.buckets = new Array(cellCount);
+
+    let totalWeight = 0;
+    for (let index = 0; index < cellCount; index++) {
+      this.buckets[index] = new Set<string>();
+      const weight = this.estimateCoverage(index);
+      this.weights[index] = weight;
+      totalWeight += weight;
+    }
+
+    this.totalWeight = totalWeight;
+  }
+
+  get size() {
+    return this.coinCells.size;
+  }
+
+  has(coinId: string) {
+    return this.coinCells.has(coinId);
+  }
+
+  cellIndexFor(x: number, y: number) {
+    const col = this.clampCol(Math.floor((x - this.originX) / this.cellSize));
+    const row = this.clampRow(Math.floor((y - this.originY) / this.cellSize));
+    return row * this.cols + col;
+  }
+
+  cellBounds(index: number): CellBounds {
+    const col = index % this.cols;
+    const row = Math.floor(index / this.cols);
+    const minX = this.originX + col * this.cellSize;
+    const minY = this.originY + row * this.cellSize;
+    return { minX, minY, maxX: minX + this.cellSize, maxY: minY + this.cellSize };
+  }
+
+  countInCell(index: number) {
+    return this.buckets[index]?.size ?? 0;
+  }
+
+  add(coinId: string, x: number, y: number) {
+    this.remove(coinId);
+    const index = this.cellIndexFor(x, y);
+    this.buckets[index].add(coinId);
+    this.coinCells.set(coinId, index);
+  }
+
+  remove(coinId: string) {
+    const index = this.coinCells.get(coinId);
+    if (index === undefined) {
+      return false;
+    }
+
+    this.buckets[index].delete(coinId);
+    this.coinCells.delete(coinId);
+    return true;
+  }
+
+  clear() {
+    this.buckets.forEach((bucket) => bucket.clear());
+    this.coinCells.clear();
+  }
+
+  // Collects the ids of coins in every cell overlapping the square of half-size
+  // `reach` around (x, y). Callers still perform the exact distance check.
+  collectNear(x: number, y: number, reach: number, out: string[] = []) {
+    const minCol = this.clampCol(Math.floor((x - reach - this.originX) / this.cellSize));
+    const maxCol = this.clampCol(Math.floor((x + reach - this.originX) / this.cellSize));
+    const minRow = this.clampRow(Math.floor((y - reach - this.originY) / this.cellSize));
+    const maxRow = this.clampRow(Math.floor((y + reach - this.originY) / this.cellSize));
+
+    for (let row = minRow; row <= maxRow; row++) {
+      for (let col = minCol; col <= maxCol; col++) {
+        this.buckets[row * this.cols + col].forEach((coinId) => {
+          out.push(coinId);
+        });
+      }
+    }
+
+    return out;
+  }
+
+  // Picks a cell whose coin count is below its share of `targetTotal`, with
+  // probability proportional to the deficit. Returns -1 when every cell is at
+  // or above its share so the caller can fall back to uniform sampling.
+  pickUnderfilledCell(targetTotal: number, random: () => number = Math.random) {
+    if (this.totalWeight <= 0 || targetTotal <= 0) {
+      return -1;
+    }
+
+    const perWeight = targetTotal / this.totalWeight;
+    let totalDeficit = 0;
+
+    for (let index = 0; index < this.weights.length; index++) {
+      const deficit = this.weights[index] * perWeight - this.buckets[index].size;
+      if (deficit > 0) {
+        totalDeficit += deficit;
+      }
+    }
+
+    if (totalDeficit <= 0) {
+      return -1;
+    }
+
+    let threshold = random() * totalDeficit;
+    let lastCandidate = -1;
+
+    for (let index = 0; index < this.weights.length; index++) {
+      const deficit = this.weights[index] * perWeight - this.buckets[index].size;
+      if (deficit <= 0) {
+        continue;
+      }
+
+      lastCandidate = index;
+      threshold -= deficit;
+      if (threshold <= 0) {
+        return index;
+      }
+    }
+
+    return lastCandidate;
+  }
+
+  private estimateCoverage(index: number) {
+    const { minX, minY } = this.cellBounds(index);
+    const step = this.cellSize / AREA_SAMPLES_PER_AXIS;
+    const radiusSq = this.radius * this.radius;
+    let inside = 0;
+
+    for (let i = 0; i < AREA_SAMPLES_PER_AXIS; i++) {
+      for (let j = 0; j < AREA_SAMPLES_PER_AXIS; j++) {
+        const dx = minX + (i + 0.5) * step - this.centerX;
+        const dy = minY + (j + 0.5) * step - this.centerY;
+        if (dx * dx + dy * dy <= radiusSq) {
+          inside++;
+        }
+      }
+    }
+
+    return inside / (AREA_SAMPLES_PER_AXIS * AREA_SAMPLES_PER_AXIS);
+  }
+
+  private clampCol(col: number) {
+    return Math.min(this.cols - 1, Math.max(0, col));
+  }
+
+  private clampRow(row: number) {
+    return Math.min(this.rows - 1, Math.max(0, row));
+  }
+}
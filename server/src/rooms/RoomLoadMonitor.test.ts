@@ -0,0 +1,27 @@
+import assert from "assert";
+import { RoomLoadMonitor } from "./RoomLoadMonitor";
+
+const thresholds = { softCap: 40, tickP99BudgetMs: 12 };
+
+const monitor = new RoomLoadMonitor(100);
+for (let i = 0; i < 100; i++) {
+  monitor.record(i < 98 ? 2 : 20);
+}
+
+assert.strictEqual(monitor.tickP99(), 20, "p99 should pick up the slowest 2% of steps");
+assert.ok(monitor.shouldLock(10, thresholds, false), "Slow ticks should lock the room");
+
+const idle = new RoomLoadMonitor(100);
+for (let i = 0; i < 100; i++) {
+  idle.record(1);
+}
+
+assert.ok(!idle.shouldLock(10, thresholds, false), "Quiet room should stay open");
+assert.ok(idle.shouldLock(40, thresholds, false), "Reaching the soft cap should lock the room");
+assert.ok(
+  idle.shouldLock(36, thresholds, true),
+  "Locked room should stay locked until it drops below the hysteresis band"
+);
+assert.ok(!idle.shouldLock(30, thresholds, true), "Room should unlock well under the soft cap");
+
+console.log("✅ Room load monitor regression test passed");
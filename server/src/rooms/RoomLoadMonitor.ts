@@ -0,0 +1,65 @@
+// Tracks recent simulation step durations and decides when a room is too hot
+// to accept more players. Locked rooms are skipped by the matchmaker, which
+// then spins up another instance for the same stake tier.
+
+const DEFAULT_SAMPLE_WINDOW = 300; // ~5 seconds of 60 Hz simulation steps
+const UNLOCK_HYSTERESIS = 0.85;
+
+export interface RoomLoadThresholds {
+  softCap: number;
+  tickP99BudgetMs: number;
+}
+
+export class RoomLoadMonitor {
+  private readonly samples: Float64Array;
+  private sampleCount = 0;
+  private cursor = 0;
+
+  constructor(sampleWindow: number = DEFAULT_SAMPLE_WINDOW) {
+    this.samples = new Float64Array(Math.max(1, sampleWindow));
+  }
+
+  record(durationMs: number) {
+    if (!Number.isFinite(durationMs) || durationMs < 0) {
+      return;
+    }
+
+    this.samples[this.cursor] = durationMs;
+    this.cursor = (this.cursor + 1) % this.samples.length;
+    this.sampleCount = Math.min(this.sampleCount + 1, this.samples.length);
+  }
+
+  percentile(p: number) {
+    if (this.sampleCount === 0) {
+      return 0;
+    }
+
+    const sorted = Array.from(this.samples.subarray(0, this.sampleCount)).sort((a, b) => a - b);
+    const rank = Math.min(sorted.length - 1, Math.max(0, Math.ceil(p * sorted.length) - 1));
+    return sorted[rank];
+  }
+
+  tickP99() {
+    return this.percentile(0.99);
+  }
+
+  // Returns true when the room should stop accepting new joins. Once locked,
+  // the room stays locked until both signals drop below the hysteresis band so
+  // a room hovering at the threshold doesn't flap between states.
+  shouldLock(players: number, thresholds: RoomLoadThresholds, currentlyLocked: boolean) {
+    const p99 = this.tickP99();
+
+    if (players >= thresholds.softCap || p99 >= thresholds.tickP99BudgetMs) {
+      return true;
+    }
+
+    if (!currentlyLocked) {
+      return false;
+    }
+
+    return (
+      players >= Math.floor(thresholds.softCap * UNLOCK_HYSTERESIS) ||
+      p99 >= thresholds.tickP99BudgetMs * UNLOCK_HYSTERESIS
+    );
+  }
+}
@@ -0,0 +1,1128 @@
+#!/usr/bin/env python3
+"""
+TurfLoot Solana RPC Stand-in
+Local JSON-RPC and Helius webhook stand-in for benchmarking paid joins and
+cash-outs end to end without mainnet or devnet.
+
+The server keeps a scripted ledger (balances plus transactions) and serves the
+JSON-RPC methods the app uses:
+1. getTransaction (json, jsonParsed and base64 encodings) and getParsedTransaction
+2. getSignatureStatuses, with processed -> confirmed -> finalized progression
+3. getLatestBlockhash, getBlockHeight, getSlot and getBalance
+4. sendTransaction: decodes system transfers from the signed wire transaction,
+   checks the blockhash and balances like preflight, and lands it after --land-ms
+5. JSON-RPC batch requests (lib/rpcGateway.js batches concurrent calls)
+
+Replay safety: transactions are keyed by signature, so resending a signed
+transaction, re-scripting a signature or redelivering a webhook never applies a
+transfer twice. Faults are drawn from a random generator seeded with --seed, so
+a run with the same script and seed injects the same faults.
+
+Fault injection (CLI defaults, overridable per method via POST /admin/faults):
+latency and jitter, HTTP 503s, 429s with Retry-After, a requests-per-second
+limit, dropped transactions that never land, and webhook drops, delays and
+duplicate deliveries.
+
+Landed transactions are delivered to --webhook-url in the Helius enhanced
+transaction format, in batches, with --webhook-secret as the Authorization
+header (see app/api/paid/webhook/route.js).
+
+Admin endpoints for scripting the ledger:
+- POST /admin/transactions {"transactions": [{"transfers": [{"from", "to", "lamports"}], "memo", "signature", "landAfterMs", "err"}]}
+- POST /admin/balances {"balances": {"<address>": lamports}}
+- POST /admin/faults {"method": "getTransaction", "latencyMs": 200, "errorRate": 0.1}
+- GET /admin/stats
+
+Usage:
+  python solana_rpc_standin.py serve --port 8899 --webhook-url http://localhost:3000/api/paid/webhook --webhook-secret bench
+  SOLANA_RPC_URLS=http://127.0.0.1:8899 NEXT_PUBLIC_HELIUS_RPC=http://127.0.0.1:8899 \\
+    HELIUS_WEBHOOK_SECRET=bench PAID_ROOMS_WEBHOOK_CONFIRMATION=true yarn dev
+  python solana_rpc_standin.py bench --room <roomId> --joins 200 --cashouts 50 --concurrency 16
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import struct
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import requests
+
+SYSTEM_PROGRAM_ID = "11111111111111111111111111111111"
+MEMO_PROGRAM_ID = "MemoSq4gqABAXKb96qnH8TysNcWxMyWCqXgDLGmfcHr"
+SYSTEM_TRANSFER_INSTRUCTION = 2
+SIGNATURE_FEE_LAMPORTS = 5_000
+# A blockhash is valid for 150 blocks after the slot it was issued in
+BLOCKHASH_VALIDITY_SLOTS = 150
+MAX_SIGNATURE_STATUSES = 256
+FIRST_SLOT = 300_000_000
+RPC_METHODS = {
+    "getHealth", "getSlot", "getBlockHeight", "getLatestBlockhash", "getBalance",
+    "getSignatureStatuses", "getTransaction", "getParsedTransaction", "sendTransaction"
+}
+
+B58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+B58_INDEX = {char: index for index, char in enumerate(B58_ALPHABET)}
+
+
+def b58encode(data):
+    number = int.from_bytes(data, "big")
+    encoded = ""
+    while number:
+        number, remainder = divmod(number, 58)
+        encoded = B58_ALPHABET[remainder] + encoded
+    padding = len(data) - len(data.lstrip(b"\0"))
+    return "1" * padding + encoded
+
+
+def b58decode(text):
+    number = 0
+    for char in text:
+        number = number * 58 + B58_INDEX[char]
+    padding = len(text) - len(text.lstrip("1"))
+    body = number.to_bytes((number.bit_length() + 7) // 8, "big") if number else b""
+    return b"\0" * padding + body
+
+
+def encode_compact_u16(value):
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def decode_compact_u16(data, offset):
+    value = 0
+    for shift in range(3):
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << (7 * shift)
+        if not byte & 0x80:
+            break
+    return value, offset
+
+
+def random_pubkey(rng=random):
+    return b58encode(bytes(rng.getrandbits(8) for _ in range(32)))
+
+
+class RpcError(Exception):
+    """JSON-RPC error returned to the caller"""
+
+    def __init__(self, code, message, data=None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.data = data
+
+
+# ---------------------------------------------------------------------------
+# Wire format
+# ---------------------------------------------------------------------------
+
+def serialize_message(message):
+    """Serializes a legacy or v0 message (without address table lookups)"""
+    out = bytearray()
+    if message["version"] == 0:
+        out.append(0x80)
+    out += bytes(message["header"])
+    out += encode_compact_u16(len(message["accountKeys"]))
+    for key in message["accountKeys"]:
+        out += b58decode(key)
+    out += b58decode(message["recentBlockhash"])
+    out += encode_compact_u16(len(message["instructions"]))
+    for ix in message["instructions"]:
+        out.append(ix["programIdIndex"])
+        out += encode_compact_u16(len(ix["accounts"]))
+        out += bytes(ix["accounts"])
+        out += encode_compact_u16(len(ix["data"]))
+        out += ix["data"]
+    if message["version"] == 0:
+        out += encode_compact_u16(0)
+    return bytes(out)
+
+
+def deserialize_transaction(raw):
+    """Parses a signed wire transaction into signatures and a message"""
+    count, offset = decode_compact_u16(raw, 0)
+    signatures = [b58encode(raw[offset + 64 * i:offset + 64 * (i + 1)]) for i in range(count)]
+    offset += 64 * count
+
+    version = "legacy"
+    if raw[offset] & 0x80:
+        version = raw[offset] & 0x7F
+        offset += 1
+    header = list(raw[offset:offset + 3])
+    offset += 3
+
+    key_count, offset = decode_compact_u16(raw, offset)
+    account_keys = [b58encode(raw[offset + 32 * i:offset + 32 * (i + 1)]) for i in range(key_count)]
+    offset += 32 * key_count
+    recent_blockhash = b58encode(raw[offset:offset + 32])
+    offset += 32
+
+    instructions = []
+    ix_count, offset = decode_compact_u16(raw, offset)
+    for _ in range(ix_count):
+        program_id_index = raw[offset]
+        offset += 1
+        account_count, offset = decode_compact_u16(raw, offset)
+        accounts = list(raw[offset:offset + account_count])
+        offset += account_count
+        data_length, offset = decode_compact_u16(raw, offset)
+        instructions.append({
+            "programIdIndex": program_id_index,
+            "accounts": accounts,
+            "data": bytes(raw[offset:offset + data_length])
+        })
+        offset += data_length
+
+    if version == 0:
+        lookup_count, offset = decode_compact_u16(raw, offset)
+        if lookup_count:
+            raise RpcError(-32602, "Address table lookups are not supported by the stand-in")
+
+    return signatures, {
+        "version": version,
+        "header": header,
+        "accountKeys": account_keys,
+        "recentBlockhash": recent_blockhash,
+        "instructions": instructions
+    }
+
+
+def decode_effects(message):
+    """Extracts system transfers and memo text from a compiled message"""
+    keys = message["accountKeys"]
+    transfers = []
+    memo = None
+    for ix in message["instructions"]:
+        program_id = keys[ix["programIdIndex"]]
+        data = ix["data"]
+        if program_id == SYSTEM_PROGRAM_ID and len(data) >= 12 and struct.unpack_from("<I", data)[0] == SYSTEM_TRANSFER_INSTRUCTION:
+            transfers.append({
+                "from": keys[ix["accounts"][0]],
+                "to": keys[ix["accounts"][1]],
+                "lamports": struct.unpack_from("<Q", data, 4)[0]
+            })
+        elif program_id == MEMO_PROGRAM_ID:
+            memo = data.decode("utf-8", errors="replace")
+    return transfers, memo
+
+
+def compile_message(transfers, memo, fee_payer, recent_blockhash):
+    """Compiles scripted transfers and memo into a legacy message"""
+    signers = [fee_payer] + [t["from"] for t in transfers if t["from"] != fee_payer]
+    signers = list(dict.fromkeys(signers))
+    writable = [t["to"] for t in transfers if t["to"] not in signers]
+    programs = ([SYSTEM_PROGRAM_ID] if transfers else []) + ([MEMO_PROGRAM_ID] if memo is not None else [])
+    keys = list(dict.fromkeys(signers + writable + programs))
+    index = {key: i for i, key in enumerate(keys)}
+
+    instructions = [{
+        "programIdIndex": index[SYSTEM_PROGRAM_ID],
+        "accounts": [index[t["from"]], index[t["to"]]],
+        "data": struct.pack("<IQ", SYSTEM_TRANSFER_INSTRUCTION, int(t["lamports"]))
+    } for t in transfers]
+    if memo is not None:
+        instructions.append({
+            "programIdIndex": index[MEMO_PROGRAM_ID],
+            "accounts": [index[fee_payer]],
+            "data": memo.encode("utf-8")
+        })
+
+    return {
+        "version": "legacy",
+        "header": [len(signers), 0, len(programs)],
+        "accountKeys": keys,
+        "recentBlockhash": recent_blockhash,
+        "instructions": instructions
+    }
+
+
+# ---------------------------------------------------------------------------
+# Ledger
+# ---------------------------------------------------------------------------
+
+class Ledger:
+    """Balances and transactions; slots advance with wall-clock time"""
+
+    def __init__(self, default_balance, slot_ms, confirm_slots, finalize_slots, rng):
+        self.lock = threading.RLock()
+        self.default_balance = default_balance
+        self.slot_ms = slot_ms
+        self.confirm_slots = confirm_slots
+        self.finalize_slots = finalize_slots
+        self.rng = rng
+        self.started = time.time()
+        self.balances = {}
+        self.transactions = {}
+        self.pending = []
+        self.issued_blockhashes = {}
+        self.on_landed = []
+        self.counters = {"scripted": 0, "sent": 0, "landed": 0, "failed": 0, "dropped": 0, "duplicates": 0}
+
+    def slot(self):
+        return FIRST_SLOT + int((time.time() - self.started) * 1000 / self.slot_ms)
+
+    def block_height(self):
+        # One block per slot
+        return self.slot() - FIRST_SLOT
+
+    def blockhash(self, slot=None):
+        slot = self.slot() if slot is None else slot
+        blockhash = b58encode(hashlib.sha256(f"turfloot-standin:{slot}".encode()).digest())
+        with self.lock:
+            self.issued_blockhashes[blockhash] = slot
+        return blockhash
+
+    def balance(self, address):
+        with self.lock:
+            return self.balances.get(address, self.default_balance)
+
+    def set_balances(self, balances):
+        with self.lock:
+            self.balances.update({address: int(lamports) for address, lamports in balances.items()})
+
+    def check_blockhash(self, blockhash):
+        issued_slot = self.issued_blockhashes.get(blockhash)
+        if issued_slot is None or self.slot() > issued_slot + BLOCKHASH_VALIDITY_SLOTS:
+            raise RpcError(-32002, "Transaction simulation failed: Blockhash not found", {"err": "BlockhashNotFound", "logs": []})
+
+    def simulate(self, transfers, fee_payer):
+        """Returns the transfer error preflight would report, or None"""
+        with self.lock:
+            spending = {fee_payer: SIGNATURE_FEE_LAMPORTS}
+            for index, transfer in enumerate(transfers):
+                spending[transfer["from"]] = spending.get(transfer["from"], 0) + int(transfer["lamports"])
+                if spending[transfer["from"]] > self.balance(transfer["from"]):
+                    return {"InstructionError": [index, {"Custom": 1}]}
+        return None
+
+    def add(self, kind, signatures, message, raw=None, err=None, land_after_ms=0, drop=False):
+        """Queues a scripted or sent transaction; returns False when its signature is already known"""
+        signature = signatures[0]
+        with self.lock:
+            if signature in self.transactions:
+                self.counters["duplicates"] += 1
+                return False
+            self.counters[kind] += 1
+            transfers, memo = decode_effects(message)
+            self.transactions[signature] = {
+                "signatures": signatures,
+                "message": message,
+                "raw": raw,
+                "transfers": transfers,
+                "memo": memo,
+                "err": err,
+                "landed": False,
+                "dropped": drop
+            }
+            if drop:
+                self.counters["dropped"] += 1
+            else:
+                self.pending.append((time.time() + land_after_ms / 1000, signature))
+                self.pending.sort()
+        return True
+
+    def land_due(self):
+        """Applies pending transactions whose landing time has passed"""
+        landed = []
+        with self.lock:
+            now = time.time()
+            while self.pending and self.pending[0][0] <= now:
+                _, signature = self.pending.pop(0)
+                landed.append(self._apply(self.transactions[signature]))
+        for transaction in landed:
+            for callback in self.on_landed:
+                callback(transaction)
+        return len(landed)
+
+    def _apply(self, transaction):
+        keys = transaction["message"]["accountKeys"]
+        pre_balances = [self.balance(key) for key in keys]
+        fee_payer = keys[0]
+        self.balances[fee_payer] = max(0, self.balance(fee_payer) - SIGNATURE_FEE_LAMPORTS)
+
+        err = transaction["err"] or self.simulate(transaction["transfers"], fee_payer)
+        if err is None:
+            for transfer in transaction["transfers"]:
+                self.balances[transfer["from"]] = self.balance(transfer["from"]) - int(transfer["lamports"])
+                self.balances[transfer["to"]] = self.balance(transfer["to"]) + int(transfer["lamports"])
+
+        transaction.update({
+            "err": err,
+            "landed": True,
+            "slot": self.slot(),
+            "blockTime": int(time.time()),
+            "preBalances": pre_balances,
+            "postBalances": [self.balance(key) for key in keys]
+        })
+        self.counters["failed" if err else "landed"] += 1
+        return transaction
+
+    def get(self, signature):
+        with self.lock:
+            transaction = self.transactions.get(signature)
+            return transaction if transaction and transaction["landed"] else None
+
+    def commitment(self, transaction):
+        age = self.slot() - transaction["slot"]
+        if age >= self.finalize_slots:
+            return "finalized", None
+        if age >= self.confirm_slots:
+            return "confirmed", age
+        return "processed", age
+
+
+# ---------------------------------------------------------------------------
+# Faults
+# ---------------------------------------------------------------------------
+
+FAULT_FIELDS = {
+    "latencyMs": 0.0,
+    "jitterMs": 0.0,
+    "errorRate": 0.0,
+    "rateLimitRate": 0.0,
+    "landMs": 0.0,
+    "dropRate": 0.0
+}
+
+
+class Faults:
+    """Per-method fault profiles ("*" applies to every method)"""
+
+    def __init__(self, defaults, rps, rng):
+        self.lock = threading.Lock()
+        self.rng = rng
+        self.profiles = {"*": {**FAULT_FIELDS, **defaults}}
+        self.rps = rps
+        self.tokens = rps
+        self.refilled_at = time.time()
+        self.injected = {"latency": 0, "errors": 0, "rateLimited": 0}
+
+    def update(self, method, fields):
+        with self.lock:
+            profile = self.profiles.setdefault(method, {})
+            profile.update({key: float(value) for key, value in fields.items() if key in FAULT_FIELDS})
+            return dict(self.profiles)
+
+    def profile(self, methods):
+        """Merges the profiles of every method in a request, worst case wins"""
+        with self.lock:
+            merged = dict(self.profiles["*"])
+            for method in methods:
+                for key, value in self.profiles.get(method, {}).items():
+                    merged[key] = max(merged[key], value)
+            return merged
+
+    def chance(self, rate):
+        with self.lock:
+            return rate > 0 and self.rng.random() < rate
+
+    def take_token(self):
+        if not self.rps:
+            return True
+        with self.lock:
+            now = time.time()
+            self.tokens = min(self.rps, self.tokens + (now - self.refilled_at) * self.rps)
+            self.refilled_at = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+    def delay(self, profile):
+        with self.lock:
+            jitter = self.rng.random() * profile["jitterMs"]
+        delay_ms = profile["latencyMs"] + jitter
+        if delay_ms > 0:
+            self.injected["latency"] += 1
+            time.sleep(delay_ms / 1000)
+
+
+# ---------------------------------------------------------------------------
+# Webhooks
+# ---------------------------------------------------------------------------
+
+def helius_enhanced_transaction(transaction):
+    """Renders a landed transaction in Helius' enhanced transaction format"""
+    message = transaction["message"]
+    keys = message["accountKeys"]
+    return {
+        "signature": transaction["signatures"][0],
+        "slot": transaction["slot"],
+        "timestamp": transaction["blockTime"],
+        "type": "TRANSFER",
+        "source": "SYSTEM_PROGRAM",
+        "fee": SIGNATURE_FEE_LAMPORTS,
+        "feePayer": keys[0],
+        "description": "",
+        "transactionError": transaction["err"],
+        "nativeTransfers": [] if transaction["err"] else [
+            {"fromUserAccount": t["from"], "toUserAccount": t["to"], "amount": int(t["lamports"])}
+            for t in transaction["transfers"]
+        ],
+        "tokenTransfers": [],
+        "accountData": [
+            {"account": key, "nativeBalanceChange": post - pre, "tokenBalanceChanges": []}
+            for key, pre, post in zip(keys, transaction["preBalances"], transaction["postBalances"])
+        ],
+        "instructions": [
+            {
+                "programId": keys[ix["programIdIndex"]],
+                "accounts": [keys[index] for index in ix["accounts"]],
+                "data": b58encode(ix["data"]),
+                "innerInstructions": []
+            }
+            for ix in message["instructions"]
+        ],
+        "events": {}
+    }
+
+
+class WebhookDispatcher:
+    """Delivers landed transactions to the app in batches, at least once"""
+
+    def __init__(self, url, secret, accounts, batch_ms, delay_ms, drop_rate, duplicate_rate, rng):
+        self.url = url
+        self.secret = secret
+        self.accounts = set(accounts or [])
+        self.batch_ms = batch_ms
+        self.delay_ms = delay_ms
+        self.drop_rate = drop_rate
+        self.duplicate_rate = duplicate_rate
+        self.rng = rng
+        self.lock = threading.Lock()
+        self.queue = []
+        self.session = requests.Session()
+        self.counters = {"delivered": 0, "failed": 0, "dropped": 0, "duplicated": 0, "batches": 0}
+
+    def enqueue(self, transaction):
+        keys = transaction["message"]["accountKeys"]
+        if self.accounts and not self.accounts.intersection(keys):
+            return
+        with self.lock:
+            self.queue.append((time.time() + self.delay_ms / 1000, False, helius_enhanced_transaction(transaction)))
+
+    def run(self):
+        while True:
+            time.sleep(self.batch_ms / 1000)
+            now = time.time()
+            with self.lock:
+                due = [entry for entry in self.queue if entry[0] <= now]
+                self.queue = [entry for entry in self.queue if entry[0] > now]
+                kept = [entry for entry in due if self.rng.random() >= self.drop_rate]
+                duplicates = [entry for entry in kept if not entry[1] and self.rng.random() < self.duplicate_rate]
+                self.counters["dropped"] += len(due) - len(kept)
+                # Redelivered once more later, like Helius retrying a delivery
+                self.queue += [(now + self.rng.random(), True, payload) for _, _, payload in duplicates]
+                self.counters["duplicated"] += len(duplicates)
+            if kept:
+                self.deliver([payload for _, _, payload in kept])
+
+    def deliver(self, payloads, attempts=3):
+        headers = {"Content-Type": "application/json"}
+        if self.secret:
+            headers["Authorization"] = self.secret
+        for attempt in range(attempts):
+            try:
+                response = self.session.post(self.url, json=payloads, headers=headers, timeout=30)
+                if response.status_code < 300:
+                    self.counters["delivered"] += len(payloads)
+                    self.counters["batches"] += 1
+                    return
+                print(f"⚠️ Webhook returned {response.status_code}: {response.text[:200]}")
+            except requests.RequestException as error:
+                print(f"⚠️ Webhook delivery failed: {error}")
+            time.sleep(0.5 * 2 ** attempt)
+        self.counters["failed"] += len(payloads)
+
+
+# ---------------------------------------------------------------------------
+# JSON-RPC methods
+# ---------------------------------------------------------------------------
+
+class RpcMethods:
+    def __init__(self, ledger, faults):
+        self.ledger = ledger
+        self.faults = faults
+
+    def context(self):
+        return {"context": {"slot": self.ledger.slot(), "apiVersion": "1.18.0"}}
+
+    def getHealth(self, *_):
+        return "ok"
+
+    def getSlot(self, *_):
+        return self.ledger.slot()
+
+    def getBlockHeight(self, *_):
+        return self.ledger.block_height()
+
+    def getLatestBlockhash(self, *_):
+        slot = self.ledger.slot()
+        return {
+            **self.context(),
+            "value": {
+                "blockhash": self.ledger.blockhash(slot),
+                "lastValidBlockHeight": slot - FIRST_SLOT + BLOCKHASH_VALIDITY_SLOTS
+            }
+        }
+
+    def getBalance(self, address, *_):
+        return {**self.context(), "value": self.ledger.balance(address)}
+
+    def getSignatureStatuses(self, signatures, *_):
+        if len(signatures) > MAX_SIGNATURE_STATUSES:
+            raise RpcError(-32602, f"Too many inputs provided; max {MAX_SIGNATURE_STATUSES}")
+        statuses = []
+        for signature in signatures:
+            transaction = self.ledger.get(signature)
+            if not transaction:
+                statuses.append(None)
+                continue
+            commitment, confirmations = self.ledger.commitment(transaction)
+            err = transaction["err"]
+            statuses.append({
+                "slot": transaction["slot"],
+                "confirmations": confirmations,
+                "err": err,
+                "status": {"Err": err} if err else {"Ok": None},
+                "confirmationStatus": commitment
+            })
+        return {**self.context(), "value": statuses}
+
+    def getTransaction(self, signature, config=None):
+        config = config if isinstance(config, dict) else {"encoding": config or "json"}
+        transaction = self.ledger.get(signature)
+        if not transaction:
+            return None
+        if config.get("commitment") == "finalized" and self.ledger.commitment(transaction)[0] != "finalized":
+            return None
+        if config.get("commitment", "confirmed") == "confirmed" and self.ledger.commitment(transaction)[0] == "processed":
+            return None
+
+        message = transaction["message"]
+        if message["version"] == 0 and config.get("maxSupportedTransactionVersion") is None:
+            raise RpcError(
+                -32015,
+                "Transaction version (0) is not supported by the requesting client. "
+                "Please try the request again with the following configuration parameter: "
+                "\"maxSupportedTransactionVersion\": 0"
+            )
+
+        encoding = config.get("encoding", "json")
+        if encoding == "base64":
+            raw = transaction["raw"] or self.serialize(transaction)
+            rendered = [base64.b64encode(raw).decode(), "base64"]
+        elif encoding == "jsonParsed":
+            rendered = self.render_parsed(transaction)
+        else:
+            rendered = self.render_json(transaction)
+
+        err = transaction["err"]
+        meta = {
+            "err": err,
+            "status": {"Err": err} if err else {"Ok": None},
+            "fee": SIGNATURE_FEE_LAMPORTS,
+            "preBalances": transaction["preBalances"],
+            "postBalances": transaction["postBalances"],
+            "innerInstructions": [],
+            "logMessages": [],
+            "preTokenBalances": [],
+            "postTokenBalances": [],
+            "rewards": [],
+            "computeUnitsConsumed": 150 * len(message["instructions"])
+        }
+        if message["version"] == 0:
+            meta["loadedAddresses"] = {"writable": [], "readonly": []}
+
+        return {
+            "slot": transaction["slot"],
+            "blockTime": transaction["blockTime"],
+            "transaction": rendered,
+            "meta": meta,
+            "version": message["version"]
+        }
+
+    def getParsedTransaction(self, signature, config=None):
+        config = dict(config) if isinstance(config, dict) else {}
+        config["encoding"] = "jsonParsed"
+        return self.getTransaction(signature, config)
+
+    def sendTransaction(self, encoded, config=None):
+        config = config or {}
+        raw = base64.b64decode(encoded) if config.get("encoding") == "base64" else b58decode(encoded)
+        signatures, message = deserialize_transaction(raw)
+        signature = signatures[0]
+        # Resending a known transaction is a no-op, as on a real cluster
+        with self.ledger.lock:
+            if signature in self.ledger.transactions:
+                self.ledger.counters["duplicates"] += 1
+                return signature
+
+        self.ledger.check_blockhash(message["recentBlockhash"])
+        if not config.get("skipPreflight"):
+            transfers, _ = decode_effects(message)
+            err = self.ledger.simulate(transfers, message["accountKeys"][0])
+            if err:
+                raise RpcError(
+                    -32002,
+                    "Transaction simulation failed: Attempt to debit an account but found no record of a prior credit.",
+                    {"err": err, "logs": []}
+                )
+
+        profile = self.faults.profile(["sendTransaction"])
+        self.ledger.add(
+            "sent",
+            signatures,
+            message,
+            raw=raw,
+            land_after_ms=profile["landMs"],
+            drop=self.faults.chance(profile["dropRate"])
+        )
+        return signature
+
+    def serialize(self, transaction):
+        out = bytearray(encode_compact_u16(len(transaction["signatures"])))
+        for signature in transaction["signatures"]:
+            out += b58decode(signature)
+        return bytes(out + serialize_message(transaction["message"]))
+
+    def render_json(self, transaction):
+        message = transaction["message"]
+        rendered = {
+            "accountKeys": message["accountKeys"],
+            "header": {
+                "numRequiredSignatures": message["header"][0],
+                "numReadonlySignedAccounts": message["header"][1],
+                "numReadonlyUnsignedAccounts": message["header"][2]
+            },
+            "recentBlockhash": message["recentBlockhash"],
+            "instructions": [
+                {
+                    "programIdIndex": ix["programIdIndex"],
+                    "accounts": ix["accounts"],
+                    "data": b58encode(ix["data"]),
+                    "stackHeight": None
+                }
+                for ix in message["instructions"]
+            ]
+        }
+        if message["version"] == 0:
+            rendered["addressTableLookups"] = []
+        return {"signatures": transaction["signatures"], "message": rendered}
+
+    def render_parsed(self, transaction):
+        message = transaction["message"]
+        keys = message["accountKeys"]
+        num_signers, readonly_signed, readonly_unsigned = message["header"]
+
+        def writable(index):
+            if index < num_signers:
+                return index < num_signers - readonly_signed
+            return index < len(keys) - readonly_unsigned
+
+        instructions = []
+        for ix in message["instructions"]:
+            program_id = keys[ix["programIdIndex"]]
+            data = ix["data"]
+            if program_id == SYSTEM_PROGRAM_ID and len(data) >= 12 and struct.unpack_from("<I", data)[0] == SYSTEM_TRANSFER_INSTRUCTION:
+                instructions.append({
+                    "program": "system",
+                    "programId": program_id,
+                    "parsed": {
+                        "type": "transfer",
+                        "info": {
+                            "source": keys[ix["accounts"][0]],
+                            "destination": keys[ix["accounts"][1]],
+                            "lamports": struct.unpack_from("<Q", data, 4)[0]
+                        }
+                    },
+                    "stackHeight": None
+                })
+            elif program_id == MEMO_PROGRAM_ID:
+                instructions.append({
+                    "program": "spl-memo",
+                    "programId": program_id,
+                    "parsed": data.decode("utf-8", errors="replace"),
+                    "stackHeight": None
+                })
+            else:
+                instructions.append({
+                    "programId": program_id,
+                    "accounts": [keys[index] for index in ix["accounts"]],
+                    "data": b58encode(data),
+                    "stackHeight": None
+                })
+
+        return {
+            "signatures": transaction["signatures"],
+            "message": {
+                "accountKeys": [
+                    {"pubkey": key, "signer": index < num_signers, "writable": writable(index), "source": "transaction"}
+                    for index, key in enumerate(keys)
+                ],
+                "recentBlockhash": message["recentBlockhash"],
+                "instructions": instructions
+            }
+        }
+
+
+# ---------------------------------------------------------------------------
+# HTTP server
+# ---------------------------------------------------------------------------
+
+class StandinServer:
+    def __init__(self, args):
+        self.rng = random.Random(args.seed)
+        self.ledger = Ledger(args.default_balance, args.slot_ms, args.confirm_slots, args.finalize_slots, self.rng)
+        self.faults = Faults({
+            "latencyMs": args.latency_ms,
+            "jitterMs": args.jitter_ms,
+            "errorRate": args.error_rate,
+            "rateLimitRate": args.rate_limit_rate,
+            "landMs": args.land_ms,
+            "dropRate": args.drop_rate
+        }, args.rps, self.rng)
+        self.methods = RpcMethods(self.ledger, self.faults)
+        self.requests = {}
+        self.requests_lock = threading.Lock()
+        self.webhooks = None
+        if args.webhook_url:
+            self.webhooks = WebhookDispatcher(
+                args.webhook_url,
+                args.webhook_secret,
+                args.webhook_accounts,
+                args.webhook_batch_ms,
+                args.webhook_delay_ms,
+                args.webhook_drop_rate,
+                args.webhook_duplicate_rate,
+                self.rng
+            )
+            self.ledger.on_landed.append(self.webhooks.enqueue)
+        if args.ledger:
+            with open(args.ledger) as handle:
+                self.load_script(json.load(handle))
+
+    def load_script(self, script):
+        self.ledger.set_balances(script.get("balances", {}))
+        return self.script_transactions(script.get("transactions", []))
+
+    def script_transactions(self, transactions):
+        signatures = []
+        for spec in transactions:
+            transfers = [
+                {"from": t.get("from") or spec.get("feePayer"), "to": t["to"], "lamports": int(t["lamports"])}
+                for t in spec.get("transfers", [])
+            ]
+            fee_payer = spec.get("feePayer") or (transfers[0]["from"] if transfers else random_pubkey(self.rng))
+            message = compile_message(transfers, spec.get("memo"), fee_payer, self.ledger.blockhash())
+            with self.faults.lock:
+                generated = [b58encode(bytes(self.rng.getrandbits(8) for _ in range(64))) for _ in range(message["header"][0])]
+            signature_list = [spec["signature"]] + generated[1:] if spec.get("signature") else generated
+            self.ledger.add(
+                "scripted",
+                signature_list,
+                message,
+                err=spec.get("err"),
+                land_after_ms=float(spec.get("landAfterMs", 0)),
+                drop=bool(spec.get("drop"))
+            )
+            signatures.append(signature_list[0])
+        return signatures
+
+    def count(self, method):
+        with self.requests_lock:
+            self.requests[method] = self.requests.get(method, 0) + 1
+
+    def call(self, request):
+        request_id = request.get("id") if isinstance(request, dict) else None
+        try:
+            method_name = request.get("method")
+            if method_name not in RPC_METHODS:
+                raise RpcError(-32601, "Method not found")
+            self.count(method_name)
+            result = getattr(self.methods, method_name)(*(request.get("params") or []))
+            return {"jsonrpc": "2.0", "id": request_id, "result": result}
+        except RpcError as error:
+            payload = {"code": error.code, "message": error.message}
+            if error.data is not None:
+                payload["data"] = error.data
+            return {"jsonrpc": "2.0", "id": request_id, "error": payload}
+        except (TypeError, KeyError, ValueError, IndexError) as error:
+            return {"jsonrpc": "2.0", "id": request_id, "error": {"code": -32602, "message": f"Invalid params: {error}"}}
+
+    def stats(self):
+        return {
+            "slot": self.ledger.slot(),
+            "blockHeight": self.ledger.block_height(),
+            "requests": dict(self.requests),
+            "faults": {"profiles": self.faults.profiles, "injected": self.faults.injected},
+            "ledger": {**self.ledger.counters, "pending": len(self.ledger.pending)},
+            "webhooks": self.webhooks.counters if self.webhooks else None
+        }
+
+    def handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *_):
+                pass
+
+            def send_json(self, status, payload, headers=None):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def read_json(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(length) or b"null")
+
+            def do_GET(self):
+                if urlparse(self.path).path == "/admin/stats":
+                    return self.send_json(200, server.stats())
+                if urlparse(self.path).path == "/health":
+                    return self.send_json(200, {"status": "ok", "slot": server.ledger.slot()})
+                self.send_json(404, {"error": "Not found"})
+
+            def do_POST(self):
+                path = urlparse(self.path).path
+                try:
+                    payload = self.read_json()
+                except json.JSONDecodeError:
+                    return self.send_json(400, {"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": "Parse error"}})
+
+                if path == "/admin/transactions":
+                    return self.send_json(200, {"signatures": server.script_transactions(payload.get("transactions", []))})
+                if path == "/admin/balances":
+                    server.ledger.set_balances(payload.get("balances", {}))
+                    return self.send_json(200, {"ok": True})
+                if path == "/admin/faults":
+                    fields = {key: value for key, value in payload.items() if key != "method"}
+                    return self.send_json(200, {"profiles": server.faults.update(payload.get("method", "*"), fields)})
+
+                calls = payload if isinstance(payload, list) else [payload]
+                profile = server.faults.profile([call.get("method") for call in calls if isinstance(call, dict)])
+                server.faults.delay(profile)
+                if not server.faults.take_token() or server.faults.chance(profile["rateLimitRate"]):
+                    server.faults.injected["rateLimited"] += 1
+                    return self.send_json(429, {"jsonrpc": "2.0", "error": {"code": 429, "message": "Too many requests"}}, {"Retry-After": "1"})
+                if server.faults.chance(profile["errorRate"]):
+                    server.faults.injected["errors"] += 1
+                    return self.send_json(503, {"error": "Service unavailable"})
+
+                replies = [server.call(call) for call in calls]
+                self.send_json(200, replies if isinstance(payload, list) else replies[0])
+
+        return Handler
+
+    def serve(self, host, port):
+        def tick():
+            while True:
+                self.ledger.land_due()
+                time.sleep(min(self.ledger.slot_ms, 50) / 1000)
+
+        threading.Thread(target=tick, daemon=True).start()
+        if self.webhooks:
+            threading.Thread(target=self.webhooks.run, daemon=True).start()
+
+        httpd = ThreadingHTTPServer((host, port), self.handler())
+        httpd.daemon_threads = True
+        print(f"🚀 Solana RPC stand-in listening on http://{host}:{port} (slot {self.ledger.slot()})")
+        if self.webhooks:
+            print(f"📬 Delivering webhooks to {self.webhooks.url}")
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            print("\n📊 Final stats:", json.dumps(self.stats(), indent=2))
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def percentile(samples, fraction):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class PaymentBenchmark:
+    """Drives paid joins and cash-outs against the app and the stand-in"""
+
+    def __init__(self, args):
+        self.args = args
+        self.api = f"{args.app.rstrip('/')}/api"
+        self.rpc = args.rpc.rstrip("/")
+        self.local = threading.local()
+
+    @property
+    def session(self):
+        if not hasattr(self.local, "session"):
+            self.local.session = requests.Session()
+        return self.local.session
+
+    def paid_join(self, index):
+        """Intent -> scripted payment -> signature -> join ticket"""
+        started = time.time()
+        player = random_pubkey()
+        response = self.session.post(f"{self.api}/paid/intent", json={
+            "userId": f"bench-user-{uuid.uuid4()}",
+            "gameId": f"bench-game-{index}",
+            "roomId": self.args.room,
+            "playerPubkey": player
+        }, timeout=30)
+        if response.status_code != 200:
+            return False, time.time() - started, f"intent {response.status_code}"
+        intent = response.json()
+
+        transfers = [{"from": player, "to": intent["prizeVault"], "lamports": intent["entryLamports"]}]
+        if intent.get("feeVault") and intent.get("feeLamports"):
+            transfers.append({"from": player, "to": intent["feeVault"], "lamports": intent["feeLamports"]})
+        scripted = self.session.post(f"{self.rpc}/admin/transactions", json={"transactions": [{
+            "feePayer": player,
+            "transfers": transfers,
+            "memo": json.dumps(intent["memoJson"], separators=(",", ":")),
+            "landAfterMs": self.args.land_ms
+        }]}, timeout=30).json()
+        signature = scripted["signatures"][0]
+
+        if not self.args.webhook_only:
+            response = self.session.post(f"{self.api}/paid/intent/{intent['intentId']}/signature", json={"signature": signature}, timeout=30)
+            if response.status_code != 200:
+                return False, time.time() - started, f"signature {response.status_code}"
+
+        deadline = started + self.args.timeout
+        while time.time() < deadline:
+            response = self.session.get(f"{self.api}/paid/intent/{intent['intentId']}/ticket", timeout=30)
+            if response.status_code == 200:
+                return True, time.time() - started, None
+            if response.status_code not in (202, 404):
+                return False, time.time() - started, f"ticket {response.status_code}"
+            time.sleep(self.args.poll_ms / 1000)
+        return False, time.time() - started, "timeout"
+
+    def cashout(self, index):
+        started = time.time()
+        response = self.session.post(f"{self.api}/cashout", json={
+            "userWalletAddress": random_pubkey(),
+            "cashOutValueUSD": self.args.cashout_usd,
+            "privyUserId": f"bench-cashout-{index}"
+        }, timeout=max(30, self.args.timeout))
+        ok = response.status_code in (200, 202) and response.json().get("success", True)
+        return ok, time.time() - started, None if ok else f"cashout {response.status_code}"
+
+    def run_phase(self, label, count, fn):
+        if count <= 0:
+            return
+        latencies = []
+        errors = {}
+        started = time.time()
+        with ThreadPoolExecutor(max_workers=self.args.concurrency) as pool:
+            for ok, elapsed, error in pool.map(self.safe(fn), range(count)):
+                if ok:
+                    latencies.append(elapsed)
+                else:
+                    errors[error] = errors.get(error, 0) + 1
+        wall = time.time() - started
+        print(
+            f"{label:<10} {len(latencies)}/{count} ok  {len(latencies) / wall:.1f}/s  "
+            f"p50 {percentile(latencies, 0.5) * 1000:.0f}ms  p95 {percentile(latencies, 0.95) * 1000:.0f}ms  "
+            f"max {max(latencies, default=0) * 1000:.0f}ms"
+        )
+        if errors:
+            print(f"   Errors: {errors}")
+
+    @staticmethod
+    def safe(fn):
+        def wrapped(index):
+            started = time.time()
+            try:
+                return fn(index)
+            except (requests.RequestException, ValueError, KeyError) as error:
+                return False, time.time() - started, type(error).__name__
+        return wrapped
+
+    def run(self):
+        print(f"⚡ Payment benchmark: {self.args.joins} paid joins and {self.args.cashouts} cash-outs, "
+              f"concurrency {self.args.concurrency}, app {self.args.app}, RPC {self.rpc}")
+        self.run_phase("paid joins", self.args.joins, self.paid_join)
+        self.run_phase("cash-outs", self.args.cashouts, self.cashout)
+        stats = self.session.get(f"{self.rpc}/admin/stats", timeout=10).json()
+        print("📊 Stand-in stats:", json.dumps({key: stats[key] for key in ("requests", "ledger", "webhooks")}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Solana RPC and Helius webhook stand-in")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="Run the stand-in RPC server")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8899)
+    serve.add_argument("--seed", type=int, default=1)
+    serve.add_argument("--ledger", help="JSON script with initial balances and transactions")
+    serve.add_argument("--default-balance", type=int, default=1_000 * 10**9, help="Lamports of unscripted accounts")
+    serve.add_argument("--slot-ms", type=float, default=400)
+    serve.add_argument("--confirm-slots", type=int, default=1, help="Slots until a transaction is confirmed")
+    serve.add_argument("--finalize-slots", type=int, default=32, help="Slots until a transaction is finalized")
+    serve.add_argument("--latency-ms", type=float, default=0)
+    serve.add_argument("--jitter-ms", type=float, default=0)
+    serve.add_argument("--error-rate", type=float, default=0, help="Share of requests answered with 503")
+    serve.add_argument("--rate-limit-rate", type=float, default=0, help="Share of requests answered with 429")
+    serve.add_argument("--rps", type=float, default=0, help="Requests per second before 429s (0 = unlimited)")
+    serve.add_argument("--land-ms", type=float, default=0, help="Delay before sent transactions land")
+    serve.add_argument("--drop-rate", type=float, default=0, help="Share of sent transactions that never land")
+    serve.add_argument("--webhook-url")
+    serve.add_argument("--webhook-secret")
+    serve.add_argument("--webhook-accounts", nargs="*", help="Only deliver transactions touching these accounts")
+    serve.add_argument("--webhook-batch-ms", type=float, default=250)
+    serve.add_argument("--webhook-delay-ms", type=float, default=0)
+    serve.add_argument("--webhook-drop-rate", type=float, default=0)
+    serve.add_argument("--webhook-duplicate-rate", type=float, default=0)
+
+    bench = commands.add_parser("bench", help="Measure paid joins and cash-outs per second")
+    bench.add_argument("--app", default="http://localhost:3000")
+    bench.add_argument("--rpc", default="http://127.0.0.1:8899")
+    bench.add_argument("--room", required=True, help="Paid room id")
+    bench.add_argument("--joins", type=int, default=100)
+    bench.add_argument("--cashouts", type=int, default=0)
+    bench.add_argument("--cashout-usd", type=float, default=1.0)
+    bench.add_argument("--concurrency", type=int, default=16)
+    bench.add_argument("--land-ms", type=float, default=0, help="Delay before scripted payments land")
+    bench.add_argument("--poll-ms", type=float, default=250)
+    bench.add_argument("--timeout", type=float, default=60)
+    bench.add_argument("--webhook-only", action="store_true", help="Skip signature submission; rely on webhooks")
+
+    args = parser.parse_args()
+    if args.command == "serve":
+        StandinServer(args).serve(args.host, args.port)
+    else:
+        PaymentBenchmark(args).run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
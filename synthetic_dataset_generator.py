@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+"""
+Synthetic Dataset Generator
+Streams production-scale data into a local MongoDB for load tests and query
+benchmarks (see mongo_query_audit.py).
+
+Documents use the same shapes the routes write and read:
+  social db (DB_NAME)   users, friends, friend_requests, parties, party_invites
+  game db (turfloot)    game_sessions, game_room_activity, elimination_earnings
+  default db (URI)      users (userId/balance), paid_matches
+
+Skew is configurable: friend counts follow a power law (a few very popular
+users, a long tail with one or two friends) and sessions/matches concentrate
+in a handful of hot rooms. Everything is generated lazily and written with
+unordered bulk inserts, so memory stays flat for millions of documents.
+
+Generated identifiers never match the test-account patterns in
+lib/userDiscovery.js, so scripts/cleanup-demo-users.js and the discovery
+backfill leave the data alone.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+
+import pymongo
+
+MONGO_URL = os.getenv('MONGO_URL', 'mongodb://localhost:27017')
+DB_NAME = os.getenv('DB_NAME', 'turfloot_db')
+GAME_DB_NAME = 'turfloot'
+# Must match lib/indexManifest.js and lib/gameSessions.js: sessions idle for
+# longer than the TTL are deleted, and rooms are counted per bucket
+GAME_SESSION_TTL_SECONDS = int(os.getenv('GAME_SESSION_TTL_SECONDS', 600))
+GAME_SESSION_BUCKET_MS = int(os.getenv('GAME_SESSION_BUCKET_MS', 60_000))
+# Active players heartbeat at least this often
+HEARTBEAT_SECONDS = 30
+EPOCH = datetime(1970, 1, 1)
+
+# Base-34 without 'e' and 'o': no identifier can spell test/debug/demo/mock.
+ID_ALPHABET = '0123456789abcdfghijklmnpqrstuvwxyz'
+ID_SPACE = len(ID_ALPHABET) ** 12
+# Odd multiplier coprime with ID_SPACE so i -> identifier is a bijection that
+# doesn't sort in insertion order.
+ID_SCRAMBLE = 0x9E3779B1
+
+NAME_PARTS = [
+    'swift', 'crimson', 'lunar', 'iron', 'neon', 'silent', 'atomic', 'wild',
+    'frost', 'shadow', 'solar', 'rapid', 'brave', 'cosmic', 'amber', 'vivid',
+]
+NAME_NOUNS = [
+    'wolf', 'falcon', 'viper', 'blade', 'storm', 'rider', 'hunter', 'spark',
+    'comet', 'titan', 'ranger', 'phantom', 'raven', 'lynx', 'nova', 'drake',
+]
+SKIN_COLORS = ['#3b82f6', '#ef4444', '#22c55e', '#eab308', '#a855f7', '#f97316']
+# Matches ROOM_TIERS in app/api/[[...path]]/route.js
+ROOM_TIERS = {
+    1: {'entryFee': 100, 'bounty': 90, 'platformFee': 10},
+    5: {'entryFee': 500, 'bounty': 450, 'platformFee': 50},
+    20: {'entryFee': 2000, 'bounty': 1800, 'platformFee': 200},
+}
+
+COLLECTIONS = {
+    'users': ('social', 'users'),
+    'friends': ('social', 'friends'),
+    'friend_requests': ('social', 'friend_requests'),
+    'parties': ('social', 'parties'),
+    'party_invites': ('social', 'party_invites'),
+    'game_sessions': ('game', 'game_sessions'),
+    # Must come after game_sessions: counts the sessions generated there
+    'game_room_activity': ('game', 'game_room_activity'),
+    'elimination_earnings': ('game', 'elimination_earnings'),
+    'wallet_users': ('default', 'users'),
+    'paid_matches': ('default', 'paid_matches'),
+}
+
+
+def user_identifier(index):
+    value = (index * ID_SCRAMBLE) % ID_SPACE
+    chars = []
+    for _ in range(12):
+        value, digit = divmod(value, len(ID_ALPHABET))
+        chars.append(ID_ALPHABET[digit])
+    return 'did:privy:cm' + ''.join(chars)
+
+
+def username(index):
+    return f"{NAME_PARTS[index % len(NAME_PARTS)]}{NAME_NOUNS[(index // len(NAME_PARTS)) % len(NAME_NOUNS)]}{index}"
+
+
+def wallet_address(index):
+    return 'W' + user_identifier(index)[12:] + f"{index:08d}"
+
+
+def iso(date):
+    return date.isoformat(timespec='milliseconds') + 'Z'
+
+
+def session_bucket(date):
+    """Activity bucket of a UTC datetime, as getBucket() in lib/gameSessions.js."""
+    return int((date - EPOCH).total_seconds() * 1000) // GAME_SESSION_BUCKET_MS
+
+
+class Generator:
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.now = datetime.utcnow()
+        # (roomId, bucket) -> players, filled in by game_sessions()
+        self.room_activity = None
+
+    # --- skew helpers -------------------------------------------------------
+
+    def power_law(self, minimum, maximum, alpha):
+        """Pareto-distributed integer in [minimum, maximum]."""
+        return min(maximum, int(minimum * self.rng.paretovariate(alpha)))
+
+    def popular_index(self, upper, skew):
+        """Index in [0, upper) biased towards 0; skew=1 is uniform."""
+        return min(upper - 1, int(upper * self.rng.random() ** skew))
+
+    def room_id(self):
+        return f"arena_{self.popular_index(self.args.rooms, self.args.room_skew):05d}"
+
+    def recent(self, max_days):
+        return self.now - timedelta(seconds=self.rng.randint(0, int(max_days * 86400)))
+
+    # --- documents ------------------------------------------------------------
+
+    def users(self):
+        for i in range(self.args.users):
+            doc = {
+                'userIdentifier': user_identifier(i),
+                'username': username(i),
+                'displayName': username(i),
+                'walletAddress': wallet_address(i),
+                'createdAt': iso(self.recent(365)),
+                'isTestAccount': False,
+                'isDiscoverable': True,
+                'gamesPlayed': self.power_law(1, 5000, 1.2) - 1,
+                'equippedSkin': {
+                    'type': 'circle',
+                    'color': self.rng.choice(SKIN_COLORS),
+                    'pattern': 'solid'
+                },
+            }
+            # Wallet-only logins have no email on the user document
+            if self.rng.random() < 0.7:
+                doc['email'] = f"{username(i)}@players.turfloot.io"
+            yield doc
+
+    def friends(self):
+        """Both directions of every accepted friendship, as accept does.
+
+        User i only befriends users with a lower index, drawn with
+        popularity skew, so edges are unique and low indexes end up with
+        power-law degree."""
+        for i in range(1, self.args.users):
+            wanted = min(i, self.power_law(1, self.args.max_friends, self.args.friend_alpha))
+            picked = set()
+            while len(picked) < wanted:
+                picked.add(self.popular_index(i, self.args.friend_skew))
+
+            for j in picked:
+                added = iso(self.recent(180))
+                for a, b in ((i, j), (j, i)):
+                    yield {
+                        'userIdentifier': user_identifier(a),
+                        'friendUserIdentifier': user_identifier(b),
+                        'friendUsername': username(b),
+                        'status': 'accepted',
+                        'addedAt': added,
+                        'lastSeen': added,
+                    }
+
+    def friend_requests(self):
+        for i in range(self.args.users):
+            # (fromUserId, toUserId) is unique, so each target at most once
+            targets = {self.popular_index(self.args.users, self.args.friend_skew)
+                       for _ in range(self.power_law(1, 50, 2.0) - 1)}
+            targets.discard(i)
+            for n, target in enumerate(targets):
+                yield {
+                    'id': f"req_{i}_{n}",
+                    'fromUserIdentifier': user_identifier(i),
+                    'fromUserId': user_identifier(i),
+                    'fromUsername': username(i),
+                    'toUserIdentifier': user_identifier(target),
+                    'toUserId': user_identifier(target),
+                    'toUsername': username(target),
+                    'sentAt': iso(self.recent(30)),
+                    # Accepted and declined requests are deleted by the route
+                    'status': 'pending',
+                }
+
+    def party_count(self):
+        return max(1, int(self.args.users * self.args.party_ratio))
+
+    def parties(self):
+        for p in range(self.party_count()):
+            owner = self.rng.randrange(self.args.users)
+            max_players = self.rng.choice([2, 2, 2, 4])
+            size = self.rng.randint(1, max_players)
+            members = {owner}
+            while len(members) < size:
+                members.add(self.rng.randrange(self.args.users))
+            status = self.rng.choices(['waiting', 'in_game', 'finished'], weights=[3, 1, 6])[0]
+            yield {
+                'id': f"party_{p}",
+                'name': f"{username(owner)}'s party",
+                'createdBy': user_identifier(owner),
+                'createdByUsername': username(owner),
+                'privacy': self.rng.choices(['public', 'private'], weights=[2, 1])[0],
+                'maxPlayers': max_players,
+                'currentPlayers': [user_identifier(m) for m in members],
+                'status': status,
+                'createdAt': iso(self.recent(14)),
+                'invitedPlayers': [],
+            }
+
+    def party_invites(self):
+        for p in range(self.party_count()):
+            if self.rng.random() > 0.3:
+                continue
+            sender = self.rng.randrange(self.args.users)
+            target = self.popular_index(self.args.users, self.args.friend_skew)
+            yield {
+                'id': f"invite_{p}",
+                'type': 'party_invite',
+                'partyId': f"party_{p}",
+                'partyName': f"{username(sender)}'s party",
+                'fromUserIdentifier': user_identifier(sender),
+                'fromUsername': username(sender),
+                'toUserIdentifier': user_identifier(target),
+                'toUsername': username(target),
+                'sentAt': iso(self.recent(7)),
+                'status': 'pending',
+                'privacy': 'private',
+                'maxPlayers': 2,
+            }
+
+    def game_sessions(self):
+        """Sessions as touchSession() leaves them, all within the TTL window.
+
+        Active sessions heartbeat every HEARTBEAT_SECONDS and are counted in
+        their current bucket (and the previous one if they were already
+        playing then); the counts are written by game_room_activity().
+        """
+        self.room_activity = {}
+        for s in range(int(self.args.users * self.args.sessions_per_user)):
+            player = self.rng.randrange(self.args.users)
+            room = self.room_id()
+            is_active = self.rng.random() < self.args.active_ratio
+            if is_active:
+                last_activity = self.now - timedelta(seconds=HEARTBEAT_SECONDS * self.rng.random())
+            else:
+                last_activity = self.now - timedelta(seconds=GAME_SESSION_TTL_SECONDS * self.rng.random())
+            joined_at = last_activity - timedelta(seconds=self.rng.randint(30, 1800))
+            counted_bucket = session_bucket(last_activity)
+            previous_bucket = counted_bucket - 1 if session_bucket(joined_at) < counted_bucket else None
+
+            doc = {
+                'sessionId': f"session_{s}",
+                'roomId': room,
+                'userId': user_identifier(player),
+                'joinedAt': joined_at,
+                'lastActivity': last_activity,
+                'status': 'active' if is_active else 'left',
+                'countedBucket': counted_bucket,
+                'previousBucket': previous_bucket,
+            }
+            if is_active:
+                for bucket in (counted_bucket, previous_bucket):
+                    if bucket is not None:
+                        key = (room, bucket)
+                        self.room_activity[key] = self.room_activity.get(key, 0) + 1
+            else:
+                doc['leftAt'] = last_activity
+            yield doc
+
+    def game_room_activity(self):
+        """Per-room bucket counters matching the generated active sessions."""
+        if self.room_activity is None:
+            for _ in self.game_sessions():
+                pass
+        for (room, bucket), players in sorted(self.room_activity.items()):
+            yield {
+                '_id': f"{room}:{bucket}",
+                'roomId': room,
+                'bucket': bucket,
+                'players': players,
+                'expiresAt': EPOCH + timedelta(milliseconds=(bucket + 3) * GAME_SESSION_BUCKET_MS),
+            }
+
+    def elimination_earnings(self):
+        for i in range(self.args.users):
+            if self.rng.random() > 0.6:
+                continue
+            eliminations = self.power_law(1, 100000, 1.3) - 1
+            yield {
+                'userIdentifier': user_identifier(i),
+                'playerName': username(i),
+                'totalEarnings': round(eliminations * self.rng.uniform(0.01, 0.5), 2),
+                'totalEliminations': eliminations,
+                'gamesPlayed': max(1, eliminations // 3),
+                'lastActive': self.recent(60),
+            }
+
+    def wallet_users(self):
+        """Balance records read by the paid-match routes (lookup by userId)."""
+        for i in range(self.args.users):
+            yield {
+                'userId': user_identifier(i),
+                'balance': self.power_law(1, 1_000_000, 1.1) * 100,
+                'createdAt': self.recent(365),
+                'updatedAt': self.now,
+            }
+
+    def paid_matches(self):
+        for m in range(int(self.args.users * self.args.match_ratio)):
+            tier = self.rng.choices(list(ROOM_TIERS), weights=[6, 3, 1])[0]
+            config = ROOM_TIERS[tier]
+            count = self.rng.randint(2, 8)
+            player_ids = list({user_identifier(self.rng.randrange(self.args.users)) for _ in range(count)})
+            created = self.recent(30)
+            status = self.rng.choices(['ACTIVE', 'SETTLED'], weights=[1, 9])[0]
+            yield {
+                'matchId': f"match_{self.room_id()}_{m}",
+                'roomTier': tier,
+                'status': status,
+                'players': {
+                    player_id: {
+                        'userId': player_id,
+                        'status': 'ACTIVE' if status == 'ACTIVE' else self.rng.choice(['ELIMINATED', 'LEFT']),
+                        'bountyEscrow': config['bounty'],
+                        'joinedAt': created,
+                        'lastDamageTime': None,
+                        'lastDamageBy': None,
+                        'matchEarnings': 0,
+                    } for player_id in player_ids
+                },
+                'playerIds': player_ids,
+                'rolloverPot': 0,
+                'platformFeesCollected': config['platformFee'] * len(player_ids),
+                'totalEntryFees': config['entryFee'] * len(player_ids),
+                'totalBounty': config['bounty'] * len(player_ids),
+                'createdAt': created,
+                'updatedAt': created,
+            }
+
+
+def database_for(client, logical):
+    if logical == 'social':
+        return client[DB_NAME]
+    if logical == 'game':
+        return client[GAME_DB_NAME]
+    return client.get_default_database('test')
+
+
+def stream(collection, documents, batch_size):
+    """Writes documents in unordered bulk batches; returns the count written."""
+    written = 0
+    batch = []
+    started = time.time()
+    for doc in documents:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            collection.insert_many(batch, ordered=False)
+            written += len(batch)
+            batch = []
+            rate = written / max(time.time() - started, 1e-6)
+            print(f"\r   {collection.name}: {written:,} docs ({rate:,.0f}/s)", end='', flush=True)
+    if batch:
+        collection.insert_many(batch, ordered=False)
+        written += len(batch)
+    print(f"\r   {collection.name}: {written:,} docs in {time.time() - started:.1f}s" + ' ' * 10)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stream a synthetic TurfLoot dataset into MongoDB')
+    parser.add_argument('--users', type=int, default=100_000, help='number of users (default 100k)')
+    parser.add_argument('--collections', default=','.join(COLLECTIONS),
+                        help=f"comma-separated subset of: {', '.join(COLLECTIONS)}")
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=42, help='random seed, for reproducible datasets')
+    parser.add_argument('--drop', action='store_true', help='drop the target collections first')
+    parser.add_argument('--allow-remote', action='store_true', help='allow a non-local MONGO_URL')
+    skew = parser.add_argument_group('skew')
+    skew.add_argument('--friend-alpha', type=float, default=1.5,
+                      help='Pareto shape for friends per user; lower is heavier-tailed')
+    skew.add_argument('--max-friends', type=int, default=2000)
+    skew.add_argument('--friend-skew', type=float, default=3.0,
+                      help='popularity bias when picking friends/request targets; 1 is uniform')
+    skew.add_argument('--rooms', type=int, default=500)
+    skew.add_argument('--room-skew', type=float, default=4.0,
+                      help='hot-room bias for sessions and matches; 1 is uniform')
+    skew.add_argument('--sessions-per-user', type=float, default=3.0)
+    skew.add_argument('--active-ratio', type=float, default=0.02,
+                      help='fraction of sessions still heartbeating; the rest have left')
+    skew.add_argument('--party-ratio', type=float, default=0.05)
+    skew.add_argument('--match-ratio', type=float, default=0.2)
+    args = parser.parse_args()
+
+    selected = [name.strip() for name in args.collections.split(',') if name.strip()]
+    unknown = [name for name in selected if name not in COLLECTIONS]
+    if unknown:
+        parser.error(f"unknown collections: {', '.join(unknown)}")
+
+    host = urlparse(MONGO_URL).hostname or ''
+    if host not in ('localhost', '127.0.0.1', '::1', 'mongo', 'mongodb') and not args.allow_remote:
+        print(f"❌ Refusing to write synthetic data to {host}; pass --allow-remote to override")
+        sys.exit(1)
+
+    print("🧪 SYNTHETIC DATASET GENERATOR")
+    print("=" * 80)
+    print(f"📍 MongoDB URL: {MONGO_URL}")
+    print(f"📊 Databases: social={DB_NAME}, game={GAME_DB_NAME}")
+    print(f"👥 Users: {args.users:,}  seed={args.seed}  batch={args.batch_size}")
+
+    client = pymongo.MongoClient(MONGO_URL)
+    client.admin.command('ping')
+    generator = Generator(args)
+
+    started = time.time()
+    total = 0
+    for name in selected:
+        logical, collection_name = COLLECTIONS[name]
+        collection = database_for(client, logical)[collection_name]
+        if args.drop:
+            collection.drop()
+        print(f"\n🌱 {collection.database.name}.{collection_name}")
+        total += stream(collection, getattr(generator, name)(), args.batch_size)
+
+    print("\n" + "=" * 80)
+    print(f"✅ Wrote {total:,} documents in {time.time() - started:.1f}s")
+    print("💡 Run `node scripts/apply-indexes.js` before benchmarking")
+    client.close()
+
+
+if __name__ == '__main__':
+    main()